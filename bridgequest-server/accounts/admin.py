@@ -6,6 +6,7 @@ from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import Group
 from django.utils.translation import gettext_lazy as _
 from accounts.models.user import User
+from accounts.services.token_revocation import revoke_user_tokens
 from utils.messages import Messages
 
 # Désinscrire le modèle Group de l'admin (non utilisé dans ce projet)
@@ -39,3 +40,17 @@ class UserAdmin(BaseUserAdmin):
     )
     
     readonly_fields = ['date_joined', 'last_login', 'created_at', 'updated_at']
+    
+    actions = ['revoke_tokens']
+    
+    def save_model(self, request, obj, form, change):
+        """Révoque les tokens d'un utilisateur désactivé (bannissement)."""
+        super().save_model(request, obj, form, change)
+        if change and 'is_active' in form.changed_data and not obj.is_active:
+            revoke_user_tokens(obj)
+    
+    @admin.action(description=_(Messages.ADMIN_REVOKE_TOKENS))
+    def revoke_tokens(self, request, queryset):
+        """Révoque tous les tokens émis pour les utilisateurs sélectionnés."""
+        for user in queryset:
+            revoke_user_tokens(user)
@@ -8,4 +8,8 @@ class AccountsConfig(AppConfig):
     
     default_auto_field = "django.db.models.BigAutoField"
     name = "accounts"
-    verbose_name = _(Messages.APP_ACCOUNTS)
\ No newline at end of file
+    verbose_name = _(Messages.APP_ACCOUNTS)
+    
+    def ready(self):
+        """Connecte les signaux (invalidation du cache des profils)."""
+        from accounts import signals  # noqa: F401
@@ -0,0 +1,29 @@
+"""
+Authentification JWT de l'API REST avec prise en compte des révocations.
+
+Un token révoqué (déconnexion, bannissement) est refusé comme un token
+invalide. La vérification ne fait pas d'I/O dans le cas courant
+(voir accounts.services.token_revocation).
+"""
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from accounts.services.token_revocation import is_token_revoked
+from utils.messages import ErrorMessages
+
+
+class RevocableJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication refusant les tokens révoqués."""
+
+    def get_validated_token(self, raw_token):
+        """
+        Valide le token puis vérifie qu'il n'est pas révoqué.
+
+        Raises:
+            InvalidToken: Si le token est invalide, expiré ou révoqué.
+        """
+        validated_token = super().get_validated_token(raw_token)
+        if is_token_revoked(validated_token):
+            raise InvalidToken(_(ErrorMessages.AUTH_TOKEN_REVOKED))
+        return validated_token
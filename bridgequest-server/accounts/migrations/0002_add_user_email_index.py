@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:37
+
+from django.db import migrations, models
+from django.db.models.functions import Lower, Trim
+
+
+def normalize_emails(apps, schema_editor):
+    """Normalise les emails existants (minuscules, sans espaces)."""
+    User = apps.get_model("accounts", "User")
+    User.objects.update(email=Lower(Trim("email")))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_create_user_model"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="user",
+            name="email",
+            field=models.EmailField(
+                blank=True,
+                db_index=True,
+                help_text="model.user.email",
+                max_length=254,
+                verbose_name="model.user.email",
+            ),
+        ),
+        migrations.RunPython(normalize_emails, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_add_user_email_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                fields=["email", "-date_joined"], name="accounts_us_email_f3135a_idx"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="user",
+            name="email",
+            field=models.EmailField(
+                blank=True,
+                help_text="model.user.email",
+                max_length=254,
+                verbose_name="model.user.email",
+            ),
+        ),
+    ]
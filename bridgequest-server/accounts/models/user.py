@@ -18,6 +18,12 @@ class User(AbstractUser):
     et ajoute des champs spécifiques à l'application.
     """
     
+    email = models.EmailField(
+        blank=True,
+        verbose_name=_(ModelMessages.USER_EMAIL),
+        help_text=_(ModelMessages.USER_EMAIL)
+    )
+    
     avatar = models.URLField(
         max_length=500,
         blank=True,
@@ -40,6 +46,26 @@ class User(AbstractUser):
         verbose_name = _(ModelMessages.USER_VERBOSE_NAME)
         verbose_name_plural = _(ModelMessages.USER_VERBOSE_NAME_PLURAL)
         ordering = ['-date_joined']
+        indexes = [
+            # Recherche par email (connexion SSO) dans l'ordre par défaut :
+            # filter(email=...).first() sans tri temporaire
+            models.Index(fields=['email', '-date_joined']),
+        ]
+    
+    def save(self, *args, **kwargs):
+        """
+        Sauvegarde l'utilisateur avec un email normalisé (minuscules, sans espaces).
+        
+        Les recherches par email (connexion SSO) sont ainsi des égalités
+        exactes servies par l'index de la colonne.
+        """
+        self.email = self.normalize_email_address(self.email)
+        super().save(*args, **kwargs)
+    
+    @staticmethod
+    def normalize_email_address(email):
+        """Retourne la forme normalisée d'un email (minuscules, sans espaces)."""
+        return (email or '').strip().lower()
     
     def __str__(self):
         """Représentation string de l'utilisateur."""
@@ -5,9 +5,11 @@ Les serializers DRF seront importés ici lorsqu'ils seront créés.
 """
 from .user_serializers import UserSerializer, UserPublicSerializer
 from .sso_serializers import SSOLoginSerializer
+from .token_serializers import RevocableTokenRefreshSerializer
 
 __all__ = [
     'UserSerializer',
     'UserPublicSerializer',
     'SSOLoginSerializer',
+    'RevocableTokenRefreshSerializer',
 ]
@@ -0,0 +1,31 @@
+"""
+Serializers pour le rafraîchissement des tokens JWT.
+"""
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.services.token_revocation import is_token_revoked
+from utils.messages import ErrorMessages
+
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Serializer de rafraîchissement refusant les refresh tokens révoqués.
+    
+    Un refresh token révoqué à la déconnexion (ou par bannissement) ne
+    peut plus produire de nouveaux access tokens.
+    """
+    
+    def validate(self, attrs):
+        """
+        Vérifie la révocation du refresh token avant le rafraîchissement.
+        
+        Raises:
+            InvalidToken: Si le refresh token est révoqué.
+        """
+        refresh = RefreshToken(attrs['refresh'])
+        if is_token_revoked(refresh):
+            raise InvalidToken(_(ErrorMessages.AUTH_TOKEN_REVOKED))
+        return super().validate(attrs)
@@ -5,25 +5,21 @@ Ce service valide les tokens ID obtenus via Apple Sign-In SDK
 depuis l'application mobile Flutter.
 """
 
-import json
-
 import jwt
-import requests
 from django.conf import settings
-from jwt.algorithms import RSAAlgorithm
 
+from accounts.services.jwks_cache import JWKSCache
 from utils.exceptions import BridgeQuestException
 from utils.messages import ErrorMessages
-from utils.sso_validation import (
-    REQUEST_TIMEOUT_SECONDS,
-    require_non_empty_sso_token,
-    require_sso_config,
-)
+from utils.sso_validation import require_non_empty_sso_token, require_sso_config
 
 # Constantes de configuration
 APPLE_PUBLIC_KEYS_URL = "https://appleid.apple.com/auth/keys"
 APPLE_ISSUER = "https://appleid.apple.com"
 
+# Clés publiques Apple (rafraîchies selon Cache-Control ou sur kid inconnu)
+apple_jwks = JWKSCache(APPLE_PUBLIC_KEYS_URL, "apple")
+
 
 def validate_apple_token(token):
     """
@@ -75,8 +71,7 @@ def _decode_and_verify_token(token):
         BridgeQuestException: Si la validation échoue
     """
     unverified_header = jwt.get_unverified_header(token)
-    apple_keys = _fetch_apple_public_keys()
-    public_key = _find_matching_public_key(apple_keys, unverified_header)
+    public_key = apple_jwks.get_key(unverified_header.get("kid"))
 
     if not public_key:
         raise BridgeQuestException(
@@ -86,60 +81,6 @@ def _decode_and_verify_token(token):
     return _decode_token_with_key(token, public_key)
 
 
-def _fetch_apple_public_keys():
-    """
-    Récupère les clés publiques Apple pour valider les tokens.
-
-    Returns:
-        dict: Dictionnaire des clés publiques Apple
-
-    Raises:
-        BridgeQuestException: Si la récupération échoue
-    """
-    try:
-        response = requests.get(APPLE_PUBLIC_KEYS_URL, timeout=REQUEST_TIMEOUT_SECONDS)
-        if response.status_code != 200:
-            raise BridgeQuestException(
-                message_key=ErrorMessages.AUTH_SSO_TOKEN_VALIDATION_FAILED
-            )
-        return response.json()
-    except requests.RequestException as e:
-        raise BridgeQuestException(
-            message_key=ErrorMessages.AUTH_SSO_TOKEN_VALIDATION_FAILED
-        ) from e
-
-
-def _find_matching_public_key(apple_keys, unverified_header):
-    """
-    Trouve la clé publique Apple correspondante au header du token.
-
-    Args:
-        apple_keys: Dictionnaire contenant les clés publiques Apple
-        unverified_header: Header du token JWT non vérifié
-
-    Returns:
-        RSAPublicKey: La clé publique trouvée ou None
-    """
-    kid = unverified_header.get("kid")
-    if not kid:
-        return None
-
-    for key in apple_keys.get("keys", []):
-        if key.get("kid") == kid:
-            return _jwk_dict_to_rsa_key(key)
-    return None
-
-
-def _jwk_dict_to_rsa_key(jwk_dict):
-    """
-    Convertit un dict JWK en clé publique RSA.
-
-    PyJWT RSAAlgorithm.from_jwk attend une chaîne JSON (pas un dict).
-    Sérialiser en JSON garantit la compatibilité (PyJWT 2.8+).
-    """
-    return RSAAlgorithm.from_jwk(json.dumps(jwk_dict))
-
-
 def _get_apple_client_id():
     """
     Récupère le Client ID Apple depuis la configuration.
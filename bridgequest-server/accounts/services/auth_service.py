@@ -3,13 +3,28 @@ Service d'authentification pour Bridge Quest.
 
 Ce service gère toute la logique métier liée à l'authentification SSO mobile.
 """
+import re
+
+from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models.functions import Length
 
 from utils.exceptions import BridgeQuestException
 from utils.messages import ErrorMessages
 
 User = get_user_model()
 
+# Champs du profil complétés depuis les données SSO : (champ User, clé SSO)
+SSO_PROFILE_FIELDS = (
+    ('first_name', 'given_name'),
+    ('last_name', 'family_name'),
+    ('avatar', 'picture'),
+)
+
+# Tentatives d'allocation d'un username en cas d'inscriptions simultanées
+USERNAME_ALLOCATION_ATTEMPTS = 5
+
 
 def _generate_username_from_email(email):
     """
@@ -28,51 +43,120 @@ def _generate_unique_username(base_username):
     """
     Génère un nom d'utilisateur unique en ajoutant un suffixe numérique si nécessaire.
     
+    Une seule requête, servie par l'index unique de username (intervalle) :
+    parmi base_username et base_username<N>, le nom au plus grand suffixe
+    est celui de longueur maximale puis d'ordre maximal. Le suffixe retenu
+    est N + 1, quel que soit le nombre de collisions existantes.
+    
+    Ces noms sont tous compris entre base_username et base_username suivi
+    de chiffres 9 : l'intervalle borne le parcours de l'index (un LIKE
+    'base%' est insensible à la casse sous SQLite et parcourrait tout
+    l'index), le tri ne porte que sur les collisions.
+    
     Args:
         base_username: Le nom d'utilisateur de base
         
     Returns:
-        str: Un nom d'utilisateur unique
+        str: Un nom d'utilisateur libre au moment de la requête
     """
-    username = base_username
-    counter = 1
+    pattern = rf'^{re.escape(base_username)}([1-9][0-9]*)?$'
+    upper_bound = base_username + '9' * User._meta.get_field('username').max_length
+    last_username = (
+        User.objects
+        .filter(
+            username__gte=base_username,
+            username__lte=upper_bound,
+            username__regex=pattern,
+        )
+        .order_by(Length('username').desc(), '-username')
+        .values_list('username', flat=True)
+        .first()
+    )
     
-    while User.objects.filter(username=username).exists():
-        username = f"{base_username}{counter}"
-        counter += 1
+    if last_username is None:
+        return base_username
     
-    return username
+    suffix = last_username[len(base_username):]
+    return f"{base_username}{int(suffix or 0) + 1}"
 
 
-def _update_user_from_sso_data(user, sso_data):
+def _create_user_with_unique_username(email, sso_data):
     """
-    Met à jour les informations d'un utilisateur à partir des données SSO.
+    Crée un utilisateur SSO avec un nom d'utilisateur unique.
     
-    Ne met à jour que les champs vides pour préserver les données existantes.
+    Deux inscriptions simultanées peuvent obtenir le même suffixe : la
+    contrainte unique de username tranche, et le perdant recalcule un
+    suffixe (savepoint, pour ne pas invalider une transaction englobante).
     
     Args:
-        user: L'instance User à mettre à jour
+        email: L'email de l'utilisateur
         sso_data: Dictionnaire contenant les données SSO
         
     Returns:
-        User: L'utilisateur mis à jour
+        User: L'utilisateur créé
+        
+    Raises:
+        IntegrityError: Si aucun nom libre n'est obtenu après
+            USERNAME_ALLOCATION_ATTEMPTS tentatives
     """
-    updated = False
+    base_username = _generate_username_from_email(email)
     
-    if sso_data.get('given_name') and not user.first_name:
-        user.first_name = sso_data.get('given_name', '')
-        updated = True
+    for attempt in range(USERNAME_ALLOCATION_ATTEMPTS):
+        username = _generate_unique_username(base_username)
+        try:
+            with transaction.atomic():
+                return User.objects.create_user(
+                    username=username,
+                    email=email,
+                    first_name=sso_data.get('given_name', ''),
+                    last_name=sso_data.get('family_name', ''),
+                    avatar=sso_data.get('picture', '')
+                )
+        except IntegrityError:
+            if attempt == USERNAME_ALLOCATION_ATTEMPTS - 1:
+                raise
+
+
+def _apply_sso_profile(user, sso_data):
+    """
+    Complète les champs vides d'un utilisateur à partir des données SSO (sans sauvegarde).
     
-    if sso_data.get('family_name') and not user.last_name:
-        user.last_name = sso_data.get('family_name', '')
-        updated = True
+    Args:
+        user: L'instance User à compléter
+        sso_data: Dictionnaire contenant les données SSO
+        
+    Returns:
+        list: Les champs modifiés (vide si rien n'a changé), à passer
+            à save(update_fields=...) avec updated_at
+    """
+    changed_fields = []
     
-    if sso_data.get('picture') and not user.avatar:
-        user.avatar = sso_data.get('picture', '')
-        updated = True
+    for field, sso_key in SSO_PROFILE_FIELDS:
+        value = sso_data.get(sso_key)
+        if value and not getattr(user, field):
+            setattr(user, field, value)
+            changed_fields.append(field)
     
-    if updated:
-        user.save()
+    return changed_fields
+
+
+def _update_user_from_sso_data(user, sso_data):
+    """
+    Met à jour les informations d'un utilisateur à partir des données SSO.
+    
+    Ne met à jour que les champs vides pour préserver les données existantes,
+    et n'écrit que les colonnes modifiées (aucune écriture si rien ne change).
+    
+    Args:
+        user: L'instance User à mettre à jour
+        sso_data: Dictionnaire contenant les données SSO
+        
+    Returns:
+        User: L'utilisateur mis à jour
+    """
+    changed_fields = _apply_sso_profile(user, sso_data)
+    if changed_fields:
+        user.save(update_fields=[*changed_fields, 'updated_at'])
     
     return user
 
@@ -94,7 +178,7 @@ def get_user_by_email(email):
         raise BridgeQuestException(message_key=ErrorMessages.USER_EMAIL_REQUIRED)
     
     try:
-        return User.objects.get(email=email)
+        return User.objects.get(email=User.normalize_email_address(email))
     except User.DoesNotExist:
         return None
     except Exception as e:
@@ -120,7 +204,9 @@ def create_or_get_user_from_sso_data(sso_data, provider):
         if not email:
             raise BridgeQuestException(message_key=ErrorMessages.USER_EMAIL_REQUIRED)
         
-        # Vérifier si un utilisateur avec cet email existe déjà
+        # Vérifier si un utilisateur avec cet email existe déjà (égalité exacte
+        # sur l'email normalisé : recherche indexée)
+        email = User.normalize_email_address(email)
         user = User.objects.filter(email=email).first()
         
         if user:
@@ -128,18 +214,7 @@ def create_or_get_user_from_sso_data(sso_data, provider):
             return _update_user_from_sso_data(user, sso_data)
         
         # Créer un nouvel utilisateur
-        base_username = _generate_username_from_email(email)
-        username = _generate_unique_username(base_username)
-        
-        user = User.objects.create_user(
-            username=username,
-            email=email,
-            first_name=sso_data.get('given_name', ''),
-            last_name=sso_data.get('family_name', ''),
-            avatar=sso_data.get('picture', '')
-        )
-        
-        return user
+        return _create_user_with_unique_username(email, sso_data)
         
     except BridgeQuestException:
         # Re-lancer les exceptions métier telles quelles
@@ -147,3 +222,44 @@ def create_or_get_user_from_sso_data(sso_data, provider):
     except Exception as e:
         # Encapsuler les autres exceptions
         raise BridgeQuestException(message_key=ErrorMessages.AUTH_SSO_FAILED) from e
+
+
+def _create_or_get_user_in_pool_thread(sso_data, provider):
+    """
+    Exécute create_or_get_user_from_sso_data dans un thread du pool partagé.
+    
+    Ce thread ne traite pas de requête : aucun request_finished ne ferme sa
+    connexion. Elle est fermée ici, comme en fin de requête (selon
+    CONN_MAX_AGE).
+    """
+    try:
+        return create_or_get_user_from_sso_data(sso_data, provider)
+    finally:
+        close_old_connections()
+
+
+async def acreate_or_get_user_from_sso_data(sso_data, provider):
+    """
+    Version asynchrone de create_or_get_user_from_sso_data.
+    
+    Utilisée par la vue de connexion SSO asynchrone. Délègue à la version
+    synchrone (recherche, mise à jour des champs modifiés et création avec
+    retry n'ont qu'une implémentation) dans le pool de threads partagé
+    (thread_sensitive=False) : les connexions simultanées ne sont pas
+    sérialisées sur le thread unique des vues synchrones et de
+    database_sync_to_async (consumers). L'ORM asynchrone de Django
+    (aget, acreate...) passe lui-même par ce thread unique.
+    
+    Args:
+        sso_data: Dictionnaire contenant les données SSO (email, given_name, etc.)
+        provider: Le fournisseur SSO ('google' ou 'apple')
+        
+    Returns:
+        User: L'utilisateur créé ou récupéré
+        
+    Raises:
+        BridgeQuestException: Si la création/récupération échoue
+    """
+    return await sync_to_async(_create_or_get_user_in_pool_thread, thread_sensitive=False)(
+        sso_data, provider
+    )
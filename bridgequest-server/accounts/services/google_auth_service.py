@@ -3,15 +3,24 @@ Service de validation des tokens Google Sign-In pour Bridge Quest.
 
 Ce service valide les tokens ID obtenus via Google Sign-In SDK
 depuis l'application mobile Flutter.
+
+La signature est vérifiée localement avec les clés publiques Google (JWKS
+en cache, rafraîchies à la rotation) : aucun appel réseau par connexion.
 """
-import requests
+import jwt
 from django.conf import settings
+
+from accounts.services.jwks_cache import JWKSCache
 from utils.exceptions import BridgeQuestException
 from utils.messages import ErrorMessages
-from utils.sso_validation import REQUEST_TIMEOUT_SECONDS, require_non_empty_sso_token, require_sso_config
+from utils.sso_validation import require_non_empty_sso_token, require_sso_config
 
 # Constantes de configuration
-GOOGLE_TOKEN_INFO_URL = 'https://oauth2.googleapis.com/tokeninfo'
+GOOGLE_PUBLIC_KEYS_URL = 'https://www.googleapis.com/oauth2/v3/certs'
+GOOGLE_ISSUERS = ('accounts.google.com', 'https://accounts.google.com')
+
+# Clés publiques Google (rafraîchies selon Cache-Control ou sur kid inconnu)
+google_jwks = JWKSCache(GOOGLE_PUBLIC_KEYS_URL, 'google')
 
 
 def validate_google_token(token):
@@ -34,7 +43,8 @@ def validate_google_token(token):
     """
     require_non_empty_sso_token(token)
     google_client_ids = _get_google_client_ids()
-    token_info = _fetch_token_info(token)
+    token_info = _decode_and_verify_token(token)
+    _validate_token_issuer(token_info)
     _validate_token_audience(token_info, google_client_ids)
     return _extract_user_data(token_info)
 
@@ -54,38 +64,52 @@ def _get_google_client_ids():
     return google_client_ids
 
 
-def _fetch_token_info(token):
+def _decode_and_verify_token(token):
     """
-    Récupère les informations du token depuis l'API Google.
-    
+    Vérifie la signature et l'expiration du token avec les clés publiques Google.
+
+    L'audience et l'émetteur sont vérifiés séparément
+    (_validate_token_audience, _validate_token_issuer).
+
     Args:
         token: Le token ID à valider
-        
+
     Returns:
-        dict: Informations du token retournées par Google
-        
+        dict: Claims du token (aud, iss, email, sub, ...)
+
     Raises:
-        BridgeQuestException: Si l'appel API échoue
+        BridgeQuestException: Si la signature, le kid ou l'expiration est invalide
     """
     try:
-        response = requests.get(
-            GOOGLE_TOKEN_INFO_URL,
-            params={'id_token': token},
-            timeout=REQUEST_TIMEOUT_SECONDS
-        )
-        
-        if response.status_code != 200:
-            raise BridgeQuestException(message_key=ErrorMessages.AUTH_SSO_TOKEN_VALIDATION_FAILED)
-        
-        token_info = response.json()
-        
-        if 'error' in token_info:
+        unverified_header = jwt.get_unverified_header(token)
+        public_key = google_jwks.get_key(unverified_header.get('kid'))
+        if not public_key:
             raise BridgeQuestException(message_key=ErrorMessages.AUTH_SSO_TOKEN_VALIDATION_FAILED)
+
+        return jwt.decode(
+            token,
+            public_key,
+            algorithms=['RS256'],
+            options={'verify_aud': False, 'require': ['exp', 'iss', 'aud']},
+        )
+    except jwt.InvalidTokenError as e:
+        raise BridgeQuestException(
+            message_key=ErrorMessages.AUTH_SSO_TOKEN_VALIDATION_FAILED
+        ) from e
+
+
+def _validate_token_issuer(token_info):
+    """
+    Vérifie que le token a été émis par Google.
+    
+    Args:
+        token_info: Claims du token
         
-        return token_info
-        
-    except requests.RequestException as e:
-        raise BridgeQuestException(message_key=ErrorMessages.AUTH_SSO_TOKEN_VALIDATION_FAILED) from e
+    Raises:
+        BridgeQuestException: Si l'émetteur n'est pas Google
+    """
+    if token_info.get('iss') not in GOOGLE_ISSUERS:
+        raise BridgeQuestException(message_key=ErrorMessages.AUTH_SSO_TOKEN_VALIDATION_FAILED)
 
 
 def _validate_token_audience(token_info, google_client_ids):
@@ -93,7 +117,7 @@ def _validate_token_audience(token_info, google_client_ids):
     Vérifie que l'audience du token correspond à un Client ID autorisé.
     
     Args:
-        token_info: Informations du token retournées par Google
+        token_info: Claims du token Google
         google_client_ids: Liste des Client IDs autorisés
         
     Raises:
@@ -109,7 +133,7 @@ def _extract_user_data(token_info):
     Extrait et normalise les données utilisateur depuis les informations du token.
     
     Args:
-        token_info: Informations du token retournées par Google
+        token_info: Claims du token Google
         
     Returns:
         dict: Données utilisateur normalisées
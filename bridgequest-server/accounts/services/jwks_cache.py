@@ -0,0 +1,181 @@
+"""
+Cache des clés publiques JWKS des fournisseurs SSO (Apple, Google).
+
+Les clés sont récupérées une fois puis conservées :
+- en mémoire du processus : clés RSA déjà construites, indexées par kid,
+- dans le cache partagé : document JWKS brut (les objets clés ne sont pas
+  sérialisables), pour que les autres workers n'aient pas à le récupérer.
+
+La durée de validité suit l'en-tête Cache-Control (max-age) du fournisseur.
+Un kid inconnu (rotation des clés) déclenche un rafraîchissement, au plus une
+fois par JWKS_MIN_REFRESH_INTERVAL_SECONDS. Les récupérations sont
+single-flight : des connexions simultanées ne déclenchent qu'un appel HTTP.
+"""
+import json
+import re
+import threading
+import time
+
+import requests
+from django.core.cache import cache
+from jwt.algorithms import RSAAlgorithm
+
+from utils.exceptions import BridgeQuestException
+from utils.http_client import get_http_client
+from utils.messages import ErrorMessages
+from utils.sso_validation import REQUEST_TIMEOUT_SECONDS
+
+# Validité par défaut si le fournisseur n'envoie pas de max-age
+JWKS_DEFAULT_MAX_AGE_SECONDS = 3600
+# Intervalle minimal entre deux récupérations (kid inconnu ou max-age très court)
+JWKS_MIN_REFRESH_INTERVAL_SECONDS = 60
+
+_CACHE_KEY_PREFIX = "sso_jwks"
+_MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+
+def _parse_max_age(cache_control):
+    """
+    Extrait max-age de l'en-tête Cache-Control.
+
+    Args:
+        cache_control: Valeur de l'en-tête (ou None).
+
+    Returns:
+        int: Durée de validité en secondes (au moins JWKS_MIN_REFRESH_INTERVAL_SECONDS).
+    """
+    match = _MAX_AGE_PATTERN.search(cache_control or "")
+    max_age = int(match.group(1)) if match else JWKS_DEFAULT_MAX_AGE_SECONDS
+    return max(max_age, JWKS_MIN_REFRESH_INTERVAL_SECONDS)
+
+
+def jwk_dict_to_rsa_key(jwk_dict):
+    """
+    Convertit un dict JWK en clé publique RSA.
+
+    PyJWT RSAAlgorithm.from_jwk attend une chaîne JSON (pas un dict).
+    Sérialiser en JSON garantit la compatibilité (PyJWT 2.8+).
+    """
+    return RSAAlgorithm.from_jwk(json.dumps(jwk_dict))
+
+
+class JWKSCache:
+    """Clés publiques d'un endpoint JWKS, indexées par kid."""
+
+    def __init__(self, url, name):
+        """
+        Args:
+            url: URL du document JWKS du fournisseur.
+            name: Nom court du fournisseur (clé du cache partagé).
+        """
+        self.url = url
+        self.cache_key = f"{_CACHE_KEY_PREFIX}:{name}"
+        self._keys = {}
+        self._expires_at = 0.0
+        self._last_fetch_at = None
+        self._lock = threading.Lock()
+
+    def get_key(self, kid):
+        """
+        Retourne la clé publique RSA correspondant au kid.
+
+        Args:
+            kid: Identifiant de clé (header du token).
+
+        Returns:
+            RSAPublicKey | None: La clé, ou None si le fournisseur ne la publie pas.
+
+        Raises:
+            BridgeQuestException: Si la récupération des clés échoue.
+        """
+        if not kid:
+            return None
+        key = self._get_fresh_key(kid)
+        if key is not None:
+            return key
+        with self._lock:
+            # Un autre thread a pu rafraîchir pendant l'attente du verrou
+            key = self._get_fresh_key(kid)
+            if key is not None:
+                return key
+            if self._load_from_shared_cache() and kid in self._keys:
+                return self._keys[kid]
+            if self._refresh_allowed():
+                try:
+                    self._fetch()
+                except BridgeQuestException:
+                    # Fournisseur indisponible : les clés expirées restent utilisables
+                    if kid not in self._keys:
+                        raise
+            return self._keys.get(kid)
+
+    def clear(self):
+        """Vide le cache en mémoire et le cache partagé."""
+        with self._lock:
+            self._keys = {}
+            self._expires_at = 0.0
+            self._last_fetch_at = None
+        cache.delete(self.cache_key)
+
+    def _get_fresh_key(self, kid):
+        """Retourne la clé en mémoire si elle n'a pas expiré."""
+        if time.time() < self._expires_at:
+            return self._keys.get(kid)
+        return None
+
+    def _install(self, jwks, expires_at):
+        """Construit les clés RSA du document JWKS et les installe en mémoire."""
+        self._keys = {
+            jwk["kid"]: jwk_dict_to_rsa_key(jwk)
+            for jwk in jwks.get("keys", [])
+            if jwk.get("kid")
+        }
+        self._expires_at = expires_at
+
+    def _load_from_shared_cache(self):
+        """
+        Installe le document JWKS publié par un autre worker, s'il est plus récent.
+
+        Returns:
+            bool: True si un document plus récent a été installé.
+        """
+        cached = cache.get(self.cache_key)
+        if not cached or cached["expires_at"] <= self._expires_at:
+            return False
+        self._install(cached["jwks"], cached["expires_at"])
+        return True
+
+    def _refresh_allowed(self):
+        """Limite les récupérations (protège le fournisseur des kid arbitraires)."""
+        if self._last_fetch_at is None or time.time() >= self._expires_at:
+            return True
+        return time.time() - self._last_fetch_at >= JWKS_MIN_REFRESH_INTERVAL_SECONDS
+
+    def _fetch(self):
+        """
+        Récupère le document JWKS et le publie dans le cache partagé.
+
+        Raises:
+            BridgeQuestException: Si la récupération échoue.
+        """
+        self._last_fetch_at = time.time()
+        try:
+            response = get_http_client().get(self.url, timeout=REQUEST_TIMEOUT_SECONDS)
+            if response.status_code != 200:
+                raise BridgeQuestException(
+                    message_key=ErrorMessages.AUTH_SSO_TOKEN_VALIDATION_FAILED
+                )
+            jwks = response.json()
+        except (requests.RequestException, ValueError) as e:
+            raise BridgeQuestException(
+                message_key=ErrorMessages.AUTH_SSO_TOKEN_VALIDATION_FAILED
+            ) from e
+
+        max_age = _parse_max_age(response.headers.get("Cache-Control"))
+        expires_at = self._last_fetch_at + max_age
+        self._install(jwks, expires_at)
+        cache.set(
+            self.cache_key,
+            {"jwks": jwks, "expires_at": expires_at},
+            timeout=max_age,
+        )
@@ -0,0 +1,151 @@
+"""
+Cache des profils utilisateur sérialisés et validateurs HTTP conditionnels.
+
+Les écrans de lobby et de partie demandent le profil de chaque participant
+(avatar) à chaque affichage. Les payloads sérialisés sont conservés dans le
+cache partagé avec la date de dernière modification (User.updated_at), ce
+qui permet :
+- de répondre 304 Not Modified (ETag / Last-Modified) sans sérialiser,
+- de servir un profil public sans requête SQL.
+
+Les entrées sont invalidées à chaque sauvegarde d'un utilisateur
+(signal post_save, voir accounts.signals).
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from accounts.serializers.user_serializers import UserPublicSerializer, UserSerializer
+
+User = get_user_model()
+
+PUBLIC_PROFILE = "public"
+PRIVATE_PROFILE = "private"
+
+_SERIALIZERS = {
+    PUBLIC_PROFILE: UserPublicSerializer,
+    PRIVATE_PROFILE: UserSerializer,
+}
+
+
+def _cache_key(kind, user_id):
+    """Clé de cache d'un profil sérialisé."""
+    return f"user_profile:{kind}:{user_id}"
+
+
+def get_profile_etag(user_id, updated_at):
+    """
+    Calcule l'ETag d'un profil à partir de sa date de modification.
+
+    Args:
+        user_id: L'ID de l'utilisateur
+        updated_at: La date de dernière modification (User.updated_at)
+
+    Returns:
+        str: ETag fort entre guillemets
+    """
+    return f'"{user_id}-{int(updated_at.timestamp() * 1_000_000)}"'
+
+
+def build_profile_entry(user, kind):
+    """
+    Sérialise un profil et le met en cache.
+
+    Args:
+        user: L'instance User
+        kind: PUBLIC_PROFILE ou PRIVATE_PROFILE
+
+    Returns:
+        dict: {'data': payload sérialisé, 'updated_at': datetime}
+    """
+    entry = {
+        'data': _SERIALIZERS[kind](user).data,
+        'updated_at': user.updated_at,
+    }
+    cache.set(
+        _cache_key(kind, user.pk),
+        entry,
+        timeout=settings.USER_PROFILE_CACHE_TIMEOUT_SECONDS,
+    )
+    return entry
+
+
+def get_cached_profile(user_id, kind):
+    """
+    Retourne l'entrée en cache d'un profil, sans accès à la base.
+
+    Args:
+        user_id: L'ID de l'utilisateur
+        kind: PUBLIC_PROFILE ou PRIVATE_PROFILE
+
+    Returns:
+        dict: {'data', 'updated_at'} ou None si absent du cache
+    """
+    return cache.get(_cache_key(kind, user_id))
+
+
+def get_public_profile(user_id):
+    """
+    Retourne le profil public d'un utilisateur (cache, sinon base puis cache).
+
+    Args:
+        user_id: L'ID de l'utilisateur
+
+    Returns:
+        dict: {'data', 'updated_at'} ou None si l'utilisateur n'existe pas
+    """
+    entry = get_cached_profile(user_id, PUBLIC_PROFILE)
+    if entry is not None:
+        return entry
+
+    user = User.objects.filter(pk=user_id).first()
+    if user is None:
+        return None
+    return build_profile_entry(user, PUBLIC_PROFILE)
+
+
+def get_public_profiles(user_ids):
+    """
+    Retourne les profils publics de plusieurs utilisateurs.
+
+    Les profils en cache sont lus en un seul get_many ; les autres en une
+    seule requête in_bulk (clé primaire), sérialisés en un seul passage
+    puis mis en cache.
+
+    Args:
+        user_ids: Liste d'IDs utilisateur (sans doublons)
+
+    Returns:
+        dict: {user_id: payload public} pour les utilisateurs existants
+    """
+    keys = {_cache_key(PUBLIC_PROFILE, user_id): user_id for user_id in user_ids}
+    profiles = {
+        keys[key]: entry['data']
+        for key, entry in cache.get_many(list(keys)).items()
+    }
+
+    missing_ids = [user_id for user_id in user_ids if user_id not in profiles]
+    if not missing_ids:
+        return profiles
+
+    users = list(User.objects.order_by().in_bulk(missing_ids).values())
+    payloads = UserPublicSerializer(users, many=True).data
+    entries = {}
+    for user, payload in zip(users, payloads):
+        profiles[user.pk] = payload
+        entries[_cache_key(PUBLIC_PROFILE, user.pk)] = {
+            'data': payload,
+            'updated_at': user.updated_at,
+        }
+    cache.set_many(entries, timeout=settings.USER_PROFILE_CACHE_TIMEOUT_SECONDS)
+    return profiles
+
+
+def invalidate_user_profile(user_id):
+    """
+    Supprime les profils en cache d'un utilisateur.
+
+    Args:
+        user_id: L'ID de l'utilisateur
+    """
+    cache.delete_many([_cache_key(kind, user_id) for kind in _SERIALIZERS])
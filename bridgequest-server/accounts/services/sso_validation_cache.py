@@ -0,0 +1,101 @@
+"""
+Cache et single-flight des validations de tokens SSO.
+
+Les clients mobiles renvoient souvent le même token après un timeout.
+Le résultat d'une validation réussie est conservé dans le cache partagé
+jusqu'à l'expiration (exp) du token, sous une clé dérivée de
+sha256(provider:token) : le token n'est jamais stocké en clair.
+
+Dans un processus, des validations simultanées du même token n'en exécutent
+qu'une : les autres attendent son résultat (ou son exception).
+Les échecs ne sont pas mis en cache.
+"""
+import hashlib
+import threading
+import time
+from concurrent.futures import Future
+
+import jwt
+from django.core.cache import cache
+
+from utils.sso_validation import REQUEST_TIMEOUT_SECONDS
+
+_CACHE_KEY_PREFIX = "sso_validation"
+
+# Attente maximale d'une validation identique déjà en cours (secondes)
+_INFLIGHT_WAIT_SECONDS = REQUEST_TIMEOUT_SECONDS * 2
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def _cache_key(provider, token):
+    """Clé de cache d'un token (empreinte, jamais le token en clair)."""
+    digest = hashlib.sha256(f"{provider}:{token}".encode()).hexdigest()
+    return f"{_CACHE_KEY_PREFIX}:{digest}"
+
+
+def _remaining_lifetime(token):
+    """
+    Durée de vie restante d'un token déjà validé, d'après son claim exp.
+
+    La signature a été vérifiée par le validateur : le claim est lu sans
+    nouvelle vérification.
+
+    Returns:
+        int: Secondes restantes (0 si exp absent ou token non JWT).
+    """
+    try:
+        claims = jwt.decode(token, options={"verify_signature": False})
+    except jwt.InvalidTokenError:
+        return 0
+    exp = claims.get("exp")
+    if not isinstance(exp, (int, float)):
+        return 0
+    return max(0, int(exp - time.time()))
+
+
+def validate_sso_token_cached(provider, token, validate):
+    """
+    Valide un token SSO via le cache, en dédupliquant les appels simultanés.
+
+    Args:
+        provider: Le fournisseur SSO ('google' ou 'apple').
+        token: Le token ID à valider.
+        validate: Validateur du fournisseur (token -> données SSO).
+
+    Returns:
+        dict: Les données SSO validées.
+
+    Raises:
+        BridgeQuestException: Si la validation échoue (propagée à tous les appelants).
+    """
+    key = _cache_key(provider, token)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        is_leader = future is None
+        if is_leader:
+            future = Future()
+            _inflight[key] = future
+
+    if not is_leader:
+        return future.result(timeout=_INFLIGHT_WAIT_SECONDS)
+
+    try:
+        sso_data = validate(token)
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        ttl = _remaining_lifetime(token)
+        if ttl > 0:
+            cache.set(key, sso_data, timeout=ttl)
+        future.set_result(sso_data)
+        return sso_data
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
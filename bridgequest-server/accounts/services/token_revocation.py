@@ -0,0 +1,312 @@
+"""
+Révocation des tokens JWT (déconnexion, bannissement) sans coût par requête.
+
+Une révocation vise soit un token (claim jti), soit tous les tokens d'un
+utilisateur émis avant un instant (revoked_before, utilisé au bannissement).
+
+- Le cache partagé contient une entrée par révocation, expirant avec le
+  token révoqué (exp) : aucune purge n'est nécessaire.
+- Chaque worker garde un filtre de Bloom en mémoire des éléments révoqués.
+  Un élément absent du filtre n'est certainement pas révoqué : la
+  vérification se fait sans I/O. Un élément présent (faux positif possible)
+  est confirmé dans le cache partagé.
+- Les révocations sont publiées à tous les workers via un journal dans le
+  cache partagé (compteur de version + une entrée par version). Chaque
+  worker relit au plus une fois par TOKEN_REVOCATION_SYNC_INTERVAL_SECONDS
+  les entrées publiées depuis sa dernière synchronisation.
+
+Une révocation émise par un autre worker est donc effective après au plus
+un intervalle de synchronisation ; dans le worker émetteur, immédiatement.
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.settings import api_settings
+
+_KEY_PREFIX = "token_revocation"
+_VERSION_KEY = f"{_KEY_PREFIX}:version"
+_FLOOR_KEY = f"{_KEY_PREFIX}:floor"
+
+# Entrées du journal lues par appel get_many
+_JOURNAL_CHUNK_SIZE = 500
+# Délai après lequel une entrée de journal absente est considérée perdue
+# (expirée ou évincée) plutôt qu'en cours d'écriture
+_MISSING_ENTRY_GRACE_SECONDS = 5
+
+
+def _jti_item(jti):
+    """Élément du filtre pour un token révoqué."""
+    return f"jti:{jti}"
+
+
+def _user_item(user_id):
+    """Élément du filtre pour les tokens révoqués d'un utilisateur."""
+    return f"user:{user_id}"
+
+
+def _entry_key(item):
+    """Clé de cache de la révocation d'un élément."""
+    return f"{_KEY_PREFIX}:{item}"
+
+
+def _journal_key(version):
+    """Clé de cache d'une entrée du journal."""
+    return f"{_KEY_PREFIX}:journal:{version}"
+
+
+def _max_token_lifetime_seconds():
+    """Durée de vie du token le plus long (refresh) : horizon d'une révocation."""
+    return int(max(
+        api_settings.ACCESS_TOKEN_LIFETIME,
+        api_settings.REFRESH_TOKEN_LIFETIME,
+    ).total_seconds())
+
+
+class BloomFilter:
+    """
+    Filtre de Bloom (ensemble probabiliste sans faux négatif).
+
+    Dimensionné pour `capacity` éléments au taux de faux positifs `error_rate`.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        """Positions des bits d'un élément (double hachage sur un condensat blake2b)."""
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+        return [(first + index * second) % self.size for index in range(self.hash_count)]
+
+    def add(self, item):
+        """Ajoute un élément."""
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class TokenRevocationRegistry:
+    """Registre des révocations d'un worker (filtre local + cache partagé)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._version = 0
+        self._missing = {}
+        self._next_sync = 0.0
+
+    def reset(self):
+        """Oublie l'état local (le prochain appel reconstruit le filtre)."""
+        with self._lock:
+            self._filter = None
+            self._version = 0
+            self._missing = {}
+            self._next_sync = 0.0
+
+    def _new_filter(self, live_items=0):
+        """Crée un filtre dimensionné pour au moins le double des éléments actifs."""
+        return BloomFilter(
+            max(settings.TOKEN_REVOCATION_BLOOM_CAPACITY, live_items * 2),
+            settings.TOKEN_REVOCATION_BLOOM_ERROR_RATE,
+        )
+
+    def _ensure_synced(self):
+        """Synchronise le filtre avec le journal partagé si l'intervalle est écoulé."""
+        if self._filter is not None and time.monotonic() < self._next_sync:
+            return
+        with self._lock:
+            if self._filter is not None and time.monotonic() < self._next_sync:
+                return
+            self._sync()
+            self._next_sync = time.monotonic() + settings.TOKEN_REVOCATION_SYNC_INTERVAL_SECONDS
+
+    def _sync(self):
+        """
+        Applique les entrées du journal publiées depuis la dernière synchronisation.
+
+        Le filtre est reconstruit au démarrage, s'il est saturé, ou si le
+        compteur de version a reculé (cache partagé vidé).
+        """
+        version = cache.get(_VERSION_KEY, 0)
+        rebuild = (
+            self._filter is None
+            or version < self._version
+            or self._filter.count >= self._filter.capacity
+        )
+        if rebuild:
+            self._rebuild(version)
+            return
+
+        versions = list(self._missing) + list(range(self._version + 1, version + 1))
+        self._version = version
+        self._load_journal(self._filter, versions)
+
+    def _rebuild(self, version):
+        """Reconstruit le filtre à partir des entrées encore présentes du journal."""
+        floor = cache.get(_FLOOR_KEY, 1)
+        live = self._new_filter()
+        self._missing = {}
+        first_present = self._load_journal(live, range(floor, version + 1))
+        if live.count >= live.capacity:
+            resized = self._new_filter(live.count)
+            self._missing = {}
+            self._load_journal(resized, range(floor, version + 1))
+            live = resized
+        self._filter = live
+        self._version = version
+        # Les entrées du journal ont toutes la même durée de vie : celles
+        # précédant la première entrée présente ont expiré définitivement.
+        # Seules les plus récentes peuvent être en cours d'écriture.
+        oldest_pending = (
+            first_present if first_present is not None else version - _JOURNAL_CHUNK_SIZE
+        )
+        self._missing = {
+            missing: first_seen
+            for missing, first_seen in self._missing.items()
+            if missing > oldest_pending
+        }
+        if first_present is not None and first_present > floor:
+            cache.set(_FLOOR_KEY, first_present, timeout=None)
+
+    def _load_journal(self, bloom, versions):
+        """
+        Ajoute au filtre les éléments encore actifs des versions du journal.
+
+        Les entrées absentes sont retentées aux synchronisations suivantes
+        (écriture concurrente) pendant _MISSING_ENTRY_GRACE_SECONDS.
+
+        Returns:
+            int: La plus petite version présente (None si aucune).
+        """
+        now = time.time()
+        first_present = None
+        versions = sorted(versions)
+        for start in range(0, len(versions), _JOURNAL_CHUNK_SIZE):
+            chunk = versions[start:start + _JOURNAL_CHUNK_SIZE]
+            entries = cache.get_many([_journal_key(version) for version in chunk])
+            for version in chunk:
+                entry = entries.get(_journal_key(version))
+                if entry is None:
+                    self._missing.setdefault(version, time.monotonic())
+                    continue
+                self._missing.pop(version, None)
+                if first_present is None:
+                    first_present = version
+                item, expires_at = entry
+                if expires_at > now:
+                    bloom.add(item)
+
+        deadline = time.monotonic() - _MISSING_ENTRY_GRACE_SECONDS
+        self._missing = {
+            version: first_seen
+            for version, first_seen in self._missing.items()
+            if first_seen > deadline
+        }
+        return first_present
+
+    def publish(self, item, value, expires_at):
+        """
+        Publie une révocation dans le cache partagé et le journal.
+
+        Args:
+            item: Élément révoqué (jti:... ou user:...).
+            value: Valeur stockée (True ou instant revoked_before).
+            expires_at: Instant (epoch) après lequel la révocation est inutile.
+        """
+        timeout = math.ceil(expires_at - time.time())
+        if timeout <= 0:
+            return
+        cache.set(_entry_key(item), value, timeout=timeout)
+
+        cache.add(_VERSION_KEY, 0, timeout=None)
+        version = cache.incr(_VERSION_KEY)
+        cache.set(
+            _journal_key(version),
+            (item, expires_at),
+            timeout=_max_token_lifetime_seconds(),
+        )
+
+        self._ensure_synced()
+        with self._lock:
+            self._filter.add(item)
+
+    def is_revoked(self, token):
+        """
+        Indique si un token validé (signature, exp) est révoqué.
+
+        Args:
+            token: Token simplejwt validé (AccessToken ou RefreshToken).
+
+        Returns:
+            bool: True si le token ou son utilisateur a été révoqué.
+        """
+        self._ensure_synced()
+        bloom = self._filter
+
+        jti = token.get(api_settings.JTI_CLAIM)
+        if jti and _jti_item(jti) in bloom and cache.get(_entry_key(_jti_item(jti))):
+            return True
+
+        user_id = token.get(api_settings.USER_ID_CLAIM)
+        if user_id is not None and _user_item(user_id) in bloom:
+            revoked_before = cache.get(_entry_key(_user_item(user_id)))
+            if revoked_before is not None and token.get('iat', 0) <= revoked_before:
+                return True
+
+        return False
+
+
+_registry = TokenRevocationRegistry()
+
+
+def revoke_token(token):
+    """
+    Révoque un token jusqu'à son expiration (déconnexion).
+
+    Args:
+        token: Token simplejwt validé (AccessToken ou RefreshToken).
+    """
+    jti = token.get(api_settings.JTI_CLAIM)
+    if not jti:
+        return
+    _registry.publish(_jti_item(jti), True, token.get('exp', 0))
+
+
+def revoke_user_tokens(user):
+    """
+    Révoque tous les tokens d'un utilisateur émis jusqu'à maintenant (bannissement).
+
+    Args:
+        user: L'utilisateur dont les tokens sont révoqués.
+    """
+    now = int(time.time())
+    user_id = getattr(user, api_settings.USER_ID_FIELD)
+    _registry.publish(_user_item(user_id), now, now + _max_token_lifetime_seconds())
+
+
+def is_token_revoked(token):
+    """
+    Indique si un token validé est révoqué (sans I/O dans le cas courant).
+
+    Args:
+        token: Token simplejwt validé (AccessToken ou RefreshToken).
+
+    Returns:
+        bool: True si le token est révoqué.
+    """
+    return _registry.is_revoked(token)
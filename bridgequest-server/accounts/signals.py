@@ -0,0 +1,19 @@
+"""
+Signaux du module Accounts.
+
+Connectés au chargement de l'application (AccountsConfig.ready).
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.services.profile_cache import invalidate_user_profile
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_profile_cache(sender, instance, **kwargs):
+    """Invalide les profils en cache d'un utilisateur modifié ou supprimé."""
+    invalidate_user_profile(instance.pk)
@@ -2,8 +2,16 @@
 Mixins de test réutilisables pour le module Accounts.
 
 Fournit des assertions partagées entre plusieurs fichiers de tests
-(ex: validation du format JWT, contrat de réponse login).
+(ex: validation du format JWT, contrat de réponse login) et un serveur
+JWKS local remplaçant les endpoints de clés des fournisseurs SSO.
 """
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
 
 
 class JwtAssertionsMixin:
@@ -34,3 +42,57 @@ class JwtAssertionsMixin:
         )
         self._assert_jwt_format(data["access"])
         self._assert_jwt_format(data["refresh"])
+
+
+class LocalJWKSServerMixin:
+    """
+    Mixin démarrant un serveur HTTP local qui publie un document JWKS.
+
+    Attributs disponibles : jwks_url, jwks_requests (nombre d'appels reçus),
+    jwks_cache_control (en-tête renvoyé). add_signing_key() génère une clé
+    RSA publiée sous un kid ; sign_token() signe des claims avec cette clé.
+    """
+
+    jwks_cache_control = "public, max-age=3600"
+
+    def setUp(self):
+        """Démarre le serveur JWKS local."""
+        super().setUp()
+        self.jwks_requests = 0
+        self._signing_keys = {}
+        self._published_jwks = []
+        mixin = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                mixin.jwks_requests += 1
+                body = json.dumps({"keys": list(mixin._published_jwks)}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Cache-Control", mixin.jwks_cache_control)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = HTTPServer(("127.0.0.1", 0), _Handler)
+        thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.jwks_url = f"http://127.0.0.1:{server.server_port}/keys"
+
+    def add_signing_key(self, kid):
+        """Génère une clé RSA et publie sa partie publique sous le kid donné."""
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+        self._published_jwks.append({**jwk, "kid": kid, "alg": "RS256", "use": "sig"})
+        self._signing_keys[kid] = private_key
+
+    def sign_token(self, claims, kid):
+        """Signe des claims (RS256) avec la clé privée du kid."""
+        return jwt.encode(
+            claims, self._signing_keys[kid], algorithm="RS256", headers={"kid": kid}
+        )
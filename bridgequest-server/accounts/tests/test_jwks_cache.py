@@ -0,0 +1,146 @@
+"""
+Tests pour le cache des clés JWKS SSO (jwks_cache).
+
+Les clés sont servies par un serveur HTTP local (LocalJWKSServerMixin).
+"""
+import threading
+import time
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from accounts.services import apple_auth_service, jwks_cache
+from accounts.services.jwks_cache import JWKSCache
+from accounts.tests.mixins import LocalJWKSServerMixin
+from utils.exceptions import BridgeQuestException
+
+
+class JWKSCacheTestCase(LocalJWKSServerMixin, TestCase):
+    """Tests pour JWKSCache."""
+
+    jwks_cache_control = "public, max-age=120"
+
+    def setUp(self):
+        """Configuration initiale pour tous les tests."""
+        super().setUp()
+        cache.clear()
+        self.add_signing_key("key-1")
+        self.jwks = JWKSCache(self.jwks_url, "test")
+
+    def test_keys_are_fetched_once(self):
+        """Test que les clés sont récupérées une fois puis servies depuis la mémoire."""
+        first = self.jwks.get_key("key-1")
+        second = self.jwks.get_key("key-1")
+
+        self.assertIsNotNone(first)
+        self.assertIs(first, second)
+        self.assertEqual(self.jwks_requests, 1)
+
+    def test_cache_control_max_age_sets_expiry(self):
+        """Test que la validité suit le max-age de l'en-tête Cache-Control."""
+        self.jwks.get_key("key-1")
+
+        self.assertAlmostEqual(
+            self.jwks._expires_at - self.jwks._last_fetch_at, 120, places=3
+        )
+
+    def test_expired_keys_are_refetched(self):
+        """Test que des clés expirées sont récupérées à nouveau."""
+        self.jwks.get_key("key-1")
+        cache.clear()
+
+        with patch.object(jwks_cache.time, "time", return_value=time.time() + 121):
+            self.jwks.get_key("key-1")
+
+        self.assertEqual(self.jwks_requests, 2)
+
+    @patch.object(jwks_cache, "JWKS_MIN_REFRESH_INTERVAL_SECONDS", 0)
+    def test_unknown_kid_triggers_refresh(self):
+        """Test qu'un kid inconnu (rotation) déclenche un rafraîchissement."""
+        self.jwks.get_key("key-1")
+        self.add_signing_key("key-2")
+        cache.clear()
+
+        self.assertIsNotNone(self.jwks.get_key("key-2"))
+        self.assertEqual(self.jwks_requests, 2)
+
+    def test_unknown_kid_refresh_is_rate_limited(self):
+        """Test qu'un kid inconnu ne déclenche pas de récupération avant l'intervalle minimal."""
+        self.jwks.get_key("key-1")
+
+        self.assertIsNone(self.jwks.get_key("forged-kid"))
+        self.assertIsNone(self.jwks.get_key("forged-kid"))
+        self.assertEqual(self.jwks_requests, 1)
+
+    def test_shared_cache_avoids_fetch_in_other_worker(self):
+        """Test qu'un autre worker lit les clés depuis le cache partagé sans appel HTTP."""
+        self.jwks.get_key("key-1")
+        other_worker = JWKSCache(self.jwks_url, "test")
+
+        self.assertIsNotNone(other_worker.get_key("key-1"))
+        self.assertEqual(self.jwks_requests, 1)
+
+    def test_concurrent_lookups_fetch_once(self):
+        """Test que des connexions simultanées ne déclenchent qu'une récupération."""
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.jwks.get_key("key-1")))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(key is not None for key in results))
+        self.assertEqual(self.jwks_requests, 1)
+
+    def test_unreachable_provider_raises_exception(self):
+        """Test qu'un fournisseur injoignable lève une exception sans clé en mémoire."""
+        unreachable = JWKSCache("http://127.0.0.1:1/keys", "unreachable")
+
+        with self.assertRaises(BridgeQuestException):
+            unreachable.get_key("key-1")
+
+
+@override_settings(APPLE_CLIENT_ID="com.example.app")
+class AppleTokenLocalKeysTestCase(LocalJWKSServerMixin, TestCase):
+    """Tests de validation Apple de bout en bout avec des clés locales."""
+
+    def setUp(self):
+        """Configuration initiale pour tous les tests."""
+        super().setUp()
+        cache.clear()
+        self.add_signing_key("apple-key")
+        patcher = patch.object(
+            apple_auth_service, "apple_jwks", JWKSCache(self.jwks_url, "apple-test")
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _token(self, **claims):
+        """Signe un token Apple valide (claims surchargeables)."""
+        payload = {
+            "iss": apple_auth_service.APPLE_ISSUER,
+            "aud": "com.example.app",
+            "sub": "apple-sub-id",
+            "email": "user@example.com",
+            "exp": int(time.time()) + 600,
+            **claims,
+        }
+        return self.sign_token(payload, "apple-key")
+
+    def test_repeated_logins_fetch_keys_once(self):
+        """Test que plusieurs connexions Apple ne récupèrent les clés qu'une fois."""
+        for _ in range(3):
+            result = apple_auth_service.validate_apple_token(self._token())
+            self.assertEqual(result["sub"], "apple-sub-id")
+
+        self.assertEqual(self.jwks_requests, 1)
+
+    def test_wrong_audience_raises_exception(self):
+        """Test qu'un token destiné à une autre application est rejeté."""
+        with self.assertRaises(BridgeQuestException):
+            apple_auth_service.validate_apple_token(self._token(aud="com.other.app"))
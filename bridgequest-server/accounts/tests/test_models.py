@@ -29,6 +29,18 @@ class UserModelTestCase(TestCase):
         self.assertEqual(user.email, self.test_email)
         self.assertTrue(user.check_password(self.test_password))
     
+    def test_email_is_normalized_on_save(self):
+        """Test que l'email est enregistré en minuscules et sans espaces."""
+        # Arrange & Act
+        user = User.objects.create_user(
+            username=self.test_username,
+            email='  Test@Example.COM '
+        )
+        
+        # Assert
+        user.refresh_from_db()
+        self.assertEqual(user.email, self.test_email)
+    
     def test_user_str_representation_with_username(self):
         """Test de la représentation string avec username."""
         # Arrange & Act
@@ -2,24 +2,27 @@
 Tests pour les services du module Accounts.
 """
 
-import json
+import threading
+import time
 from unittest.mock import Mock, patch
 
 import jwt
-import requests
+from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from rest_framework_simplejwt.tokens import AccessToken
 
-from accounts.services import apple_auth_service, google_auth_service
+from accounts.services import apple_auth_service, auth_service, google_auth_service
 from accounts.services.auth_service import (
+    _generate_unique_username,
     create_or_get_user_from_sso_data,
     get_user_by_email,
 )
+from accounts.services.jwks_cache import JWKSCache
 from accounts.services.jwt_service import generate_tokens_for_user
-from accounts.tests.mixins import JwtAssertionsMixin
+from accounts.tests.mixins import JwtAssertionsMixin, LocalJWKSServerMixin
 from utils.exceptions import BridgeQuestException
-from utils.sso_validation import REQUEST_TIMEOUT_SECONDS
 
 User = get_user_model()
 
@@ -176,6 +179,83 @@ class AuthServiceTestCase(TestCase):
         self.assertEqual(user.last_name, "User")
         self.assertEqual(user.avatar, "https://example.com/avatar.jpg")
 
+    def test_create_or_get_user_from_sso_data_matches_email_case_insensitively(self):
+        """Test qu'un email SSO de casse différente retrouve l'utilisateur existant."""
+        user = create_or_get_user_from_sso_data({"email": " Test@Example.COM "}, "google")
+
+        self.assertEqual(user.id, self.user.id)
+
+    def test_create_or_get_user_from_sso_data_existing_user_single_query(self):
+        """Test qu'une connexion sans changement de profil coûte une seule requête indexée."""
+        with self.assertNumQueries(1):
+            user = create_or_get_user_from_sso_data({"email": self.user_email}, "google")
+
+        self.assertEqual(user.id, self.user.id)
+
+    def test_update_user_from_sso_data_writes_only_changed_fields(self):
+        """Test que seule la colonne modifiée (et updated_at) est écrite."""
+        self.user.last_name = ""
+        self.user.save()
+
+        with patch.object(User, "save", autospec=True) as save:
+            create_or_get_user_from_sso_data(
+                {"email": self.user_email, "given_name": "Other", "family_name": "Doe"},
+                "google",
+            )
+
+        save.assert_called_once_with(self.user, update_fields=["last_name", "updated_at"])
+
+    def test_generate_unique_username_free_base(self):
+        """Test qu'un nom de base libre est retourné tel quel."""
+        self.assertEqual(_generate_unique_username("john"), "john")
+
+    def test_generate_unique_username_uses_max_suffix_in_one_query(self):
+        """Test que le suffixe suivant le plus grand existant est trouvé en une requête."""
+        for username in ("john", "john1", "john2", "john10", "john9", "johnny", "john07"):
+            User.objects.create_user(username=username, email=f"{username}@example.com")
+
+        with self.assertNumQueries(1):
+            username = _generate_unique_username("john")
+
+        self.assertEqual(username, "john11")
+
+    def test_generate_unique_username_escapes_special_characters(self):
+        """Test que les caractères spéciaux du nom de base ne sont pas interprétés."""
+        User.objects.create_user(username="j.doe", email="j.doe@example.com")
+        User.objects.create_user(username="jxdoe5", email="jxdoe@example.com")
+
+        self.assertEqual(_generate_unique_username("j.doe"), "j.doe1")
+
+    def test_create_user_retries_on_concurrent_username_conflict(self):
+        """Test qu'un username pris entre l'allocation et l'insertion est réalloué."""
+        allocate = auth_service._generate_unique_username
+        allocations = []
+
+        def allocate_then_lose_race(base_username):
+            username = allocate(base_username)
+            if not allocations:
+                # Une inscription concurrente prend le nom avant l'insertion
+                User.objects.create_user(username=username, email="other@example.com")
+            allocations.append(username)
+            return username
+
+        with patch.object(
+            auth_service, "_generate_unique_username", side_effect=allocate_then_lose_race
+        ):
+            user = create_or_get_user_from_sso_data({"email": "race@example.com"}, "google")
+
+        self.assertEqual(allocations, ["race", "race1"])
+        self.assertEqual(user.username, "race1")
+        self.assertEqual(user.email, "race@example.com")
+
+    def test_create_user_gives_up_after_allocation_attempts(self):
+        """Test qu'une collision persistante finit par lever une exception métier."""
+        User.objects.create_user(username="taken", email="taken@example.com")
+
+        with patch.object(auth_service, "_generate_unique_username", return_value="taken"):
+            with self.assertRaises(BridgeQuestException):
+                create_or_get_user_from_sso_data({"email": "taken@other.com"}, "google")
+
 
 class GoogleAuthServiceTestCase(TestCase):
     """Tests pour le service de validation des tokens Google Sign-In."""
@@ -203,28 +283,6 @@ class GoogleAuthServiceTestCase(TestCase):
         self.assertEqual(result["picture"], picture)
         self.assertEqual(result["sub"], sub)
 
-    @patch.object(google_auth_service, "settings")
-    @patch("accounts.services.google_auth_service.requests.get")
-    def test_validate_google_token_success(self, mock_get, mock_settings):
-        """Test de validation réussie d'un token Google."""
-        mock_settings.GOOGLE_CLIENT_IDS = [self.valid_client_id]
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = self.valid_token_info
-        mock_get.return_value = mock_response
-
-        result = google_auth_service.validate_google_token(self.valid_token)
-
-        self._assert_google_user_data(
-            result,
-            email="user@example.com",
-            given_name="John",
-            family_name="Doe",
-            picture="https://example.com/photo.jpg",
-            sub="google-sub-id",
-        )
-        mock_get.assert_called_once()
-
     def test_validate_google_token_empty_raises_exception(self):
         """Test qu'un token vide lève une exception."""
         with self.assertRaises(BridgeQuestException):
@@ -258,54 +316,15 @@ class GoogleAuthServiceTestCase(TestCase):
         with self.assertRaises(BridgeQuestException):
             google_auth_service._get_google_client_ids()
 
-    @patch("accounts.services.google_auth_service.requests.get")
-    def test_fetch_token_info_success(self, mock_get):
-        """Test de récupération des informations du token depuis l'API Google."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = self.valid_token_info
-        mock_get.return_value = mock_response
-
-        result = google_auth_service._fetch_token_info(self.valid_token)
-
-        self.assertEqual(result, self.valid_token_info)
-        mock_get.assert_called_once_with(
-            google_auth_service.GOOGLE_TOKEN_INFO_URL,
-            params={"id_token": self.valid_token},
-            timeout=REQUEST_TIMEOUT_SECONDS,
-        )
-
-    @patch("accounts.services.google_auth_service.requests.get")
-    def test_fetch_token_info_non_200_raises_exception(self, mock_get):
-        """Test qu'un statut HTTP non 200 lève une exception."""
-        mock_response = Mock()
-        mock_response.status_code = 401
-        mock_get.return_value = mock_response
-
-        with self.assertRaises(BridgeQuestException):
-            google_auth_service._fetch_token_info(self.valid_token)
-
-    @patch("accounts.services.google_auth_service.requests.get")
-    def test_fetch_token_info_error_in_response_raises_exception(self, mock_get):
-        """Test qu'une réponse contenant 'error' lève une exception."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "error": "invalid_token",
-            "error_description": "Invalid",
-        }
-        mock_get.return_value = mock_response
+    def test_validate_token_issuer_accepts_google_issuers(self):
+        """Test que les deux émetteurs Google sont acceptés."""
+        for issuer in google_auth_service.GOOGLE_ISSUERS:
+            google_auth_service._validate_token_issuer({"iss": issuer})
 
+    def test_validate_token_issuer_wrong_issuer_raises_exception(self):
+        """Test qu'un émetteur autre que Google lève une exception."""
         with self.assertRaises(BridgeQuestException):
-            google_auth_service._fetch_token_info(self.valid_token)
-
-    @patch("accounts.services.google_auth_service.requests.get")
-    def test_fetch_token_info_request_exception_raises_exception(self, mock_get):
-        """Test qu'une RequestException lève une exception."""
-        mock_get.side_effect = requests.RequestException("Network error")
-
-        with self.assertRaises(BridgeQuestException):
-            google_auth_service._fetch_token_info(self.valid_token)
+            google_auth_service._validate_token_issuer({"iss": "https://evil.example.com"})
 
     def test_validate_token_audience_success(self):
         """Test de validation de l'audience lorsque le Client ID est autorisé."""
@@ -372,6 +391,90 @@ class GoogleAuthServiceTestCase(TestCase):
         self.assertEqual(result["sub"], "sub-id")
 
 
+class GoogleTokenLocalVerificationTestCase(LocalJWKSServerMixin, TestCase):
+    """Tests de vérification locale des tokens Google (clés publiques locales)."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        super().setUp()
+        cache.clear()
+        self.valid_client_id = "123456789-xxx.apps.googleusercontent.com"
+        self.add_signing_key("google-key")
+        patcher = patch.object(
+            google_auth_service, "google_jwks", JWKSCache(self.jwks_url, "google-test")
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _token(self, kid="google-key", **claims):
+        """Signe un token Google valide (claims surchargeables)."""
+        payload = {
+            "iss": "https://accounts.google.com",
+            "aud": self.valid_client_id,
+            "sub": "google-sub-id",
+            "email": "user@example.com",
+            "given_name": "John",
+            "family_name": "Doe",
+            "picture": "https://example.com/photo.jpg",
+            "exp": int(time.time()) + 600,
+            **claims,
+        }
+        return self.sign_token(payload, kid)
+
+    def _validate(self, token):
+        """Valide le token avec le Client ID de test."""
+        with override_settings(GOOGLE_CLIENT_IDS=[self.valid_client_id]):
+            return google_auth_service.validate_google_token(token)
+
+    def test_validate_google_token_success(self):
+        """Test de validation réussie d'un token Google, sans appel réseau par connexion."""
+        for _ in range(3):
+            result = self._validate(self._token())
+
+        self.assertEqual(result["email"], "user@example.com")
+        self.assertEqual(result["given_name"], "John")
+        self.assertEqual(result["picture"], "https://example.com/photo.jpg")
+        self.assertEqual(result["sub"], "google-sub-id")
+        self.assertEqual(self.jwks_requests, 1)
+
+    def test_short_issuer_accepted(self):
+        """Test que l'émetteur sans schéma (accounts.google.com) est accepté."""
+        result = self._validate(self._token(iss="accounts.google.com"))
+
+        self.assertEqual(result["sub"], "google-sub-id")
+
+    def test_expired_token_raises_exception(self):
+        """Test qu'un token expiré est rejeté."""
+        with self.assertRaises(BridgeQuestException):
+            self._validate(self._token(exp=int(time.time()) - 60))
+
+    def test_wrong_audience_raises_exception(self):
+        """Test qu'un token destiné à un autre client est rejeté."""
+        with self.assertRaises(BridgeQuestException):
+            self._validate(self._token(aud="other.apps.googleusercontent.com"))
+
+    def test_wrong_issuer_raises_exception(self):
+        """Test qu'un token d'un autre émetteur est rejeté."""
+        with self.assertRaises(BridgeQuestException):
+            self._validate(self._token(iss="https://evil.example.com"))
+
+    def test_tampered_signature_raises_exception(self):
+        """Test qu'un token à la signature altérée est rejeté."""
+        header, payload, signature = self._token().split(".")
+        tampered = ".".join([header, payload, signature[::-1]])
+
+        with self.assertRaises(BridgeQuestException):
+            self._validate(tampered)
+
+    def test_unknown_kid_raises_exception(self):
+        """Test qu'un token signé par une clé non publiée est rejeté."""
+        self.add_signing_key("rotated-key")
+        self._published_jwks.pop()
+
+        with self.assertRaises(BridgeQuestException):
+            self._validate(self._token(kid="rotated-key"))
+
+
 class AppleAuthServiceTestCase(TestCase):
     """Tests pour le service de validation des tokens Apple Sign-In."""
 
@@ -386,7 +489,6 @@ class AppleAuthServiceTestCase(TestCase):
             "family_name": "Doe",
         }
         self.valid_unverified_header = {"kid": "APPLE_KEY_ID"}
-        self.valid_apple_keys = {"keys": [{"kid": "APPLE_KEY_ID"}]}
 
     def _assert_apple_user_data(
         self, result, email, sub, given_name="", family_name=""
@@ -399,22 +501,19 @@ class AppleAuthServiceTestCase(TestCase):
 
     @patch.object(apple_auth_service, "settings")
     @patch("accounts.services.apple_auth_service.jwt.decode")
-    @patch("accounts.services.apple_auth_service._find_matching_public_key")
-    @patch("accounts.services.apple_auth_service._fetch_apple_public_keys")
+    @patch.object(apple_auth_service.apple_jwks, "get_key")
     @patch("accounts.services.apple_auth_service.jwt.get_unverified_header")
     def test_validate_apple_token_success(
         self,
         mock_get_header,
-        mock_fetch_keys,
-        mock_find_key,
+        mock_get_key,
         mock_decode,
         mock_settings,
     ):
         """Test de validation réussie d'un token Apple."""
         mock_settings.APPLE_CLIENT_ID = self.valid_client_id
         mock_get_header.return_value = self.valid_unverified_header
-        mock_fetch_keys.return_value = self.valid_apple_keys
-        mock_find_key.return_value = Mock()
+        mock_get_key.return_value = Mock()
         mock_decode.return_value = self.valid_decoded_token
 
         result = apple_auth_service.validate_apple_token(self.valid_token)
@@ -425,6 +524,7 @@ class AppleAuthServiceTestCase(TestCase):
             given_name="John",
             family_name="Doe",
         )
+        mock_get_key.assert_called_once_with("APPLE_KEY_ID")
 
     def test_validate_apple_token_empty_raises_exception(self):
         """Test qu'un token vide lève une exception."""
@@ -482,72 +582,15 @@ class AppleAuthServiceTestCase(TestCase):
         with self.assertRaises(BridgeQuestException):
             apple_auth_service._get_apple_client_id()
 
-    @patch("accounts.services.apple_auth_service.requests.get")
-    def test_fetch_apple_public_keys_success(self, mock_get):
-        """Test de récupération des clés publiques Apple."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = self.valid_apple_keys
-        mock_get.return_value = mock_response
-
-        result = apple_auth_service._fetch_apple_public_keys()
-
-        self.assertEqual(result, self.valid_apple_keys)
-        mock_get.assert_called_once_with(
-            apple_auth_service.APPLE_PUBLIC_KEYS_URL,
-            timeout=REQUEST_TIMEOUT_SECONDS,
-        )
-
-    @patch("accounts.services.apple_auth_service.requests.get")
-    def test_fetch_apple_public_keys_non_200_raises_exception(self, mock_get):
-        """Test qu'un statut HTTP non 200 lève une exception."""
-        mock_response = Mock()
-        mock_response.status_code = 500
-        mock_get.return_value = mock_response
+    @patch.object(apple_auth_service.apple_jwks, "get_key", return_value=None)
+    @patch("accounts.services.apple_auth_service.jwt.get_unverified_header")
+    def test_decode_and_verify_token_unknown_kid_raises_exception(
+        self, mock_get_header, mock_get_key
+    ):
+        """Test qu'un kid absent des clés Apple lève une exception."""
+        mock_get_header.return_value = {"kid": "UNKNOWN_KID"}
         with self.assertRaises(BridgeQuestException):
-            apple_auth_service._fetch_apple_public_keys()
-
-    @patch("accounts.services.apple_auth_service.requests.get")
-    def test_fetch_apple_public_keys_request_exception_raises_exception(self, mock_get):
-        """Test qu'une RequestException lève une exception."""
-        mock_get.side_effect = requests.RequestException("Network error")
-        with self.assertRaises(BridgeQuestException):
-            apple_auth_service._fetch_apple_public_keys()
-
-    @patch("accounts.services.apple_auth_service.RSAAlgorithm.from_jwk")
-    def test_find_matching_public_key_success(self, mock_from_jwk):
-        """Test de recherche d'une clé correspondante au kid du header."""
-        mock_key = Mock()
-        mock_from_jwk.return_value = mock_key
-        unverified_header = {"kid": "APPLE_KEY_ID"}
-        apple_keys = {"keys": [{"kid": "APPLE_KEY_ID"}]}
-
-        result = apple_auth_service._find_matching_public_key(
-            apple_keys, unverified_header
-        )
-
-        self.assertEqual(result, mock_key)
-        # PyJWT RSAAlgorithm.from_jwk attend une chaîne JSON JWK (CODING_STANDARDS)
-        expected_jwk = json.dumps({"kid": "APPLE_KEY_ID"})
-        mock_from_jwk.assert_called_once_with(expected_jwk)
-
-    def test_find_matching_public_key_no_match_returns_none(self):
-        """Test qu'aucune clé correspondante ne retourne None."""
-        unverified_header = {"kid": "UNKNOWN_KID"}
-        apple_keys = {"keys": [{"kid": "APPLE_KEY_ID"}]}
-        result = apple_auth_service._find_matching_public_key(
-            apple_keys, unverified_header
-        )
-        self.assertIsNone(result)
-
-    def test_find_matching_public_key_empty_keys_returns_none(self):
-        """Test qu'une liste de clés vide retourne None."""
-        unverified_header = {"kid": "APPLE_KEY_ID"}
-        apple_keys = {"keys": []}
-        result = apple_auth_service._find_matching_public_key(
-            apple_keys, unverified_header
-        )
-        self.assertIsNone(result)
+            apple_auth_service._decode_and_verify_token(self.valid_token)
 
     @patch.object(apple_auth_service, "settings")
     @patch("accounts.services.apple_auth_service.jwt.decode")
@@ -614,3 +657,27 @@ class AppleAuthServiceTestCase(TestCase):
             email="minimal@example.com",
             sub="apple-sub-id",
         )
+
+
+class AsyncAuthServiceTestCase(TestCase):
+    """Tests pour acreate_or_get_user_from_sso_data (pool de threads partagé)."""
+
+    async def test_runs_outside_single_thread_and_closes_connection(self):
+        """Test que la recherche s'exécute hors du thread unique, puis ferme sa connexion."""
+        threads = []
+        single_thread = await sync_to_async(threading.get_ident)()
+
+        def record_thread(sso_data, provider):
+            threads.append(threading.get_ident())
+            return "user"
+
+        with patch.object(
+            auth_service, "create_or_get_user_from_sso_data", side_effect=record_thread
+        ), patch.object(auth_service, "close_old_connections") as mock_close:
+            user = await auth_service.acreate_or_get_user_from_sso_data(
+                {"email": "async@example.com"}, "google"
+            )
+
+        self.assertEqual(user, "user")
+        self.assertNotEqual(threads, [single_thread])
+        mock_close.assert_called_once_with()
@@ -0,0 +1,135 @@
+"""
+Tests pour le cache et le single-flight des validations SSO (sso_validation_cache).
+"""
+import threading
+import time
+from unittest.mock import Mock
+
+import jwt
+from django.core.cache import cache
+from django.test import TestCase
+
+from accounts.services import sso_validation_cache
+from accounts.services.sso_validation_cache import validate_sso_token_cached
+from utils.exceptions import BridgeQuestException
+from utils.messages import ErrorMessages
+
+
+class SSOValidationCacheTestCase(TestCase):
+    """Tests pour validate_sso_token_cached."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        cache.clear()
+        self.sso_data = {"email": "user@example.com", "sub": "sub-id"}
+        self.token = self._token(exp=int(time.time()) + 600)
+
+    @staticmethod
+    def _token(**claims):
+        """Construit un JWT de test (la signature n'est pas vérifiée par le cache)."""
+        return jwt.encode({"sub": "sub-id", **claims}, "secret", algorithm="HS256")
+
+    def test_successful_validation_is_cached_until_exp(self):
+        """Test qu'une validation réussie est réutilisée sans nouvel appel fournisseur."""
+        validate = Mock(return_value=self.sso_data)
+
+        first = validate_sso_token_cached("google", self.token, validate)
+        second = validate_sso_token_cached("google", self.token, validate)
+
+        self.assertEqual(first, self.sso_data)
+        self.assertEqual(second, self.sso_data)
+        validate.assert_called_once_with(self.token)
+
+    def test_cache_key_does_not_contain_token(self):
+        """Test que la clé de cache est une empreinte (le token n'y figure pas)."""
+        key = sso_validation_cache._cache_key("google", self.token)
+
+        self.assertNotIn(self.token, key)
+        self.assertNotEqual(key, sso_validation_cache._cache_key("apple", self.token))
+
+    def test_token_without_exp_is_not_cached(self):
+        """Test qu'un token sans exp n'est pas mis en cache."""
+        validate = Mock(return_value=self.sso_data)
+        token = self._token()
+
+        validate_sso_token_cached("google", token, validate)
+        validate_sso_token_cached("google", token, validate)
+
+        self.assertEqual(validate.call_count, 2)
+
+    def test_failure_is_not_cached(self):
+        """Test qu'un échec de validation est propagé et non mis en cache."""
+        validate = Mock(side_effect=[
+            BridgeQuestException(message_key=ErrorMessages.AUTH_SSO_TOKEN_VALIDATION_FAILED),
+            self.sso_data,
+        ])
+
+        with self.assertRaises(BridgeQuestException):
+            validate_sso_token_cached("google", self.token, validate)
+
+        self.assertEqual(validate_sso_token_cached("google", self.token, validate), self.sso_data)
+
+    def test_concurrent_identical_requests_validate_once(self):
+        """Test que des requêtes identiques simultanées ne déclenchent qu'une validation."""
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_validate(token):
+            calls.append(token)
+            started.set()
+            release.wait(timeout=5)
+            return self.sso_data
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    validate_sso_token_cached("apple", self.token, slow_validate)
+                )
+            )
+            for _ in range(5)
+        ]
+        threads[0].start()
+        started.wait(timeout=5)
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.05)  # Laisse les requêtes suivantes rejoindre la validation en cours
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [self.sso_data] * 5)
+
+    def test_concurrent_waiters_receive_leader_exception(self):
+        """Test que l'échec de la validation en cours est propagé aux requêtes en attente."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def failing_validate(token):
+            started.set()
+            release.wait(timeout=5)
+            raise BridgeQuestException(
+                message_key=ErrorMessages.AUTH_SSO_TOKEN_VALIDATION_FAILED
+            )
+
+        errors = []
+
+        def attempt():
+            try:
+                validate_sso_token_cached("google", self.token, failing_validate)
+            except BridgeQuestException as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=attempt)
+        leader.start()
+        started.wait(timeout=5)
+        waiter = threading.Thread(target=attempt)
+        waiter.start()
+        time.sleep(0.05)
+        release.set()
+        leader.join()
+        waiter.join()
+
+        self.assertEqual(len(errors), 2)
@@ -1,7 +1,7 @@
 """
 Tests pour les vues SSO mobile du module Accounts.
 """
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -220,3 +220,101 @@ class SSOViewsTestCase(JwtAssertionsMixin, TestCase):
                 f"Expected 500 for config error, got {response.status_code}. Response: {response.data}"
             )
             self.assertIn('error', response.data)
+
+
+class SSOAsyncLoginViewTestCase(JwtAssertionsMixin, TransactionTestCase):
+    """
+    Tests pour la vue de connexion SSO asynchrone.
+    
+    TransactionTestCase : l'utilisateur est créé ou lu dans un thread du pool
+    partagé, avec sa propre connexion, qui ne voit pas une transaction de test
+    non validée.
+    """
+
+    url = '/api/auth/sso/login/async/'
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        self.sso_email = 'sso@example.com'
+        self.sso_token = 'fake_token_12345'
+        self.sso_data_google = {
+            'email': self.sso_email,
+            'given_name': 'John',
+            'family_name': 'Doe',
+            'picture': 'https://example.com/avatar.jpg',
+            'sub': 'google_user_id_123'
+        }
+
+    async def _post(self, data):
+        """Envoie une requête JSON à la vue asynchrone."""
+        return await self.async_client.post(self.url, data, content_type='application/json')
+
+    async def test_sso_login_async_success_new_user(self):
+        """Test de connexion SSO asynchrone avec création d'un nouvel utilisateur."""
+        with patch('accounts.views.auth_views.validate_google_token') as mock_validate:
+            mock_validate.return_value = self.sso_data_google
+
+            response = await self._post({'provider': 'google', 'token': self.sso_token})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['user']['email'], self.sso_email)
+        self.assertIn('message', data)
+        self._assert_login_response_contains_valid_tokens(data)
+        user = await User.objects.aget(email=self.sso_email)
+        self.assertEqual(user.first_name, 'John')
+        mock_validate.assert_called_once_with(self.sso_token)
+
+    async def test_sso_login_async_existing_user_fills_empty_fields(self):
+        """Test que la connexion asynchrone complète uniquement les champs vides."""
+        existing_user = await User.objects.acreate_user(
+            username='existing',
+            email=self.sso_email,
+            first_name='Old',
+        )
+
+        with patch('accounts.views.auth_views.validate_google_token') as mock_validate:
+            mock_validate.return_value = self.sso_data_google
+
+            response = await self._post({'provider': 'google', 'token': self.sso_token})
+
+        self.assertEqual(response.json()['user']['id'], existing_user.id)
+        await existing_user.arefresh_from_db()
+        self.assertEqual(existing_user.first_name, 'Old')
+        self.assertEqual(existing_user.last_name, 'Doe')
+
+    async def test_sso_login_async_generates_unique_username(self):
+        """Test que le nom d'utilisateur généré évite les doublons."""
+        await User.objects.acreate_user(username='sso', email='other@example.com')
+
+        with patch('accounts.views.auth_views.validate_google_token') as mock_validate:
+            mock_validate.return_value = self.sso_data_google
+
+            response = await self._post({'provider': 'google', 'token': self.sso_token})
+
+        self.assertEqual(response.json()['user']['username'], 'sso1')
+
+    async def test_sso_login_async_missing_token(self):
+        """Test de connexion SSO asynchrone sans token."""
+        response = await self._post({'provider': 'google'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('token', response.json())
+
+    async def test_sso_login_async_invalid_token(self):
+        """Test qu'un token invalide renvoie l'erreur métier."""
+        with patch('accounts.views.auth_views.validate_google_token') as mock_validate:
+            mock_validate.side_effect = BridgeQuestException(
+                message_key=ErrorMessages.AUTH_SSO_TOKEN_VALIDATION_FAILED
+            )
+
+            response = await self._post({'provider': 'google', 'token': 'invalid_token'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('error', response.json())
+
+    async def test_sso_login_async_get_not_allowed(self):
+        """Test que seule la méthode POST est acceptée."""
+        response = await self.async_client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
@@ -0,0 +1,200 @@
+"""
+Tests pour la révocation des tokens JWT (token_revocation, logout, refresh, WebSocket).
+"""
+import time
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from accounts.services import token_revocation
+from accounts.services.token_revocation import (
+    BloomFilter,
+    TokenRevocationRegistry,
+    is_token_revoked,
+    revoke_token,
+    revoke_user_tokens,
+)
+from accounts.websocket_auth import _get_user_from_token
+
+User = get_user_model()
+
+
+class BloomFilterTestCase(TestCase):
+    """Tests pour BloomFilter."""
+
+    def test_added_items_are_always_found(self):
+        """Test qu'un élément ajouté est toujours trouvé (aucun faux négatif)."""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [f"jti:{index}" for index in range(1000)]
+        for item in items:
+            bloom.add(item)
+
+        self.assertTrue(all(item in bloom for item in items))
+
+    def test_false_positive_rate_is_bounded(self):
+        """Test que le taux de faux positifs reste proche du taux configuré."""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for index in range(1000):
+            bloom.add(f"jti:{index}")
+
+        false_positives = sum(f"other:{index}" in bloom for index in range(10000))
+
+        self.assertLess(false_positives, 300)
+
+
+@override_settings(TOKEN_REVOCATION_SYNC_INTERVAL_SECONDS=0)
+class TokenRevocationTestCase(TestCase):
+    """Tests pour revoke_token, revoke_user_tokens et is_token_revoked."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        cache.clear()
+        token_revocation._registry.reset()
+        self.user = User.objects.create_user(username="revoked", email="revoked@example.com")
+        self.refresh = RefreshToken.for_user(self.user)
+        self.access = self.refresh.access_token
+
+    def test_token_is_not_revoked_by_default(self):
+        """Test qu'un token non révoqué est accepté."""
+        self.assertFalse(is_token_revoked(self.access))
+
+    def test_revoked_token_is_detected(self):
+        """Test qu'un token révoqué est refusé, sans affecter les autres tokens."""
+        revoke_token(self.access)
+
+        self.assertTrue(is_token_revoked(self.access))
+        self.assertFalse(is_token_revoked(RefreshToken.for_user(self.user).access_token))
+
+    def test_unrevoked_token_check_does_not_hit_cache(self):
+        """Test qu'un token absent du filtre est accepté sans lecture du cache."""
+        revoke_token(self.access)
+        other = RefreshToken.for_user(self.user).access_token
+        other[token_revocation.api_settings.USER_ID_CLAIM] = self.user.id + 1000
+
+        with override_settings(TOKEN_REVOCATION_SYNC_INTERVAL_SECONDS=60):
+            is_token_revoked(other)  # Synchronisation initiale
+            with patch.object(token_revocation, "cache") as shared_cache:
+                self.assertFalse(is_token_revoked(other))
+
+        shared_cache.get.assert_not_called()
+
+    def test_revocation_is_published_to_other_workers(self):
+        """Test qu'un autre worker voit la révocation après synchronisation."""
+        other_worker = TokenRevocationRegistry()
+        self.assertFalse(other_worker.is_revoked(self.access))
+
+        revoke_token(self.access)
+
+        self.assertTrue(other_worker.is_revoked(self.access))
+
+    def test_new_worker_rebuilds_filter_from_journal(self):
+        """Test qu'un worker démarré après la révocation la connaît."""
+        revoke_token(self.access)
+
+        self.assertTrue(TokenRevocationRegistry().is_revoked(self.access))
+
+    def test_revocation_entry_expires_with_token(self):
+        """Test que l'entrée de révocation expire avec le token."""
+        self.access.set_exp(lifetime=-self.access.lifetime)  # Déjà expiré
+        revoke_token(self.access)
+
+        self.assertFalse(is_token_revoked(self.access))
+        self.assertIsNone(cache.get("token_revocation:version"))
+
+    def test_revoke_user_tokens_revokes_previously_issued_tokens(self):
+        """Test que le bannissement révoque les tokens émis avant, pas les suivants."""
+        revoke_user_tokens(self.user)
+        later = RefreshToken.for_user(self.user)
+        later["iat"] = int(time.time()) + 1
+
+        self.assertTrue(is_token_revoked(self.access))
+        self.assertTrue(is_token_revoked(self.refresh))
+        self.assertFalse(is_token_revoked(later))
+
+    def test_shared_cache_flush_rebuilds_filter(self):
+        """Test qu'un vidage du cache partagé réinitialise l'état local."""
+        revoke_token(self.access)
+        revoke_token(RefreshToken.for_user(self.user).access_token)
+        cache.clear()
+        cache.set("token_revocation:version", 1, timeout=None)
+
+        self.assertFalse(is_token_revoked(self.access))
+
+
+@override_settings(TOKEN_REVOCATION_SYNC_INTERVAL_SECONDS=0)
+class TokenRevocationEndpointsTestCase(TestCase):
+    """Tests de la révocation sur logout, refresh, API REST et WebSocket."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        cache.clear()
+        token_revocation._registry.reset()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="session", email="session@example.com")
+        self.refresh = RefreshToken.for_user(self.user)
+        self.access = str(self.refresh.access_token)
+
+    def test_logout_revokes_access_and_refresh_tokens(self):
+        """Test que le logout révoque l'access token et le refresh token fournis."""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access}")
+
+        response = self.client.post("/api/auth/logout/", {"refresh": str(self.refresh)}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(self.client.get("/api/auth/me/").status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials()
+        response = self.client.post(
+            "/api/auth/token/refresh/", {"refresh": str(self.refresh)}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logout_ignores_invalid_refresh_token(self):
+        """Test qu'un refresh token invalide n'empêche pas la déconnexion."""
+        response = self.client.post("/api/auth/logout/", {"refresh": "invalid"}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_refresh_with_valid_token_still_works(self):
+        """Test que le rafraîchissement d'un token non révoqué fonctionne."""
+        response = self.client.post(
+            "/api/auth/token/refresh/", {"refresh": str(self.refresh)}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("access", response.data)
+
+    def test_websocket_rejects_revoked_token(self):
+        """Test que le handshake WebSocket ignore un token révoqué."""
+        self.assertEqual(async_to_sync(_get_user_from_token)(self.access), self.user)
+
+        revoke_token(AccessToken(self.access))
+
+        self.assertIsNone(async_to_sync(_get_user_from_token)(self.access))
+
+    def test_admin_deactivation_revokes_user_tokens(self):
+        """Test que la désactivation d'un utilisateur dans l'admin révoque ses tokens."""
+        admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass"
+        )
+        self.client.force_login(admin)
+
+        self.client.post(
+            f"/admin/accounts/user/{self.user.pk}/change/",
+            {
+                "username": self.user.username,
+                "email": self.user.email,
+                "is_active": "",
+                "date_joined_0": "2026-01-01",
+                "date_joined_1": "00:00:00",
+            },
+        )
+
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertTrue(is_token_revoked(self.refresh))
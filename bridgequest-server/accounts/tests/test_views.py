@@ -1,11 +1,17 @@
 """
 Tests pour les vues API du module Accounts.
 """
+from unittest.mock import patch
+
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from rest_framework.test import APIClient
 from rest_framework import status
 
+from accounts.serializers.user_serializers import UserSerializer
+from accounts.services.profile_cache import get_profile_etag
+
 User = get_user_model()
 
 
@@ -114,3 +120,187 @@ class AuthViewsTestCase(TestCase):
             response.status_code,
             [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN]
         )
+
+
+class ProfileConditionalGetTestCase(TestCase):
+    """Tests des requêtes conditionnelles et du cache des profils."""
+    
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='cached',
+            email='cached@example.com',
+            first_name='Cached',
+        )
+        self.client.force_authenticate(user=self.user)
+    
+    def test_profile_response_has_validators(self):
+        """Test que le profil expose ETag et Last-Modified."""
+        # Act
+        response = self.client.get(f'/api/auth/profile/{self.user.id}/')
+        
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['ETag'], get_profile_etag(self.user.id, self.user.updated_at))
+        self.assertIn('Last-Modified', response)
+    
+    def test_profile_if_none_match_returns_not_modified(self):
+        """Test qu'un ETag à jour renvoie 304 sans corps."""
+        # Arrange
+        etag = self.client.get(f'/api/auth/profile/{self.user.id}/')['ETag']
+        
+        # Act
+        response = self.client.get(f'/api/auth/profile/{self.user.id}/', HTTP_IF_NONE_MATCH=etag)
+        
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+    
+    def test_profile_if_modified_since_returns_not_modified(self):
+        """Test qu'une date If-Modified-Since à jour renvoie 304."""
+        # Arrange
+        last_modified = self.client.get(f'/api/auth/profile/{self.user.id}/')['Last-Modified']
+        
+        # Act
+        response = self.client.get(
+            f'/api/auth/profile/{self.user.id}/', HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+    
+    def test_cached_profile_is_served_without_query(self):
+        """Test qu'un profil en cache est servi sans requête SQL."""
+        # Arrange
+        self.client.get(f'/api/auth/profile/{self.user.id}/')
+        
+        # Act & Assert
+        with self.assertNumQueries(0):
+            response = self.client.get(f'/api/auth/profile/{self.user.id}/')
+        self.assertEqual(response.data['first_name'], 'Cached')
+    
+    def test_user_save_invalidates_cached_profile(self):
+        """Test qu'une sauvegarde de l'utilisateur invalide le profil en cache."""
+        # Arrange
+        etag = self.client.get(f'/api/auth/profile/{self.user.id}/')['ETag']
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        
+        # Act
+        response = self.client.get(f'/api/auth/profile/{self.user.id}/', HTTP_IF_NONE_MATCH=etag)
+        
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['first_name'], 'Renamed')
+        self.assertNotEqual(response['ETag'], etag)
+    
+    def test_current_user_if_none_match_skips_serialization(self):
+        """Test que /me répond 304 sans sérialiser quand le client est à jour."""
+        # Arrange
+        etag = self.client.get('/api/auth/me/')['ETag']
+        
+        # Act
+        with patch.object(UserSerializer, 'to_representation') as to_representation:
+            response = self.client.get('/api/auth/me/', HTTP_IF_NONE_MATCH=etag)
+        
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        to_representation.assert_not_called()
+    
+    def test_current_user_reflects_update(self):
+        """Test que /me renvoie les données à jour après modification."""
+        # Arrange
+        self.client.get('/api/auth/me/')
+        self.user.last_name = 'Updated'
+        self.user.save()
+        
+        # Act
+        response = self.client.get('/api/auth/me/')
+        
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['last_name'], 'Updated')
+
+
+class UsersBulkViewTestCase(TestCase):
+    """Tests pour l'endpoint de récupération groupée des profils publics."""
+    
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        cache.clear()
+        self.client = APIClient()
+        self.users = [
+            User.objects.create_user(username=f'player{index}', email=f'p{index}@example.com')
+            for index in range(5)
+        ]
+        self.client.force_authenticate(user=self.users[0])
+    
+    def _ids(self, users):
+        """Construit le paramètre ids à partir d'utilisateurs."""
+        return ','.join(str(user.id) for user in users)
+    
+    def test_returns_profiles_in_requested_order(self):
+        """Test que les profils sont retournés dans l'ordre des IDs, sans email."""
+        # Arrange
+        requested = [self.users[3], self.users[1], self.users[4]]
+        
+        # Act
+        response = self.client.get('/api/auth/users/', {'ids': self._ids(requested)})
+        
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([profile['id'] for profile in response.data], [u.id for u in requested])
+        self.assertNotIn('email', response.data[0])
+    
+    def test_uses_single_query_then_cache(self):
+        """Test qu'une seule requête SQL sert tous les profils, puis aucune (cache)."""
+        # Act & Assert
+        with self.assertNumQueries(1):
+            self.client.get('/api/auth/users/', {'ids': self._ids(self.users)})
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/auth/users/', {'ids': self._ids(self.users)})
+        self.assertEqual(len(response.data), 5)
+    
+    def test_unknown_and_duplicate_ids_are_ignored(self):
+        """Test que les IDs inconnus sont ignorés et les doublons fusionnés."""
+        # Act
+        response = self.client.get(
+            '/api/auth/users/', {'ids': f'{self.users[2].id},99999,{self.users[2].id}'}
+        )
+        
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([profile['id'] for profile in response.data], [self.users[2].id])
+    
+    def test_invalid_ids_return_bad_request(self):
+        """Test qu'un paramètre ids absent ou invalide renvoie 400."""
+        for params in ({}, {'ids': ''}, {'ids': '1,abc'}, {'ids': '0'}):
+            with self.subTest(params=params):
+                response = self.client.get('/api/auth/users/', params)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn('error', response.data)
+    
+    def test_too_many_ids_return_bad_request(self):
+        """Test qu'au-delà du nombre maximal d'IDs la requête est refusée."""
+        # Act
+        with self.settings(USER_BULK_LOOKUP_MAX_IDS=3):
+            response = self.client.get('/api/auth/users/', {'ids': self._ids(self.users)})
+        
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_unauthenticated_forbidden(self):
+        """Test que l'endpoint exige une authentification."""
+        # Arrange
+        self.client.force_authenticate(user=None)
+        
+        # Act
+        response = self.client.get('/api/auth/users/', {'ids': self._ids(self.users)})
+        
+        # Assert
+        self.assertIn(
+            response.status_code,
+            [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN]
+        )
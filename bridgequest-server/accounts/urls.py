@@ -5,9 +5,11 @@ from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
 from accounts.views.auth_views import (
     sso_login_view,
+    sso_login_async_view,
     current_user_view,
     logout_view,
-    user_profile_view
+    user_profile_view,
+    users_bulk_view,
 )
 
 app_name = 'accounts'
@@ -15,6 +17,7 @@ app_name = 'accounts'
 urlpatterns = [
     # Authentification SSO mobile
     path('sso/login/', sso_login_view, name='sso-login'),
+    path('sso/login/async/', sso_login_async_view, name='sso-login-async'),
     
     # OAuth2/JWT - Refresh token
     path('token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
@@ -23,4 +26,5 @@ urlpatterns = [
     path('me/', current_user_view, name='current-user'),
     path('logout/', logout_view, name='logout'),
     path('profile/<int:user_id>/', user_profile_view, name='user-profile'),
+    path('users/', users_bulk_view, name='users-bulk'),
 ]
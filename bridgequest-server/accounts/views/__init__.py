@@ -5,14 +5,18 @@ Les vues API REST seront importées ici lorsqu'elles seront créées.
 """
 from .auth_views import (
     sso_login_view,
+    sso_login_async_view,
     current_user_view,
     logout_view,
-    user_profile_view
+    user_profile_view,
+    users_bulk_view,
 )
 
 __all__ = [
     'sso_login_view',
+    'sso_login_async_view',
     'current_user_view',
     'logout_view',
-    'user_profile_view'
+    'user_profile_view',
+    'users_bulk_view',
 ]
@@ -3,22 +3,47 @@ Vues API pour l'authentification dans le module Accounts.
 
 Ces vues gèrent les endpoints d'authentification SSO mobile.
 """
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django.utils.translation import gettext_lazy as _
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import RefreshToken, Token
 
 from accounts.serializers.sso_serializers import SSOLoginSerializer
-from accounts.serializers.user_serializers import UserPublicSerializer, UserSerializer
+from accounts.serializers.user_serializers import UserSerializer
 from accounts.services.apple_auth_service import validate_apple_token
-from accounts.services.auth_service import create_or_get_user_from_sso_data
+from accounts.services.auth_service import (
+    acreate_or_get_user_from_sso_data,
+    create_or_get_user_from_sso_data,
+)
 from accounts.services.google_auth_service import validate_google_token
+from accounts.services.profile_cache import (
+    PRIVATE_PROFILE,
+    build_profile_entry,
+    get_cached_profile,
+    get_profile_etag,
+    get_public_profile,
+    get_public_profiles,
+)
 from accounts.services.jwt_service import generate_tokens_for_user
+from accounts.services.sso_validation_cache import validate_sso_token_cached
+from accounts.services.token_revocation import revoke_token
 from utils.exceptions import BridgeQuestException
+from utils.query_budget import query_budget
 from utils.messages import ErrorMessages, Messages
-from utils.responses import error_response
+from utils.responses import error_response, json_error_response
 
 User = get_user_model()
 
@@ -27,6 +52,10 @@ def _validate_sso_token(provider, token):
     """
     Valide un token SSO selon le provider.
     
+    Les validations réussies sont mises en cache jusqu'à l'expiration du token
+    et les validations simultanées d'un même token dédupliquées : les
+    relances des clients ne multiplient pas les appels aux fournisseurs.
+    
     Args:
         provider: Le fournisseur SSO ('google' ou 'apple')
         token: Le token à valider
@@ -38,11 +67,12 @@ def _validate_sso_token(provider, token):
         BridgeQuestException: Si le provider est invalide ou la validation échoue
     """
     if provider == 'google':
-        return validate_google_token(token)
+        validate = validate_google_token
     elif provider == 'apple':
-        return validate_apple_token(token)
+        validate = validate_apple_token
     else:
         raise BridgeQuestException(message_key=ErrorMessages.AUTH_SSO_PROVIDER_INVALID)
+    return validate_sso_token_cached(provider, token, validate)
 
 
 def _build_login_response(user, tokens):
@@ -120,6 +150,53 @@ def sso_login_view(request):
         )
 
 
+@csrf_exempt
+@require_POST
+async def sso_login_async_view(request):
+    """
+    Variante asynchrone de sso_login_view (même contrat, même réponse).
+    
+    Sous ASGI (Daphne), aucun thread n'est réservé pendant la connexion :
+    - validation du token fournisseur dans le pool de threads partagé
+      (thread_sensitive=False) : ne bloque pas le thread unique des vues
+      synchrones ni database_sync_to_async des consumers,
+    - création/récupération de l'utilisateur également dans le pool partagé
+      (acreate_or_get_user_from_sso_data, connexion fermée après usage),
+    - génération des tokens JWT (calcul local, sans I/O).
+    
+    Vue Django native (DRF ne supporte pas les vues async) : authentification
+    non requise et sans session, d'où csrf_exempt.
+    """
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        data = {}  # Corps illisible : erreurs de champs requis du serializer
+    
+    serializer = SSOLoginSerializer(data=data)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    provider = serializer.validated_data['provider']
+    token = serializer.validated_data['token']
+    
+    try:
+        sso_data = await sync_to_async(_validate_sso_token, thread_sensitive=False)(
+            provider, token
+        )
+        user = await acreate_or_get_user_from_sso_data(sso_data, provider)
+        tokens = generate_tokens_for_user(user)
+        
+        return JsonResponse(_build_login_response(user, tokens), status=status.HTTP_200_OK)
+        
+    except BridgeQuestException as e:
+        return json_error_response(e, e.status_code)
+    except Exception:
+        return json_error_response(
+            _(ErrorMessages.AUTH_SSO_FAILED),
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
 def _build_validation_error_response(errors):
     """
     Construit une réponse d'erreur de validation.
@@ -136,17 +213,74 @@ def _build_validation_error_response(errors):
     )
 
 
+def _conditional_profile_response(request, user_id, updated_at, get_data):
+    """
+    Construit une réponse de profil avec ETag / Last-Modified.
+    
+    Si le client possède déjà cette version (If-None-Match ou
+    If-Modified-Since), répond 304 sans sérialiser.
+    
+    Args:
+        request: La requête DRF
+        user_id: L'ID de l'utilisateur
+        updated_at: La date de dernière modification du profil
+        get_data: Fonction retournant le payload (appelée seulement si nécessaire)
+        
+    Returns:
+        HttpResponse: Réponse 304 ou Response avec le profil
+    """
+    etag = get_profile_etag(user_id, updated_at)
+    last_modified = int(updated_at.timestamp())
+    
+    response = get_conditional_response(
+        request._request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        response = Response(get_data(), status=status.HTTP_200_OK)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # Profil propre à l'utilisateur authentifié : pas de cache partagé (proxy)
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@query_budget('current_user_view', max_queries=0)
 def current_user_view(request):
     """
     Endpoint pour récupérer les informations de l'utilisateur actuellement connecté.
     
+    Supporte les requêtes conditionnelles (ETag / Last-Modified dérivés de
+    updated_at) : 304 si le client est à jour.
+    
     Returns:
         Response: Informations de l'utilisateur au format JSON
     """
-    serializer = UserSerializer(request.user)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    user = request.user
+    
+    def get_data():
+        entry = get_cached_profile(user.pk, PRIVATE_PROFILE)
+        if entry is None or entry['updated_at'] != user.updated_at:
+            entry = build_profile_entry(user, PRIVATE_PROFILE)
+        return entry['data']
+    
+    return _conditional_profile_response(request, user.pk, user.updated_at, get_data)
+
+
+def _revoke_refresh_token(raw_token):
+    """
+    Révoque le refresh token fourni s'il est valide (ignoré sinon).
+    
+    Args:
+        raw_token: Le refresh token transmis par le client (ou None)
+    """
+    if not raw_token:
+        return
+    try:
+        revoke_token(RefreshToken(raw_token))
+    except TokenError:
+        pass
 
 
 @api_view(['POST'])
@@ -155,16 +289,19 @@ def logout_view(request):
     """
     Endpoint pour déconnecter l'utilisateur.
     
-    Avec l'authentification JWT, la déconnexion est principalement gérée côté client
-    (suppression des tokens). Ce endpoint existe pour la compatibilité et peut être
-    utilisé pour blacklister un refresh token si nécessaire à l'avenir.
+    Révoque l'access token de la requête (header Authorization) et le
+    refresh token transmis dans le corps ({"refresh": "..."}) jusqu'à leur
+    expiration. Les tokens sont aussi supprimés côté client.
     
     Returns:
         Response: Message de confirmation
     """
-    # Avec JWT stateless, la déconnexion est gérée côté client
-    # Les tokens sont supprimés par l'application Flutter
-    # Si besoin de blacklist à l'avenir, utiliser rest_framework_simplejwt.token_blacklist
+    if isinstance(request.auth, Token):
+        revoke_token(request.auth)
+    
+    refresh = request.data.get('refresh') if isinstance(request.data, dict) else None
+    _revoke_refresh_token(refresh)
+    
     return Response(
         {'message': _(Messages.LOGOUT_SUCCESS)},
         status=status.HTTP_200_OK
@@ -173,22 +310,80 @@ def logout_view(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@query_budget('user_profile_view', max_queries=1)
 def user_profile_view(request, user_id):
     """
     Endpoint pour récupérer le profil public d'un utilisateur.
     
+    Le profil sérialisé est servi depuis le cache (aucune requête SQL) et
+    supporte les requêtes conditionnelles (ETag / Last-Modified).
+    
     Args:
         user_id: L'ID de l'utilisateur
         
     Returns:
         Response: Informations publiques de l'utilisateur
     """
-    try:
-        user = User.objects.get(pk=user_id)
-        serializer = UserPublicSerializer(user)
-        return Response(serializer.data, status=status.HTTP_200_OK)
-    except User.DoesNotExist:
+    entry = get_public_profile(user_id)
+    if entry is None:
         return error_response(
             _(ErrorMessages.USER_NOT_FOUND),
             status.HTTP_404_NOT_FOUND,
         )
+    
+    return _conditional_profile_response(
+        request, user_id, entry['updated_at'], lambda: entry['data']
+    )
+
+
+def _parse_user_ids(raw_ids):
+    """
+    Analyse le paramètre ids (« 1,2,3 ») en liste d'IDs sans doublons.
+    
+    Args:
+        raw_ids: La valeur brute du paramètre de requête
+        
+    Returns:
+        list: Les IDs dans l'ordre demandé
+        
+    Raises:
+        BridgeQuestException: Si la liste est vide, invalide ou trop longue
+    """
+    try:
+        user_ids = list(dict.fromkeys(
+            int(value) for value in (raw_ids or '').split(',') if value.strip()
+        ))
+    except ValueError as e:
+        raise BridgeQuestException(message_key=ErrorMessages.USER_IDS_INVALID) from e
+    
+    if not user_ids or any(user_id <= 0 for user_id in user_ids):
+        raise BridgeQuestException(message_key=ErrorMessages.USER_IDS_INVALID)
+    if len(user_ids) > settings.USER_BULK_LOOKUP_MAX_IDS:
+        raise BridgeQuestException(message_key=ErrorMessages.USER_IDS_TOO_MANY)
+    return user_ids
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@query_budget('users_bulk_view', max_queries=1)
+def users_bulk_view(request):
+    """
+    Endpoint pour récupérer plusieurs profils publics en une requête.
+    
+    Query params:
+        ids: IDs séparés par des virgules (au plus USER_BULK_LOOKUP_MAX_IDS)
+        
+    Returns:
+        Response: Liste des profils publics, dans l'ordre des IDs demandés
+            (les IDs inconnus sont ignorés)
+    """
+    try:
+        user_ids = _parse_user_ids(request.query_params.get('ids'))
+    except BridgeQuestException as e:
+        return error_response(e, e.status_code)
+    
+    profiles = get_public_profiles(user_ids)
+    return Response(
+        [profiles[user_id] for user_id in user_ids if user_id in profiles],
+        status=status.HTTP_200_OK
+    )
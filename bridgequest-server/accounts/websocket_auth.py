@@ -14,6 +14,8 @@ from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework_simplejwt.tokens import AccessToken
 
+from accounts.services.token_revocation import is_token_revoked
+
 User = get_user_model()
 
 
@@ -30,9 +32,11 @@ def _extract_token_from_scope(scope):
 
 @database_sync_to_async
 def _get_user_from_token(token):
-    """Valide le token JWT et retourne l'utilisateur ou None."""
+    """Valide le token JWT (signature, expiration, révocation) et retourne l'utilisateur ou None."""
     try:
         validated = AccessToken(token)
+        if is_token_revoked(validated):
+            return None
         user_id = validated.get("user_id")
         if not user_id:
             return None
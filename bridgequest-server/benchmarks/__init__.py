@@ -0,0 +1,15 @@
+"""
+Scripts de mesure de performance pour Bridge Quest.
+
+Chaque module s'exécute depuis bridgequest-server/ :
+    python -m benchmarks.<module> [options]
+
+Les mesures utilisent les settings de test (base SQLite en mémoire, cache
+LocMem) : elles comparent des variantes entre elles, pas des valeurs absolues
+de production.
+
+benchmarks.services mesure les services cœur sur trois tailles de jeu de
+données et compare un rapport à la baseline versionnée
+(benchmarks/baselines/services.json) : une modification présentée comme
+un gain de performance s'accompagne de cette comparaison.
+"""
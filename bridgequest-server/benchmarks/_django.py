@@ -0,0 +1,31 @@
+"""
+Initialisation de Django pour les scripts de benchmark.
+
+Crée une base de test éphémère (comme le runner de tests) avant la mesure.
+"""
+import os
+
+import django
+
+
+def setup_django():
+    """
+    Configure Django avec les settings de test et crée la base de test.
+
+    Returns:
+        Callable: Fonction de nettoyage (destruction de la base de test).
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "bridgequest.settings.testing")
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, keepdb=False)
+
+    def teardown():
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    return teardown
@@ -0,0 +1,112 @@
+"""
+Surcoût des access logs sur le chemin de la requête.
+
+Mesure le temps passé dans AccessLogMiddleware (vue triviale) pour :
+- sync : handler fichier appelé dans le thread de la requête (configuration
+  d'origine), sur un disque lent simulé,
+- queue : même handler derrière QueueListenerHandler (thread d'écriture),
+  format JSON,
+- queue+sampling : idem avec POST /api/locations/ échantillonné à 1 %.
+
+Usage (depuis bridgequest-server/) :
+    python -m benchmarks.access_log --requests 2000 --disk-latency-ms 2
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from benchmarks._django import setup_django
+from benchmarks.sso_login import _percentile
+
+PATH = "/api/locations/"
+
+
+class _SlowFileHandler(logging.FileHandler):
+    """FileHandler avec une latence d'écriture fixe (disque lent simulé)."""
+
+    def __init__(self, filename, latency_seconds):
+        super().__init__(filename)
+        self.latency_seconds = latency_seconds
+
+    def emit(self, record):
+        time.sleep(self.latency_seconds)
+        super().emit(record)
+
+
+def _measure(handler, requests, sample_rates):
+    """Exécute le middleware `requests` fois et retourne les durées par requête."""
+    from django.http import HttpResponse
+    from django.test import RequestFactory, override_settings
+
+    from utils.middleware import AccessLogMiddleware
+
+    logger = logging.getLogger("bridgequest.access")
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    factory = RequestFactory()
+    middleware = AccessLogMiddleware(lambda request: HttpResponse(b"{}"))
+    durations = []
+    with override_settings(ACCESS_LOG_SAMPLE_RATES=sample_rates):
+        for _ in range(requests):
+            request = factory.post(PATH)
+            started = time.perf_counter()
+            middleware(request)
+            durations.append(time.perf_counter() - started)
+    handler.close()
+    return durations
+
+
+def _run(options):
+    """Mesure les trois configurations sur le même disque simulé."""
+    from utils.log_handlers import JSONFormatter, QueueListenerHandler
+
+    latency = options.disk_latency_ms / 1000
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        def slow_handler(formatter):
+            handler = _SlowFileHandler(os.path.join(directory, "access.log"), latency)
+            handler.setFormatter(formatter)
+            return handler
+
+        configurations = (
+            ("sync", lambda: slow_handler(logging.Formatter()), {}),
+            ("queue", lambda: QueueListenerHandler([slow_handler(JSONFormatter())]), {}),
+            (
+                "queue+sampling",
+                lambda: QueueListenerHandler([slow_handler(JSONFormatter())]),
+                {f"POST {PATH}": 0.01},
+            ),
+        )
+        for label, build_handler, sample_rates in configurations:
+            durations = _measure(build_handler(), options.requests, sample_rates)
+            results.append((label, durations))
+    return results
+
+
+def main():
+    """Point d'entrée : parse les options, exécute et affiche la comparaison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--disk-latency-ms", type=float, default=2.0)
+    options = parser.parse_args()
+
+    teardown = setup_django()
+    try:
+        results = _run(options)
+    finally:
+        teardown()
+
+    print(f"{'config':<15} {'mean µs':>9} {'p50 µs':>9} {'p99 µs':>9}")
+    for label, durations in results:
+        print(
+            f"{label:<15} {sum(durations) / len(durations) * 1e6:>9.1f} "
+            f"{_percentile(durations, 50) * 1e6:>9.1f} {_percentile(durations, 99) * 1e6:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+"""
+Benchmarks des services cœur, avec baseline de non-régression.
+
+Pour chaque taille de jeu de données (small, medium, large, générés par
+games.services.synthetic_data), mesure la durée (min, p50, p95, moyenne) et le
+nombre de requêtes SQL de :
+- create_game, join_game, start_game,
+- update_position, get_latest_positions_for_game,
+- create_or_get_user_from_sso_data (utilisateur existant, nouvel utilisateur),
+- le flux d'exclusion du lobby (exclusion de l'admin, transfert des droits),
+- les serializers (partie, joueurs, positions, utilisateur).
+
+Chaque itération s'exécute dans un savepoint annulé : le jeu de données est
+identique d'une itération à l'autre. Le ramasse-miettes est suspendu pendant
+l'appel mesuré et les itérations sont entrelacées entre benchmarks (ROUNDS
+tours).
+
+Usage (depuis bridgequest-server/) :
+    python -m benchmarks.services run --output /tmp/services.json
+    python -m benchmarks.services compare benchmarks/baselines/services.json /tmp/services.json
+
+compare signale une régression quand la durée (--metric, défaut min : la
+plus stable d'une exécution à l'autre, les percentiles suivant la charge
+passagère de la machine) dépasse celle de la baseline de plus de --threshold
+(défaut 25 %) ou quand le nombre de requêtes augmente ; le code de sortie est
+alors 1. Les durées dépendent de la machine : la
+baseline se régénère (run --output benchmarks/baselines/services.json) sur
+la machine qui compare, à partir de la branche principale.
+"""
+import argparse
+import gc
+import json
+import platform
+import sqlite3
+import statistics
+import sys
+import time
+
+from benchmarks._django import setup_django
+from benchmarks.sso_login import _percentile
+
+SIZES = {
+    "small": {"users": 200, "games": 40, "players_per_game": 4, "positions_per_player": 20},
+    "medium": {"users": 2000, "games": 400, "players_per_game": 8, "positions_per_player": 50},
+    "large": {"users": 10000, "games": 2000, "players_per_game": 10, "positions_per_player": 80},
+}
+SEED = 42
+DEFAULT_ITERATIONS = 200
+WARMUP_ITERATIONS = 3
+# Tours entrelacés entre lesquels les itérations sont réparties
+ROUNDS = 10
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_METRIC = "min_ms"
+METRICS = ("min_ms", "p50_ms", "p95_ms", "mean_ms")
+
+STATUS_OK = "ok"
+STATUS_REGRESSION = "REGRESSION"
+STATUS_IMPROVED = "improved"
+STATUS_MISSING = "missing"
+
+
+class _Fixtures:
+    """Objets du jeu de données choisis une fois par taille, puis par itération."""
+
+    def __init__(self):
+        from django.contrib.auth import get_user_model
+
+        from games.models import Game, GameState, Player
+
+        User = get_user_model()
+        self.users = list(User.objects.order_by("pk")[:100])
+        self.waiting_admins = list(
+            Player.objects.filter(game__state=GameState.WAITING, is_admin=True)
+            .select_related("game", "user")
+            .order_by("pk")[:100]
+        )
+        self.active_players = list(
+            Player.objects.filter(game__state=GameState.IN_PROGRESS)
+            .select_related("game", "user")
+            .order_by("pk")[:100]
+        )
+        self.active_games = list(
+            Game.objects.filter(state=GameState.IN_PROGRESS).order_by("pk")[:100]
+        )
+        # Sans partie : peut rejoindre toute partie en attente
+        self.outsider = User.objects.create_user(username="bench", email="bench@example.com")
+
+    @staticmethod
+    def pick(items, iteration):
+        """Élément de l'itération (parcours circulaire)."""
+        return items[iteration % len(items)]
+
+
+def _prepare_create_game(fixtures, iteration):
+    from games.services import create_game
+
+    user = fixtures.pick(fixtures.users, iteration)
+    return lambda: create_game(user)
+
+
+def _prepare_join_game(fixtures, iteration):
+    from games.services import join_game
+
+    game = fixtures.pick(fixtures.waiting_admins, iteration).game
+    return lambda: join_game(game.code, fixtures.outsider)
+
+
+def _prepare_start_game(fixtures, iteration):
+    from games.services import start_game
+
+    admin = fixtures.pick(fixtures.waiting_admins, iteration)
+    return lambda: start_game(admin.game_id, admin.user)
+
+
+def _prepare_update_position(fixtures, iteration):
+    from locations.services.position_service import update_position
+
+    player = fixtures.pick(fixtures.active_players, iteration)
+    return lambda: update_position(player.game_id, player.user, 48.8566, 2.3522)
+
+
+def _prepare_latest_positions(fixtures, iteration):
+    from locations.services.position_service import get_latest_positions_for_game
+
+    game = fixtures.pick(fixtures.active_games, iteration)
+    return lambda: get_latest_positions_for_game(game)
+
+
+def _prepare_sso_existing(fixtures, iteration):
+    from accounts.services.auth_service import create_or_get_user_from_sso_data
+
+    user = fixtures.pick(fixtures.users, iteration)
+    sso_data = {"email": user.email, "given_name": user.first_name, "family_name": user.last_name}
+    return lambda: create_or_get_user_from_sso_data(sso_data, "google")
+
+
+def _prepare_sso_new(fixtures, iteration):
+    from accounts.services.auth_service import create_or_get_user_from_sso_data
+
+    # Nom de base en collision avec les utilisateurs générés (synth1, synth10...)
+    sso_data = {"email": "synth1@new.example.com", "given_name": "New", "family_name": "User"}
+    return lambda: create_or_get_user_from_sso_data(sso_data, "google")
+
+
+def _prepare_lobby_exclusion(fixtures, iteration):
+    from games.services.lobby_service import exclude_player_immediately
+
+    admin = fixtures.pick(fixtures.waiting_admins, iteration)
+    return lambda: exclude_player_immediately(admin.game_id, admin.pk)
+
+
+def _prepare_game_serializer(fixtures, iteration):
+    from games.serializers import GameSerializer
+
+    game = fixtures.pick(fixtures.active_games, iteration)
+    return lambda: GameSerializer(game).data
+
+
+def _prepare_player_serializer(fixtures, iteration):
+    from games.serializers import PlayerSerializer
+
+    game = fixtures.pick(fixtures.active_games, iteration)
+    players = list(game.players.select_related("user"))
+    return lambda: PlayerSerializer(players, many=True).data
+
+
+def _prepare_position_serializer(fixtures, iteration):
+    from locations.serializers import PositionWithPlayerSerializer
+    from locations.services.position_service import get_latest_positions_for_game
+
+    positions = get_latest_positions_for_game(fixtures.pick(fixtures.active_games, iteration))
+    return lambda: PositionWithPlayerSerializer(positions, many=True).data
+
+
+def _prepare_user_serializer(fixtures, iteration):
+    from accounts.serializers import UserSerializer
+
+    user = fixtures.pick(fixtures.users, iteration)
+    return lambda: UserSerializer(user).data
+
+
+# Nom -> préparation (hors mesure) retournant l'appel mesuré
+BENCHMARKS = {
+    "create_game": _prepare_create_game,
+    "join_game": _prepare_join_game,
+    "start_game": _prepare_start_game,
+    "update_position": _prepare_update_position,
+    "get_latest_positions_for_game": _prepare_latest_positions,
+    "create_or_get_user_from_sso_data[existing]": _prepare_sso_existing,
+    "create_or_get_user_from_sso_data[new]": _prepare_sso_new,
+    "lobby_exclusion[admin]": _prepare_lobby_exclusion,
+    "GameSerializer": _prepare_game_serializer,
+    "PlayerSerializer[many]": _prepare_player_serializer,
+    "PositionWithPlayerSerializer[many]": _prepare_position_serializer,
+    "UserSerializer": _prepare_user_serializer,
+}
+
+
+def _measure(prepare, fixtures, iterations, first_iteration=0):
+    """
+    Exécute une série d'itérations d'un benchmark.
+
+    Returns:
+        tuple[list[float], int]: Durées (ms) et nombre de requêtes d'une itération
+    """
+    from django.db import connection, transaction
+
+    durations = []
+    queries = 0
+
+    def count_query(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    for iteration in range(first_iteration, first_iteration + iterations):
+        with transaction.atomic():
+            run = prepare(fixtures, iteration)
+            queries = 0
+            gc.collect()
+            gc.disable()
+            try:
+                with connection.execute_wrapper(count_query):
+                    started = time.perf_counter()
+                    run()
+                    elapsed = time.perf_counter() - started
+            finally:
+                gc.enable()
+            transaction.set_rollback(True)
+        durations.append(elapsed * 1000)
+    return durations, queries
+
+
+def _summarize(durations, queries):
+    """Statistiques (ms) et nombre de requêtes d'un benchmark."""
+    return {
+        "min_ms": round(min(durations), 4),
+        "p50_ms": round(_percentile(durations, 50), 4),
+        "p95_ms": round(_percentile(durations, 95), 4),
+        "mean_ms": round(statistics.fmean(durations), 4),
+        "queries": queries,
+    }
+
+
+def _run_size(size, iterations):
+    """
+    Génère le jeu de données d'une taille, mesure tous les benchmarks puis l'annule.
+
+    Les itérations sont réparties en ROUNDS tours entrelacés (chaque tour
+    passe sur tous les benchmarks) : un ralentissement passager de la
+    machine se répartit sur tous les benchmarks au lieu de fausser un seul
+    d'entre eux.
+    """
+    from django.db import transaction
+
+    from games.services.synthetic_data import generate_synthetic_data
+    from utils import query_plans
+
+    per_round = max(1, iterations // ROUNDS)
+    with transaction.atomic():
+        generate_synthetic_data(**SIZES[size], seed=SEED)
+        query_plans.analyze()
+        fixtures = _Fixtures()
+        for prepare in BENCHMARKS.values():
+            _measure(prepare, fixtures, WARMUP_ITERATIONS)
+        durations = {name: [] for name in BENCHMARKS}
+        queries = {}
+        for round_index in range(ROUNDS):
+            for name, prepare in BENCHMARKS.items():
+                measured, queries[name] = _measure(
+                    prepare, fixtures, per_round, first_iteration=round_index * per_round
+                )
+                durations[name].extend(measured)
+        results = {name: _summarize(durations[name], queries[name]) for name in BENCHMARKS}
+        for name, result in results.items():
+            print(f"{size:<7} {name:<45} p50={result['p50_ms']:.3f} ms", file=sys.stderr)
+        transaction.set_rollback(True)
+    return results
+
+
+def run(options):
+    """Exécute la suite et écrit les résultats JSON."""
+    teardown = setup_django()
+    try:
+        import django
+
+        report = {
+            "environment": {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "machine": platform.machine(),
+                "iterations": options.iterations,
+                "seed": SEED,
+            },
+            "results": {size: _run_size(size, options.iterations) for size in options.sizes},
+        }
+    finally:
+        teardown()
+
+    with open(options.output, "w", encoding="utf-8") as output:
+        json.dump(report, output, indent=2, sort_keys=True)
+        output.write("\n")
+    print(f"Résultats écrits dans {options.output}")
+    return 0
+
+
+def compare_reports(baseline, current, threshold, metric=DEFAULT_METRIC):
+    """
+    Compare deux rapports benchmark par benchmark.
+
+    Args:
+        baseline: Rapport de référence (dict JSON)
+        current: Rapport à évaluer
+        threshold: Hausse relative tolérée de la métrique (0.25 = +25 %)
+        metric: Durée comparée ('p50_ms', 'min_ms', 'p95_ms' ou 'mean_ms')
+
+    Returns:
+        list[tuple]: (taille, nom, durée baseline, durée courante, requêtes baseline,
+        requêtes courantes, statut)
+    """
+    rows = []
+    for size, benchmarks in baseline["results"].items():
+        for name, reference in benchmarks.items():
+            measured = current["results"].get(size, {}).get(name)
+            if measured is None:
+                rows.append((
+                    size, name, reference[metric], None, reference["queries"], None, STATUS_MISSING,
+                ))
+                continue
+            ratio = measured[metric] / reference[metric] if reference[metric] else 1.0
+            if measured["queries"] > reference["queries"] or ratio > 1 + threshold:
+                status = STATUS_REGRESSION
+            elif ratio < 1 - threshold:
+                status = STATUS_IMPROVED
+            else:
+                status = STATUS_OK
+            rows.append((
+                size, name, reference[metric], measured[metric],
+                reference["queries"], measured["queries"], status,
+            ))
+    return rows
+
+
+def compare(options):
+    """Affiche la comparaison ; code de sortie 1 en cas de régression."""
+    with open(options.baseline, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+    with open(options.current, encoding="utf-8") as current_file:
+        current = json.load(current_file)
+
+    rows = compare_reports(baseline, current, options.threshold, options.metric)
+    print(
+        f"{'size':<7} {'benchmark':<45} {'base ms':>9} {'new ms':>9} {'delta':>8} "
+        f"{'queries':>9}  status"
+    )
+    for size, name, base_ms, new_ms, base_queries, new_queries, status in rows:
+        if new_ms is None:
+            print(f"{size:<7} {name:<45} {base_ms:>9.3f} {'-':>9} {'-':>8} {'-':>9}  {status}")
+            continue
+        delta = new_ms / base_ms - 1 if base_ms else 0.0
+        print(
+            f"{size:<7} {name:<45} {base_ms:>9.3f} {new_ms:>9.3f} {delta:>+8.1%} "
+            f"{f'{base_queries}->{new_queries}':>9}  {status}"
+        )
+    regressions = sum(row[-1] == STATUS_REGRESSION for row in rows)
+    print(f"\n{regressions} régression(s) au-delà de {options.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main():
+    """Point d'entrée : sous-commandes run et compare."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Exécute la suite et écrit un rapport JSON.")
+    run_parser.add_argument(
+        "--sizes",
+        type=lambda value: value.split(","),
+        default=list(SIZES),
+        help="Tailles à mesurer, séparées par des virgules (défaut : toutes).",
+    )
+    run_parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    run_parser.add_argument("--output", required=True, help="Fichier JSON du rapport.")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare un rapport à la baseline.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    compare_parser.add_argument(
+        "--metric",
+        choices=METRICS,
+        default=DEFAULT_METRIC,
+        help="Durée comparée (défaut min_ms : la moins sensible au bruit de la machine).",
+    )
+    compare_parser.set_defaults(handler=compare)
+
+    options = parser.parse_args()
+    if options.command == "run":
+        unknown = set(options.sizes) - set(SIZES)
+        if unknown:
+            parser.error(f"tailles inconnues : {', '.join(sorted(unknown))}")
+    sys.exit(options.handler(options))
+
+
+if __name__ == "__main__":
+    main()
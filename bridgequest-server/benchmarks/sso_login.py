@@ -0,0 +1,146 @@
+"""
+Charge de connexions SSO simultanées : vue synchrone vs vue asynchrone.
+
+Simule un pic de connexions (N requêtes, C simultanées) avec une latence
+fournisseur fixe, et mesure pour chaque chemin :
+- le débit (connexions/s) et les latences p50/p95,
+- la latence d'une sonde database_sync_to_async (ce qu'utilisent les
+  consumers WebSocket) exécutée pendant la charge.
+
+Sous ASGI, les vues synchrones partagent un thread unique
+(thread_sensitive=True) : la latence fournisseur s'y additionne et bloque
+aussi les appels database_sync_to_async des consumers.
+
+Usage (depuis bridgequest-server/) :
+    python -m benchmarks.sso_login --logins 200 --concurrency 50 --provider-latency-ms 50
+"""
+import argparse
+import asyncio
+import time
+from unittest.mock import patch
+
+from benchmarks._django import setup_django
+
+SYNC_URL = "/api/auth/sso/login/"
+ASYNC_URL = "/api/auth/sso/login/async/"
+
+
+def _percentile(values, percent):
+    """Retourne le percentile (méthode du rang le plus proche) d'une liste non vide."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _fake_provider(latency_seconds):
+    """Validation fournisseur simulée : latence bloquante puis données SSO par token."""
+
+    def validate(token):
+        time.sleep(latency_seconds)
+        return {
+            "email": f"{token}@bench.example.com",
+            "given_name": "Bench",
+            "family_name": token,
+            "picture": "",
+            "sub": token,
+        }
+
+    return validate
+
+
+async def _run_path(client, url, label, logins, concurrency):
+    """Lance les connexions sur un chemin et mesure latences et sonde consumers."""
+    from channels.db import database_sync_to_async
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async def login(index):
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post(
+                url,
+                {"provider": "google", "token": f"{label}-{index}"},
+                content_type="application/json",
+            )
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                failures += 1
+
+    probe_latencies = []
+    done = asyncio.Event()
+
+    async def probe():
+        while not done.is_set():
+            started = time.perf_counter()
+            await database_sync_to_async(lambda: None)()
+            probe_latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(0.01)
+
+    probe_task = asyncio.create_task(probe())
+    started = time.perf_counter()
+    await asyncio.gather(*(login(index) for index in range(logins)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await probe_task
+
+    return {
+        "path": label,
+        "logins_per_second": logins / elapsed,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "failures": failures,
+        "consumer_probe_p95_ms": _percentile(probe_latencies, 95) * 1000,
+        "consumer_probe_max_ms": max(probe_latencies) * 1000,
+    }
+
+
+async def _run(options):
+    """Exécute les deux chemins avec la même charge."""
+    from django.test import AsyncClient
+
+    client = AsyncClient()
+    results = []
+    with patch(
+        "accounts.views.auth_views.validate_google_token",
+        _fake_provider(options.provider_latency_ms / 1000),
+    ):
+        for url, label in ((SYNC_URL, "sync"), (ASYNC_URL, "async")):
+            results.append(
+                await _run_path(client, url, label, options.logins, options.concurrency)
+            )
+    return results
+
+
+def main():
+    """Point d'entrée : parse les options, exécute et affiche la comparaison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--provider-latency-ms", type=float, default=50.0)
+    options = parser.parse_args()
+
+    teardown = setup_django()
+    try:
+        results = asyncio.run(_run(options))
+    finally:
+        teardown()
+
+    print(
+        f"{'path':<6} {'logins/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'fail':>5} {'probe p95':>10} {'probe max':>10}"
+    )
+    for result in results:
+        print(
+            f"{result['path']:<6} {result['logins_per_second']:>9.1f} "
+            f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['failures']:>5} "
+            f"{result['consumer_probe_p95_ms']:>10.1f} {result['consumer_probe_max_ms']:>10.1f}"
+        )
+    sync, async_ = results
+    print(f"\nCapacité async / sync : x{async_['logins_per_second'] / sync['logins_per_second']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Allocation de noms d'utilisateur uniques sur un préfixe très partagé.
+
+Crée N utilisateurs dont l'email commence par le même préfixe ("john@..."),
+puis mesure pour l'inscription suivante :
+- le nombre de requêtes SQL et la durée de l'allocateur actuel (une requête),
+- les mêmes mesures pour l'ancienne boucle exists() (une requête par suffixe).
+
+Usage (depuis bridgequest-server/) :
+    python -m benchmarks.username_allocation --users 10000
+"""
+import argparse
+import time
+
+from benchmarks._django import setup_django
+
+BASE_USERNAME = "john"
+
+
+def _legacy_allocation(User, base_username):
+    """Ancienne allocation : une requête exists() par suffixe déjà pris."""
+    username = base_username
+    counter = 1
+    while User.objects.filter(username=username).exists():
+        username = f"{base_username}{counter}"
+        counter += 1
+    return username
+
+
+def _measure(allocate):
+    """Exécute une allocation et retourne (username, requêtes, millisecondes)."""
+    from django.db import connection
+
+    queries = 0
+
+    def count_query(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count_query):
+        started = time.perf_counter()
+        username = allocate(BASE_USERNAME)
+        elapsed = time.perf_counter() - started
+    return username, queries, elapsed * 1000
+
+
+def _run(options):
+    """Peuple les collisions puis compare les deux allocateurs."""
+    from django.contrib.auth import get_user_model
+
+    from accounts.services.auth_service import _generate_unique_username
+
+    User = get_user_model()
+    User.objects.bulk_create(
+        User(
+            username=f"{BASE_USERNAME}{index or ''}",
+            email=f"{BASE_USERNAME}@domain{index}.example.com",
+        )
+        for index in range(options.users)
+    )
+
+    return [
+        ("current", *_measure(_generate_unique_username)),
+        ("legacy", *_measure(lambda base: _legacy_allocation(User, base))),
+    ]
+
+
+def main():
+    """Point d'entrée : parse les options, exécute et affiche la comparaison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=10000)
+    options = parser.parse_args()
+
+    teardown = setup_django()
+    try:
+        results = _run(options)
+    finally:
+        teardown()
+
+    print(f"{'allocator':<10} {'username':<12} {'queries':>8} {'ms':>9}")
+    for label, username, queries, elapsed_ms in results:
+        print(f"{label:<10} {username:<12} {queries:>8} {elapsed_ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,15 @@ Configuration du routing WebSocket pour Bridge Quest.
 Deux canaux distincts :
 - ws/lobby/{game_id}/ : salle d'attente (phase WAITING)
 - ws/game/{game_id}/ : partie en cours (phases DEPLOYMENT, IN_PROGRESS)
+
+Les consumers sont profilables à la demande (utils.profiling,
+PROFILING_ENABLED) comme les requêtes HTTP.
 """
 from django.urls import path
 from games.consumers import GameConsumer, LobbyConsumer
+from utils.profiling import profile_consumer
 
 websocket_urlpatterns = [
-    path("ws/lobby/<int:game_id>/", LobbyConsumer.as_asgi()),
-    path("ws/game/<int:game_id>/", GameConsumer.as_asgi()),
+    path("ws/lobby/<int:game_id>/", profile_consumer(LobbyConsumer).as_asgi()),
+    path("ws/game/<int:game_id>/", profile_consumer(GameConsumer).as_asgi()),
 ]
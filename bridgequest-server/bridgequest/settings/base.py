@@ -44,7 +44,9 @@ AUTH_USER_MODEL = 'accounts.User'
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'utils.middleware.MetricsMiddleware',  # Latence, statuts, tailles et SQL par vue (/internal/metrics/)
+    'utils.middleware.ProfilingMiddleware',  # Profilage à la demande (retiré si PROFILING_ENABLED=False)
+    'utils.middleware.AsyncWhiteNoiseMiddleware',  # WhiteNoise compatible async (vues async sous ASGI)
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS middleware (avant CommonMiddleware)
     'django.middleware.common.CommonMiddleware',
@@ -134,7 +136,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.RevocableJWTAuthentication',  # JWT + révocation (logout, ban)
         'rest_framework.authentication.SessionAuthentication',  # Gardé pour compatibilité admin Django
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -176,6 +178,20 @@ GOOGLE_CLIENT_IDS = config(
     cast=lambda v: [s.strip() for s in v.split(',') if s.strip()] if v else []
 )
 
+# Client HTTP sortant (fournisseurs SSO) : pool keep-alive, concurrence par hôte,
+# nouvelles tentatives avec jitter et disjoncteur (utils.http_client)
+OUTBOUND_HTTP_POOL_SIZE = config('OUTBOUND_HTTP_POOL_SIZE', default=10, cast=int)
+OUTBOUND_HTTP_MAX_CONCURRENCY_PER_HOST = config(
+    'OUTBOUND_HTTP_MAX_CONCURRENCY_PER_HOST', default=8, cast=int
+)
+OUTBOUND_HTTP_MAX_RETRIES = config('OUTBOUND_HTTP_MAX_RETRIES', default=2, cast=int)
+OUTBOUND_HTTP_CIRCUIT_FAILURE_THRESHOLD = config(
+    'OUTBOUND_HTTP_CIRCUIT_FAILURE_THRESHOLD', default=5, cast=int
+)
+OUTBOUND_HTTP_CIRCUIT_RESET_SECONDS = config(
+    'OUTBOUND_HTTP_CIRCUIT_RESET_SECONDS', default=30, cast=int
+)
+
 # Simple JWT Configuration
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),  # Token d'accès valide 1 heure
@@ -191,4 +207,132 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',  # Claim JWT contenant l'ID utilisateur
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    # Refus des refresh tokens révoqués (déconnexion, bannissement)
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.token_serializers.RevocableTokenRefreshSerializer',
 }
+
+# Access logs (utils.middleware.AccessLogMiddleware)
+# Échantillonnage des requêtes réussies par préfixe de chemin (méthode optionnelle) ;
+# les erreurs (>= 400) sont toujours enregistrées.
+# Exemple : "POST /api/locations/=0.01,GET /api/auth/users/=0.1"
+ACCESS_LOG_SAMPLE_RATES = config(
+    'ACCESS_LOG_SAMPLE_RATES',
+    default='',
+    cast=lambda v: {
+        rule.strip(): float(rate)
+        for rule, _, rate in (item.rpartition('=') for item in v.split(',') if item.strip())
+    }
+)
+# Format JSON (une ligne par requête, avec durée et utilisateur) en production
+ACCESS_LOG_JSON = config('ACCESS_LOG_JSON', default=False, cast=bool)
+
+# Métriques (utils.metrics) : totaux par worker publiés dans le cache partagé par
+# un thread démon, additionnés au scrape de /internal/metrics/ (METRICS_ALLOWED_IPS)
+METRICS_FLUSH_INTERVAL_SECONDS = config('METRICS_FLUSH_INTERVAL_SECONDS', default=10, cast=float)
+# Un worker sans publication depuis ce délai n'est plus compté (redémarrage, arrêt)
+METRICS_WORKER_TTL_SECONDS = config('METRICS_WORKER_TTL_SECONDS', default=120, cast=int)
+METRICS_ALLOWED_IPS = config(
+    'METRICS_ALLOWED_IPS',
+    default='127.0.0.1,::1',
+    cast=lambda v: [s.strip() for s in v.split(',') if s.strip()]
+)
+
+# Profilage à la demande (utils.profiling) : fraction des requêtes HTTP et des
+# messages WebSocket, ou en-tête X-BridgeQuest-Profile signé (make_profile_token)
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=False, cast=bool)
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.0, cast=float)
+PROFILING_TOKEN_MAX_AGE_SECONDS = config('PROFILING_TOKEN_MAX_AGE_SECONDS', default=3600, cast=int)
+# Intervalle de l'échantillonneur statistique (chaîne async : Daphne, consumers)
+PROFILING_SAMPLE_INTERVAL_SECONDS = config('PROFILING_SAMPLE_INTERVAL_SECONDS', default=0.005, cast=float)
+PROFILING_DIR = config('PROFILING_DIR', default=str(BASE_DIR / 'profiles'))
+# Rotation : nombre de profils conservés (hors top-N des plus lents par endpoint)
+PROFILING_MAX_FILES = config('PROFILING_MAX_FILES', default=200, cast=int)
+PROFILING_TOP_N = config('PROFILING_TOP_N', default=10, cast=int)
+
+# Traçage par requête (utils.tracing) : spans propagés dans les messages du
+# channel layer, exportés en JSON sur le logger bridgequest.tracing ('log')
+# ou dans un collecteur en mémoire ('memory')
+TRACING_ENABLED = config('TRACING_ENABLED', default=False, cast=bool)
+TRACING_SAMPLE_RATE = config('TRACING_SAMPLE_RATE', default=1.0, cast=float)
+TRACING_EXPORTER = config('TRACING_EXPORTER', default='log')
+
+# Budgets de requêtes SQL (utils.query_budget) : 'off', 'warn' (journalisé sur
+# une fraction des traitements) ou 'raise' (tests : une régression N+1 échoue)
+QUERY_BUDGET_MODE = config('QUERY_BUDGET_MODE', default='warn')
+QUERY_BUDGET_SAMPLE_RATE = config('QUERY_BUDGET_SAMPLE_RATE', default=0.01, cast=float)
+
+# Fraction des group_send dont le fan-out est mesuré avec RedisChannelLayer
+# (un ZCARD par mesure ; games.services.realtime_metrics)
+CHANNEL_GROUP_FANOUT_SAMPLE_RATE = config('CHANNEL_GROUP_FANOUT_SAMPLE_RATE', default=0.01, cast=float)
+
+# Sonde de latence des positions (games.services.latency_probe) : derniers
+# acquittements conservés par partie et par worker, exposés par /internal/latency/
+LATENCY_PROBE_SAMPLE_SIZE = config('LATENCY_PROBE_SAMPLE_SIZE', default=1000, cast=int)
+# Une partie sans acquittement depuis ce délai est oubliée
+LATENCY_PROBE_GAME_TTL_SECONDS = config('LATENCY_PROBE_GAME_TTL_SECONDS', default=600, cast=int)
+
+# Cache des profils utilisateur sérialisés (invalidé à chaque sauvegarde)
+USER_PROFILE_CACHE_TIMEOUT_SECONDS = config(
+    'USER_PROFILE_CACHE_TIMEOUT_SECONDS', default=300, cast=int
+)
+# Nombre maximal d'IDs par requête GET /api/auth/users/?ids=...
+USER_BULK_LOOKUP_MAX_IDS = config('USER_BULK_LOOKUP_MAX_IDS', default=100, cast=int)
+
+# Révocation des tokens JWT (accounts.services.token_revocation)
+# Filtre de Bloom local par worker, confirmé dans le cache partagé ;
+# journal des révocations relu au plus une fois par intervalle
+TOKEN_REVOCATION_BLOOM_CAPACITY = config(
+    'TOKEN_REVOCATION_BLOOM_CAPACITY', default=100000, cast=int
+)
+TOKEN_REVOCATION_BLOOM_ERROR_RATE = config(
+    'TOKEN_REVOCATION_BLOOM_ERROR_RATE', default=0.001, cast=float
+)
+TOKEN_REVOCATION_SYNC_INTERVAL_SECONDS = config(
+    'TOKEN_REVOCATION_SYNC_INTERVAL_SECONDS', default=1.0, cast=float
+)
+
+# Nettoyage des parties abandonnées (commande reap_stale_games)
+# WAITING inactive au-delà du délai -> supprimée
+# DEPLOYMENT / IN_PROGRESS sans activité (partie ni positions) -> FINISHED
+# FINISHED au-delà de la rétention -> supprimée (0 = conservation illimitée)
+GAME_REAPER_WAITING_TIMEOUT_MINUTES = config(
+    'GAME_REAPER_WAITING_TIMEOUT_MINUTES', default=120, cast=int
+)
+GAME_REAPER_ACTIVE_TIMEOUT_MINUTES = config(
+    'GAME_REAPER_ACTIVE_TIMEOUT_MINUTES', default=360, cast=int
+)
+GAME_REAPER_FINISHED_RETENTION_DAYS = config(
+    'GAME_REAPER_FINISHED_RETENTION_DAYS', default=30, cast=int
+)
+GAME_REAPER_CHUNK_SIZE = config('GAME_REAPER_CHUNK_SIZE', default=100, cast=int)
+
+# Boucle de jeu serveur (commande run_game_loop)
+# Une partie DEPLOYMENT / IN_PROGRESS est pilotée par un seul worker (bail dans le cache partagé)
+GAME_LOOP_TICK_RATE_HZ = config('GAME_LOOP_TICK_RATE_HZ', default=2.0, cast=float)
+GAME_LOOP_LEASE_TTL_SECONDS = config('GAME_LOOP_LEASE_TTL_SECONDS', default=15, cast=int)
+GAME_LOOP_DISCOVERY_INTERVAL_SECONDS = config(
+    'GAME_LOOP_DISCOVERY_INTERVAL_SECONDS', default=5, cast=int
+)
+# Durée du déploiement : la boucle passe la partie de DEPLOYMENT à IN_PROGRESS ensuite
+GAME_LOOP_DEPLOYMENT_SECONDS = config('GAME_LOOP_DEPLOYMENT_SECONDS', default=300, cast=int)
+# Règles évaluées à chaque tick (chemins de classes GameRule, séparés par des virgules)
+GAME_LOOP_RULES = config(
+    'GAME_LOOP_RULES',
+    default='games.services.game_rules.SpiritConversionRule',
+    cast=lambda v: [s.strip() for s in v.split(',') if s.strip()]
+)
+# SpiritConversionRule : rayon de contact, points de l'Esprit, âge maximal d'une position
+GAME_RULE_CONVERSION_RADIUS_METERS = config(
+    'GAME_RULE_CONVERSION_RADIUS_METERS', default=15, cast=float
+)
+GAME_RULE_CONVERSION_POINTS = config('GAME_RULE_CONVERSION_POINTS', default=1, cast=int)
+GAME_RULE_POSITION_MAX_AGE_SECONDS = config(
+    'GAME_RULE_POSITION_MAX_AGE_SECONDS', default=60, cast=int
+)
+
+# Acteur de jeu : état en mémoire de la partie dans la boucle de jeu (write-behind)
+# et instantané partagé lu par les chemins chauds (POST position, ws/game/)
+GAME_ACTOR_ENABLED = config('GAME_ACTOR_ENABLED', default=False, cast=bool)
+GAME_ACTOR_FLUSH_INTERVAL_SECONDS = config(
+    'GAME_ACTOR_FLUSH_INTERVAL_SECONDS', default=2, cast=float
+)
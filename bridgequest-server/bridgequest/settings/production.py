@@ -59,14 +59,17 @@ CHANNEL_LAYERS = {
 
 # Cache partagé requis pour lobby_service (exclusions en attente)
 # Sans CACHES explicite : LocMemCache par process → incohérences multi-workers
+# django-redis : expose la connexion Redis (sorted sets du classement)
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'BACKEND': 'django_redis.cache.RedisCache',
         'LOCATION': _redis_url,
     },
 }
 
 # Logging pour la production
+# Les écritures (fichier, console) sont faites par un thread d'arrière-plan
+# (QueueListenerHandler) : un disque lent ne bloque pas les requêtes.
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -75,6 +78,13 @@ LOGGING = {
             'format': '{levelname} {asctime} {module} {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'utils.log_handlers.JSONFormatter',
+        },
+        # Spans déjà sérialisés en JSON par utils.tracing
+        'span': {
+            'format': '%(message)s',
+        },
     },
     'handlers': {
         'file': {
@@ -86,19 +96,52 @@ LOGGING = {
             'class': 'logging.StreamHandler',
             'formatter': 'verbose',
         },
+        'access_file': {
+            'class': 'logging.FileHandler',
+            'filename': BASE_DIR / 'logs' / 'access.log',
+            'formatter': 'json' if ACCESS_LOG_JSON else 'verbose',
+        },
+        'file_traces': {
+            'class': 'logging.FileHandler',
+            'filename': BASE_DIR / 'logs' / 'traces.jsonl',
+            'formatter': 'span',
+        },
+        # Noms triés après leurs cibles (ordre de configuration de dictConfig)
+        'queue': {
+            '()': 'utils.log_handlers.QueueListenerHandler',
+            'handlers': ['cfg://handlers.file', 'cfg://handlers.console'],
+        },
+        'queue_access': {
+            '()': 'utils.log_handlers.QueueListenerHandler',
+            'handlers': ['cfg://handlers.access_file'],
+        },
+        'queue_tracing': {
+            '()': 'utils.log_handlers.QueueListenerHandler',
+            'handlers': ['cfg://handlers.file_traces'],
+        },
     },
     'root': {
-        'handlers': ['file', 'console'],
+        'handlers': ['queue'],
         'level': 'WARNING',
     },
     'loggers': {
         'django': {
-            'handlers': ['file', 'console'],
+            'handlers': ['queue'],
             'level': 'ERROR',
             'propagate': False,
         },
         'bridgequest': {
-            'handlers': ['file', 'console'],
+            'handlers': ['queue'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'bridgequest.access': {
+            'handlers': ['queue_access'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'bridgequest.tracing': {
+            'handlers': ['queue_tracing'],
             'level': 'INFO',
             'propagate': False,
         },
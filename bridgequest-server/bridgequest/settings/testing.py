@@ -43,6 +43,11 @@ CACHES = {
 
 EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
 
+# Budgets de requêtes SQL vérifiés sur chaque traitement : un dépassement
+# (régression N+1) fait échouer le test
+QUERY_BUDGET_MODE = 'raise'
+QUERY_BUDGET_SAMPLE_RATE = 1.0
+
 DEBUG = False
 
 # Password hashing rapide pour les tests uniquement
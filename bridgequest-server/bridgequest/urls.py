@@ -6,6 +6,9 @@ Les URLs sont organisées par module via include().
 from django.contrib import admin
 from django.urls import path, include
 
+from games.views import latency_probe_view
+from utils.metrics import metrics_view
+
 urlpatterns = [
     # Interface d'administration Django
     path('admin/', admin.site.urls),
@@ -17,4 +20,9 @@ urlpatterns = [
     path('api/locations/', include('locations.urls')),
     path('api/powers/', include('powers.urls')),
     path('api/logs/', include('logs.urls')),
+    
+    # Métriques Prometheus (réseau interne uniquement)
+    path('internal/metrics/', metrics_view, name='metrics'),
+    # Percentiles de latence des positions par partie et par worker
+    path('internal/latency/', latency_probe_view, name='latency-probe'),
 ]
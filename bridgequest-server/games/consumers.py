@@ -6,13 +6,16 @@ Deux canaux distincts :
 - GameConsumer : partie en cours (phases DEPLOYMENT, IN_PROGRESS)
 """
 import asyncio
+import time
 
 from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from django.contrib.auth.models import AnonymousUser
 
 from games.models import Game, GameState, Player
+from games.services import latency_probe, realtime_metrics
 from games.services.game_broadcast import get_game_group_name
+from games.services.game_snapshot import build_snapshot_player, get_game_snapshot
 from games.services.lobby_broadcast import get_lobby_group_name
 from games.services.lobby_service import (
     LOBBY_DISCONNECT_GRACE_SECONDS,
@@ -22,6 +25,8 @@ from games.services.lobby_service import (
     mark_player_disconnected,
 )
 from games.services.player_payload import build_player_websocket_payload
+from utils import tracing
+from utils.query_budget import query_budget
 
 # Codes de fermeture WebSocket
 _WS_CLOSE_UNAUTHORIZED = 4001
@@ -30,6 +35,20 @@ _WS_CLOSE_WRONG_CHANNEL = 4003
 
 # Message client : sortie volontaire → exclusion immédiate (sans délai 30 s)
 _WS_MESSAGE_LEAVE = "leave"
+# Message client : mesure de latence → réponse pong avec le temps de traitement
+_WS_MESSAGE_PING = "ping"
+# Message client : acquittement d'une position (sonde de latence)
+_WS_MESSAGE_ACK = "ack"
+
+# Messages client reconnus (les autres sont comptés comme « other »)
+_WS_INBOUND_MESSAGE_TYPES = frozenset({_WS_MESSAGE_LEAVE, _WS_MESSAGE_PING, _WS_MESSAGE_ACK})
+
+# Issue d'une connexion refusée, par code de fermeture (label de métrique)
+_CONNECT_OUTCOMES = {
+    _WS_CLOSE_UNAUTHORIZED: "unauthorized",
+    _WS_CLOSE_NOT_IN_GAME: "not_in_game",
+    _WS_CLOSE_WRONG_CHANNEL: "wrong_channel",
+}
 
 _CLOSE_CODES_SKIP_EXCLUSION = (
     _WS_CLOSE_UNAUTHORIZED,
@@ -42,9 +61,72 @@ class _BaseGameConsumerMixin:
     """
     Mixin partagé pour LobbyConsumer et GameConsumer.
 
-    Fournit les méthodes communes d'authentification et de sérialisation.
+    Fournit les méthodes communes d'authentification et de sérialisation,
+    et instrumente le cycle de vie de la connexion (games.services.
+    realtime_metrics) : issue et latence de connexion, connexions ouvertes,
+    messages reçus, trames et octets envoyés.
     """
 
+    # Label « channel » des métriques (défini par chaque consumer)
+    metrics_channel = None
+
+    async def websocket_connect(self, message):
+        """Mesure l'issue et la latence du chemin de connexion."""
+        self._connect_outcome = None
+        self._counted_connection = False
+        started = time.perf_counter()
+        try:
+            await super().websocket_connect(message)
+        finally:
+            realtime_metrics.record_connect(
+                self.metrics_channel,
+                self._connect_outcome or "error",
+                time.perf_counter() - started,
+            )
+
+    async def accept(self, subprotocol=None, headers=None):
+        """Accepte la connexion et la compte dans les connexions ouvertes."""
+        if self._connect_outcome is None:
+            self._connect_outcome = realtime_metrics.CONNECT_ACCEPTED
+            self._counted_connection = True
+            realtime_metrics.connection_opened(self.metrics_channel, self.game_id)
+        await super().accept(subprotocol=subprotocol, headers=headers)
+
+    async def close(self, code=None, reason=None):
+        """Ferme la connexion (pendant connect : issue = motif du code)."""
+        if self._connect_outcome is None:
+            self._connect_outcome = _CONNECT_OUTCOMES.get(code, "closed")
+        await super().close(code=code, reason=reason)
+
+    async def websocket_disconnect(self, message):
+        """Décompte la connexion ouverte à la déconnexion."""
+        try:
+            await super().websocket_disconnect(message)
+        finally:
+            if self._counted_connection:
+                self._counted_connection = False
+                realtime_metrics.connection_closed(self.metrics_channel, self.game_id)
+
+    async def receive(self, text_data=None, bytes_data=None, **kwargs):
+        """Compte le message reçu par type puis le transmet à receive_json."""
+        self._receive_started = time.perf_counter()
+        if not text_data:
+            await super().receive(text_data=text_data, bytes_data=bytes_data, **kwargs)
+            return
+        content = await self.decode_json(text_data)
+        message_type = content.get("type") if isinstance(content, dict) else None
+        if message_type not in _WS_INBOUND_MESSAGE_TYPES:
+            message_type = "other"
+        realtime_metrics.record_received(self.metrics_channel, message_type)
+        await self.receive_json(content, **kwargs)
+
+    async def send_json(self, content, close=False):
+        """Envoie un message JSON et compte la trame et sa taille."""
+        text_data = await self.encode_json(content)
+        # json.dumps échappe le non-ASCII : longueur du texte = octets envoyés
+        realtime_metrics.record_sent(self.metrics_channel, content["type"], len(text_data))
+        await self.send(text_data=text_data, close=close)
+
     @database_sync_to_async
     def _get_player_in_game(self):
         """Récupère le joueur dans la partie, ou None si absent."""
@@ -73,9 +155,27 @@ class _BaseGameConsumerMixin:
             "player": self._player_payload(),
         })
 
+    async def _send_pong(self, content):
+        """
+        Répond à un ping avec l'heure et le temps de traitement du serveur.
+
+        server_time permet au client d'estimer le décalage de son horloge
+        (acquittements de la sonde de latence) ; processing_ms sépare le
+        temps serveur du temps réseau dans l'aller-retour mesuré par le client.
+        """
+        await self.send_json({
+            "type": "pong",
+            "client_time": content.get("client_time"),
+            "server_time": latency_probe.now_ms(),
+            "processing_ms": round((time.perf_counter() - self._receive_started) * 1000, 3),
+        })
+
     async def receive_json(self, content):
-        """Reçoit un message du client. Echo pour vérifier la connectivité."""
-        await self.send_json({"type": "echo", "received": content})
+        """Reçoit un message du client : ping, sinon echo pour vérifier la connectivité."""
+        if isinstance(content, dict) and content.get("type") == _WS_MESSAGE_PING:
+            await self._send_pong(content)
+        else:
+            await self.send_json({"type": "echo", "received": content})
 
 
 class LobbyConsumer(_BaseGameConsumerMixin, AsyncJsonWebsocketConsumer):
@@ -91,6 +191,9 @@ class LobbyConsumer(_BaseGameConsumerMixin, AsyncJsonWebsocketConsumer):
                         4003 (partie déjà commencée, utiliser ws/game/).
     """
 
+    metrics_channel = "lobby"
+
+    @query_budget("LobbyConsumer.connect", max_queries=2)
     async def connect(self):
         """Accepte la connexion si l'utilisateur est authentifié et dans la partie."""
         self.game_id = self.scope["url_route"]["kwargs"]["game_id"]
@@ -134,12 +237,13 @@ class LobbyConsumer(_BaseGameConsumerMixin, AsyncJsonWebsocketConsumer):
     async def _broadcast_player_joined(self):
         """Diffuse l'événement joueur rejoint au groupe."""
         payload = self._player_payload()
-        await self.channel_layer.group_send(
+        await realtime_metrics.group_send(
             self.room_group_name,
             {
                 "type": "player_joined",
                 "player": payload,
             },
+            self.channel_layer,
         )
 
     def _is_voluntary_leave_message(self, content):
@@ -199,12 +303,13 @@ class LobbyConsumer(_BaseGameConsumerMixin, AsyncJsonWebsocketConsumer):
 
     async def _broadcast_player_left(self):
         """Diffuse l'événement joueur quitte au groupe."""
-        await self.channel_layer.group_send(
+        await realtime_metrics.group_send(
             self.room_group_name,
             {
                 "type": "player_left",
                 "player": self._player_payload(),
             },
+            self.channel_layer,
         )
 
     async def player_joined(self, event):
@@ -246,11 +351,29 @@ class GameConsumer(_BaseGameConsumerMixin, AsyncJsonWebsocketConsumer):
     Canal : ws/game/{game_id}/
     Groupe : game_{game_id}
     Phases : DEPLOYMENT, IN_PROGRESS uniquement.
-    Événements : position_updated (et futurs : conversion, score, etc.).
+    Événements : position_updated, score_updated, role_changed, game_finished.
+    Messages client : ping (→ pong), ack (acquittement de position_updated).
     Codes de fermeture : 4001 (non authentifié), 4002 (non dans la partie),
                         4003 (partie en attente ou terminée).
     """
 
+    metrics_channel = "game"
+
+    @database_sync_to_async
+    def _get_snapshot_player_and_state(self):
+        """
+        Lit le joueur et l'état de la partie dans l'instantané de l'acteur.
+
+        Returns:
+            tuple | None: (Player ou None, état), ou None sans instantané publié.
+        """
+        snapshot = get_game_snapshot(self.game_id)
+        if snapshot is None:
+            return None
+        player = build_snapshot_player(snapshot, self.game_id, self.user.id)
+        return player, snapshot["state"]
+
+    @query_budget("GameConsumer.connect", max_queries=2)
     async def connect(self):
         """Accepte la connexion si l'utilisateur est dans la partie et le jeu actif."""
         self.game_id = self.scope["url_route"]["kwargs"]["game_id"]
@@ -262,13 +385,18 @@ class GameConsumer(_BaseGameConsumerMixin, AsyncJsonWebsocketConsumer):
             await self.close(code=_WS_CLOSE_UNAUTHORIZED)
             return
 
-        player = await self._get_player_in_game()
+        from_snapshot = await self._get_snapshot_player_and_state()
+        if from_snapshot is not None:
+            player, state = from_snapshot
+        else:
+            player = await self._get_player_in_game()
         if player is None:
             await self.close(code=_WS_CLOSE_NOT_IN_GAME)
             return
 
-        game = await self._get_game()
-        if game.state not in (GameState.DEPLOYMENT, GameState.IN_PROGRESS):
+        if from_snapshot is None:
+            state = (await self._get_game()).state
+        if state not in (GameState.DEPLOYMENT, GameState.IN_PROGRESS):
             await self.close(code=_WS_CLOSE_WRONG_CHANNEL)
             return
 
@@ -286,6 +414,15 @@ class GameConsumer(_BaseGameConsumerMixin, AsyncJsonWebsocketConsumer):
         """Construit le payload minimal du joueur (game : sans is_admin)."""
         return build_player_websocket_payload(self.player, include_admin=False)
 
+    async def receive_json(self, content):
+        """Gère les messages client : ack (sonde de latence), ping ou echo."""
+        if isinstance(content, dict) and content.get("type") == _WS_MESSAGE_ACK:
+            latency_probe.record_ack(
+                self.game_id, content.get("timing") or {}, content.get("received_at"),
+            )
+        else:
+            await super().receive_json(content)
+
     async def disconnect(self, close_code):
         """Quitte le groupe à la déconnexion."""
         if self._joined_group:
@@ -295,6 +432,47 @@ class GameConsumer(_BaseGameConsumerMixin, AsyncJsonWebsocketConsumer):
             )
 
     async def position_updated(self, event):
-        """Reçoit position_updated du groupe et transmet au client."""
-        payload = {k: v for k, v in event.items() if k != "type"}
-        await self._forward_to_client("position_updated", payload)
+        """
+        Reçoit position_updated du groupe et transmet au client (horodaté).
+
+        Le span de livraison est rattaché à la trace de l'émetteur
+        (traceparent de l'événement) et se termine à l'envoi au client.
+        """
+        parent = tracing.extract(event.get("traceparent"))
+        with tracing.span(
+            "GameConsumer.position_updated", {"game_id": self.game_id}, parent=parent
+        ):
+            payload = {k: v for k, v in event.items() if k not in ("type", "traceparent")}
+            if "timing" in payload:
+                payload["timing"] = latency_probe.stamp_sent(payload["timing"])
+            await self._forward_to_client("position_updated", payload)
+
+    async def score_updated(self, event):
+        """Reçoit score_updated du groupe et transmet au client."""
+        await self._forward_to_client("score_updated", {
+            "player_id": event["player_id"],
+            "delta": event["delta"],
+            "score": event["score"],
+        })
+
+    async def role_changed(self, event):
+        """Reçoit role_changed du groupe et transmet au client."""
+        await self._forward_to_client("role_changed", {
+            "player_id": event["player_id"],
+            "role": event["role"],
+        })
+
+    async def game_state_changed(self, event):
+        """Reçoit game_state_changed du groupe (passage en IN_PROGRESS) et transmet au client."""
+        await self._forward_to_client("game_state_changed", {
+            "game_id": event["game_id"],
+            "state": event["state"],
+        })
+
+    async def game_finished(self, event):
+        """Reçoit game_finished du groupe, transmet au client puis ferme la connexion."""
+        await self._forward_to_client("game_finished", {
+            "game_id": event["game_id"],
+            "state": event["state"],
+        })
+        await self.close()
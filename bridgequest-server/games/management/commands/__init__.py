@@ -0,0 +1,3 @@
+"""
+Commandes de gestion du module Games.
+"""
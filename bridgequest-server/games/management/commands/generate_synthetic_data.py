@@ -0,0 +1,103 @@
+"""
+Commande de génération d'un jeu de données synthétique.
+
+Usage :
+    python manage.py generate_synthetic_data --seed 42
+    python manage.py generate_synthetic_data --users 20000 --games 5000 \\
+        --players-per-game 10 --positions-per-player 200 --seed 42   # 10M positions
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from games.services.synthetic_data import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_BOUNDING_BOX,
+    generate_synthetic_data,
+)
+
+
+def _bounding_box(value):
+    """Lit un rectangle 'lat_min,lng_min,lat_max,lng_max'."""
+    try:
+        min_lat, min_lng, max_lat, max_lng = (float(part) for part in value.split(","))
+    except ValueError:
+        raise CommandError("--bbox attend lat_min,lng_min,lat_max,lng_max")
+    if not (-90 <= min_lat < max_lat <= 90 and -180 <= min_lng < max_lng <= 180):
+        raise CommandError("--bbox : rectangle géographique invalide")
+    return min_lat, min_lng, max_lat, max_lng
+
+
+class Command(BaseCommand):
+    """Remplit la base d'un jeu de données synthétique (voir games.services.synthetic_data)."""
+
+    help = (
+        "Génère utilisateurs, parties (tous états), joueurs et trajectoires GPS "
+        "pour reproduire des volumes de production."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000, help="Nombre d'utilisateurs.")
+        parser.add_argument("--games", type=int, default=200, help="Nombre de parties.")
+        parser.add_argument(
+            "--players-per-game", type=int, default=8, help="Joueurs par partie."
+        )
+        parser.add_argument(
+            "--positions-per-player",
+            type=int,
+            default=100,
+            help="Fixes GPS par joueur d'une partie lancée (hors WAITING).",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=None, help="Graine (génération reproductible)."
+        )
+        parser.add_argument(
+            "--bbox",
+            type=_bounding_box,
+            default=DEFAULT_BOUNDING_BOX,
+            help="Rectangle des trajectoires : lat_min,lng_min,lat_max,lng_max (défaut : Paris).",
+        )
+        parser.add_argument(
+            "--interval", type=int, default=5, help="Secondes entre deux fixes d'un joueur."
+        )
+        parser.add_argument(
+            "--days", type=int, default=30, help="Profondeur d'historique des parties (jours)."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Taille des lots de bulk_create.",
+        )
+        parser.add_argument(
+            "--prefix",
+            default="synth",
+            help="Préfixe des noms d'utilisateur et emails (unique par génération).",
+        )
+
+    def handle(self, *args, **options):
+        counts = ("users", "games", "players_per_game", "positions_per_player")
+        if min(options[name] for name in counts) < 0 or options["batch_size"] <= 0:
+            raise CommandError("Les nombres d'objets doivent être positifs (--batch-size non nul)")
+        prefix = options["prefix"].lower()
+        if get_user_model().objects.filter(username__startswith=prefix).exists():
+            raise CommandError(f"Des utilisateurs '{prefix}*' existent déjà : changez --prefix")
+
+        started = time.perf_counter()
+        counts = generate_synthetic_data(
+            options["users"],
+            options["games"],
+            options["players_per_game"],
+            options["positions_per_player"],
+            seed=options["seed"],
+            bounding_box=options["bbox"],
+            interval_seconds=options["interval"],
+            days=options["days"],
+            batch_size=options["batch_size"],
+            prefix=prefix,
+        )
+        self.stdout.write(
+            "users={users} games={games} players={players} positions={positions}".format(**counts)
+            + f" duration={time.perf_counter() - started:.1f}s"
+        )
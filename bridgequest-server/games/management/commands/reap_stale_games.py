@@ -0,0 +1,45 @@
+"""
+Commande de nettoyage des parties abandonnées.
+
+Usage :
+    python manage.py reap_stale_games                # un passage
+    python manage.py reap_stale_games --interval 300 # job périodique (toutes les 5 min)
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from games.services.game_reaper import reap_stale_games
+
+
+class Command(BaseCommand):
+    """Supprime ou termine les parties inactives (voir games.services.game_reaper)."""
+
+    help = "Nettoie les parties abandonnées (WAITING, IN_PROGRESS inactives, FINISHED expirées)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=None,
+            help="Nombre de parties traitées par lot (défaut : GAME_REAPER_CHUNK_SIZE).",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Relance toutes les N secondes (0 : un seul passage).",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        while True:
+            summary = reap_stale_games(chunk_size=options["chunk_size"])
+            self.stdout.write(
+                "waiting_deleted={waiting_deleted} "
+                "active_finished={active_finished} "
+                "finished_deleted={finished_deleted}".format(**summary)
+            )
+            if interval <= 0:
+                return
+            time.sleep(interval)
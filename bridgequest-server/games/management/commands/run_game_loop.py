@@ -0,0 +1,28 @@
+"""
+Commande d'exécution de la boucle de jeu serveur.
+
+Usage :
+    python manage.py run_game_loop
+
+Plusieurs instances peuvent tourner en parallèle : chaque partie IN_PROGRESS
+n'est pilotée que par l'instance qui détient son bail (games.services.game_lease).
+"""
+import asyncio
+
+from django.core.management.base import BaseCommand
+
+from games.services.game_loop import GameLoopRunner
+
+
+class Command(BaseCommand):
+    """Démarre le superviseur des boucles de jeu (voir games.services.game_loop)."""
+
+    help = "Exécute la boucle de jeu serveur des parties IN_PROGRESS."
+
+    def handle(self, *args, **options):
+        runner = GameLoopRunner()
+        self.stdout.write(f"Worker {runner.worker_id} : {len(runner.rules)} règle(s) chargée(s)")
+        try:
+            asyncio.run(runner.run_forever())
+        except KeyboardInterrupt:
+            self.stdout.write("Arrêt de la boucle de jeu")
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("games", "0001_add_game_and_player_models"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="game",
+            index=models.Index(
+                fields=["state", "updated_at"], name="games_game_state_f8add6_idx"
+            ),
+        ),
+    ]
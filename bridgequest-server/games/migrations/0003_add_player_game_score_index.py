@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("games", "0002_add_game_state_updated_at_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="player",
+            index=models.Index(
+                fields=["game", "-score"], name="games_playe_game_id_87f0ac_idx"
+            ),
+        ),
+    ]
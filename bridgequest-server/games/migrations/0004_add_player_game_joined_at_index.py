@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("games", "0003_add_player_game_score_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="player",
+            index=models.Index(
+                fields=["game", "joined_at"], name="games_playe_game_id_3bd956_idx"
+            ),
+        ),
+    ]
@@ -56,6 +56,10 @@ class Game(models.Model):
         verbose_name = _(ModelMessages.GAME_VERBOSE_NAME)
         verbose_name_plural = _(ModelMessages.GAME_VERBOSE_NAME_PLURAL)
         ordering = ["-created_at"]
+        indexes = [
+            # Balayage des parties inactives par état (game_reaper)
+            models.Index(fields=["state", "updated_at"]),
+        ]
 
     def __str__(self):
         """Représentation string de la partie."""
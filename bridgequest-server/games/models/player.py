@@ -64,6 +64,13 @@ class Player(models.Model):
         verbose_name = _(ModelMessages.PLAYER_VERBOSE_NAME)
         verbose_name_plural = _(ModelMessages.PLAYER_VERBOSE_NAME_PLURAL)
         ordering = ["-joined_at"]
+        indexes = [
+            # Classement d'une partie (score_service.get_leaderboard)
+            models.Index(fields=["game", "-score"]),
+            # Joueurs d'une partie dans l'ordre par défaut (-joined_at) et
+            # joueur le plus ancien (lobby_service._handle_admin_exclusion)
+            models.Index(fields=["game", "joined_at"]),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["user", "game"],
@@ -0,0 +1,185 @@
+"""
+Acteur de jeu : état autoritaire en mémoire d'une partie active (optionnel).
+
+Activé par settings.GAME_ACTOR_ENABLED, l'acteur vit dans la boucle de jeu du
+worker propriétaire du bail (games.services.game_loop). Il détient l'état de
+la partie, le roster (rôles, scores) et les dernières positions.
+
+- Mutations : sérialisées par une file asyncio unique (un seul consommateur),
+  donc sans verrou.
+- Persistance : write-behind. Les changements de rôle et les points sont
+  diffusés immédiatement puis écrits en base par lots
+  (settings.GAME_ACTOR_FLUSH_INTERVAL_SECONDS). Les points sont écrits en
+  incréments (score_service.increment_score) : les scores écrits hors de
+  l'acteur (score_service.add_score) sont conservés, et l'acteur recharge
+  les scores de la base à chaque lot.
+- Lecture : un instantané (game_snapshot) est publié dans le cache partagé
+  après chaque lot, pour les chemins chauds des autres workers.
+
+Les commandes proviennent des règles de la boucle (conversion, points). Les
+positions n'y passent pas : la boucle les reçoit déjà du groupe game_{id}
+(position_updated) dans l'état qu'elle partage avec l'acteur. La fin de
+partie (game_finished sur ce groupe) arrête la boucle, qui persiste l'acteur
+et retire l'instantané (stop).
+"""
+import asyncio
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from channels.db import database_sync_to_async
+from django.conf import settings
+
+from games.models import Game, Player
+from games.services import game_broadcast, game_snapshot, score_service
+
+COMMAND_CHANGE_ROLE = "change_role"
+COMMAND_AWARD_SCORE = "award_score"
+
+
+def _load_roster(game_id):
+    """Charge l'état de la partie et le roster (joueurs + utilisateurs) en une requête chacun."""
+    state = Game.objects.filter(pk=game_id).values_list("state", flat=True).get()
+    players = {
+        player.id: {
+            "player_id": player.id,
+            "user_id": player.user_id,
+            "username": player.user.username or "",
+            "first_name": player.user.first_name,
+            "last_name": player.user.last_name,
+            "avatar": player.user.avatar,
+            "role": player.role,
+            "is_admin": player.is_admin,
+            "score": player.score,
+        }
+        for player in Player.objects.filter(game_id=game_id).select_related("user")
+    }
+    return state, players
+
+
+def _flush(game_id, roles, score_deltas):
+    """
+    Écrit en base les mutations accumulées depuis le dernier lot.
+
+    Returns:
+        dict[int, int]: Scores en base de tous les joueurs (écritures hors acteur incluses).
+    """
+    for player_id, role in roles.items():
+        Player.objects.filter(pk=player_id, game_id=game_id).update(role=role)
+    for player_id, delta in score_deltas.items():
+        score_service.increment_score(game_id, player_id, delta)
+    return dict(Player.objects.filter(game_id=game_id).order_by().values_list("pk", "score"))
+
+
+class GameActor:
+    """État autoritaire en mémoire d'une partie, muté via une file unique."""
+
+    def __init__(self, game_id, game_state, *, flush_interval=None, snapshot_ttl=None):
+        """
+        Args:
+            game_id: Identifiant de la partie.
+            game_state: GameLoopState partagé avec la boucle (rôles, positions).
+            flush_interval: Période d'écriture en base (défaut : settings).
+            snapshot_ttl: TTL de l'instantané publié (défaut : TTL du bail).
+        """
+        self.game_id = game_id
+        self.game_state = game_state
+        self.flush_interval = flush_interval or settings.GAME_ACTOR_FLUSH_INTERVAL_SECONDS
+        self.snapshot_ttl = snapshot_ttl or settings.GAME_LOOP_LEASE_TTL_SECONDS
+        self.state = None
+        self.players = {}
+        self.queue = asyncio.Queue()
+        self._dirty_roles = {}
+        self._score_deltas = defaultdict(int)
+
+    async def load(self):
+        """Charge l'état et le roster, puis publie le premier instantané."""
+        self.state, self.players = await database_sync_to_async(_load_roster)(self.game_id)
+        await self._publish_snapshot()
+
+    def submit(self, command, *args):
+        """Ajoute une commande à la file (non bloquant)."""
+        self.queue.put_nowait((command, args))
+
+    def _apply(self, command, args):
+        """Applique une commande à l'état en mémoire et retourne l'effet à diffuser."""
+        if command == COMMAND_CHANGE_ROLE:
+            player_id, role = args
+            if player_id in self.players and self.players[player_id]["role"] != role:
+                self.players[player_id]["role"] = role
+                self.game_state.roles[player_id] = role
+                self._dirty_roles[player_id] = role
+                return ("role", player_id, role)
+        elif command == COMMAND_AWARD_SCORE:
+            player_id, delta = args
+            if player_id in self.players and delta:
+                self.players[player_id]["score"] += delta
+                self._score_deltas[player_id] += delta
+                return ("score", player_id, delta, self.players[player_id]["score"])
+        return None
+
+    async def _broadcast(self, effects):
+        """Diffuse au canal game les effets appliqués (avant persistance)."""
+        for effect in effects:
+            if effect[0] == "role":
+                await game_broadcast.abroadcast_role_changed(self.game_id, effect[1], effect[2])
+            else:
+                await game_broadcast.abroadcast_score_updated(self.game_id, *effect[1:])
+
+    def _snapshot(self):
+        """Construit l'instantané publié dans le cache partagé (sans les scores)."""
+        players = {
+            str(entry["user_id"]): {
+                key: value for key, value in entry.items() if key != "score"
+            }
+            for entry in self.players.values()
+        }
+        return {"state": self.state, "players": players}
+
+    async def _publish_snapshot(self):
+        """Publie l'instantané dans le cache partagé (TTL prolongé)."""
+        await sync_to_async(game_snapshot.publish_game_snapshot)(
+            self.game_id, self._snapshot(), self.snapshot_ttl,
+        )
+
+    async def process_pending(self):
+        """
+        Applique toutes les commandes en file puis diffuse leurs effets.
+
+        Les écritures en base sont différées au prochain flush().
+
+        Returns:
+            int: Nombre de commandes traitées.
+        """
+        effects = []
+        processed = 0
+        while not self.queue.empty():
+            command, args = self.queue.get_nowait()
+            effect = self._apply(command, args)
+            if effect is not None:
+                effects.append(effect)
+            processed += 1
+        if effects:
+            await self._broadcast(effects)
+        return processed
+
+    async def flush(self):
+        """
+        Écrit en base les mutations en attente (write-behind) et republie l'instantané.
+
+        Appelé tous les flush_interval par la boucle de jeu : la republication
+        prolonge aussi le TTL de l'instantané. Les scores en mémoire sont
+        remplacés par ceux de la base (plus les points reçus pendant l'écriture).
+        """
+        roles, self._dirty_roles = self._dirty_roles, {}
+        score_deltas, self._score_deltas = dict(self._score_deltas), defaultdict(int)
+        scores = await database_sync_to_async(_flush)(self.game_id, roles, score_deltas)
+        for player_id, score in scores.items():
+            if player_id in self.players:
+                self.players[player_id]["score"] = score + self._score_deltas.get(player_id, 0)
+        await self._publish_snapshot()
+
+    async def stop(self):
+        """Traite les commandes restantes, persiste et retire l'instantané."""
+        await self.process_pending()
+        await self.flush()
+        await sync_to_async(game_snapshot.delete_game_snapshot)(self.game_id)
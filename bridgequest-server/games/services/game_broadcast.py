@@ -5,7 +5,11 @@ Diffuse les événements de jeu (positions, conversions, etc.) aux clients
 connectés au canal game. Canal séparé du lobby (salle d'attente).
 """
 from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
+
+from games.models import GameState
+from games.services.latency_probe import build_timing
+from games.services.realtime_metrics import group_send
+from utils.tracing import traced
 
 
 def get_game_group_name(game_id):
@@ -13,15 +17,124 @@ def get_game_group_name(game_id):
     return f"game_{game_id}"
 
 
-def broadcast_position_updated(position):
+def broadcast_game_finished(game_id):
+    """
+    Diffuse l'événement « partie terminée » aux clients du canal game.
+
+    Appelé lorsqu'une partie passe en FINISHED (ex. nettoyage d'une partie
+    abandonnée). Les consumers transmettent l'événement puis ferment la
+    connexion, ce qui vide le groupe game_{game_id}.
+
+    Args:
+        game_id: Identifiant de la partie.
+    """
+    async_to_sync(group_send)(
+        get_game_group_name(game_id),
+        {
+            "type": "game_finished",
+            "game_id": game_id,
+            "state": GameState.FINISHED,
+        },
+    )
+
+
+async def abroadcast_game_state_changed(game_id, state):
+    """
+    Diffuse un changement d'état de la partie aux clients du canal game.
+
+    Appelé par la boucle de jeu au passage de DEPLOYMENT à IN_PROGRESS.
+
+    Args:
+        game_id: Identifiant de la partie.
+        state: Nouvel état (GameState).
+    """
+    await group_send(
+        get_game_group_name(game_id),
+        {
+            "type": "game_state_changed",
+            "game_id": game_id,
+            "state": state,
+        },
+    )
+
+
+async def abroadcast_score_updated(game_id, player_id, delta, score):
+    """
+    Diffuse une variation de score aux clients du canal game.
+
+    Les clients appliquent le delta sans recharger le classement complet.
+    Variante async (acteur de jeu) de broadcast_score_updated.
+
+    Args:
+        game_id: Identifiant de la partie.
+        player_id: Identifiant du joueur.
+        delta: Variation appliquée.
+        score: Nouveau score du joueur.
+    """
+    await group_send(
+        get_game_group_name(game_id),
+        {
+            "type": "score_updated",
+            "player_id": player_id,
+            "delta": delta,
+            "score": score,
+        },
+    )
+
+
+def broadcast_score_updated(game_id, player_id, delta, score):
+    """
+    Diffuse une variation de score depuis du code synchrone.
+
+    Appelé par score_service.add_score après chaque incrément (voir
+    abroadcast_score_updated).
+    """
+    async_to_sync(abroadcast_score_updated)(game_id, player_id, delta, score)
+
+
+async def abroadcast_role_changed(game_id, player_id, role):
+    """
+    Diffuse un changement de rôle (conversion Humain/Esprit) au canal game.
+
+    Variante async (acteur de jeu) de broadcast_role_changed.
+
+    Args:
+        game_id: Identifiant de la partie.
+        player_id: Identifiant du joueur converti.
+        role: Nouveau rôle (PlayerRole).
+    """
+    await group_send(
+        get_game_group_name(game_id),
+        {
+            "type": "role_changed",
+            "player_id": player_id,
+            "role": role,
+        },
+    )
+
+
+def broadcast_role_changed(game_id, player_id, role):
+    """
+    Diffuse un changement de rôle depuis du code synchrone.
+
+    Appelé par la boucle de jeu (sans acteur) lorsqu'une règle convertit un
+    joueur (voir abroadcast_role_changed).
+    """
+    async_to_sync(abroadcast_role_changed)(game_id, player_id, role)
+
+
+@traced("broadcast_position_updated")
+def broadcast_position_updated(position, ingested_at=None):
     """
     Diffuse une mise à jour de position aux clients du canal game.
 
     Appelé après chaque POST /api/locations/ réussi. Les clients connectés
-    à ws/game/{game_id}/ reçoivent position_updated sans polling.
+    à ws/game/{game_id}/ reçoivent position_updated sans polling, avec les
+    horodatages de la sonde de latence (clé timing, voir latency_probe).
 
     Args:
         position: Instance Position avec player et player.user chargés.
+        ingested_at: Réception du POST (ms epoch, latency_probe.now_ms()).
     """
     from accounts.serializers.user_serializers import UserPublicSerializer
 
@@ -32,10 +145,10 @@ def broadcast_position_updated(position):
         "latitude": str(position.latitude),
         "longitude": str(position.longitude),
         "recorded_at": position.recorded_at.isoformat(),
+        "timing": build_timing(ingested_at),
     }
 
-    channel_layer = get_channel_layer()
-    async_to_sync(channel_layer.group_send)(
+    async_to_sync(group_send)(
         get_game_group_name(position.player.game_id),
         {
             "type": "position_updated",
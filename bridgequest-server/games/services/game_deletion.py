@@ -0,0 +1,90 @@
+"""
+Service de suppression en masse des parties et des joueurs.
+
+Le collecteur Django (Model.delete()) charge en mémoire chaque Player et
+Position liés pour émuler le CASCADE. Pour une partie terminée avec des
+centaines de milliers de positions, cela provoque des pics mémoire et de
+longues transactions.
+
+Ce service supprime par lots d'identifiants (values_list, aucune instance
+créée) avec des DELETE bruts, chaque lot dans sa propre transaction courte.
+Ordre : positions -> joueurs -> partie (respect des clés étrangères).
+"""
+from django.db import router, transaction
+
+from games.models import Game, Player
+from locations.models import Position
+
+# Nombre de lignes supprimées par requête DELETE (et par transaction)
+DELETION_CHUNK_SIZE = 5000
+
+
+def _raw_delete_in_chunks(queryset, chunk_size):
+    """
+    Supprime les lignes d'un queryset par lots, sans instancier les modèles.
+
+    Chaque lot récupère uniquement les clés primaires puis exécute un DELETE
+    brut (QuerySet._raw_delete : pas de collecteur, pas de signaux).
+
+    Args:
+        queryset: Queryset des lignes à supprimer.
+        chunk_size: Nombre maximal de lignes par DELETE.
+
+    Returns:
+        int: Nombre total de lignes supprimées.
+    """
+    model = queryset.model
+    using = router.db_for_write(model)
+    pk_queryset = queryset.order_by().values_list("pk", flat=True)
+    deleted = 0
+    while True:
+        with transaction.atomic(using=using):
+            chunk = list(pk_queryset[:chunk_size])
+            if chunk:
+                deleted += model.objects.filter(pk__in=chunk)._raw_delete(using)
+        if len(chunk) < chunk_size:
+            return deleted
+
+
+def delete_player(player_id, *, chunk_size=DELETION_CHUNK_SIZE):
+    """
+    Supprime un joueur et son historique de positions sans collecteur Django.
+
+    Args:
+        player_id: Identifiant du joueur.
+        chunk_size: Nombre maximal de lignes par DELETE.
+
+    Returns:
+        int: Nombre de positions supprimées.
+    """
+    positions_deleted = _raw_delete_in_chunks(
+        Position.objects.filter(player_id=player_id), chunk_size
+    )
+    _raw_delete_in_chunks(Player.objects.filter(pk=player_id), chunk_size)
+    return positions_deleted
+
+
+def delete_game(game_id, *, chunk_size=DELETION_CHUNK_SIZE):
+    """
+    Supprime une partie, ses joueurs et leurs positions par lots.
+
+    Args:
+        game_id: Identifiant de la partie.
+        chunk_size: Nombre maximal de lignes par DELETE.
+
+    Returns:
+        dict: Nombre de lignes supprimées par table
+            (positions, players, games).
+    """
+    positions_deleted = _raw_delete_in_chunks(
+        Position.objects.filter(player__game_id=game_id), chunk_size
+    )
+    players_deleted = _raw_delete_in_chunks(
+        Player.objects.filter(game_id=game_id), chunk_size
+    )
+    games_deleted = _raw_delete_in_chunks(Game.objects.filter(pk=game_id), chunk_size)
+    return {
+        "positions": positions_deleted,
+        "players": players_deleted,
+        "games": games_deleted,
+    }
@@ -0,0 +1,149 @@
+"""
+Baux (leases) de parties dans le cache partagé.
+
+Garantit qu'une partie active n'est pilotée que par un seul worker à la fois
+(boucle de jeu, acteur). Un bail est une clé avec TTL contenant
+l'identifiant du worker propriétaire :
+- acquisition : SET NX (atomique, échoue si la clé existe déjà)
+- renouvellement : prolongation du TTL par le propriétaire uniquement
+- libération : suppression par le propriétaire uniquement
+
+Renouvellement et libération sont des compare-and-set : avec Redis, un
+script Lua compare le propriétaire et agit en une seule opération ; un
+worker dont le bail a expiré ne peut ni prolonger ni supprimer le bail
+qu'un autre worker vient de prendre. Sans Redis (cache local, un seul
+processus), la comparaison et l'écriture sont faites sous verrou.
+
+Un worker qui s'arrête brutalement perd son bail à l'expiration du TTL ;
+un autre worker peut alors reprendre la partie.
+"""
+import os
+import socket
+import threading
+import uuid
+
+from django.core.cache import cache
+
+from utils.redis_client import get_redis_client
+
+_CACHE_KEY_PREFIX = "game_lease"
+
+# Prolonge (PEXPIRE) la clé si elle appartient toujours au worker
+_RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+# Supprime la clé si elle appartient toujours au worker
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Cache local : un seul processus, le verrou rend get + touch/delete atomiques
+_local_lock = threading.Lock()
+
+
+def _lease_key(game_id):
+    """Clé de cache du bail d'une partie."""
+    return f"{_CACHE_KEY_PREFIX}:{game_id}"
+
+
+def _redis_lease_key(game_id):
+    """Clé Redis du bail (préfixe et version du cache inclus)."""
+    return cache.make_and_validate_key(_lease_key(game_id))
+
+
+def generate_worker_id():
+    """
+    Génère un identifiant unique de worker (hôte, processus, suffixe aléatoire).
+
+    Returns:
+        str: Identifiant du worker, ex. "host:1234:9f3a1c2b".
+    """
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def acquire_lease(game_id, worker_id, ttl_seconds):
+    """
+    Tente d'acquérir le bail d'une partie.
+
+    Args:
+        game_id: Identifiant de la partie.
+        worker_id: Identifiant du worker demandeur.
+        ttl_seconds: Durée de validité du bail.
+
+    Returns:
+        bool: True si le bail est acquis (ou déjà détenu par ce worker).
+    """
+    client = get_redis_client()
+    if client is not None:
+        acquired = client.set(
+            _redis_lease_key(game_id), worker_id, nx=True, px=int(ttl_seconds * 1000)
+        )
+    else:
+        acquired = cache.add(_lease_key(game_id), worker_id, timeout=ttl_seconds)
+    return bool(acquired) or renew_lease(game_id, worker_id, ttl_seconds)
+
+
+def renew_lease(game_id, worker_id, ttl_seconds):
+    """
+    Prolonge le bail si le worker en est toujours propriétaire.
+
+    Args:
+        game_id: Identifiant de la partie.
+        worker_id: Identifiant du worker propriétaire.
+        ttl_seconds: Nouvelle durée de validité.
+
+    Returns:
+        bool: False si le bail a expiré ou appartient à un autre worker.
+    """
+    client = get_redis_client()
+    if client is not None:
+        renew = client.register_script(_RENEW_SCRIPT)
+        keys = [_redis_lease_key(game_id)]
+        return bool(renew(keys=keys, args=[worker_id, int(ttl_seconds * 1000)]))
+
+    key = _lease_key(game_id)
+    with _local_lock:
+        return cache.get(key) == worker_id and cache.touch(key, timeout=ttl_seconds)
+
+
+def release_lease(game_id, worker_id):
+    """
+    Libère le bail si le worker en est propriétaire.
+
+    Args:
+        game_id: Identifiant de la partie.
+        worker_id: Identifiant du worker propriétaire.
+    """
+    client = get_redis_client()
+    if client is not None:
+        release = client.register_script(_RELEASE_SCRIPT)
+        release(keys=[_redis_lease_key(game_id)], args=[worker_id])
+        return
+
+    key = _lease_key(game_id)
+    with _local_lock:
+        if cache.get(key) == worker_id:
+            cache.delete(key)
+
+
+def get_lease_owner(game_id):
+    """
+    Retourne l'identifiant du worker propriétaire du bail, ou None.
+
+    Args:
+        game_id: Identifiant de la partie.
+
+    Returns:
+        str | None: Identifiant du worker propriétaire.
+    """
+    client = get_redis_client()
+    if client is not None:
+        owner = client.get(_redis_lease_key(game_id))
+        return owner.decode() if owner is not None else None
+    return cache.get(_lease_key(game_id))
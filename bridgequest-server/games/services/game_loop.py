@@ -0,0 +1,396 @@
+"""
+Boucle de jeu côté serveur pour les parties DEPLOYMENT et IN_PROGRESS.
+
+Chaque partie active est pilotée par un seul worker, propriétaire de son bail
+(game_lease). La boucle :
+- charge une fois la phase, le roster (rôles) et les dernières positions,
+- s'abonne au groupe game_{id} pour recevoir position_updated en mémoire
+  (aucune lecture en base par tick),
+- fait passer la partie de DEPLOYMENT à IN_PROGRESS une fois le déploiement
+  écoulé (settings.GAME_LOOP_DEPLOYMENT_SECONDS depuis start_game), diffuse
+  game_state_changed et applique les événements de départ des règles
+  (GameRule.start),
+- en IN_PROGRESS, évalue les règles (settings.GAME_LOOP_RULES) à fréquence
+  fixe (settings.GAME_LOOP_TICK_RATE_HZ),
+- n'écrit en base que les événements produits (changement de rôle, score).
+
+Si settings.GAME_ACTOR_ENABLED, la boucle héberge aussi l'acteur de la partie
+(game_actor) : les événements passent par sa file, sont diffusés aussitôt et
+persistés par lots.
+
+Les règles ne font aucune I/O : elles lisent GameLoopState et retournent des
+événements. Prérequis multi-processus : channel layer Redis (InMemoryChannelLayer
+ne partage pas les groupes entre processus).
+"""
+import abc
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from asgiref.sync import sync_to_async
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from games.models import Game, GameState, Player
+from games.services import game_actor, game_broadcast, game_lease, score_service
+from locations.services.position_service import get_latest_positions_for_game
+
+logger = logging.getLogger("bridgequest.game_loop")
+
+
+@dataclass(frozen=True)
+class RoleChangedEvent:
+    """Conversion d'un joueur (ex. HUMAN -> SPIRIT)."""
+
+    player_id: int
+    role: str
+
+
+@dataclass(frozen=True)
+class ScoreAwardedEvent:
+    """Points attribués à un joueur."""
+
+    player_id: int
+    delta: int
+
+
+class GameRule(abc.ABC):
+    """
+    Règle de jeu évaluée à chaque tick de la phase IN_PROGRESS.
+
+    Sous-classer et implémenter evaluate() (start() est optionnel). Une règle
+    ne fait aucune écriture ni lecture en base : elle lit l'état en mémoire et
+    retourne des événements. Règles disponibles : games.services.game_rules.
+    """
+
+    def start(self, state, now):
+        """
+        Événements du passage de la partie en IN_PROGRESS (ex. rôles initiaux).
+
+        Args:
+            state: GameLoopState de la partie.
+            now: Date du passage en IN_PROGRESS.
+
+        Returns:
+            list: Événements produits (aucun par défaut).
+        """
+        return []
+
+    @abc.abstractmethod
+    def evaluate(self, state, now):
+        """
+        Évalue la règle sur l'état courant.
+
+        Args:
+            state: GameLoopState de la partie.
+            now: Date du tick.
+
+        Returns:
+            list: Événements produits (RoleChangedEvent, ScoreAwardedEvent).
+        """
+
+
+class GameLoopState:
+    """
+    État en mémoire d'une partie pilotée par la boucle.
+
+    Attributes:
+        game_id: Identifiant de la partie.
+        roles: {player_id: role}.
+        positions: {player_id: (latitude, longitude, recorded_at)}.
+        phase: État de la partie (DEPLOYMENT ou IN_PROGRESS).
+        phase_started_at: Date d'entrée dans la phase courante.
+        tick: Nombre de ticks évalués.
+        started_at: Date de démarrage de la boucle (base des minuteurs).
+    """
+
+    def __init__(self, game_id, roles, positions, *, phase=GameState.IN_PROGRESS,
+                 phase_started_at=None):
+        self.game_id = game_id
+        self.roles = roles
+        self.positions = positions
+        self.phase = phase
+        self.tick = 0
+        self.started_at = timezone.now()
+        self.phase_started_at = phase_started_at or self.started_at
+
+    def apply_position(self, player_id, latitude, longitude, recorded_at):
+        """Enregistre la dernière position d'un joueur (ignore les positions plus anciennes)."""
+        current = self.positions.get(player_id)
+        if current is None or current[2] <= recorded_at:
+            self.positions[player_id] = (latitude, longitude, recorded_at)
+
+
+def load_rules():
+    """
+    Instancie les règles configurées dans settings.GAME_LOOP_RULES.
+
+    Returns:
+        list[GameRule]: Règles à évaluer à chaque tick.
+    """
+    return [import_string(path)() for path in settings.GAME_LOOP_RULES]
+
+
+def _load_state(game_id):
+    """
+    Charge la phase, le roster et les dernières positions d'une partie (3 requêtes).
+
+    updated_at date l'entrée dans la phase : start_game (DEPLOYMENT) et
+    _begin_play (IN_PROGRESS) le mettent à jour, et la partie n'est plus
+    modifiée ensuite (pas d'arrivée après WAITING).
+    """
+    phase, phase_started_at = (
+        Game.objects.filter(pk=game_id).values_list("state", "updated_at").get()
+    )
+    roles = dict(
+        Player.objects.filter(game_id=game_id).order_by().values_list("pk", "role")
+    )
+    positions = {
+        position.player_id: (
+            float(position.latitude),
+            float(position.longitude),
+            position.recorded_at,
+        )
+        for position in get_latest_positions_for_game(game_id)
+    }
+    return GameLoopState(
+        game_id, roles, positions, phase=phase, phase_started_at=phase_started_at
+    )
+
+
+def _begin_play(game_id, now):
+    """
+    Passe la partie de DEPLOYMENT à IN_PROGRESS (UPDATE conditionnel).
+
+    Returns:
+        bool: False si la partie a quitté DEPLOYMENT entre-temps (terminée, supprimée).
+    """
+    return bool(
+        Game.objects.filter(pk=game_id, state=GameState.DEPLOYMENT)
+        .update(state=GameState.IN_PROGRESS, updated_at=now)
+    )
+
+
+def _persist_events(game_id, events):
+    """Écrit les événements produits par les règles et les diffuse au canal game."""
+    for event in events:
+        if isinstance(event, RoleChangedEvent):
+            Player.objects.filter(pk=event.player_id, game_id=game_id).update(
+                role=event.role
+            )
+            game_broadcast.broadcast_role_changed(game_id, event.player_id, event.role)
+        elif isinstance(event, ScoreAwardedEvent):
+            score_service.add_score(game_id, event.player_id, event.delta)
+
+
+def _active_game_ids():
+    """Identifiants des parties DEPLOYMENT et IN_PROGRESS (index (state, updated_at))."""
+    return list(
+        Game.objects.filter(state__in=(GameState.DEPLOYMENT, GameState.IN_PROGRESS))
+        .order_by()
+        .values_list("pk", flat=True)
+    )
+
+
+class GameLoop:
+    """Boucle de tick d'une partie, exécutée par le worker propriétaire du bail."""
+
+    def __init__(self, game_id, worker_id, rules, *, tick_rate_hz=None, lease_ttl=None):
+        self.game_id = game_id
+        self.worker_id = worker_id
+        self.rules = rules
+        self.tick_interval = 1.0 / (tick_rate_hz or settings.GAME_LOOP_TICK_RATE_HZ)
+        self.lease_ttl = lease_ttl or settings.GAME_LOOP_LEASE_TTL_SECONDS
+        self.state = None
+        self.actor = None
+        self.stopped = False
+
+    async def load_state(self):
+        """Charge l'état initial de la partie en mémoire (et l'acteur si activé)."""
+        self.state = await database_sync_to_async(_load_state)(self.game_id)
+        if settings.GAME_ACTOR_ENABLED:
+            self.actor = game_actor.GameActor(self.game_id, self.state)
+            await self.actor.load()
+
+    def ingest(self, message):
+        """
+        Intègre un message du groupe game_{id} à l'état en mémoire.
+
+        position_updated met à jour la dernière position, game_finished
+        arrête la boucle ; les autres messages sont ignorés.
+        """
+        message_type = message.get("type")
+        if message_type == "position_updated":
+            self.state.apply_position(
+                message["player_id"],
+                float(message["latitude"]),
+                float(message["longitude"]),
+                datetime.fromisoformat(message["recorded_at"]),
+            )
+        elif message_type == "game_finished":
+            self.stopped = True
+
+    async def _end_deployment(self, now):
+        """
+        Passe la partie en IN_PROGRESS si le déploiement est écoulé.
+
+        La boucle s'arrête si la partie a quitté DEPLOYMENT autrement. L'acteur
+        éventuel republie son instantané (nouvel état) au prochain flush.
+
+        Returns:
+            list: Événements de départ des règles (vide tant que le déploiement dure).
+        """
+        deployment = timedelta(seconds=settings.GAME_LOOP_DEPLOYMENT_SECONDS)
+        if now - self.state.phase_started_at < deployment:
+            return []
+        if not await database_sync_to_async(_begin_play)(self.game_id, now):
+            self.stopped = True
+            return []
+        self.state.phase = GameState.IN_PROGRESS
+        self.state.phase_started_at = now
+        if self.actor is not None:
+            self.actor.state = GameState.IN_PROGRESS
+        await game_broadcast.abroadcast_game_state_changed(self.game_id, GameState.IN_PROGRESS)
+        events = []
+        for rule in self.rules:
+            events.extend(rule.start(self.state, now))
+        return events
+
+    async def tick(self, now=None):
+        """
+        Évalue toutes les règles puis persiste les événements produits.
+
+        En DEPLOYMENT, aucune règle n'est évaluée : le tick fait seulement
+        passer la partie en IN_PROGRESS à la fin du déploiement.
+
+        Returns:
+            list: Événements produits lors de ce tick.
+        """
+        now = now or timezone.now()
+        if self.state.phase == GameState.DEPLOYMENT:
+            events = await self._end_deployment(now)
+        else:
+            events = []
+            for rule in self.rules:
+                events.extend(rule.evaluate(self.state, now))
+        if self.actor is not None:
+            for event in events:
+                if isinstance(event, RoleChangedEvent):
+                    self.actor.submit(game_actor.COMMAND_CHANGE_ROLE, event.player_id, event.role)
+                elif isinstance(event, ScoreAwardedEvent):
+                    self.actor.submit(game_actor.COMMAND_AWARD_SCORE, event.player_id, event.delta)
+            await self.actor.process_pending()
+        else:
+            for event in events:
+                if isinstance(event, RoleChangedEvent):
+                    self.state.roles[event.player_id] = event.role
+            if events:
+                await database_sync_to_async(_persist_events)(self.game_id, events)
+        self.state.tick += 1
+        return events
+
+    async def _drain_messages(self, channel_layer, channel, timeout):
+        """Reçoit les messages du groupe jusqu'à l'échéance du prochain tick."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not self.stopped:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                message = await asyncio.wait_for(channel_layer.receive(channel), remaining)
+            except asyncio.TimeoutError:
+                return
+            self.ingest(message)
+
+    async def run(self):
+        """
+        Exécute la boucle jusqu'à la fin de la partie ou la perte du bail.
+
+        Le bail est renouvelé toutes les lease_ttl / 3 secondes et libéré à la sortie.
+        L'acteur éventuel est persisté tous les GAME_ACTOR_FLUSH_INTERVAL_SECONDS.
+        """
+        channel_layer = get_channel_layer()
+        group = game_broadcast.get_game_group_name(self.game_id)
+        channel = await channel_layer.new_channel()
+        await channel_layer.group_add(group, channel)
+        loop = asyncio.get_running_loop()
+        renew_every = self.lease_ttl / 3
+        try:
+            await self.load_state()
+            last_renewal = last_flush = loop.time()
+            while not self.stopped:
+                await self._drain_messages(channel_layer, channel, self.tick_interval)
+                if self.stopped:
+                    break
+                await self.tick()
+                if self.actor is not None and loop.time() - last_flush >= self.actor.flush_interval:
+                    await self.actor.flush()
+                    last_flush = loop.time()
+                if loop.time() - last_renewal >= renew_every:
+                    renewed = await sync_to_async(game_lease.renew_lease)(
+                        self.game_id, self.worker_id, self.lease_ttl,
+                    )
+                    if not renewed:
+                        logger.warning("Bail perdu pour la partie %s", self.game_id)
+                        break
+                    last_renewal = loop.time()
+        finally:
+            if self.actor is not None:
+                await self.actor.stop()
+            await channel_layer.group_discard(group, channel)
+            await sync_to_async(game_lease.release_lease)(self.game_id, self.worker_id)
+
+
+class GameLoopRunner:
+    """
+    Superviseur des boucles de jeu d'un worker.
+
+    Découvre périodiquement les parties DEPLOYMENT et IN_PROGRESS, tente
+    d'acquérir leur bail et démarre une GameLoop pour chaque partie obtenue.
+    """
+
+    def __init__(self, worker_id=None, rules=None):
+        self.worker_id = worker_id or game_lease.generate_worker_id()
+        self.rules = rules if rules is not None else load_rules()
+        self.loops = {}
+
+    async def discover(self):
+        """
+        Démarre une boucle pour chaque partie active dont le bail est acquis.
+
+        Returns:
+            list[int]: Identifiants des parties nouvellement prises en charge.
+        """
+        for game_id, task in list(self.loops.items()):
+            if task.done():
+                del self.loops[game_id]
+                if not task.cancelled() and task.exception() is not None:
+                    logger.error(
+                        "Boucle de la partie %s arrêtée sur une erreur", game_id,
+                        exc_info=task.exception(),
+                    )
+
+        started = []
+        for game_id in await database_sync_to_async(_active_game_ids)():
+            if game_id in self.loops:
+                continue
+            acquired = await sync_to_async(game_lease.acquire_lease)(
+                game_id, self.worker_id, settings.GAME_LOOP_LEASE_TTL_SECONDS,
+            )
+            if acquired:
+                game_loop = GameLoop(game_id, self.worker_id, self.rules)
+                self.loops[game_id] = asyncio.create_task(game_loop.run())
+                started.append(game_id)
+        return started
+
+    async def run_forever(self):
+        """Boucle de découverte (settings.GAME_LOOP_DISCOVERY_INTERVAL_SECONDS)."""
+        logger.info("Game loop runner démarré (worker %s)", self.worker_id)
+        while True:
+            await self.discover()
+            await asyncio.sleep(settings.GAME_LOOP_DISCOVERY_INTERVAL_SECONDS)
@@ -0,0 +1,196 @@
+"""
+Service de nettoyage des parties abandonnées.
+
+Trois cas, traités par lots bornés via l'index (state, updated_at) :
+- WAITING inactive (salle vidée sans exclusion propre) -> supprimée
+- DEPLOYMENT / IN_PROGRESS sans activité (ni partie ni positions) -> FINISHED
+- FINISHED au-delà de la durée de rétention -> supprimée
+
+Pour chaque partie traitée, les clés lobby_pending_exclusion:* et le
+classement partagé (leaderboard:*) sont purgés, et un événement terminal est
+diffusé (game_deleted / game_finished) afin que les consumers encore
+connectés quittent les groupes lobby_{id} / game_{id}.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from games.models import Game, GameState, Player
+from games.services import game_broadcast, lobby_broadcast
+from games.services.game_deletion import delete_game
+from games.services.game_snapshot import delete_game_snapshot
+from games.services.lobby_service import purge_pending_exclusions
+from games.services.score_service import clear_leaderboard
+from locations.models import Position
+
+_ACTIVE_STATES = (GameState.DEPLOYMENT, GameState.IN_PROGRESS)
+
+
+def _find_stale_game_ids(states, cutoff, limit):
+    """
+    Récupère les identifiants des parties inactives depuis cutoff.
+
+    Parcourt l'index (state, updated_at) : aucune lecture de table complète.
+
+    Args:
+        states: États à balayer.
+        cutoff: Date limite (updated_at strictement antérieur).
+        limit: Nombre maximal d'identifiants retournés (taille du lot).
+
+    Returns:
+        list[int]: Identifiants, du plus ancien au plus récent.
+    """
+    return list(
+        Game.objects.filter(state__in=states, updated_at__lt=cutoff)
+        .order_by("updated_at")
+        .values_list("pk", flat=True)[:limit]
+    )
+
+
+def _purge_game_cache(game_id):
+    """Purge les exclusions en attente, le classement partagé et l'instantané de la partie."""
+    player_ids = Player.objects.filter(game_id=game_id).values_list("pk", flat=True)
+    purge_pending_exclusions(game_id, list(player_ids))
+    clear_leaderboard(game_id)
+    delete_game_snapshot(game_id)
+
+
+def _ids_with_recent_positions(game_ids, cutoff):
+    """
+    Retourne les parties (parmi game_ids) ayant reçu une position depuis cutoff.
+
+    Les mises à jour de position ne modifient pas Game.updated_at : une partie
+    peut être active malgré un updated_at ancien.
+    """
+    return set(
+        Position.objects.filter(
+            player__game_id__in=game_ids,
+            recorded_at__gte=cutoff,
+        )
+        .order_by()
+        .values_list("player__game_id", flat=True)
+        .distinct()
+    )
+
+
+def reap_stale_waiting_games(cutoff, chunk_size):
+    """
+    Supprime les parties WAITING inactives depuis cutoff.
+
+    join_game rafraîchit updated_at : seul un lobby sans arrivée depuis
+    cutoff est supprimé.
+
+    Args:
+        cutoff: Date limite d'inactivité.
+        chunk_size: Nombre de parties traitées par lot.
+
+    Returns:
+        int: Nombre de parties supprimées.
+    """
+    reaped = 0
+    while True:
+        game_ids = _find_stale_game_ids((GameState.WAITING,), cutoff, chunk_size)
+        for game_id in game_ids:
+            _purge_game_cache(game_id)
+            delete_game(game_id)
+            lobby_broadcast.broadcast_game_deleted(game_id)
+        reaped += len(game_ids)
+        if len(game_ids) < chunk_size:
+            return reaped
+
+
+def finish_stale_active_games(cutoff, chunk_size):
+    """
+    Passe en FINISHED les parties DEPLOYMENT / IN_PROGRESS inactives depuis cutoff.
+
+    Une partie dont updated_at est ancien mais ayant reçu des positions
+    récentes est conservée ; son updated_at est rafraîchi pour qu'elle sorte
+    de la fenêtre de balayage (sinon elle serait réexaminée à chaque lot).
+
+    Args:
+        cutoff: Date limite d'inactivité.
+        chunk_size: Nombre de parties traitées par lot.
+
+    Returns:
+        int: Nombre de parties terminées.
+    """
+    finished = 0
+    while True:
+        game_ids = _find_stale_game_ids(_ACTIVE_STATES, cutoff, chunk_size)
+        still_active = _ids_with_recent_positions(game_ids, cutoff)
+        stale_ids = [game_id for game_id in game_ids if game_id not in still_active]
+        now = timezone.now()
+
+        if still_active:
+            Game.objects.filter(pk__in=still_active).update(updated_at=now)
+        if stale_ids:
+            Game.objects.filter(pk__in=stale_ids).update(
+                state=GameState.FINISHED,
+                updated_at=now,
+            )
+        for game_id in stale_ids:
+            _purge_game_cache(game_id)
+            game_broadcast.broadcast_game_finished(game_id)
+
+        finished += len(stale_ids)
+        if len(game_ids) < chunk_size:
+            return finished
+
+
+def delete_expired_finished_games(cutoff, chunk_size):
+    """
+    Supprime les parties FINISHED terminées avant cutoff (fin de rétention).
+
+    Args:
+        cutoff: Date limite de rétention.
+        chunk_size: Nombre de parties traitées par lot.
+
+    Returns:
+        int: Nombre de parties supprimées.
+    """
+    deleted = 0
+    while True:
+        game_ids = _find_stale_game_ids((GameState.FINISHED,), cutoff, chunk_size)
+        for game_id in game_ids:
+            delete_game(game_id)
+        deleted += len(game_ids)
+        if len(game_ids) < chunk_size:
+            return deleted
+
+
+def reap_stale_games(now=None, chunk_size=None):
+    """
+    Exécute un passage complet de nettoyage des parties abandonnées.
+
+    Les délais proviennent des settings GAME_REAPER_*.
+
+    Args:
+        now: Date de référence (défaut : maintenant).
+        chunk_size: Taille des lots (défaut : GAME_REAPER_CHUNK_SIZE).
+
+    Returns:
+        dict: Nombre de parties traitées par cas
+            (waiting_deleted, active_finished, finished_deleted).
+    """
+    now = now or timezone.now()
+    chunk_size = chunk_size or settings.GAME_REAPER_CHUNK_SIZE
+
+    summary = {
+        "waiting_deleted": reap_stale_waiting_games(
+            now - timedelta(minutes=settings.GAME_REAPER_WAITING_TIMEOUT_MINUTES),
+            chunk_size,
+        ),
+        "active_finished": finish_stale_active_games(
+            now - timedelta(minutes=settings.GAME_REAPER_ACTIVE_TIMEOUT_MINUTES),
+            chunk_size,
+        ),
+        "finished_deleted": 0,
+    }
+    retention_days = settings.GAME_REAPER_FINISHED_RETENTION_DAYS
+    if retention_days > 0:
+        summary["finished_deleted"] = delete_expired_finished_games(
+            now - timedelta(days=retention_days),
+            chunk_size,
+        )
+    return summary
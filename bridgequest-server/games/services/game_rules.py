@@ -0,0 +1,78 @@
+"""
+Règles de jeu évaluées par la boucle de jeu (settings.GAME_LOOP_RULES).
+
+Une règle lit l'état en mémoire de la partie (GameLoopState) et retourne des
+événements ; la boucle les persiste et les diffuse.
+"""
+import math
+import random
+from datetime import timedelta
+
+from django.conf import settings
+
+from games.models import PlayerRole
+from games.services.game_loop import GameRule, RoleChangedEvent, ScoreAwardedEvent
+
+_EARTH_RADIUS_METERS = 6_371_000
+
+
+def _distance_meters(first, second):
+    """Distance (haversine) entre deux positions (latitude, longitude, ...), en mètres."""
+    lat1, lon1 = math.radians(first[0]), math.radians(first[1])
+    lat2, lon2 = math.radians(second[0]), math.radians(second[1])
+    haversine = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * _EARTH_RADIUS_METERS * math.asin(math.sqrt(haversine))
+
+
+class SpiritConversionRule(GameRule):
+    """
+    Conversion par contact : un Esprit proche d'un Humain le convertit.
+
+    Au passage en IN_PROGRESS, un joueur tiré au sort devient le premier
+    Esprit (si aucun ne l'est déjà). À chaque tick, tout Humain à moins de
+    settings.GAME_RULE_CONVERSION_RADIUS_METERS d'un Esprit devient Esprit ;
+    l'Esprit le plus proche marque settings.GAME_RULE_CONVERSION_POINTS.
+    Les positions plus anciennes que settings.GAME_RULE_POSITION_MAX_AGE_SECONDS
+    (joueur déconnecté) sont ignorées. Un joueur converti pendant un tick ne
+    convertit qu'à partir du tick suivant.
+    """
+
+    def __init__(self):
+        self.radius_meters = settings.GAME_RULE_CONVERSION_RADIUS_METERS
+        self.points = settings.GAME_RULE_CONVERSION_POINTS
+        self.max_age = timedelta(seconds=settings.GAME_RULE_POSITION_MAX_AGE_SECONDS)
+
+    def start(self, state, now):
+        """Désigne le premier Esprit parmi les joueurs de la partie."""
+        if not state.roles or PlayerRole.SPIRIT in state.roles.values():
+            return []
+        return [RoleChangedEvent(random.choice(sorted(state.roles)), PlayerRole.SPIRIT)]
+
+    def _fresh_positions(self, state, role, now):
+        """Dernières positions récentes des joueurs du rôle donné, par player_id."""
+        return {
+            player_id: position
+            for player_id, position in state.positions.items()
+            if state.roles.get(player_id) == role and now - position[2] <= self.max_age
+        }
+
+    def evaluate(self, state, now):
+        """Convertit les Humains au contact d'un Esprit et crédite l'Esprit le plus proche."""
+        spirits = self._fresh_positions(state, PlayerRole.SPIRIT, now)
+        if not spirits:
+            return []
+        events = []
+        humans = self._fresh_positions(state, PlayerRole.HUMAN, now)
+        for human_id, human_position in sorted(humans.items()):
+            distance, spirit_id = min(
+                (_distance_meters(human_position, spirit_position), spirit_id)
+                for spirit_id, spirit_position in spirits.items()
+            )
+            if distance <= self.radius_meters:
+                events.append(RoleChangedEvent(human_id, PlayerRole.SPIRIT))
+                if self.points:
+                    events.append(ScoreAwardedEvent(spirit_id, self.points))
+        return events
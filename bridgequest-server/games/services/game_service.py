@@ -7,12 +7,15 @@ import random
 import string
 
 from django.db import IntegrityError
+from django.utils import timezone
 from rest_framework import status
 
 from games.models import Game, GameState, Player, PlayerRole
 from games.services import lobby_broadcast
+from games.services.score_service import seed_leaderboard
 from utils.exceptions import GameException, PlayerException
 from utils.messages import ErrorMessages
+from utils.query_budget import query_budget
 
 _CODE_LENGTH = 6
 _CODE_CHARS = string.ascii_uppercase + string.digits
@@ -67,8 +70,12 @@ def _normalize_game_code(code):
 
 
 _MAX_CREATE_ATTEMPTS = 10
+# Deux requêtes par tentative (partie, administrateur) ; une collision de
+# code relance une tentative
+CREATE_GAME_MAX_QUERIES = 2 * _MAX_CREATE_ATTEMPTS
 
 
+@query_budget("create_game_attempt", max_queries=2)
 def _try_create_game_with_code(code, admin_user):
     """
     Tente de créer une partie avec le code donné.
@@ -84,6 +91,7 @@ def _try_create_game_with_code(code, admin_user):
     return game
 
 
+@query_budget("create_game", max_queries=CREATE_GAME_MAX_QUERIES)
 def create_game(admin_user):
     """
     Crée une nouvelle partie avec l'utilisateur comme administrateur.
@@ -207,6 +215,7 @@ def _validate_can_join_game(game, user):
         raise PlayerException(message_key=ErrorMessages.PLAYER_ALREADY_IN_GAME)
 
 
+@query_budget("join_game", max_queries=4)
 def join_game(code, user):
     """
     Fait rejoindre un utilisateur à une partie via son code.
@@ -227,9 +236,15 @@ def join_game(code, user):
         raise GameException(message_key=ErrorMessages.GAME_CODE_NOT_FOUND)
 
     _validate_can_join_game(game, user)
-    return _add_player_to_game(game, user, is_admin=False)
+    player = _add_player_to_game(game, user, is_admin=False)
+    # Une arrivée est une activité : le reaper ne supprime pas un lobby peuplé
+    Game.objects.filter(pk=game.pk).update(updated_at=timezone.now())
+    return player
 
 
+# Partie, joueur, mise à jour ; seed_leaderboard relit les joueurs quand le
+# classement est sur Redis
+@query_budget("start_game", max_queries=4)
 def start_game(game_id, user):
     """
     Lance une partie (passe de WAITING à DEPLOYMENT).
@@ -259,5 +274,6 @@ def start_game(game_id, user):
 
     game.state = GameState.DEPLOYMENT
     game.save(update_fields=["state", "updated_at"])
+    seed_leaderboard(game.id)
     lobby_broadcast.broadcast_game_started(game.id)
     return game
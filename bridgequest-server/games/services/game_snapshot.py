@@ -0,0 +1,97 @@
+"""
+Instantané de partie publié par l'acteur de jeu dans le cache partagé.
+
+L'acteur (games.services.game_actor), sur le worker propriétaire du bail,
+publie l'état de la partie et son roster. Les chemins chauds (POST position,
+connexion ws/game/) le lisent en une lecture de cache au lieu de relire
+Game et Player en base. Absent (acteur désactivé, expiré, partie nettoyée) :
+repli sur la base.
+
+Format :
+    {
+        "state": "IN_PROGRESS",
+        "players": {
+            "<user_id>": {"player_id", "user_id", "username", "first_name",
+                          "last_name", "avatar", "role", "is_admin"},
+        },
+    }
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from games.models import Player
+
+_CACHE_KEY_PREFIX = "game_snapshot"
+
+
+def _snapshot_key(game_id):
+    """Clé de cache de l'instantané d'une partie."""
+    return f"{_CACHE_KEY_PREFIX}:{game_id}"
+
+
+def publish_game_snapshot(game_id, snapshot, ttl_seconds):
+    """
+    Publie l'instantané d'une partie.
+
+    Le TTL est aligné sur le bail : si le worker propriétaire disparaît,
+    l'instantané expire et les lecteurs repassent par la base.
+    """
+    cache.set(_snapshot_key(game_id), snapshot, timeout=ttl_seconds)
+
+
+def delete_game_snapshot(game_id):
+    """Supprime l'instantané d'une partie (fin de partie, nettoyage)."""
+    cache.delete(_snapshot_key(game_id))
+
+
+def get_game_snapshot(game_id):
+    """
+    Retourne l'instantané publié par l'acteur, ou None.
+
+    Toujours None si l'acteur est désactivé (settings.GAME_ACTOR_ENABLED).
+
+    Args:
+        game_id: Identifiant de la partie.
+
+    Returns:
+        dict | None: Instantané {state, players}.
+    """
+    if not settings.GAME_ACTOR_ENABLED:
+        return None
+    return cache.get(_snapshot_key(game_id))
+
+
+def build_snapshot_player(snapshot, game_id, user_id):
+    """
+    Construit un Player (avec user) à partir de l'instantané, sans requête.
+
+    Les instances ne sont pas relues en base : elles portent les champs
+    nécessaires aux écritures par clé (player_id) et aux payloads publics.
+
+    Args:
+        snapshot: Instantané de la partie.
+        game_id: Identifiant de la partie.
+        user_id: Identifiant de l'utilisateur recherché.
+
+    Returns:
+        Player | None: Le joueur, ou None si l'utilisateur n'est pas dans la partie.
+    """
+    entry = snapshot["players"].get(str(user_id))
+    if entry is None:
+        return None
+    user = get_user_model()(
+        pk=entry["user_id"],
+        username=entry["username"],
+        first_name=entry["first_name"],
+        last_name=entry["last_name"],
+        avatar=entry["avatar"],
+    )
+    player = Player(
+        pk=entry["player_id"],
+        game_id=game_id,
+        role=entry["role"],
+        is_admin=entry["is_admin"],
+    )
+    player.user = user
+    return player
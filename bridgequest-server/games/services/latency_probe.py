@@ -0,0 +1,214 @@
+"""
+Sonde de latence de bout en bout des positions (fix GPS → client).
+
+Les trames position_updated portent une clé `timing` (millisecondes epoch,
+horloge du serveur) :
+- ingested_at : réception du POST /api/locations/,
+- broadcast_at : envoi sur le channel layer (après écriture en base),
+- sent_at : transmission au client par le consumer.
+
+Le client acquitte avec {"type": "ack", "timing": {...}, "received_at": ms}.
+received_at est exprimé dans l'horloge du serveur : le client estime son
+décalage avec le message ping (server_time de la réponse pong).
+
+Étapes (histogramme position_latency_seconds{stage}, utils.metrics) :
+- ingest : ingested_at → broadcast_at (validation, écriture, sérialisation),
+- channel_layer : broadcast_at → sent_at,
+- network : sent_at → received_at,
+- delivery : ingested_at → received_at (fix → livraison).
+
+La latence fix → livraison est aussi conservée par partie dans un réservoir
+borné du worker (LATENCY_PROBE_SAMPLE_SIZE derniers acquittements).
+L'acquittement ne fait aucune entrée-sortie : les réservoirs sont publiés
+dans le cache partagé par le thread de publication de utils.metrics (voir
+add_publish_hook), hors de la boucle d'événements des consumers.
+/internal/latency/ (games.views) expose les percentiles par partie et par
+worker.
+"""
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import cache
+
+from utils import metrics
+
+_KEY_PREFIX = "latency_probe"
+
+STAGE_INGEST = "ingest"
+STAGE_CHANNEL_LAYER = "channel_layer"
+STAGE_NETWORK = "network"
+STAGE_DELIVERY = "delivery"
+
+# Acquittement incohérent au-delà (horloge client erronée, rejeu)
+_MAX_DELIVERY_SECONDS = 60
+
+_PERCENTILES = (50, 95, 99)
+
+metrics.register_histogram(
+    "position_latency_seconds",
+    "Latence des positions par étape (ingest, channel_layer, network, delivery).",
+    (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+# Réservoirs du worker : game_id -> deque des latences fix → livraison (s).
+# Alimentés depuis la boucle d'événements des consumers, lus par le thread
+# de publication : le verrou ne couvre que des opérations en mémoire.
+_samples = {}
+_last_seen = {}
+_lock = threading.Lock()
+
+
+def now_ms():
+    """Horodatage courant en millisecondes epoch (horloge du serveur)."""
+    return round(time.time() * 1000, 3)
+
+
+def build_timing(ingested_at):
+    """
+    Construit les horodatages d'une position au moment de sa diffusion.
+
+    Args:
+        ingested_at: Réception du POST (ms epoch), ou None si inconnue.
+
+    Returns:
+        dict: {'ingested_at', 'broadcast_at'}
+    """
+    broadcast_at = now_ms()
+    if ingested_at is None:
+        ingested_at = broadcast_at
+    metrics.observe(
+        "position_latency_seconds",
+        (broadcast_at - ingested_at) / 1000,
+        {"stage": STAGE_INGEST},
+    )
+    return {"ingested_at": ingested_at, "broadcast_at": broadcast_at}
+
+
+def stamp_sent(timing):
+    """
+    Ajoute l'horodatage de transmission au client.
+
+    Args:
+        timing: Horodatages reçus du channel layer.
+
+    Returns:
+        dict: Copie de timing avec sent_at
+    """
+    sent_at = now_ms()
+    metrics.observe(
+        "position_latency_seconds",
+        max(0.0, sent_at - timing["broadcast_at"]) / 1000,
+        {"stage": STAGE_CHANNEL_LAYER},
+    )
+    return {**timing, "sent_at": sent_at}
+
+
+def record_ack(game_id, timing, received_at):
+    """
+    Enregistre l'acquittement d'une position par un client.
+
+    Args:
+        game_id: Identifiant de la partie.
+        timing: Horodatages renvoyés par le client (voir stamp_sent).
+        received_at: Réception par le client (ms, horloge du serveur).
+
+    Returns:
+        bool: False si l'acquittement est invalide (ignoré)
+    """
+    try:
+        ingested_at = float(timing["ingested_at"])
+        sent_at = float(timing["sent_at"])
+        received_at = float(received_at)
+    except (KeyError, TypeError, ValueError):
+        return False
+    delivery = (received_at - ingested_at) / 1000
+    if not 0 <= delivery <= _MAX_DELIVERY_SECONDS:
+        return False
+
+    metrics.observe(
+        "position_latency_seconds",
+        max(0.0, received_at - sent_at) / 1000,
+        {"stage": STAGE_NETWORK},
+    )
+    metrics.observe("position_latency_seconds", delivery, {"stage": STAGE_DELIVERY})
+    with _lock:
+        samples = _samples.get(game_id)
+        if samples is None:
+            samples = _samples[game_id] = deque(maxlen=settings.LATENCY_PROBE_SAMPLE_SIZE)
+        samples.append(delivery)
+        _last_seen[game_id] = time.monotonic()
+    return True
+
+
+def _prune():
+    """Oublie les parties sans acquittement depuis LATENCY_PROBE_GAME_TTL_SECONDS (sous _lock)."""
+    deadline = time.monotonic() - settings.LATENCY_PROBE_GAME_TTL_SECONDS
+    for game_id in [game_id for game_id, seen in _last_seen.items() if seen < deadline]:
+        del _samples[game_id]
+        del _last_seen[game_id]
+
+
+def publish():
+    """
+    Publie les réservoirs du worker dans le cache partagé.
+
+    Appelé par le thread de publication de utils.metrics et avant chaque
+    lecture de /internal/latency/.
+    """
+    with _lock:
+        _prune()
+        reservoirs = {game_id: list(samples) for game_id, samples in _samples.items()}
+    cache.set(
+        f"{_KEY_PREFIX}:{metrics.get_worker_id()}",
+        reservoirs,
+        timeout=settings.METRICS_WORKER_TTL_SECONDS,
+    )
+
+
+metrics.add_publish_hook(publish)
+
+
+def reset():
+    """Vide les réservoirs du worker (tests)."""
+    with _lock:
+        _samples.clear()
+        _last_seen.clear()
+
+
+def _summarize(samples):
+    """Nombre d'échantillons et percentiles (rang le plus proche, en ms)."""
+    ordered = sorted(samples)
+    summary = {"count": len(ordered)}
+    for percentile in _PERCENTILES:
+        index = max(0, -(-len(ordered) * percentile // 100) - 1)
+        summary[f"p{percentile}_ms"] = round(ordered[index] * 1000, 1)
+    return summary
+
+
+def collect_latency_summary():
+    """
+    Calcule les percentiles fix → livraison de tous les workers actifs.
+
+    Returns:
+        dict: {'games': {game_id: résumé}, 'workers': {worker: {game_id: résumé}}}
+    """
+    publish()
+    workers = metrics.get_active_workers()
+    published = cache.get_many([f"{_KEY_PREFIX}:{worker}" for worker in workers])
+    by_game = {}
+    by_worker = {}
+    for worker in workers:
+        reservoirs = published.get(f"{_KEY_PREFIX}:{worker}")
+        if not reservoirs:
+            continue
+        by_worker[worker] = {
+            game_id: _summarize(samples) for game_id, samples in reservoirs.items()
+        }
+        for game_id, samples in reservoirs.items():
+            by_game.setdefault(game_id, []).extend(samples)
+    return {
+        "games": {game_id: _summarize(samples) for game_id, samples in by_game.items()},
+        "workers": by_worker,
+    }
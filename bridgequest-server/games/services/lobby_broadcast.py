@@ -6,9 +6,9 @@ exclusion, transfert admin) aux clients connectés au canal lobby.
 Canal réservé à la phase WAITING.
 """
 from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
 
 from games.models import GameState
+from games.services.realtime_metrics import group_send
 
 
 def get_lobby_group_name(game_id):
@@ -25,8 +25,7 @@ def _send_to_lobby(group_game_id, event_type, **event_payload):
         event_type: Type de l'événement (ex: game_started, player_excluded).
         **event_payload: Données de l'événement envoyées aux clients.
     """
-    channel_layer = get_channel_layer()
-    async_to_sync(channel_layer.group_send)(
+    async_to_sync(group_send)(
         get_lobby_group_name(group_game_id),
         {"type": event_type, **event_payload},
     )
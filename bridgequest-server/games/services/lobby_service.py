@@ -12,6 +12,7 @@ from django.utils import timezone
 
 from games.models import Game, GameState, Player
 from games.services import lobby_broadcast
+from games.services.game_deletion import delete_game, delete_player
 from games.services.player_payload import build_player_websocket_payload
 
 # Délai en secondes avant exclusion (spec: 30 s)
@@ -57,6 +58,22 @@ def cancel_pending_exclusion(game_id, player_id):
     cache.delete(_cache_key(game_id, player_id))
 
 
+def purge_pending_exclusions(game_id, player_ids):
+    """
+    Supprime les exclusions en attente de plusieurs joueurs d'une partie.
+
+    Appelé lors du nettoyage d'une partie abandonnée (game_reaper) pour ne
+    pas laisser de clés orphelines dans le cache partagé.
+
+    Args:
+        game_id: Identifiant de la partie.
+        player_ids: Identifiants des joueurs de la partie.
+    """
+    keys = [_cache_key(game_id, player_id) for player_id in player_ids]
+    if keys:
+        cache.delete_many(keys)
+
+
 def exclude_player_immediately(game_id, player_id):
     """
     Exclut immédiatement un joueur (sortie volontaire).
@@ -93,7 +110,7 @@ def _remove_player_from_lobby(game_id, player_id):
     """
     Supprime un joueur de la partie et gère les conséquences.
 
-    - Supprime le joueur de la base
+    - Supprime le joueur de la base (DELETE par lots, sans collecteur Django)
     - Diffuse player_excluded
     - Si c'était l'admin : transfère ou supprime la partie
 
@@ -117,7 +134,7 @@ def _remove_player_from_lobby(game_id, player_id):
     was_admin = player.is_admin
     player_payload = build_player_websocket_payload(player, include_admin=True)
 
-    player.delete()
+    delete_player(player.id)
     lobby_broadcast.broadcast_player_excluded(game_id, player_payload)
 
     if was_admin:
@@ -140,7 +157,7 @@ def _handle_admin_exclusion(game):
 
     if next_admin is None:
         game_id = game.id
-        game.delete()
+        delete_game(game_id)
         lobby_broadcast.broadcast_game_deleted(game_id)
     else:
         next_admin.is_admin = True
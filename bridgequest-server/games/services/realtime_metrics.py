@@ -0,0 +1,159 @@
+"""
+Métriques du temps réel : connexions WebSocket et channel layer.
+
+Exposées avec les métriques HTTP (utils.metrics, /internal/metrics/) :
+- ws_connect_total{channel,outcome} : tentatives de connexion par issue
+  (accepted, ou motif du code de fermeture),
+- ws_connect_duration_seconds{channel} : latence du chemin de connexion,
+- ws_connections{channel,game} : connexions ouvertes par partie (jauge),
+- ws_messages_received_total{channel,type} : messages client par type,
+- ws_frames_sent_total / ws_bytes_sent_total{channel,type} : trames envoyées
+  par type d'événement,
+- channel_group_send_duration_seconds{group,event} : latence de group_send,
+- channel_group_send_fanout{group} : nombre de membres du groupe visé.
+
+Les labels restent à cardinalité bornée : types d'événements définis par le
+serveur, type de groupe (lobby, game, game_actor) plutôt que son nom. Seule
+la jauge des connexions est par partie : la série d'une partie est supprimée
+quand sa dernière connexion se ferme (metrics.adjust_gauge), le nombre de
+séries suit celui des parties ayant des clients connectés.
+
+Avec RedisChannelLayer, la taille d'un groupe coûte un aller-retour Redis
+(ZCARD) : le fan-out n'est alors mesuré que sur une fraction
+CHANNEL_GROUP_FANOUT_SAMPLE_RATE des envois.
+"""
+import random
+import time
+
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+from utils import metrics, tracing
+
+CONNECT_ACCEPTED = "accepted"
+
+metrics.register_counter("ws_connect_total", "Tentatives de connexion WebSocket par issue.")
+metrics.register_histogram(
+    "ws_connect_duration_seconds",
+    "Latence du chemin de connexion WebSocket (acceptation ou refus).",
+    (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+metrics.register_gauge("ws_connections", "Connexions WebSocket ouvertes par partie.")
+metrics.register_counter("ws_messages_received_total", "Messages WebSocket reçus par type.")
+metrics.register_counter("ws_frames_sent_total", "Trames WebSocket envoyées par type d'événement.")
+metrics.register_counter("ws_bytes_sent_total", "Octets WebSocket envoyés par type d'événement.")
+metrics.register_histogram(
+    "channel_group_send_duration_seconds",
+    "Latence de group_send sur le channel layer.",
+    (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+metrics.register_histogram(
+    "channel_group_send_fanout",
+    "Nombre de membres du groupe visé par group_send.",
+    (0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+
+
+def _group_kind(group):
+    """Type d'un groupe (lobby_12 -> lobby, game_actor_12 -> game_actor)."""
+    return group.rsplit("_", 1)[0]
+
+
+def record_connect(channel, outcome, duration):
+    """
+    Enregistre l'issue et la latence d'une tentative de connexion.
+
+    Args:
+        channel: Canal WebSocket ('lobby' ou 'game').
+        outcome: CONNECT_ACCEPTED ou motif du refus.
+        duration: Durée du chemin de connexion (secondes).
+    """
+    metrics.increment("ws_connect_total", {"channel": channel, "outcome": outcome})
+    metrics.observe("ws_connect_duration_seconds", duration, {"channel": channel})
+
+
+def connection_opened(channel, game_id):
+    """Compte une connexion acceptée sur une partie."""
+    metrics.adjust_gauge("ws_connections", {"channel": channel, "game": game_id}, 1)
+
+
+def connection_closed(channel, game_id):
+    """Décompte une connexion fermée sur une partie (série supprimée à zéro)."""
+    metrics.adjust_gauge("ws_connections", {"channel": channel, "game": game_id}, -1)
+
+
+def record_received(channel, message_type):
+    """
+    Compte un message reçu du client.
+
+    Args:
+        channel: Canal WebSocket.
+        message_type: Type du message (borné par le consumer).
+    """
+    metrics.increment("ws_messages_received_total", {"channel": channel, "type": message_type})
+
+
+def record_sent(channel, event_type, size):
+    """
+    Compte une trame envoyée au client et sa taille.
+
+    Args:
+        channel: Canal WebSocket.
+        event_type: Type de l'événement envoyé.
+        size: Taille de la trame (octets).
+    """
+    labels = {"channel": channel, "type": event_type}
+    metrics.increment("ws_frames_sent_total", labels)
+    metrics.increment("ws_bytes_sent_total", labels, size)
+
+
+async def _get_group_size(channel_layer, group):
+    """
+    Retourne le nombre de membres d'un groupe, ou None s'il n'est pas mesuré.
+
+    InMemoryChannelLayer expose ses groupes ; RedisChannelLayer les stocke
+    dans un ensemble trié (un ZCARD sur le shard du groupe, échantillonné).
+    """
+    groups = getattr(channel_layer, "groups", None)
+    if isinstance(groups, dict):
+        return len(groups.get(group, ()))
+    if hasattr(channel_layer, "_group_key"):
+        if random.random() >= settings.CHANNEL_GROUP_FANOUT_SAMPLE_RATE:
+            return None
+        connection = channel_layer.connection(channel_layer.consistent_hash(group))
+        return await connection.zcard(channel_layer._group_key(group))
+    return None
+
+
+async def group_send(group, message, channel_layer=None):
+    """
+    Envoie un message à un groupe en mesurant latence et fan-out.
+
+    Remplace channel_layer.group_send dans les consumers et les services de
+    diffusion (async_to_sync(group_send) depuis du code synchrone). Dans une
+    trace, l'envoi est un span et le message porte son traceparent
+    (utils.tracing) pour relier le traitement des destinataires.
+
+    Args:
+        group: Nom du groupe.
+        message: Message channels (avec sa clé 'type').
+        channel_layer: Layer à utiliser (défaut : get_channel_layer()).
+    """
+    channel_layer = channel_layer or get_channel_layer()
+    with tracing.span("channel_layer.group_send", {"group": group, "event": message["type"]}):
+        traceparent = tracing.inject()
+        if traceparent is not None:
+            message = {**message, "traceparent": traceparent}
+        started = time.perf_counter()
+        await channel_layer.group_send(group, message)
+        duration = time.perf_counter() - started
+
+    kind = _group_kind(group)
+    metrics.observe(
+        "channel_group_send_duration_seconds",
+        duration,
+        {"group": kind, "event": message["type"]},
+    )
+    size = await _get_group_size(channel_layer, group)
+    if size is not None:
+        metrics.observe("channel_group_send_fanout", size, {"group": kind})
@@ -0,0 +1,226 @@
+"""
+Service de score et de classement pour Bridge Quest.
+
+Écriture : incrément atomique en base via F() dans une transaction. L'UPDATE
+verrouille la ligne du joueur jusqu'au commit : la relecture du score voit
+notre écriture. La recopie du score absolu dans le classement partagé est
+faite après le commit (transaction.on_commit) : aucun appel Redis sous le
+verrou, et jamais de score annulé par un rollback dans le classement.
+
+Classement : sorted set Redis par partie (ZADD / ZREVRANGE, O(log n) par
+écriture et O(log n + N) pour un top N), via utils.redis_client. Le sorted
+set reconstruit depuis la base (lancement de la partie, index (game, -score))
+contient un membre marqueur : un sorted set évincé, puis recréé partiellement
+par une recopie, n'a plus ce marqueur et est reconstruit à la lecture. Sans
+cache Redis (développement, tests), le classement est lu en base via ce même
+index.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from rest_framework import status
+
+from games.models import Player
+from games.services import game_broadcast
+from utils.exceptions import PlayerException
+from utils.messages import ErrorMessages
+from utils.query_budget import query_budget
+from utils.redis_client import get_redis_client
+
+LEADERBOARD_DEFAULT_LIMIT = 10
+LEADERBOARD_MAX_LIMIT = 100
+_LEADERBOARD_KEY_PREFIX = "leaderboard"
+# Membre marqueur du sorted set complet (score -inf : toujours en dernier)
+_SEEDED_MEMBER = "seeded"
+
+
+def _leaderboard_key(game_id):
+    """Clé du sorted set de classement d'une partie (préfixe/version du cache inclus)."""
+    return cache.make_and_validate_key(f"{_LEADERBOARD_KEY_PREFIX}:{game_id}")
+
+
+def mirror_score(game_id, player_id, score):
+    """
+    Recopie le score absolu d'un joueur dans le classement partagé.
+
+    ZADD avec la valeur absolue (et non ZINCRBY) : idempotent. Si la clé a
+    été évincée, le sorted set ne contient ensuite que les joueurs ayant
+    marqué depuis, sans le marqueur ; _top_player_scores le reconstruit.
+
+    Args:
+        game_id: Identifiant de la partie.
+        player_id: Identifiant du joueur.
+        score: Score absolu du joueur.
+    """
+    key = _leaderboard_key(game_id)
+    client = get_redis_client()
+    if client is not None:
+        client.zadd(key, {str(player_id): score})
+
+
+def seed_leaderboard(game_id):
+    """
+    Initialise le classement partagé avec tous les joueurs de la partie.
+
+    Appelé au lancement de la partie : les joueurs sans point apparaissent
+    dans le classement dès le départ (score 0).
+
+    Args:
+        game_id: Identifiant de la partie.
+    """
+    key = _leaderboard_key(game_id)
+    client = get_redis_client()
+    if client is not None:
+        _rebuild_leaderboard(client, key, game_id)
+
+
+def _rebuild_leaderboard(client, key, game_id):
+    """
+    Recharge le classement partagé depuis la base.
+
+    ZADD NX : un score recopié par add_score pendant la reconstruction (plus
+    récent que la lecture en base) n'est pas écrasé. Le marqueur est ajouté
+    dans le même ZADD : l'effectif de la partie est figé au lancement (pas
+    d'arrivée après WAITING), le sorted set est alors complet.
+
+    Returns:
+        list[tuple[int, int]]: Les (player_id, score), du meilleur au moins bon.
+    """
+    scores = list(
+        Player.objects.filter(game_id=game_id)
+        .order_by("-score", "pk")
+        .values_list("pk", "score")
+    )
+    members = {str(player_id): score for player_id, score in scores}
+    members[_SEEDED_MEMBER] = float("-inf")
+    client.zadd(key, members, nx=True)
+    return scores
+
+
+def clear_leaderboard(game_id):
+    """
+    Supprime le classement partagé d'une partie (partie terminée ou supprimée).
+
+    Args:
+        game_id: Identifiant de la partie.
+    """
+    key = _leaderboard_key(game_id)
+    client = get_redis_client()
+    if client is not None:
+        client.delete(key)
+
+
+def increment_score(game_id, player_id, delta):
+    """
+    Ajoute delta au score d'un joueur en base et recopie le résultat dans le classement.
+
+    Chemin d'écriture unique des scores (add_score, flush de l'acteur) : le
+    score recopié est celui relu en base, recopié une fois la transaction
+    validée (dans une transaction englobante : à son commit). Deux écritures
+    concurrentes du même joueur peuvent recopier dans le désordre ; la
+    suivante corrige la valeur.
+
+    Args:
+        game_id: Identifiant de la partie.
+        player_id: Identifiant du joueur.
+        delta: Incrément (positif ou négatif).
+
+    Returns:
+        int | None: Le nouveau score, ou None si le joueur n'appartient pas à la partie.
+    """
+    players = Player.objects.filter(pk=player_id, game_id=game_id)
+    with transaction.atomic():
+        if not players.update(score=F("score") + delta):
+            return None
+        # Ligne verrouillée par l'UPDATE jusqu'au commit : la lecture voit notre écriture
+        score = players.values_list("score", flat=True).get()
+        transaction.on_commit(lambda: mirror_score(game_id, player_id, score))
+    return score
+
+
+def add_score(game_id, player_id, delta):
+    """
+    Ajoute delta au score d'un joueur et diffuse score_updated.
+
+    Args:
+        game_id: Identifiant de la partie.
+        player_id: Identifiant du joueur.
+        delta: Incrément (positif ou négatif).
+
+    Returns:
+        int: Le nouveau score du joueur.
+
+    Raises:
+        PlayerException: Si le joueur n'appartient pas à la partie.
+    """
+    score = increment_score(game_id, player_id, delta)
+    if score is None:
+        raise PlayerException(
+            message_key=ErrorMessages.PLAYER_NOT_IN_GAME,
+            status_code=status.HTTP_404_NOT_FOUND,
+        )
+
+    game_broadcast.broadcast_score_updated(game_id, player_id, delta, score)
+    return score
+
+
+def _top_player_scores(game_id, limit):
+    """
+    Retourne les (player_id, score) du top N, du meilleur au moins bon.
+
+    Lit le sorted set Redis s'il est disponible et complet (marqueur présent,
+    lu avec le top N en un aller-retour, sans requête en base) ; sinon il est
+    reconstruit depuis la base. Sans Redis, lit la base.
+    """
+    key = _leaderboard_key(game_id)
+    client = get_redis_client()
+    if client is not None:
+        pipeline = client.pipeline()
+        pipeline.zscore(key, _SEEDED_MEMBER)
+        pipeline.zrevrange(key, 0, limit - 1, withscores=True)
+        seeded, entries = pipeline.execute()
+        if seeded is None:
+            return _rebuild_leaderboard(client, key, game_id)[:limit]
+        return [
+            (int(member), int(score))
+            for member, score in entries
+            if member != _SEEDED_MEMBER.encode()
+        ]
+
+    return list(
+        Player.objects.filter(game_id=game_id)
+        .order_by("-score", "pk")
+        .values_list("pk", "score")[:limit]
+    )
+
+
+@query_budget("get_leaderboard", max_queries=2)
+def get_leaderboard(game_id, limit=LEADERBOARD_DEFAULT_LIMIT):
+    """
+    Construit le classement d'une partie (top N).
+
+    Args:
+        game_id: Identifiant de la partie.
+        limit: Nombre de joueurs retournés (borné à LEADERBOARD_MAX_LIMIT).
+
+    Returns:
+        list[dict]: Entrées {rank, player_id, user_id, username, score}.
+    """
+    limit = max(1, min(limit, LEADERBOARD_MAX_LIMIT))
+    top = _top_player_scores(game_id, limit)
+    # Dictionnaire par clé : l'ordre par défaut (-joined_at) serait un tri inutile
+    players = Player.objects.select_related("user").order_by().in_bulk([pk for pk, _ in top])
+
+    leaderboard = []
+    for player_id, score in top:
+        player = players.get(player_id)
+        if player is None:
+            continue  # Joueur supprimé depuis l'écriture du classement
+        leaderboard.append({
+            "rank": len(leaderboard) + 1,
+            "player_id": player_id,
+            "user_id": player.user_id,
+            "username": player.user.username or "",
+            "score": score,
+        })
+    return leaderboard
@@ -0,0 +1,288 @@
+"""
+Génération d'un jeu de données synthétique (benchmarks, plans d'exécution).
+
+generate_synthetic_data crée des utilisateurs, des parties réparties sur
+tous les états de GameState, leurs joueurs et, pour les parties lancées
+(hors WAITING), une trajectoire GPS par joueur : marche aléatoire à cap
+persistant et vitesse de marche, réfléchie sur les bords d'un rectangle
+géographique, un fix toutes les `interval_seconds`.
+
+Les horodatages sont réalistes (inscriptions, création des parties,
+arrivées des joueurs, fixes successifs) : les champs auto_now /
+auto_now_add sont désactivés le temps de la génération. Les insertions
+passent par bulk_create par lots ; les positions sont produites à la
+volée (pas de liste de 10M d'objets en mémoire).
+
+Le générateur est déterministe pour une graine et une base donnés.
+"""
+import itertools
+import math
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from games.models import Game, GameState, Player, PlayerRole
+from games.services.game_service import _CODE_CHARS, _CODE_LENGTH
+from locations.models import Position
+
+User = get_user_model()
+
+# Paris intra-muros : (lat_min, lng_min, lat_max, lng_max)
+DEFAULT_BOUNDING_BOX = (48.815, 2.255, 48.902, 2.415)
+
+DEFAULT_BATCH_SIZE = 10000
+
+_METERS_PER_DEGREE = 111_320
+_WALKING_SPEED_MPS = 1.4
+_SPIRIT_RATIO = 0.25
+_MAX_SCORE = 500
+# Dispersion des joueurs d'une partie autour de son point de départ (mètres)
+_GAME_SPREAD_METERS = 300
+# Délais entre création de la partie, arrivée des joueurs et lancement
+_LOBBY_DURATION = timedelta(minutes=10)
+
+_AUTO_NOW_FIELDS = (
+    (User, "created_at"),
+    (User, "updated_at"),
+    (Game, "created_at"),
+    (Game, "updated_at"),
+    (Player, "joined_at"),
+    (Position, "recorded_at"),
+)
+
+
+@contextmanager
+def _auto_now_disabled():
+    """Désactive auto_now / auto_now_add des champs horodatés (valeurs fournies)."""
+    fields = [model._meta.get_field(name) for model, name in _AUTO_NOW_FIELDS]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _batched(objects, batch_size):
+    """Découpe un itérable en listes de batch_size éléments."""
+    iterator = iter(objects)
+    while batch := list(itertools.islice(iterator, batch_size)):
+        yield batch
+
+
+def _bulk_insert(model, objects, batch_size):
+    """Insère les objets par lots ; retourne le nombre d'objets insérés."""
+    count = 0
+    for batch in _batched(objects, batch_size):
+        model.objects.bulk_create(batch)
+        count += len(batch)
+    return count
+
+
+def _game_codes(rng, count):
+    """Codes de partie uniques, absents de la base."""
+    taken = set(Game.objects.values_list("code", flat=True))
+    codes = []
+    while len(codes) < count:
+        code = "".join(rng.choices(_CODE_CHARS, k=_CODE_LENGTH))
+        if code not in taken:
+            taken.add(code)
+            codes.append(code)
+    return codes
+
+
+class _Walk:
+    """
+    Marche aléatoire d'un joueur dans un rectangle géographique.
+
+    Le cap varie peu d'un pas à l'autre (trajectoire lissée) ; un pas qui
+    sortirait du rectangle est réfléchi sur le bord franchi.
+    """
+
+    def __init__(self, rng, bounding_box, lat, lng, step_meters):
+        self.rng = rng
+        self.min_lat, self.min_lng, self.max_lat, self.max_lng = bounding_box
+        self.lat = lat
+        self.lng = lng
+        self.heading = rng.uniform(0, 2 * math.pi)
+        self.step_meters = step_meters
+
+    def step(self):
+        """Avance d'un pas ; retourne (lat, lng)."""
+        self.heading += self.rng.gauss(0, 0.4)
+        distance = max(0.0, self.rng.gauss(self.step_meters, self.step_meters / 4))
+        d_lat = distance * math.cos(self.heading) / _METERS_PER_DEGREE
+        d_lng = distance * math.sin(self.heading) / (
+            _METERS_PER_DEGREE * math.cos(math.radians(self.lat))
+        )
+        self.lat, flip_lat = _reflect(self.lat + d_lat, self.min_lat, self.max_lat)
+        self.lng, flip_lng = _reflect(self.lng + d_lng, self.min_lng, self.max_lng)
+        if flip_lat:
+            self.heading = math.pi - self.heading
+        if flip_lng:
+            self.heading = -self.heading
+        return self.lat, self.lng
+
+
+def _reflect(value, low, high):
+    """Réfléchit value dans [low, high] ; retourne (valeur, réfléchie ?)."""
+    if value < low:
+        return min(2 * low - value, high), True
+    if value > high:
+        return max(2 * high - value, low), True
+    return value, False
+
+
+def _game_schedule(rng, state, now, days, track_duration):
+    """
+    Date de création d'une partie selon son état.
+
+    Les parties en attente et en cours sont récentes (leur dernier fix est
+    proche de maintenant) ; les autres sont réparties sur `days` jours.
+    """
+    if state == GameState.WAITING:
+        return now - rng.uniform(0, 1) * _LOBBY_DURATION
+    if state == GameState.IN_PROGRESS:
+        return now - _LOBBY_DURATION - track_duration
+    return now - timedelta(days=rng.uniform(0, days)) - _LOBBY_DURATION - track_duration
+
+
+def generate_synthetic_data(
+    users,
+    games,
+    players_per_game,
+    positions_per_player,
+    *,
+    seed=None,
+    bounding_box=DEFAULT_BOUNDING_BOX,
+    interval_seconds=5,
+    days=30,
+    batch_size=DEFAULT_BATCH_SIZE,
+    prefix="synth",
+):
+    """
+    Génère un jeu de données synthétique complet.
+
+    Args:
+        users: Nombre d'utilisateurs créés.
+        games: Nombre de parties (états répartis uniformément).
+        players_per_game: Joueurs par partie (borné au nombre d'utilisateurs).
+        positions_per_player: Fixes GPS par joueur d'une partie lancée.
+        seed: Graine du générateur (None : aléatoire).
+        bounding_box: Rectangle (lat_min, lng_min, lat_max, lng_max) des trajectoires.
+        interval_seconds: Intervalle entre deux fixes d'un joueur.
+        days: Profondeur d'historique des parties terminées ou en déploiement.
+        batch_size: Taille des lots de bulk_create.
+        prefix: Préfixe des noms d'utilisateur et emails (unique par génération).
+
+    Returns:
+        dict: Nombre d'objets créés (users, games, players, positions).
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    prefix = prefix.lower()
+    players_per_game = min(players_per_game, users)
+    track_duration = timedelta(seconds=interval_seconds * positions_per_player)
+    states = GameState.values
+
+    with _auto_now_disabled(), transaction.atomic():
+        password = make_password(None)
+        user_objects = []
+        for index in range(users):
+            joined = now - timedelta(days=days) - timedelta(days=rng.uniform(0, 365))
+            user_objects.append(User(
+                username=f"{prefix}{index}",
+                email=f"{prefix}{index}@example.com",
+                password=password,
+                date_joined=joined,
+                created_at=joined,
+                updated_at=joined,
+            ))
+        _bulk_insert(User, user_objects, batch_size)
+        user_ids = [user.pk for user in user_objects]
+
+        game_objects = []
+        for index, code in enumerate(_game_codes(rng, games)):
+            state = states[index % len(states)]
+            created = _game_schedule(rng, state, now, days, track_duration)
+            # Dernière activité : le dernier fix pour une partie lancée
+            updated = created
+            if state != GameState.WAITING:
+                updated += _LOBBY_DURATION + track_duration
+            game_objects.append(
+                Game(code=code, state=state, created_at=created, updated_at=updated)
+            )
+        _bulk_insert(Game, game_objects, batch_size)
+
+        player_objects = []
+        for game in game_objects:
+            started = game.state != GameState.WAITING
+            arrivals = sorted(rng.uniform(0, 1) for _ in range(players_per_game))
+            for rank, (user_id, arrival) in enumerate(
+                zip(rng.sample(user_ids, players_per_game), arrivals)
+            ):
+                player_objects.append(Player(
+                    user_id=user_id,
+                    game=game,
+                    is_admin=rank == 0,
+                    role=(
+                        PlayerRole.SPIRIT if started and rng.random() < _SPIRIT_RATIO
+                        else PlayerRole.HUMAN
+                    ),
+                    score=rng.randint(0, _MAX_SCORE) if started else 0,
+                    joined_at=game.created_at + arrival * _LOBBY_DURATION,
+                ))
+        _bulk_insert(Player, player_objects, batch_size)
+
+        position_count = _bulk_insert(
+            Position,
+            _trajectories(
+                rng, player_objects, positions_per_player, bounding_box, interval_seconds
+            ),
+            batch_size,
+        )
+
+    return {
+        "users": len(user_objects),
+        "games": len(game_objects),
+        "players": len(player_objects),
+        "positions": position_count,
+    }
+
+
+def _trajectories(rng, players, positions_per_player, bounding_box, interval_seconds):
+    """Produit les positions des joueurs des parties lancées, partie par partie."""
+    min_lat, min_lng, max_lat, max_lng = bounding_box
+    interval = timedelta(seconds=interval_seconds)
+    step_meters = _WALKING_SPEED_MPS * interval_seconds
+    spread = _GAME_SPREAD_METERS / _METERS_PER_DEGREE
+
+    for game, game_players in itertools.groupby(players, key=lambda player: player.game):
+        if game.state == GameState.WAITING:
+            continue
+        center_lat = rng.uniform(min_lat, max_lat)
+        center_lng = rng.uniform(min_lng, max_lng)
+        started = game.created_at + _LOBBY_DURATION
+        for player in game_players:
+            walk = _Walk(
+                rng,
+                bounding_box,
+                min(max(center_lat + rng.uniform(-spread, spread), min_lat), max_lat),
+                min(max(center_lng + rng.uniform(-spread, spread), min_lng), max_lng),
+                step_meters,
+            )
+            for index in range(positions_per_player):
+                lat, lng = walk.step()
+                yield Position(
+                    player_id=player.pk,
+                    latitude=round(lat, 6),
+                    longitude=round(lng, 6),
+                    recorded_at=started + (index + 1) * interval,
+                )
@@ -0,0 +1,172 @@
+"""
+Tests pour l'acteur de jeu (game_actor) et l'instantané partagé (game_snapshot).
+"""
+import asyncio
+from decimal import Decimal
+from unittest.mock import patch
+
+from channels.db import database_sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from games.models import Game, GameState, Player, PlayerRole
+from games.services import game_actor, game_snapshot, score_service
+from games.services.game_loop import (
+    GameLoop,
+    GameRule,
+    RoleChangedEvent,
+    ScoreAwardedEvent,
+)
+from locations.models import Position
+from locations.services.position_service import update_position
+
+User = get_user_model()
+
+
+class _AwardPointRule(GameRule):
+    """Règle de test : un point à chaque joueur ayant une position, puis conversion."""
+
+    def evaluate(self, state, now):
+        events = []
+        for player_id in sorted(state.positions):
+            events.append(ScoreAwardedEvent(player_id, 1))
+            if state.roles[player_id] == PlayerRole.HUMAN:
+                events.append(RoleChangedEvent(player_id, PlayerRole.SPIRIT))
+        return events
+
+
+@override_settings(GAME_ACTOR_ENABLED=True, GAME_LOOP_LEASE_TTL_SECONDS=10)
+@patch("games.services.game_actor.game_broadcast.abroadcast_score_updated")
+@patch("games.services.game_actor.game_broadcast.abroadcast_role_changed")
+class GameActorTestCase(TestCase):
+    """Tests pour GameActor (file de commandes, write-behind, instantané)."""
+
+    def setUp(self):
+        """Configuration initiale pour tous les tests."""
+        cache.clear()
+        self.game = Game.objects.create(code="ABC123", state=GameState.IN_PROGRESS)
+        self.alice = Player.objects.create(
+            user=User.objects.create_user(username="alice", email="alice@test.com"),
+            game=self.game,
+            is_admin=True,
+        )
+        self.bob = Player.objects.create(
+            user=User.objects.create_user(username="bob", email="bob@test.com"),
+            game=self.game,
+        )
+        Position.objects.create(
+            player=self.bob,
+            latitude=Decimal("48.8566"),
+            longitude=Decimal("2.3522"),
+        )
+
+    async def _loaded_loop(self, rules=()):
+        """Retourne une GameLoop chargée (avec acteur)."""
+        game_loop = GameLoop(self.game.id, "worker-a", list(rules))
+        await game_loop.load_state()
+        return game_loop
+
+    async def test_load_publishes_snapshot(self, mock_role, mock_score):
+        """Test que le chargement publie l'état et le roster dans l'instantané."""
+        await self._loaded_loop()
+
+        snapshot = await asyncio.to_thread(game_snapshot.get_game_snapshot, self.game.id)
+
+        self.assertEqual(snapshot["state"], GameState.IN_PROGRESS)
+        entry = snapshot["players"][str(self.alice.user_id)]
+        self.assertEqual(entry["player_id"], self.alice.id)
+        self.assertTrue(entry["is_admin"])
+        self.assertNotIn("score", entry)
+
+    async def test_events_are_broadcast_before_write_behind(
+        self, mock_role, mock_score
+    ):
+        """Test que les événements sont diffusés aussitôt mais écrits en base au flush."""
+        game_loop = await self._loaded_loop([_AwardPointRule()])
+
+        await game_loop.tick()
+        await game_loop.tick()
+
+        mock_role.assert_called_once_with(self.game.id, self.bob.id, PlayerRole.SPIRIT)
+        self.assertEqual(mock_score.call_count, 2)
+        mock_score.assert_called_with(self.game.id, self.bob.id, 1, 2)
+        bob = await Player.objects.aget(pk=self.bob.id)
+        self.assertEqual((bob.role, bob.score), (PlayerRole.HUMAN, 0))
+
+        await game_loop.actor.flush()
+
+        bob = await Player.objects.aget(pk=self.bob.id)
+        self.assertEqual((bob.role, bob.score), (PlayerRole.SPIRIT, 2))
+        snapshot = await asyncio.to_thread(game_snapshot.get_game_snapshot, self.game.id)
+        self.assertEqual(snapshot["players"][str(bob.user_id)]["role"], PlayerRole.SPIRIT)
+
+    @patch("games.services.score_service.game_broadcast.broadcast_score_updated")
+    async def test_flush_keeps_scores_written_outside_actor(
+        self, mock_external_score, mock_role, mock_score
+    ):
+        """Test que le flush ajoute ses points aux scores écrits hors acteur et les recharge."""
+        game_loop = await self._loaded_loop()
+        await database_sync_to_async(score_service.add_score)(self.game.id, self.alice.id, 10)
+
+        game_loop.actor.submit(game_actor.COMMAND_AWARD_SCORE, self.alice.id, 3)
+        await game_loop.actor.process_pending()
+        await game_loop.actor.flush()
+
+        alice = await Player.objects.aget(pk=self.alice.id)
+        self.assertEqual(alice.score, 13)
+        self.assertEqual(game_loop.actor.players[self.alice.id]["score"], 13)
+
+    async def test_game_finished_stops_loop_and_removes_snapshot(
+        self, mock_role, mock_score
+    ):
+        """Test que game_finished arrête la boucle ; l'arrêt de l'acteur retire l'instantané."""
+        game_loop = await self._loaded_loop()
+
+        game_loop.ingest({"type": "game_finished", "game_id": self.game.id})
+        await game_loop.actor.stop()
+
+        self.assertTrue(game_loop.stopped)
+        self.assertIsNone(
+            await asyncio.to_thread(game_snapshot.get_game_snapshot, self.game.id)
+        )
+
+
+@override_settings(GAME_ACTOR_ENABLED=True)
+class GameSnapshotHotPathTestCase(TestCase):
+    """Tests pour la lecture de l'instantané par le POST position."""
+
+    def setUp(self):
+        """Configuration initiale pour tous les tests."""
+        cache.clear()
+        self.game = Game.objects.create(code="ABC123", state=GameState.IN_PROGRESS)
+        self.user = User.objects.create_user(username="alice", email="alice@test.com")
+        self.player = Player.objects.create(user=self.user, game=self.game)
+        game_snapshot.publish_game_snapshot(self.game.id, {
+            "state": GameState.IN_PROGRESS,
+            "players": {
+                str(self.user.id): {
+                    "player_id": self.player.id,
+                    "user_id": self.user.id,
+                    "username": "alice",
+                    "first_name": "",
+                    "last_name": "",
+                    "avatar": None,
+                    "role": PlayerRole.HUMAN,
+                    "is_admin": False,
+                },
+            },
+        }, ttl_seconds=10)
+
+    def test_update_position_skips_game_and_player_reads(self):
+        """Test que l'instantané évite la lecture de Game et Player (seul l'INSERT reste)."""
+        with self.assertNumQueries(1):
+            position = update_position(self.game.id, self.user, 48.8566, 2.3522)
+
+        self.assertEqual(position.player_id, self.player.id)
+        self.assertEqual(position.player.user.username, "alice")
+
+    @override_settings(GAME_ACTOR_ENABLED=False)
+    def test_snapshot_ignored_when_actor_disabled(self):
+        """Test que l'instantané n'est pas lu si l'acteur est désactivé."""
+        self.assertIsNone(game_snapshot.get_game_snapshot(self.game.id))
@@ -3,6 +3,7 @@ Tests pour le service de diffusion WebSocket de la partie en cours.
 """
 from decimal import Decimal
 
+from channels.layers import get_channel_layer
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 
@@ -33,3 +34,17 @@ class GameBroadcastTestCase(TestCase):
             longitude=Decimal("2.3522"),
         )
         game_broadcast.broadcast_position_updated(position)
+
+    async def test_async_broadcasts_reach_game_group(self):
+        """Test que les variantes async (acteur) diffusent directement sur le groupe game."""
+        channel_layer = get_channel_layer()
+        channel = await channel_layer.new_channel()
+        await channel_layer.group_add(game_broadcast.get_game_group_name(7), channel)
+
+        await game_broadcast.abroadcast_score_updated(7, 3, 2, 12)
+        await game_broadcast.abroadcast_role_changed(7, 3, PlayerRole.SPIRIT)
+
+        score = await channel_layer.receive(channel)
+        role = await channel_layer.receive(channel)
+        self.assertEqual((score["type"], score["score"]), ("score_updated", 12))
+        self.assertEqual((role["type"], role["role"]), ("role_changed", PlayerRole.SPIRIT))
@@ -0,0 +1,97 @@
+"""
+Tests pour le service de suppression en masse (game_deletion).
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import pre_delete
+from django.test import TestCase
+
+from games.models import Game, Player
+from games.services.game_deletion import delete_game, delete_player
+from locations.models import Position
+
+User = get_user_model()
+
+
+class GameDeletionTestCase(TestCase):
+    """Tests pour delete_game et delete_player."""
+
+    def setUp(self):
+        """Configuration initiale pour tous les tests."""
+        self.game = Game.objects.create(code="ABC123")
+        self.other_game = Game.objects.create(code="XYZ789")
+        self.players = []
+        for index in range(3):
+            user = User.objects.create_user(
+                username=f"player{index}",
+                email=f"player{index}@test.com",
+            )
+            player = Player.objects.create(user=user, game=self.game)
+            self._create_positions(player, count=4)
+            self.players.append(player)
+        other_user = User.objects.create_user(username="other", email="other@test.com")
+        self.other_player = Player.objects.create(user=other_user, game=self.other_game)
+        self._create_positions(self.other_player, count=2)
+
+    def _create_positions(self, player, count):
+        """Crée des positions pour un joueur."""
+        Position.objects.bulk_create(
+            Position(
+                player=player,
+                latitude=Decimal("48.8566"),
+                longitude=Decimal("2.3522"),
+            )
+            for _ in range(count)
+        )
+
+    def test_delete_game_removes_game_players_and_positions(self):
+        """Test que delete_game supprime la partie, ses joueurs et leurs positions."""
+        counts = delete_game(self.game.id, chunk_size=5)
+
+        self.assertEqual(counts, {"positions": 12, "players": 3, "games": 1})
+        self.assertFalse(Game.objects.filter(pk=self.game.id).exists())
+        self.assertFalse(Player.objects.filter(game_id=self.game.id).exists())
+        self.assertEqual(Position.objects.count(), 2)
+
+    def test_delete_game_keeps_other_games(self):
+        """Test que delete_game ne touche pas aux autres parties."""
+        delete_game(self.game.id)
+
+        self.assertTrue(Game.objects.filter(pk=self.other_game.id).exists())
+        self.assertTrue(Player.objects.filter(pk=self.other_player.id).exists())
+        self.assertEqual(
+            Position.objects.filter(player=self.other_player).count(), 2
+        )
+
+    def test_delete_game_unknown_id_is_noop(self):
+        """Test que delete_game sur un identifiant inconnu ne supprime rien."""
+        counts = delete_game(999999)
+
+        self.assertEqual(counts, {"positions": 0, "players": 0, "games": 0})
+        self.assertEqual(Game.objects.count(), 2)
+
+    def test_delete_player_removes_player_and_positions(self):
+        """Test que delete_player supprime le joueur et son historique."""
+        target = self.players[0]
+
+        deleted = delete_player(target.id, chunk_size=3)
+
+        self.assertEqual(deleted, 4)
+        self.assertFalse(Player.objects.filter(pk=target.id).exists())
+        self.assertEqual(Position.objects.filter(player__game=self.game).count(), 8)
+
+    def test_delete_game_does_not_use_collector(self):
+        """Test que la suppression n'instancie pas les lignes (aucun signal pre_delete)."""
+        received = []
+
+        def _receiver(sender, instance, **kwargs):
+            received.append(instance)
+
+        pre_delete.connect(_receiver)
+        try:
+            delete_game(self.game.id)
+        finally:
+            pre_delete.disconnect(_receiver)
+
+        self.assertEqual(received, [])
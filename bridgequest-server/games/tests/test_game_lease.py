@@ -0,0 +1,88 @@
+"""
+Tests pour les baux de parties (game_lease).
+"""
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from games.services import game_lease
+
+
+class GameLeaseTestCase(TestCase):
+    """Tests pour l'acquisition, le renouvellement et la libération des baux."""
+
+    def setUp(self):
+        """Configuration initiale pour tous les tests."""
+        cache.clear()
+
+    def test_acquire_lease_is_exclusive(self):
+        """Test qu'un seul worker peut détenir le bail d'une partie."""
+        self.assertTrue(game_lease.acquire_lease(1, "worker-a", 10))
+        self.assertFalse(game_lease.acquire_lease(1, "worker-b", 10))
+        self.assertEqual(game_lease.get_lease_owner(1), "worker-a")
+
+    def test_acquire_lease_is_reentrant_for_owner(self):
+        """Test que le propriétaire peut ré-acquérir son bail."""
+        game_lease.acquire_lease(1, "worker-a", 10)
+        self.assertTrue(game_lease.acquire_lease(1, "worker-a", 10))
+
+    def test_renew_lease_only_for_owner(self):
+        """Test que seul le propriétaire peut renouveler le bail."""
+        game_lease.acquire_lease(1, "worker-a", 10)
+        self.assertTrue(game_lease.renew_lease(1, "worker-a", 10))
+        self.assertFalse(game_lease.renew_lease(1, "worker-b", 10))
+
+    def test_release_lease_only_for_owner(self):
+        """Test que seul le propriétaire peut libérer le bail."""
+        game_lease.acquire_lease(1, "worker-a", 10)
+
+        game_lease.release_lease(1, "worker-b")
+        self.assertEqual(game_lease.get_lease_owner(1), "worker-a")
+
+        game_lease.release_lease(1, "worker-a")
+        self.assertIsNone(game_lease.get_lease_owner(1))
+        self.assertTrue(game_lease.acquire_lease(1, "worker-b", 10))
+
+    def test_generate_worker_id_is_unique(self):
+        """Test que deux identifiants de worker générés sont distincts."""
+        self.assertNotEqual(
+            game_lease.generate_worker_id(), game_lease.generate_worker_id()
+        )
+
+
+class RedisGameLeaseTestCase(TestCase):
+    """Tests que les baux passent par des opérations Redis atomiques."""
+
+    def setUp(self):
+        """Configuration initiale pour tous les tests."""
+        self.client_redis = MagicMock()
+        patcher = patch(
+            "games.services.game_lease.get_redis_client", return_value=self.client_redis
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.key = cache.make_and_validate_key("game_lease:1")
+
+    def test_acquire_lease_uses_set_nx(self):
+        """Test que l'acquisition est un SET NX avec TTL en millisecondes."""
+        self.client_redis.set.return_value = True
+
+        self.assertTrue(game_lease.acquire_lease(1, "worker-a", 10))
+        self.client_redis.set.assert_called_once_with(self.key, "worker-a", nx=True, px=10000)
+
+    def test_renew_and_release_are_compare_and_set_scripts(self):
+        """Test que renouvellement et libération sont des scripts Lua (compare-and-set)."""
+        script = self.client_redis.register_script.return_value
+        script.return_value = 0
+
+        self.assertFalse(game_lease.renew_lease(1, "worker-a", 10))
+        game_lease.release_lease(1, "worker-a")
+
+        self.assertEqual(
+            [call.args[0] for call in self.client_redis.register_script.call_args_list],
+            [game_lease._RENEW_SCRIPT, game_lease._RELEASE_SCRIPT],
+        )
+        script.assert_any_call(keys=[self.key], args=["worker-a", 10000])
+        script.assert_called_with(keys=[self.key], args=["worker-a"])
+        self.client_redis.delete.assert_not_called()
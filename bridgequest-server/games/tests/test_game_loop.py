@@ -0,0 +1,198 @@
+"""
+Tests pour la boucle de jeu serveur (game_loop).
+"""
+import asyncio
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from channels.layers import get_channel_layer
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from games.models import Game, GameState, Player, PlayerRole
+from games.services import game_lease
+from games.services.game_loop import (
+    GameLoop,
+    GameLoopRunner,
+    GameRule,
+    RoleChangedEvent,
+    ScoreAwardedEvent,
+)
+from locations.models import Position
+
+User = get_user_model()
+
+
+class _ConvertFirstHumanRule(GameRule):
+    """Règle de test : convertit en Esprit le premier Humain ayant une position."""
+
+    def evaluate(self, state, now):
+        for player_id, role in sorted(state.roles.items()):
+            if role == PlayerRole.HUMAN and player_id in state.positions:
+                return [
+                    RoleChangedEvent(player_id, PlayerRole.SPIRIT),
+                    ScoreAwardedEvent(player_id, 1),
+                ]
+        return []
+
+
+@override_settings(GAME_LOOP_TICK_RATE_HZ=50, GAME_LOOP_LEASE_TTL_SECONDS=10)
+@patch("games.services.score_service.game_broadcast.broadcast_score_updated")
+@patch("games.services.game_loop.game_broadcast.broadcast_role_changed")
+class GameLoopTestCase(TestCase):
+    """Tests pour GameLoop et GameLoopRunner."""
+
+    def setUp(self):
+        """Configuration initiale pour tous les tests."""
+        cache.clear()
+        self.game = Game.objects.create(code="ABC123", state=GameState.IN_PROGRESS)
+        self.alice = Player.objects.create(
+            user=User.objects.create_user(username="alice", email="alice@test.com"),
+            game=self.game,
+        )
+        self.bob = Player.objects.create(
+            user=User.objects.create_user(username="bob", email="bob@test.com"),
+            game=self.game,
+        )
+        Position.objects.create(
+            player=self.bob,
+            latitude=Decimal("48.8566"),
+            longitude=Decimal("2.3522"),
+        )
+
+    async def test_load_state_reads_roster_and_latest_positions(self, mock_role, mock_score):
+        """Test que l'état initial contient les rôles et les dernières positions."""
+        game_loop = GameLoop(self.game.id, "worker-a", [])
+
+        await game_loop.load_state()
+
+        self.assertEqual(
+            game_loop.state.roles,
+            {self.alice.id: PlayerRole.HUMAN, self.bob.id: PlayerRole.HUMAN},
+        )
+        self.assertEqual(list(game_loop.state.positions), [self.bob.id])
+
+    async def test_tick_persists_rule_events(self, mock_role, mock_score):
+        """Test qu'un tick écrit et diffuse uniquement les événements produits."""
+        game_loop = GameLoop(self.game.id, "worker-a", [_ConvertFirstHumanRule()])
+        await game_loop.load_state()
+
+        events = await game_loop.tick()
+
+        self.assertEqual(len(events), 2)
+        self.assertEqual(game_loop.state.roles[self.bob.id], PlayerRole.SPIRIT)
+        bob = await Player.objects.aget(pk=self.bob.id)
+        self.assertEqual(bob.role, PlayerRole.SPIRIT)
+        self.assertEqual(bob.score, 1)
+        mock_role.assert_called_once_with(self.game.id, self.bob.id, PlayerRole.SPIRIT)
+
+    @override_settings(GAME_LOOP_DEPLOYMENT_SECONDS=60)
+    @patch("games.services.game_loop.game_broadcast.abroadcast_game_state_changed")
+    async def test_deployment_ends_after_delay(self, mock_state, mock_role, mock_score):
+        """Test que la partie passe en IN_PROGRESS après le déploiement, sans règle avant."""
+        await Game.objects.filter(pk=self.game.id).aupdate(state=GameState.DEPLOYMENT)
+        game_loop = GameLoop(self.game.id, "worker-a", [_ConvertFirstHumanRule()])
+        await game_loop.load_state()
+        deployed_at = game_loop.state.phase_started_at
+
+        during = await game_loop.tick(deployed_at + timedelta(seconds=30))
+        after = await game_loop.tick(deployed_at + timedelta(seconds=60))
+        playing = await game_loop.tick(deployed_at + timedelta(seconds=61))
+
+        self.assertEqual((during, after), ([], []))
+        self.assertEqual(playing, [
+            RoleChangedEvent(self.bob.id, PlayerRole.SPIRIT), ScoreAwardedEvent(self.bob.id, 1),
+        ])
+        game = await Game.objects.aget(pk=self.game.id)
+        self.assertEqual(game.state, GameState.IN_PROGRESS)
+        mock_state.assert_called_once_with(self.game.id, GameState.IN_PROGRESS)
+
+    @override_settings(GAME_LOOP_DEPLOYMENT_SECONDS=0)
+    @patch("games.services.game_loop.game_broadcast.abroadcast_game_state_changed")
+    async def test_deployment_end_stops_loop_of_finished_game(
+        self, mock_state, mock_role, mock_score
+    ):
+        """Test que la boucle s'arrête si la partie a quitté DEPLOYMENT (terminée entre-temps)."""
+        await Game.objects.filter(pk=self.game.id).aupdate(state=GameState.DEPLOYMENT)
+        game_loop = GameLoop(self.game.id, "worker-a", [])
+        await game_loop.load_state()
+        await Game.objects.filter(pk=self.game.id).aupdate(state=GameState.FINISHED)
+
+        await game_loop.tick(timezone.now())
+
+        self.assertTrue(game_loop.stopped)
+        mock_state.assert_not_called()
+
+    async def test_ingested_position_is_used_without_db(self, mock_role, mock_score):
+        """Test que les positions reçues du groupe alimentent l'état en mémoire."""
+        game_loop = GameLoop(self.game.id, "worker-a", [_ConvertFirstHumanRule()])
+        await game_loop.load_state()
+        game_loop.state.roles[self.bob.id] = PlayerRole.SPIRIT
+
+        game_loop.ingest({
+            "type": "position_updated",
+            "player_id": self.alice.id,
+            "latitude": "48.000001",
+            "longitude": "2.000001",
+            "recorded_at": "2026-01-01T12:00:00+00:00",
+        })
+        events = await game_loop.tick()
+
+        self.assertEqual(events[0], RoleChangedEvent(self.alice.id, PlayerRole.SPIRIT))
+
+    async def test_game_finished_message_stops_loop(self, mock_role, mock_score):
+        """Test que game_finished arrête la boucle et libère le bail."""
+        await asyncio.to_thread(game_lease.acquire_lease, self.game.id, "worker-a", 10)
+        game_loop = GameLoop(self.game.id, "worker-a", [])
+        task = asyncio.create_task(game_loop.run())
+        await asyncio.sleep(0.05)
+
+        await get_channel_layer().group_send(
+            f"game_{self.game.id}",
+            {"type": "game_finished", "game_id": self.game.id, "state": GameState.FINISHED},
+        )
+        await asyncio.wait_for(task, timeout=2)
+
+        self.assertTrue(game_loop.stopped)
+        self.assertIsNone(await asyncio.to_thread(game_lease.get_lease_owner, self.game.id))
+
+    async def test_runner_starts_one_loop_per_leased_game(self, mock_role, mock_score):
+        """Test que le runner ne démarre une boucle que pour les parties dont il obtient le bail."""
+        other_game = await Game.objects.acreate(code="XYZ789", state=GameState.IN_PROGRESS)
+        await asyncio.to_thread(game_lease.acquire_lease, other_game.id, "worker-b", 10)
+        runner = GameLoopRunner(worker_id="worker-a", rules=[])
+
+        async def _run_until_cancelled():
+            await asyncio.Event().wait()
+
+        with patch.object(GameLoop, "run", side_effect=_run_until_cancelled) as mock_run:
+            started = await runner.discover()
+            again = await runner.discover()
+            for task in runner.loops.values():
+                task.cancel()
+
+        self.assertEqual(started, [self.game.id])
+        self.assertEqual(again, [])
+        self.assertEqual(mock_run.call_count, 1)
+
+    async def test_runner_logs_crashed_loop(self, mock_role, mock_score):
+        """Test que le runner journalise l'exception d'une boucle arrêtée avant de l'oublier."""
+        runner = GameLoopRunner(worker_id="worker-a", rules=[])
+
+        async def _crash():
+            raise ValueError("règle invalide")
+
+        with patch.object(GameLoop, "run", side_effect=_crash):
+            await runner.discover()
+            await asyncio.gather(*runner.loops.values(), return_exceptions=True)
+            await asyncio.to_thread(game_lease.release_lease, self.game.id, "worker-a")
+            with self.assertLogs("bridgequest.game_loop", level="ERROR") as logs:
+                await runner.discover()
+            for task in runner.loops.values():
+                task.cancel()
+
+        self.assertIn(f"partie {self.game.id}", logs.output[0])
+        self.assertIn("ValueError", logs.output[0])
@@ -0,0 +1,139 @@
+"""
+Tests pour le service de nettoyage des parties abandonnées (game_reaper).
+"""
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from games.models import Game, GameState, Player
+from games.services import game_reaper, join_game, lobby_service
+from locations.models import Position
+
+User = get_user_model()
+
+
+@override_settings(
+    GAME_REAPER_WAITING_TIMEOUT_MINUTES=60,
+    GAME_REAPER_ACTIVE_TIMEOUT_MINUTES=120,
+    GAME_REAPER_FINISHED_RETENTION_DAYS=7,
+    GAME_REAPER_CHUNK_SIZE=2,
+)
+@patch("games.services.game_reaper.game_broadcast.broadcast_game_finished")
+@patch("games.services.game_reaper.lobby_broadcast.broadcast_game_deleted")
+class GameReaperTestCase(TestCase):
+    """Tests pour reap_stale_games."""
+
+    def setUp(self):
+        """Configuration initiale pour tous les tests."""
+        self.now = timezone.now()
+        self.user = User.objects.create_user(username="player", email="player@test.com")
+
+    def _create_game(self, code, state, age):
+        """Crée une partie avec un joueur, inactive depuis age."""
+        game = Game.objects.create(code=code, state=state)
+        Player.objects.create(user=self.user, game=game, is_admin=True)
+        Game.objects.filter(pk=game.pk).update(updated_at=self.now - age)
+        return game
+
+    def test_stale_waiting_games_are_deleted(self, mock_deleted, mock_finished):
+        """Test que les parties WAITING inactives sont supprimées et diffusées."""
+        stale = [
+            self._create_game(f"WAIT0{i}", GameState.WAITING, timedelta(hours=2))
+            for i in range(3)
+        ]
+        fresh = self._create_game("FRESH1", GameState.WAITING, timedelta(minutes=5))
+
+        summary = game_reaper.reap_stale_games(now=self.now)
+
+        self.assertEqual(summary["waiting_deleted"], 3)
+        self.assertFalse(Game.objects.filter(pk__in=[g.pk for g in stale]).exists())
+        self.assertTrue(Game.objects.filter(pk=fresh.pk).exists())
+        self.assertEqual(mock_deleted.call_count, 3)
+
+    def test_waiting_game_with_recent_join_is_kept(self, mock_deleted, mock_finished):
+        """Test qu'une arrivée récente rafraîchit la partie : le lobby peuplé est conservé."""
+        game = self._create_game("WAIT01", GameState.WAITING, timedelta(hours=2))
+        joiner = User.objects.create_user(username="joiner", email="joiner@test.com")
+        join_game(game.code, joiner)
+
+        summary = game_reaper.reap_stale_games(now=self.now)
+
+        self.assertEqual(summary["waiting_deleted"], 0)
+        self.assertTrue(Game.objects.filter(pk=game.pk).exists())
+
+    def test_stale_waiting_game_purges_pending_exclusions(self, mock_deleted, mock_finished):
+        """Test que les clés lobby_pending_exclusion de la partie sont purgées."""
+        game = self._create_game("WAIT01", GameState.WAITING, timedelta(hours=2))
+        player = Player.objects.get(game=game)
+        lobby_service.mark_player_disconnected(game.id, player.id)
+
+        game_reaper.reap_stale_games(now=self.now)
+
+        self.assertIsNone(cache.get(f"lobby_pending_exclusion:{game.id}:{player.id}"))
+
+    def test_stale_active_games_are_finished(self, mock_deleted, mock_finished):
+        """Test que les parties actives inactives passent en FINISHED."""
+        in_progress = self._create_game("PROG01", GameState.IN_PROGRESS, timedelta(hours=3))
+        deployment = self._create_game("DEPL01", GameState.DEPLOYMENT, timedelta(hours=3))
+
+        summary = game_reaper.reap_stale_games(now=self.now)
+
+        self.assertEqual(summary["active_finished"], 2)
+        for game in (in_progress, deployment):
+            game.refresh_from_db()
+            self.assertEqual(game.state, GameState.FINISHED)
+        self.assertEqual(mock_finished.call_count, 2)
+
+    def test_active_game_with_recent_positions_is_kept(self, mock_deleted, mock_finished):
+        """Test qu'une partie avec des positions récentes n'est pas terminée."""
+        game = self._create_game("PROG01", GameState.IN_PROGRESS, timedelta(hours=3))
+        Position.objects.create(
+            player=Player.objects.get(game=game),
+            latitude=Decimal("48.8566"),
+            longitude=Decimal("2.3522"),
+        )
+
+        summary = game_reaper.reap_stale_games(now=self.now)
+
+        self.assertEqual(summary["active_finished"], 0)
+        game.refresh_from_db()
+        self.assertEqual(game.state, GameState.IN_PROGRESS)
+        self.assertGreater(game.updated_at, self.now - timedelta(minutes=1))
+        mock_finished.assert_not_called()
+
+    def test_expired_finished_games_are_deleted(self, mock_deleted, mock_finished):
+        """Test que les parties FINISHED au-delà de la rétention sont supprimées."""
+        expired = self._create_game("DONE01", GameState.FINISHED, timedelta(days=10))
+        recent = self._create_game("DONE02", GameState.FINISHED, timedelta(days=1))
+
+        summary = game_reaper.reap_stale_games(now=self.now)
+
+        self.assertEqual(summary["finished_deleted"], 1)
+        self.assertFalse(Game.objects.filter(pk=expired.pk).exists())
+        self.assertTrue(Game.objects.filter(pk=recent.pk).exists())
+
+    @override_settings(GAME_REAPER_FINISHED_RETENTION_DAYS=0)
+    def test_zero_retention_keeps_finished_games(self, mock_deleted, mock_finished):
+        """Test qu'une rétention à 0 conserve les parties FINISHED."""
+        game = self._create_game("DONE01", GameState.FINISHED, timedelta(days=365))
+
+        summary = game_reaper.reap_stale_games(now=self.now)
+
+        self.assertEqual(summary["finished_deleted"], 0)
+        self.assertTrue(Game.objects.filter(pk=game.pk).exists())
+
+    def test_management_command_runs_single_pass(self, mock_deleted, mock_finished):
+        """Test que la commande reap_stale_games affiche le résumé d'un passage."""
+        self._create_game("WAIT01", GameState.WAITING, timedelta(days=1))
+        out = StringIO()
+
+        call_command("reap_stale_games", stdout=out)
+
+        self.assertIn("waiting_deleted=1", out.getvalue())
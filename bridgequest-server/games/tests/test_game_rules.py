@@ -0,0 +1,100 @@
+"""
+Tests pour les règles de jeu (game_rules).
+"""
+from datetime import timedelta
+
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+
+from games.models import PlayerRole
+from games.services.game_loop import (
+    GameLoopState,
+    GameRule,
+    RoleChangedEvent,
+    ScoreAwardedEvent,
+    load_rules,
+)
+from games.services.game_rules import SpiritConversionRule, _distance_meters
+
+# Environ 11 mètres par 0.0001 degré de latitude
+_ORIGIN = (48.8566, 2.3522)
+
+
+@override_settings(
+    GAME_RULE_CONVERSION_RADIUS_METERS=15,
+    GAME_RULE_CONVERSION_POINTS=2,
+    GAME_RULE_POSITION_MAX_AGE_SECONDS=60,
+)
+class SpiritConversionRuleTestCase(SimpleTestCase):
+    """Tests pour SpiritConversionRule."""
+
+    def setUp(self):
+        """Configuration initiale pour tous les tests."""
+        self.now = timezone.now()
+        self.rule = SpiritConversionRule()
+
+    def _state(self, players):
+        """Construit un état : players = {player_id: (role, degrés au nord, âge en secondes)}."""
+        roles = {player_id: role for player_id, (role, _, _) in players.items()}
+        positions = {
+            player_id: (
+                _ORIGIN[0] + north, _ORIGIN[1], self.now - timedelta(seconds=age)
+            )
+            for player_id, (_, north, age) in players.items()
+        }
+        return GameLoopState(1, roles, positions)
+
+    def test_distance_is_haversine(self):
+        """Test que la distance est calculée en mètres (0.0001° de latitude ≈ 11 m)."""
+        distance = _distance_meters(_ORIGIN, (_ORIGIN[0] + 0.0001, _ORIGIN[1]))
+
+        self.assertAlmostEqual(distance, 11.1, delta=0.1)
+
+    def test_human_in_radius_is_converted_by_nearest_spirit(self):
+        """Test qu'un Humain au contact devient Esprit et que l'Esprit le plus proche marque."""
+        state = self._state({
+            1: (PlayerRole.HUMAN, 0, 0),
+            2: (PlayerRole.SPIRIT, 0.0001, 0),
+            3: (PlayerRole.SPIRIT, 0.00005, 0),
+            4: (PlayerRole.HUMAN, 0.01, 0),
+        })
+
+        events = self.rule.evaluate(state, self.now)
+
+        self.assertEqual(events, [
+            RoleChangedEvent(1, PlayerRole.SPIRIT), ScoreAwardedEvent(3, 2),
+        ])
+
+    def test_stale_positions_are_ignored(self):
+        """Test qu'une position trop ancienne (joueur déconnecté) ne convertit pas."""
+        state = self._state({
+            1: (PlayerRole.HUMAN, 0, 0),
+            2: (PlayerRole.SPIRIT, 0, 120),
+        })
+
+        self.assertEqual(self.rule.evaluate(state, self.now), [])
+
+    def test_start_designates_one_spirit(self):
+        """Test que le passage en IN_PROGRESS désigne un seul premier Esprit."""
+        state = self._state({1: (PlayerRole.HUMAN, 0, 0), 2: (PlayerRole.HUMAN, 0, 0)})
+
+        events = self.rule.start(state, self.now)
+
+        self.assertEqual(len(events), 1)
+        self.assertIn(events[0].player_id, (1, 2))
+        self.assertEqual(events[0].role, PlayerRole.SPIRIT)
+
+    def test_start_keeps_existing_spirit(self):
+        """Test qu'aucun Esprit n'est désigné si la partie en compte déjà un."""
+        state = self._state({1: (PlayerRole.HUMAN, 0, 0), 2: (PlayerRole.SPIRIT, 0, 0)})
+
+        self.assertEqual(self.rule.start(state, self.now), [])
+
+    def test_default_rules_are_loaded(self):
+        """Test que la règle de conversion est configurée par défaut."""
+        self.assertEqual([type(rule) for rule in load_rules()], [SpiritConversionRule])
+
+    def test_rule_without_evaluate_cannot_be_instantiated(self):
+        """Test que GameRule impose l'implémentation d'evaluate()."""
+        with self.assertRaises(TypeError):
+            type("IncompleteRule", (GameRule,), {})()
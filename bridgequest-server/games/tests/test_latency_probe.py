@@ -0,0 +1,144 @@
+"""
+Tests pour la sonde de latence des positions (latency_probe, ping / ack).
+"""
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from games.consumers import GameConsumer
+from games.models import Game, GameState, Player
+from games.services import latency_probe
+from games.services.game_broadcast import get_game_group_name
+from utils import metrics
+
+User = get_user_model()
+
+
+class LatencyProbeTestCase(TestCase):
+    """Tests pour l'agrégation des acquittements."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        cache.clear()
+        metrics.reset()
+        latency_probe.reset()
+        self.addCleanup(latency_probe.reset)
+
+    def _ack(self, game_id, delivery_ms):
+        """Acquitte une position livrée en delivery_ms."""
+        timing = {"ingested_at": 1000.0, "broadcast_at": 1001.0, "sent_at": 1002.0}
+        return latency_probe.record_ack(game_id, timing, 1000.0 + delivery_ms)
+
+    def test_percentiles_per_game_and_worker(self):
+        """Test que les percentiles sont calculés par partie et par worker."""
+        for delivery_ms in range(1, 101):
+            self._ack(1, delivery_ms)
+        self._ack(2, 40)
+
+        summary = latency_probe.collect_latency_summary()
+
+        self.assertEqual(
+            summary["games"][1],
+            {"count": 100, "p50_ms": 50.0, "p95_ms": 95.0, "p99_ms": 99.0},
+        )
+        self.assertEqual(summary["games"][2]["p99_ms"], 40.0)
+        self.assertEqual(summary["workers"][metrics.get_worker_id()][2]["count"], 1)
+
+    def test_ack_is_published_by_metrics_flush(self):
+        """Test que l'acquittement n'écrit pas le cache : utils.metrics le publie."""
+        key = f"latency_probe:{metrics.get_worker_id()}"
+
+        self._ack(1, 20)
+        self.assertIsNone(cache.get(key))
+
+        metrics.flush()
+        self.assertEqual(cache.get(key), {1: [0.02]})
+
+    def test_invalid_acks_are_ignored(self):
+        """Test qu'un acquittement incomplet ou incohérent est ignoré."""
+        self.assertFalse(latency_probe.record_ack(1, {"ingested_at": 1000.0}, 1010.0))
+        self.assertFalse(latency_probe.record_ack(1, "timing", 1010.0))
+        self.assertFalse(self._ack(1, -5))
+        self.assertFalse(self._ack(1, 3_600_000))
+
+        self.assertEqual(latency_probe.collect_latency_summary()["games"], {})
+
+    @override_settings(LATENCY_PROBE_SAMPLE_SIZE=10)
+    def test_reservoir_keeps_latest_samples(self):
+        """Test que le réservoir d'une partie ne garde que les derniers acquittements."""
+        for delivery_ms in range(1, 31):
+            self._ack(1, delivery_ms)
+
+        summary = latency_probe.collect_latency_summary()["games"][1]
+
+        self.assertEqual((summary["count"], summary["p50_ms"]), (10, 25.0))
+
+    def test_endpoint_is_internal(self):
+        """Test que /internal/latency/ est réservé aux adresses autorisées."""
+        self._ack(1, 20)
+
+        response = self.client.get(reverse("latency-probe"))
+        refused = self.client.get(reverse("latency-probe"), REMOTE_ADDR="10.0.0.1")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["games"]["1"]["count"], 1)
+        self.assertEqual(refused.status_code, 404)
+
+
+class LatencyProtocolTestCase(TestCase):
+    """Tests pour le protocole ping / ack du GameConsumer."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        cache.clear()
+        metrics.reset()
+        latency_probe.reset()
+        self.addCleanup(latency_probe.reset)
+        self.user = User.objects.create_user(username="alice", email="alice@test.com")
+        self.game = Game.objects.create(code="ABC123", state=GameState.IN_PROGRESS)
+        Player.objects.create(user=self.user, game=self.game)
+
+    async def _connect(self):
+        """Connecte un client au canal game et consomme le message connected."""
+        communicator = WebsocketCommunicator(GameConsumer.as_asgi(), f"/ws/game/{self.game.id}/")
+        communicator.scope["user"] = self.user
+        communicator.scope["url_route"] = {"kwargs": {"game_id": self.game.id}}
+        await communicator.connect()
+        await communicator.receive_json_from()
+        return communicator
+
+    async def test_ping_returns_server_time_and_processing_time(self):
+        """Test que ping renvoie l'heure serveur et le temps de traitement."""
+        communicator = await self._connect()
+
+        await communicator.send_json_to({"type": "ping", "client_time": 123})
+        pong = await communicator.receive_json_from()
+        await communicator.disconnect()
+
+        self.assertEqual((pong["type"], pong["client_time"]), ("pong", 123))
+        self.assertGreaterEqual(pong["processing_ms"], 0)
+        self.assertAlmostEqual(pong["server_time"], latency_probe.now_ms(), delta=5000)
+
+    async def test_position_is_stamped_and_ack_recorded(self):
+        """Test que position_updated est horodaté et que l'ack alimente la sonde."""
+        communicator = await self._connect()
+        ingested_at = latency_probe.now_ms() - 30
+
+        await get_channel_layer().group_send(get_game_group_name(self.game.id), {
+            "type": "position_updated",
+            "player_id": 1,
+            "timing": latency_probe.build_timing(ingested_at),
+        })
+        frame = await communicator.receive_json_from()
+        timing = frame["timing"]
+        await communicator.send_json_to({
+            "type": "ack", "timing": timing, "received_at": timing["sent_at"] + 10,
+        })
+        await communicator.disconnect()
+
+        self.assertLessEqual(timing["ingested_at"], timing["broadcast_at"])
+        self.assertLessEqual(timing["broadcast_at"], timing["sent_at"])
+        self.assertGreaterEqual(latency_probe._samples[self.game.id][0], 0.04)
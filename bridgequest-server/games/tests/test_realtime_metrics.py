@@ -0,0 +1,126 @@
+"""
+Tests pour les métriques temps réel (consumers WebSocket, group_send).
+"""
+from unittest.mock import AsyncMock, MagicMock
+
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import TestCase
+
+from games.consumers import GameConsumer, LobbyConsumer
+from games.models import Game, GameState, Player
+from games.services import lobby_broadcast, realtime_metrics
+from utils import metrics
+
+User = get_user_model()
+
+
+def _value(name, **labels):
+    """Valeur d'une série du processus (0 si absente)."""
+    key = (name, tuple(sorted(labels.items())))
+    return metrics.snapshot().get(key, 0)
+
+
+class RealtimeMetricsTestCase(TestCase):
+    """Tests pour l'instrumentation des consumers et du channel layer."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        cache.clear()
+        metrics.reset()
+        self.user = User.objects.create_user(username="alice", email="alice@test.com")
+        self.game = Game.objects.create(code="ABC123", state=GameState.IN_PROGRESS)
+        self.player = Player.objects.create(user=self.user, game=self.game)
+
+    def _communicator(self, consumer, user):
+        """Construit un communicator WebSocket pour la partie de test."""
+        communicator = WebsocketCommunicator(consumer.as_asgi(), f"/ws/{self.game.id}/")
+        communicator.scope["user"] = user
+        communicator.scope["url_route"] = {"kwargs": {"game_id": self.game.id}}
+        return communicator
+
+    async def test_refused_connection_is_counted_by_close_code(self):
+        """Test qu'un refus est compté avec le motif de son code de fermeture."""
+        communicator = self._communicator(LobbyConsumer, AnonymousUser())
+
+        connected, code = await communicator.connect()
+
+        self.assertFalse(connected)
+        self.assertEqual(code, 4001)
+        self.assertEqual(_value("ws_connect_total", channel="lobby", outcome="unauthorized"), 1)
+        self.assertEqual(_value("ws_connect_duration_seconds", channel="lobby")[2], 1)
+        self.assertEqual(_value("ws_connections", channel="lobby", game=self.game.id), 0)
+
+    async def test_connection_lifecycle_is_measured(self):
+        """Test l'issue, la jauge de connexions et les trames d'une connexion acceptée."""
+        communicator = self._communicator(GameConsumer, self.user)
+
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        connected_frame = await communicator.receive_from()
+
+        self.assertEqual(_value("ws_connect_total", channel="game", outcome="accepted"), 1)
+        self.assertEqual(_value("ws_connections", channel="game", game=self.game.id), 1)
+        self.assertEqual(_value("ws_frames_sent_total", channel="game", type="connected"), 1)
+        self.assertEqual(
+            _value("ws_bytes_sent_total", channel="game", type="connected"),
+            len(connected_frame.encode()),
+        )
+
+        await communicator.disconnect()
+
+        # La série de la partie est supprimée, pas conservée à zéro
+        self.assertNotIn(
+            ("ws_connections", (("channel", "game"), ("game", self.game.id))), metrics.snapshot()
+        )
+
+    async def test_inbound_messages_are_counted_by_known_type(self):
+        """Test que les types de messages inconnus sont regroupés sous « other »."""
+        communicator = self._communicator(GameConsumer, self.user)
+        await communicator.connect()
+        await communicator.receive_from()
+
+        await communicator.send_json_to({"type": "hello"})
+        await communicator.receive_json_from()
+        await communicator.disconnect()
+
+        self.assertEqual(_value("ws_messages_received_total", channel="game", type="other"), 1)
+        self.assertEqual(_value("ws_frames_sent_total", channel="game", type="echo"), 1)
+
+    async def test_group_send_records_latency_and_fanout(self):
+        """Test que group_send mesure la latence et le nombre de membres du groupe."""
+        channel_layer = get_channel_layer()
+        group = lobby_broadcast.get_lobby_group_name(self.game.id)
+        for _ in range(3):
+            await channel_layer.group_add(group, await channel_layer.new_channel())
+
+        await realtime_metrics.group_send(group, {"type": "game_deleted", "game_id": self.game.id})
+
+        latency = _value("channel_group_send_duration_seconds", group="lobby", event="game_deleted")
+        fanout = _value("channel_group_send_fanout", group="lobby")
+        self.assertEqual(latency[2], 1)
+        self.assertEqual((fanout[1], fanout[2]), (3, 1))
+
+    async def test_redis_group_size_is_sampled(self):
+        """Test que le ZCARD du fan-out n'est émis que sur la fraction échantillonnée."""
+        connection = MagicMock()
+        connection.zcard = AsyncMock(return_value=4)
+        channel_layer = MagicMock(
+            spec=["group_send", "_group_key", "connection", "consistent_hash"]
+        )
+        channel_layer.group_send = AsyncMock()
+        channel_layer.connection.return_value = connection
+        message = {"type": "game_deleted", "game_id": self.game.id}
+
+        with self.settings(CHANNEL_GROUP_FANOUT_SAMPLE_RATE=0.0):
+            await realtime_metrics.group_send("lobby_1", message, channel_layer)
+        connection.zcard.assert_not_called()
+        self.assertEqual(_value("channel_group_send_fanout", group="lobby"), 0)
+
+        with self.settings(CHANNEL_GROUP_FANOUT_SAMPLE_RATE=1.0):
+            await realtime_metrics.group_send("lobby_1", message, channel_layer)
+        connection.zcard.assert_awaited_once()
+        self.assertEqual(_value("channel_group_send_fanout", group="lobby")[1], 4)
@@ -0,0 +1,229 @@
+"""
+Tests pour le service de score et de classement (score_service).
+"""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase
+
+from games.models import Game, GameState, Player
+from games.services import score_service
+from utils.exceptions import PlayerException
+
+User = get_user_model()
+
+
+class _FakeSortedSetClient:
+    """Client Redis minimal (sorted sets) pour tester le classement partagé."""
+
+    def __init__(self):
+        self.sets = {}
+        self.pending = []
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        results, self.pending = [call() for call in self.pending], []
+        return results
+
+    def zadd(self, key, mapping, nx=False):
+        members = self.sets.setdefault(key, {})
+        for member, score in mapping.items():
+            if not (nx and member in members):
+                members[member] = score
+
+    def zscore(self, key, member):
+        self.pending.append(lambda: self.sets.get(key, {}).get(member))
+
+    def zrevrange(self, key, start, end, withscores=False):
+        def call():
+            entries = sorted(self.sets.get(key, {}).items(), key=lambda item: -item[1])
+            return [(member.encode(), float(score)) for member, score in entries[start:end + 1]]
+        self.pending.append(call)
+
+    def delete(self, key):
+        self.sets.pop(key, None)
+
+
+@patch("games.services.score_service.game_broadcast.broadcast_score_updated")
+class ScoreServiceTestCase(TestCase):
+    """Tests pour add_score et get_leaderboard (sans cache Redis)."""
+
+    def setUp(self):
+        """Configuration initiale pour tous les tests."""
+        self.game = Game.objects.create(code="ABC123", state=GameState.IN_PROGRESS)
+        self.players = [
+            Player.objects.create(
+                user=User.objects.create_user(
+                    username=f"player{index}",
+                    email=f"player{index}@test.com",
+                ),
+                game=self.game,
+            )
+            for index in range(3)
+        ]
+
+    def test_add_score_increments_and_returns_new_score(self, mock_broadcast):
+        """Test que add_score incrémente le score en base et retourne la nouvelle valeur."""
+        player = self.players[0]
+
+        score_service.add_score(self.game.id, player.id, 5)
+        score = score_service.add_score(self.game.id, player.id, -2)
+
+        self.assertEqual(score, 3)
+        player.refresh_from_db()
+        self.assertEqual(player.score, 3)
+
+    def test_add_score_broadcasts_delta(self, mock_broadcast):
+        """Test que add_score diffuse score_updated avec le delta et le score."""
+        player = self.players[1]
+
+        score_service.add_score(self.game.id, player.id, 7)
+
+        mock_broadcast.assert_called_once_with(self.game.id, player.id, 7, 7)
+
+    def test_add_score_player_not_in_game_raises(self, mock_broadcast):
+        """Test que add_score lève une exception si le joueur n'est pas dans la partie."""
+        other_game = Game.objects.create(code="XYZ789")
+
+        with self.assertRaises(PlayerException):
+            score_service.add_score(other_game.id, self.players[0].id, 1)
+        mock_broadcast.assert_not_called()
+
+    def test_get_leaderboard_orders_by_score(self, mock_broadcast):
+        """Test que le classement est trié par score décroissant avec les rangs."""
+        score_service.add_score(self.game.id, self.players[0].id, 1)
+        score_service.add_score(self.game.id, self.players[2].id, 10)
+
+        leaderboard = score_service.get_leaderboard(self.game.id, limit=2)
+
+        self.assertEqual(
+            [(entry["rank"], entry["player_id"], entry["score"]) for entry in leaderboard],
+            [(1, self.players[2].id, 10), (2, self.players[0].id, 1)],
+        )
+        self.assertEqual(leaderboard[0]["username"], "player2")
+
+    def test_local_cache_has_no_redis_client(self, mock_broadcast):
+        """Test qu'un cache non Redis (LocMemCache) désactive le classement partagé."""
+        self.assertIsNone(score_service.get_redis_client())
+
+    def test_get_leaderboard_limit_is_bounded(self, mock_broadcast):
+        """Test que la limite est bornée (au moins 1)."""
+        leaderboard = score_service.get_leaderboard(self.game.id, limit=0)
+
+        self.assertEqual(len(leaderboard), 1)
+
+
+@patch("games.services.score_service.game_broadcast.broadcast_score_updated")
+class SharedLeaderboardTestCase(TestCase):
+    """Tests pour le classement partagé (sorted set Redis)."""
+
+    def setUp(self):
+        """Configuration initiale pour tous les tests."""
+        self.client_redis = _FakeSortedSetClient()
+        patcher = patch(
+            "games.services.score_service.get_redis_client",
+            return_value=self.client_redis,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.game = Game.objects.create(code="ABC123", state=GameState.IN_PROGRESS)
+        self.alice = Player.objects.create(
+            user=User.objects.create_user(username="alice", email="alice@test.com"),
+            game=self.game,
+        )
+        self.bob = Player.objects.create(
+            user=User.objects.create_user(username="bob", email="bob@test.com"),
+            game=self.game,
+        )
+
+    def _members(self):
+        """Retourne le contenu du sorted set de la partie (marqueur exclu)."""
+        members = self.client_redis.sets.get(score_service._leaderboard_key(self.game.id), {})
+        return {
+            member: score for member, score in members.items()
+            if member != score_service._SEEDED_MEMBER
+        }
+
+    def _add_score(self, player_id, delta):
+        """Ajoute des points en exécutant les recopies différées au commit."""
+        with self.captureOnCommitCallbacks(execute=True):
+            return score_service.add_score(self.game.id, player_id, delta)
+
+    def test_seed_leaderboard_adds_all_players(self, mock_broadcast):
+        """Test que seed_leaderboard ajoute tous les joueurs à 0."""
+        score_service.seed_leaderboard(self.game.id)
+
+        self.assertEqual(
+            self._members(), {str(self.alice.id): 0, str(self.bob.id): 0}
+        )
+
+    def test_add_score_mirrors_absolute_score(self, mock_broadcast):
+        """Test que add_score recopie le score absolu dans le sorted set."""
+        self._add_score(self.bob.id, 4)
+        self._add_score(self.bob.id, 3)
+
+        self.assertEqual(self._members()[str(self.bob.id)], 7)
+
+    def test_mirror_waits_for_commit(self, mock_broadcast):
+        """Test que la recopie attend le commit et n'a pas lieu après un rollback."""
+        with self.captureOnCommitCallbacks() as callbacks:
+            score_service.add_score(self.game.id, self.bob.id, 4)
+        self.assertEqual(self._members(), {})
+
+        try:
+            with transaction.atomic():
+                score_service.add_score(self.game.id, self.alice.id, 5)
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(self._members(), {str(self.bob.id): 4})
+
+    def test_get_leaderboard_reads_sorted_set(self, mock_broadcast):
+        """Test que le classement est lu depuis le sorted set (sans tri en base)."""
+        score_service.seed_leaderboard(self.game.id)
+        self._add_score(self.bob.id, 2)
+
+        # Marqueur et top N en un aller-retour Redis ; seuls les joueurs du top N en base
+        with self.assertNumQueries(1):
+            leaderboard = score_service.get_leaderboard(self.game.id)
+
+        self.assertEqual(
+            [entry["username"] for entry in leaderboard], ["bob", "alice"]
+        )
+
+    def test_get_leaderboard_rebuilds_evicted_sorted_set(self, mock_broadcast):
+        """Test qu'un sorted set évincé puis réécrit partiellement est reconstruit."""
+        self._add_score(self.alice.id, 5)
+        score_service.clear_leaderboard(self.game.id)  # Éviction
+        self._add_score(self.bob.id, 2)
+
+        leaderboard = score_service.get_leaderboard(self.game.id)
+
+        self.assertEqual(
+            [(entry["username"], entry["score"]) for entry in leaderboard],
+            [("alice", 5), ("bob", 2)],
+        )
+        self.assertEqual(self._members(), {str(self.alice.id): 5, str(self.bob.id): 2})
+
+    def test_rebuild_keeps_newer_mirrored_scores(self, mock_broadcast):
+        """Test que la reconstruction (ZADD NX) n'écrase pas un score recopié entre-temps."""
+        self.client_redis.zadd(score_service._leaderboard_key(self.game.id), {str(self.bob.id): 9})
+
+        score_service.seed_leaderboard(self.game.id)
+
+        self.assertEqual(self._members(), {str(self.alice.id): 0, str(self.bob.id): 9})
+
+    def test_clear_leaderboard_removes_sorted_set(self, mock_broadcast):
+        """Test que clear_leaderboard supprime le classement partagé."""
+        score_service.seed_leaderboard(self.game.id)
+
+        score_service.clear_leaderboard(self.game.id)
+
+        self.assertEqual(self._members(), {})
@@ -1,8 +1,10 @@
 """
 Tests pour les services du module Games.
 """
+from unittest.mock import MagicMock, patch
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 
 from games.models import Game, GameState, Player
 from games.services import (
@@ -75,6 +77,26 @@ class CreateGameTestCase(GameServiceTestCase):
         self.assertEqual(Player.objects.filter(game=game).count(), 1)
 
 
+class CreateGameCollisionTestCase(TransactionTestCase):
+    """Tests pour create_game en cas de collision de code (hors transaction de test)."""
+
+    def test_create_game_retries_on_code_collision(self):
+        """Test qu'une collision de code relance une tentative dans le budget de requêtes."""
+        # Arrange
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        Game.objects.create(code="AAAAAA")
+
+        # Act
+        with patch(
+            "games.services.game_service.generate_game_code", side_effect=["AAAAAA", "BBBBBB"]
+        ):
+            game = create_game(user)
+
+        # Assert
+        self.assertEqual(game.code, "BBBBBB")
+        self.assertTrue(Player.objects.get(game=game, user=user).is_admin)
+
+
 class GetGameByIdTestCase(GameServiceTestCase):
     """Tests pour get_game_by_id."""
 
@@ -214,6 +236,21 @@ class StartGameTestCase(GameServiceTestCase):
         # Assert
         self.assertEqual(result.state, GameState.DEPLOYMENT)
 
+    def test_start_game_seeds_redis_leaderboard_within_budget(self):
+        """Test que le lancement avec classement Redis (relecture des joueurs) tient son budget."""
+        # Arrange
+        admin = self._create_user()
+        game = create_game(admin)
+        client = MagicMock()
+
+        # Act
+        with patch("games.services.score_service.get_redis_client", return_value=client):
+            result = start_game(game.id, admin)
+
+        # Assert
+        self.assertEqual(result.state, GameState.DEPLOYMENT)
+        client.zadd.assert_called_once()
+
     def test_start_game_not_admin_raises_exception(self):
         """Test qu'un joueur non-admin lève PlayerException."""
         # Arrange
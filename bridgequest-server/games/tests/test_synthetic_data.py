@@ -0,0 +1,107 @@
+"""
+Tests pour la génération de données synthétiques (games.services.synthetic_data).
+"""
+import math
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from games.models import Game, GameState, Player
+from games.services.synthetic_data import generate_synthetic_data
+from locations.models import Position
+
+User = get_user_model()
+
+BOUNDING_BOX = (48.85, 2.34, 48.86, 2.36)
+
+
+class GenerateSyntheticDataTestCase(TestCase):
+    """Tests pour generate_synthetic_data."""
+
+    def _generate(self, **kwargs):
+        """Génère un petit jeu de données (graine fixe)."""
+        options = {"seed": 7, "bounding_box": BOUNDING_BOX, "batch_size": 50}
+        options.update(kwargs)
+        return generate_synthetic_data(20, 8, 4, 30, **options)
+
+    def test_counts_and_states(self):
+        """Test les volumes créés et la répartition sur tous les états."""
+        counts = self._generate()
+
+        # 6 parties lancées sur 8 (hors WAITING) : 6 * 4 joueurs * 30 fixes
+        self.assertEqual(counts, {"users": 20, "games": 8, "players": 32, "positions": 720})
+        self.assertEqual(
+            set(Game.objects.values_list("state", flat=True)), set(GameState.values)
+        )
+        self.assertEqual(Player.objects.filter(is_admin=True).count(), 8)
+        self.assertFalse(Position.objects.filter(player__game__state=GameState.WAITING).exists())
+
+    def test_trajectories_are_walks_inside_bounding_box(self):
+        """Test que les trajectoires restent dans le rectangle, à vitesse de marche."""
+        self._generate()
+
+        min_lat, min_lng, max_lat, max_lng = BOUNDING_BOX
+        player = Player.objects.filter(positions__isnull=False).order_by("pk").first()
+        track = list(player.positions.order_by("recorded_at"))
+        for position in track:
+            self.assertTrue(min_lat <= position.latitude <= max_lat)
+            self.assertTrue(min_lng <= position.longitude <= max_lng)
+        for previous, current in zip(track, track[1:]):
+            self.assertEqual((current.recorded_at - previous.recorded_at).total_seconds(), 5)
+            d_lat = float(current.latitude - previous.latitude)
+            d_lng = float(current.longitude - previous.longitude) * math.cos(math.radians(48.85))
+            meters = math.hypot(d_lat, d_lng) * 111_320
+            self.assertLess(meters, 30)
+
+    def test_timestamps_are_generated(self):
+        """Test que les dates générées remplacent auto_now / auto_now_add, ensuite restaurés."""
+        self._generate()
+
+        game = Game.objects.exclude(state=GameState.WAITING).order_by("pk").first()
+        fixes = Position.objects.filter(player__game=game)
+        first_join = game.players.order_by("joined_at").first().joined_at
+        self.assertLess(first_join, fixes.earliest("recorded_at").recorded_at)
+        self.assertEqual(game.updated_at, fixes.latest("recorded_at").recorded_at)
+        self.assertTrue(Position._meta.get_field("recorded_at").auto_now_add)
+        self.assertTrue(Game._meta.get_field("updated_at").auto_now)
+
+    def test_seed_is_reproducible(self):
+        """Test qu'une même graine produit les mêmes trajectoires."""
+        def generate_track():
+            self._generate()
+            track = list(Position.objects.order_by("pk").values_list("latitude", "longitude"))
+            Game.objects.all().delete()
+            User.objects.all().delete()
+            return track
+
+        self.assertEqual(generate_track(), generate_track())
+
+
+class GenerateSyntheticDataCommandTestCase(TestCase):
+    """Tests pour la commande generate_synthetic_data."""
+
+    def test_command_reports_counts(self):
+        """Test que la commande génère les données et affiche les volumes."""
+        out = StringIO()
+        call_command(
+            "generate_synthetic_data",
+            "--users=10", "--games=4", "--players-per-game=3", "--positions-per-player=5",
+            "--seed=1", "--bbox=48.85,2.34,48.86,2.36",
+            stdout=out,
+        )
+
+        self.assertIn("users=10 games=4 players=12 positions=45", out.getvalue())
+
+    def test_command_rejects_existing_prefix_and_invalid_bbox(self):
+        """Test que la commande refuse un préfixe déjà utilisé et un rectangle invalide."""
+        User.objects.create_user(username="synth0", email="synth0@example.com")
+
+        with self.assertRaisesMessage(CommandError, "--prefix"):
+            call_command("generate_synthetic_data", "--users=1", stdout=StringIO())
+        with self.assertRaisesMessage(CommandError, "--bbox"):
+            call_command(
+                "generate_synthetic_data", "--bbox=1,2,3", "--prefix=other", stdout=StringIO()
+            )
@@ -196,3 +196,27 @@ class GameViewsTestCase(TestCase):
             response.status_code,
             [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN],
         )
+
+    def test_game_leaderboard_success(self):
+        """Test de récupération du classement par un joueur de la partie."""
+        game = Game.objects.create(code='LDB123', state=GameState.IN_PROGRESS)
+        Player.objects.create(game=game, user=self.user, is_admin=True, score=3)
+        Player.objects.create(game=game, user=self.other_user, score=8)
+
+        self._authenticate_client()
+        response = self.client.get(f'/api/games/{game.id}/leaderboard/?limit=1')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]['username'], 'otheruser')
+        self.assertEqual(response.data[0]['score'], 8)
+        self.assertEqual(response.data[0]['rank'], 1)
+
+    def test_game_leaderboard_not_in_game_forbidden(self):
+        """Test de récupération du classement par un utilisateur hors de la partie."""
+        game = Game.objects.create(code='LDB456', state=GameState.IN_PROGRESS)
+        Player.objects.create(game=game, user=self.user, is_admin=True)
+
+        self._authenticate_client(self.other_user)
+        response = self.client.get(f'/api/games/{game.id}/leaderboard/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertIn('error', response.data)
@@ -6,6 +6,7 @@ from django.urls import path
 from games.views.game_views import (
     create_game_view,
     game_detail_view,
+    game_leaderboard_view,
     game_players_view,
     game_positions_view,
     game_start_view,
@@ -20,5 +21,6 @@ urlpatterns = [
     path('<int:pk>/', game_detail_view, name='detail'),
     path('<int:pk>/players/', game_players_view, name='players'),
     path('<int:pk>/positions/', game_positions_view, name='positions'),
+    path('<int:pk>/leaderboard/', game_leaderboard_view, name='leaderboard'),
     path('<int:pk>/start/', game_start_view, name='start'),
 ]
@@ -1,13 +1,16 @@
 """
 Vues du module Games.
 
-Réexporte les vues API REST pour accès direct depuis games.views.
+Réexporte les vues API REST et la vue interne de latence pour accès direct
+depuis games.views.
 """
 from .game_views import (
     create_game_view,
     game_detail_view,
+    game_leaderboard_view,
     game_players_view,
     game_positions_view,
     game_start_view,
     join_game_view,
 )
+from .latency_views import latency_probe_view
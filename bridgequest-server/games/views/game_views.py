@@ -20,12 +20,23 @@ from games.services import (
     join_game,
     start_game,
 )
+from games.services.game_service import CREATE_GAME_MAX_QUERIES
+from games.services.score_service import LEADERBOARD_DEFAULT_LIMIT, get_leaderboard
 from locations.serializers import PositionWithPlayerSerializer
 from locations.services.position_service import get_latest_positions_for_game
 from utils.exceptions import GameException, PlayerException
+from utils.query_budget import query_budget
 from utils.responses import error_response
 
 
+def _parse_leaderboard_limit(request):
+    """Lit le paramètre ?limit= (entier), avec repli sur la valeur par défaut."""
+    try:
+        return int(request.query_params.get("limit", LEADERBOARD_DEFAULT_LIMIT))
+    except (TypeError, ValueError):
+        return LEADERBOARD_DEFAULT_LIMIT
+
+
 def _game_detail_response(game):
     """Construit la réponse de détail d'une partie."""
     return Response(GameSerializer(game).data, status=status.HTTP_200_OK)
@@ -42,6 +53,7 @@ def _game_players_response(game):
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@query_budget("create_game_view", max_queries=CREATE_GAME_MAX_QUERIES)
 def create_game_view(request):
     """
     Crée une nouvelle partie.
@@ -61,6 +73,7 @@ def create_game_view(request):
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@query_budget("join_game_view", max_queries=4)
 def join_game_view(request):
     """
     Rejoint une partie via son code.
@@ -85,6 +98,7 @@ def join_game_view(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@query_budget("game_detail_view", max_queries=1)
 def game_detail_view(request, pk):
     """
     Récupère les détails d'une partie.
@@ -100,6 +114,7 @@ def game_detail_view(request, pk):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@query_budget("game_players_view", max_queries=2)
 def game_players_view(request, pk):
     """
     Récupère la liste des joueurs d'une partie.
@@ -115,6 +130,7 @@ def game_players_view(request, pk):
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@query_budget("game_start_view", max_queries=4)
 def game_start_view(request, pk):
     """
     Lance une partie (administrateur uniquement).
@@ -131,6 +147,7 @@ def game_start_view(request, pk):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@query_budget("game_positions_view", max_queries=3)
 def game_positions_view(request, pk):
     """
     Récupère les dernières positions de tous les joueurs de la partie.
@@ -147,3 +164,23 @@ def game_positions_view(request, pk):
         return Response(data, status=status.HTTP_200_OK)
     except (GameException, PlayerException) as e:
         return error_response(e, e.status_code)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@query_budget("game_leaderboard_view", max_queries=4)
+def game_leaderboard_view(request, pk):
+    """
+    Récupère le classement (top N) de la partie.
+
+    L'utilisateur doit faire partie de la partie.
+    GET /api/games/{id}/leaderboard/?limit=10
+    """
+    try:
+        game = get_game_by_id(pk)
+        get_player_in_game(game, request.user)
+
+        leaderboard = get_leaderboard(game.id, _parse_leaderboard_limit(request))
+        return Response(leaderboard, status=status.HTTP_200_OK)
+    except (GameException, PlayerException) as e:
+        return error_response(e, e.status_code)
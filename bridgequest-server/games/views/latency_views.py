@@ -0,0 +1,23 @@
+"""
+Vue interne de la sonde de latence des positions.
+
+Expose les percentiles fix → livraison calculés par
+games.services.latency_probe.
+"""
+from django.http import JsonResponse
+
+from games.services.latency_probe import collect_latency_summary
+from utils import metrics
+
+
+def latency_probe_view(request):
+    """
+    Expose les percentiles de latence des positions (JSON).
+
+    Réservé aux adresses de METRICS_ALLOWED_IPS (voir utils.metrics).
+
+    Returns:
+        JsonResponse: Résumés par partie et par worker
+    """
+    metrics.check_internal_request(request)
+    return JsonResponse(collect_latency_summary())
@@ -10,9 +10,12 @@ from rest_framework import status
 
 from games.models import GameState
 from games.services import get_game_by_id, get_player_in_game
+from games.services.game_snapshot import build_snapshot_player, get_game_snapshot
 from locations.models import Position
-from utils.exceptions import LocationException
+from utils.exceptions import LocationException, PlayerException
 from utils.messages import ErrorMessages
+from utils.query_budget import query_budget
+from utils.tracing import traced
 
 # Plages valides WGS84
 _LAT_MIN = Decimal("-90")
@@ -21,16 +24,19 @@ _LNG_MIN = Decimal("-180")
 _LNG_MAX = Decimal("180")
 
 
-def _require_game_active(game):
+def _require_game_active(state):
     """
     Vérifie que la partie est en phase active (DEPLOYMENT ou IN_PROGRESS).
 
     Les positions ne sont enregistrées que pendant le déploiement ou le jeu.
 
+    Args:
+        state: État de la partie (GameState).
+
     Raises:
         LocationException: Si la partie n'est pas active.
     """
-    if game.state not in (GameState.DEPLOYMENT, GameState.IN_PROGRESS):
+    if state not in (GameState.DEPLOYMENT, GameState.IN_PROGRESS):
         raise LocationException(
             message_key=ErrorMessages.POSITION_GAME_NOT_ACTIVE,
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -59,6 +65,39 @@ def _validate_coordinates(latitude, longitude):
     return lat, lng
 
 
+def _get_active_player(game_id, user):
+    """
+    Récupère le joueur d'une partie active, depuis l'instantané de l'acteur si publié.
+
+    Avec instantané (settings.GAME_ACTOR_ENABLED) : aucune lecture de Game ni
+    de Player en base. Sinon : lecture de la partie puis du joueur.
+
+    Returns:
+        Player: Le joueur, avec user chargé.
+
+    Raises:
+        GameException: Si la partie n'existe pas.
+        PlayerException: Si l'utilisateur n'est pas dans la partie.
+        LocationException: Si la partie n'est pas active.
+    """
+    snapshot = get_game_snapshot(game_id)
+    if snapshot is None:
+        game = get_game_by_id(game_id)
+        _require_game_active(game.state)
+        return get_player_in_game(game, user)
+
+    _require_game_active(snapshot["state"])
+    player = build_snapshot_player(snapshot, game_id, user.id)
+    if player is None:
+        raise PlayerException(
+            message_key=ErrorMessages.PLAYER_NOT_IN_GAME,
+            status_code=status.HTTP_403_FORBIDDEN,
+        )
+    return player
+
+
+@traced("update_position")
+@query_budget("update_position", max_queries=3)
 def update_position(game_id, user, latitude, longitude):
     """
     Enregistre une nouvelle position GPS pour le joueur dans la partie.
@@ -77,10 +116,7 @@ def update_position(game_id, user, latitude, longitude):
         PlayerException: Si l'utilisateur n'est pas dans la partie.
         LocationException: Si la partie n'est pas active ou coordonnées invalides.
     """
-    game = get_game_by_id(game_id)
-    _require_game_active(game)
-
-    player = get_player_in_game(game, user)
+    player = _get_active_player(game_id, user)
     lat, lng = _validate_coordinates(latitude, longitude)
 
     return Position.objects.create(
@@ -90,6 +126,7 @@ def update_position(game_id, user, latitude, longitude):
     )
 
 
+@query_budget("get_latest_positions_for_game", max_queries=1)
 def get_latest_positions_for_game(game):
     """
     Récupère la dernière position connue de chaque joueur de la partie.
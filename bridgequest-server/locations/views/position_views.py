@@ -9,14 +9,19 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from games.services.game_broadcast import broadcast_position_updated
+from games.services.latency_probe import now_ms
 from locations.serializers import PositionSerializer, UpdatePositionSerializer
 from locations.services.position_service import update_position
 from utils.exceptions import GameException, LocationException, PlayerException
+from utils.query_budget import query_budget
 from utils.responses import error_response
+from utils.tracing import traced
 
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@traced("update_position_view")
+@query_budget("update_position_view", max_queries=3)
 def update_position_view(request):
     """
     Met à jour la position GPS du joueur dans une partie.
@@ -24,6 +29,7 @@ def update_position_view(request):
     Body: {"game_id": int, "latitude": float, "longitude": float}
     La partie doit être en DEPLOYMENT ou IN_PROGRESS.
     """
+    ingested_at = now_ms()
     serializer = UpdatePositionSerializer(data=request.data)
     if not serializer.is_valid():
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -36,7 +42,7 @@ def update_position_view(request):
             latitude=data["latitude"],
             longitude=data["longitude"],
         )
-        broadcast_position_updated(position)
+        broadcast_position_updated(position, ingested_at=ingested_at)
         return Response(
             PositionSerializer(position).data,
             status=status.HTTP_201_CREATED,
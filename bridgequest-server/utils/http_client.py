@@ -0,0 +1,273 @@
+"""
+Client HTTP sortant partagé pour Bridge Quest (fournisseurs SSO).
+
+Un seul client par processus (get_http_client) :
+- pool de connexions keep-alive (requests.Session + HTTPAdapter),
+- concurrence bornée par hôte : au-delà, échec immédiat plutôt que
+  d'immobiliser des threads de requête,
+- nouvelles tentatives avec backoff exponentiel et jitter (erreurs réseau, 5xx),
+- disjoncteur par hôte : après N échecs consécutifs, les appels échouent
+  immédiatement pendant OUTBOUND_HTTP_CIRCUIT_RESET_SECONDS, puis un appel
+  d'essai décide de la fermeture. L'issue de chaque appel autorisé est
+  enregistrée quelle que soit sa sortie (exception comprise) : un essai ne
+  peut pas laisser le disjoncteur bloqué en semi-ouvert,
+- métriques par hôte exportées par utils.metrics (outbound_http_*).
+
+Les erreurs levées héritent de requests.RequestException : les appelants
+existants n'ont pas à distinguer un disjoncteur ouvert d'une erreur réseau.
+"""
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from utils import metrics
+
+# Statuts HTTP justifiant une nouvelle tentative
+_RETRY_STATUS_CODES = frozenset((502, 503, 504))
+# Délai de base du backoff (secondes) : 0.1, 0.2, 0.4... avec jitter complet
+_RETRY_BACKOFF_BASE_SECONDS = 0.1
+
+_CIRCUIT_CLOSED = "closed"
+_CIRCUIT_OPEN = "open"
+_CIRCUIT_HALF_OPEN = "half_open"
+
+metrics.register_counter("outbound_http_requests_total", "Tentatives HTTP sortantes par hôte.")
+metrics.register_counter(
+    "outbound_http_failures_total", "Tentatives HTTP sortantes en échec (réseau, 5xx) par hôte."
+)
+metrics.register_counter(
+    "outbound_http_retries_total", "Nouvelles tentatives HTTP sortantes par hôte."
+)
+metrics.register_counter(
+    "outbound_http_rejected_total",
+    "Appels HTTP sortants refusés sans requête réseau par hôte et motif.",
+)
+metrics.register_histogram(
+    "outbound_http_request_duration_seconds",
+    "Durée des tentatives HTTP sortantes par hôte.",
+    (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+metrics.register_gauge(
+    "outbound_http_circuit_open", "Disjoncteurs non fermés par hôte (somme des workers)."
+)
+
+
+class UpstreamUnavailableError(requests.RequestException):
+    """Appel refusé sans requête réseau (disjoncteur ouvert ou hôte saturé)."""
+
+
+class _CircuitBreaker:
+    """Disjoncteur d'un hôte (fermé, ouvert, semi-ouvert)."""
+
+    def __init__(self, host, failure_threshold, reset_seconds):
+        self.labels = {"host": host}
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = _CIRCUIT_CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        Indique si un appel peut être tenté.
+
+        En semi-ouvert, un seul appel d'essai est autorisé à la fois.
+        """
+        with self._lock:
+            if self.state == _CIRCUIT_CLOSED:
+                return True
+            elapsed = time.monotonic() - self.opened_at
+            if self.state == _CIRCUIT_OPEN and elapsed >= self.reset_seconds:
+                self.state = _CIRCUIT_HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        """Ferme le disjoncteur."""
+        with self._lock:
+            if self.state != _CIRCUIT_CLOSED:
+                metrics.increment("outbound_http_circuit_open", self.labels, -1)
+            self.state = _CIRCUIT_CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        """Compte un échec ; ouvre le disjoncteur au seuil (ou si l'essai échoue)."""
+        with self._lock:
+            self.failures += 1
+            if self.state == _CIRCUIT_HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state == _CIRCUIT_CLOSED:
+                    metrics.increment("outbound_http_circuit_open", self.labels)
+                self.state = _CIRCUIT_OPEN
+                self.opened_at = time.monotonic()
+
+
+class _HostState:
+    """Concurrence et disjoncteur d'un hôte."""
+
+    def __init__(self, host, max_concurrency, failure_threshold, reset_seconds):
+        self.labels = {"host": host}
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+        self.circuit = _CircuitBreaker(host, failure_threshold, reset_seconds)
+
+    def reject(self, reason, message):
+        """Compte un appel refusé et retourne l'erreur à lever."""
+        metrics.increment("outbound_http_rejected_total", {**self.labels, "reason": reason})
+        return UpstreamUnavailableError(message)
+
+
+class OutboundHTTPClient:
+    """Client HTTP sortant poolé, borné par hôte et protégé par disjoncteur."""
+
+    def __init__(
+        self,
+        *,
+        pool_size=None,
+        max_concurrency_per_host=None,
+        max_retries=None,
+        circuit_failure_threshold=None,
+        circuit_reset_seconds=None,
+    ):
+        """
+        Args:
+            pool_size: Connexions keep-alive conservées par hôte.
+            max_concurrency_per_host: Appels simultanés autorisés par hôte.
+            max_retries: Nouvelles tentatives après l'appel initial.
+            circuit_failure_threshold: Échecs consécutifs ouvrant le disjoncteur.
+            circuit_reset_seconds: Durée d'ouverture avant l'appel d'essai.
+
+        Les valeurs absentes proviennent des settings OUTBOUND_HTTP_*.
+        """
+        pool_size = pool_size or settings.OUTBOUND_HTTP_POOL_SIZE
+        self.max_concurrency_per_host = (
+            max_concurrency_per_host or settings.OUTBOUND_HTTP_MAX_CONCURRENCY_PER_HOST
+        )
+        self.max_retries = (
+            settings.OUTBOUND_HTTP_MAX_RETRIES if max_retries is None else max_retries
+        )
+        self.circuit_failure_threshold = (
+            circuit_failure_threshold or settings.OUTBOUND_HTTP_CIRCUIT_FAILURE_THRESHOLD
+        )
+        self.circuit_reset_seconds = (
+            settings.OUTBOUND_HTTP_CIRCUIT_RESET_SECONDS
+            if circuit_reset_seconds is None
+            else circuit_reset_seconds
+        )
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._hosts = {}
+        self._hosts_lock = threading.Lock()
+
+    def _host_state(self, host):
+        """Retourne (en le créant au besoin) l'état d'un hôte."""
+        with self._hosts_lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = _HostState(
+                    host,
+                    self.max_concurrency_per_host,
+                    self.circuit_failure_threshold,
+                    self.circuit_reset_seconds,
+                )
+                self._hosts[host] = state
+            return state
+
+    def get(self, url, *, timeout, **kwargs):
+        """
+        Effectue un GET avec pool, concurrence bornée, retries et disjoncteur.
+
+        Args:
+            url: URL appelée.
+            timeout: Timeout (secondes) de chaque tentative.
+            **kwargs: Arguments transmis à requests.Session.get.
+
+        Returns:
+            requests.Response: Dernière réponse obtenue (éventuellement 5xx).
+
+        Raises:
+            UpstreamUnavailableError: Si le disjoncteur est ouvert ou l'hôte saturé.
+            requests.RequestException: Si toutes les tentatives échouent.
+        """
+        host = urlparse(url).netloc
+        state = self._host_state(host)
+
+        # Créneau de concurrence d'abord : le disjoncteur ne passe en
+        # semi-ouvert que pour un appel d'essai effectivement lancé
+        if not state.semaphore.acquire(blocking=False):
+            raise state.reject("concurrency", f"Trop d'appels simultanés vers {host}")
+        try:
+            if not state.circuit.allow():
+                raise state.reject("circuit", f"Circuit ouvert pour {host}")
+            succeeded = False
+            try:
+                response = self._get_with_retries(state, url, timeout, kwargs)
+                succeeded = response.status_code not in _RETRY_STATUS_CODES
+                return response
+            finally:
+                # Toute sortie (exception quelconque comprise) est une issue
+                if succeeded:
+                    state.circuit.record_success()
+                else:
+                    state.circuit.record_failure()
+        finally:
+            state.semaphore.release()
+
+    def _get_with_retries(self, state, url, timeout, kwargs):
+        """Boucle de tentatives ; alimente les métriques de l'hôte."""
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                metrics.increment("outbound_http_retries_total", state.labels)
+                time.sleep(random.uniform(0, _RETRY_BACKOFF_BASE_SECONDS * 2 ** (attempt - 1)))
+            metrics.increment("outbound_http_requests_total", state.labels)
+            started = time.monotonic()
+            try:
+                response = self.session.get(url, timeout=timeout, **kwargs)
+            except requests.RequestException:
+                self._record_failed_attempt(state, started)
+                if attempt == self.max_retries:
+                    raise
+                continue
+            if response.status_code in _RETRY_STATUS_CODES:
+                self._record_failed_attempt(state, started)
+                if attempt == self.max_retries:
+                    return response
+                continue
+            metrics.observe(
+                "outbound_http_request_duration_seconds", time.monotonic() - started, state.labels
+            )
+            return response
+
+    @staticmethod
+    def _record_failed_attempt(state, started):
+        """Enregistre la durée et l'échec d'une tentative."""
+        metrics.observe(
+            "outbound_http_request_duration_seconds", time.monotonic() - started, state.labels
+        )
+        metrics.increment("outbound_http_failures_total", state.labels)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """
+    Retourne le client HTTP sortant partagé du processus.
+
+    Returns:
+        OutboundHTTPClient: Client créé au premier appel.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OutboundHTTPClient()
+    return _client
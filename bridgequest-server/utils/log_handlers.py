@@ -0,0 +1,121 @@
+"""
+Handlers et formatters de logging pour Bridge Quest.
+
+- QueueListenerHandler — le thread de la requête dépose l'enregistrement
+  dans une file bornée ; un thread d'arrière-plan l'écrit sur les handlers
+  cibles (fichier, console). Un disque lent ne bloque plus les requêtes ;
+  si la file est pleine, l'enregistrement est abandonné et compté
+  (métrique log_records_dropped_total{handler}).
+- JSONFormatter — une ligne JSON par enregistrement, avec les champs
+  passés en `extra` (durée, utilisateur...).
+
+Utilisables depuis LOGGING (dictConfig) :
+
+    'queue': {
+        '()': 'utils.log_handlers.QueueListenerHandler',
+        'handlers': ['cfg://handlers.file', 'cfg://handlers.console'],
+    }
+
+Le nom du handler de file doit être trié après ceux de ses cibles
+(dictConfig configure les handlers par ordre alphabétique) ; sinon la
+configuration échoue sur une TypeError.
+"""
+import atexit
+import json
+import logging
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from utils import metrics
+
+# Attributs standard d'un LogRecord (les autres proviennent de `extra`)
+_RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord('', 0, '', 0, '', (), None).__dict__
+) | {'message', 'asctime'}
+
+metrics.register_counter(
+    'log_records_dropped_total', 'Enregistrements de log abandonnés (file pleine) par handler.'
+)
+
+
+class _QueueListener(QueueListener):
+    """QueueListener dont l'arrêt attend une place dans une file bornée pleine."""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class QueueListenerHandler(QueueHandler):
+    """
+    QueueHandler avec son propre QueueListener (thread d'écriture).
+
+    Args:
+        handlers: Handlers cibles (références cfg:// dans dictConfig).
+        queue_size: Taille maximale de la file (0 = illimitée).
+        respect_handler_level: Applique le niveau de chaque handler cible.
+    """
+
+    def __init__(self, handlers, queue_size=10000, respect_handler_level=True):
+        targets = [handlers[index] for index in range(len(handlers))]  # Résout les cfg://
+        if not all(isinstance(target, logging.Handler) for target in targets):
+            raise TypeError(
+                'QueueListenerHandler : handlers cibles non configurés '
+                '(nommer le handler de file après ses cibles)'
+            )
+
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.dropped = 0
+        self._listener = _QueueListener(
+            self.queue, *targets, respect_handler_level=respect_handler_level
+        )
+        self._listener.start()
+        atexit.register(self.close)
+
+    def enqueue(self, record):
+        """Dépose l'enregistrement sans jamais bloquer (abandon si la file est pleine)."""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            metrics.increment('log_records_dropped_total', {'handler': self.name or 'queue'})
+
+    def flush(self):
+        """
+        Attend l'écriture des enregistrements déjà en file.
+
+        Le listener est arrêté (il vide la file avant de s'arrêter) puis relancé.
+        """
+        with self.lock:
+            if self._listener._thread is not None:
+                self._listener.stop()
+                self._listener.start()
+
+    def close(self):
+        """Vide la file, arrête le thread d'écriture et ferme le handler."""
+        if self._listener._thread is not None:
+            self._listener.stop()
+        super().close()
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formate un enregistrement en une ligne JSON.
+
+    Champs : time (ISO 8601 UTC), level, logger, message, puis les champs
+    passés en `extra` (ex. duration_ms, user_id).
+    """
+
+    def format(self, record):
+        payload = {
+            'time': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info:
+            payload['exception'] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
@@ -42,6 +42,7 @@ class Messages:
     ADMIN_PERSONAL_INFO = "admin.user.personal_info"
     ADMIN_IMPORTANT_DATES = "admin.user.important_dates"
     ADMIN_PERMISSIONS = "admin.user.permissions"
+    ADMIN_REVOKE_TOKENS = "admin.user.revoke_tokens"
     
     # SSO Serializer
     SSO_PROVIDER_HELP_TEXT = "serializer.sso.provider.help_text"
@@ -105,6 +106,7 @@ class ErrorMessages:
     AUTH_ACCOUNT_NOT_FOUND = "error.auth.account_not_found"
     AUTH_TOKEN_INVALID = "error.auth.token_invalid"
     AUTH_TOKEN_EXPIRED = "error.auth.token_expired"
+    AUTH_TOKEN_REVOKED = "error.auth.token_revoked"
     AUTH_SSO_FAILED = "error.auth.sso_failed"
     AUTH_SSO_PROVIDER_INVALID = "error.auth.sso.provider_invalid"
     AUTH_SSO_TOKEN_REQUIRED = "error.auth.sso.token_required"
@@ -115,6 +117,8 @@ class ErrorMessages:
     USER_NOT_FOUND = "error.user.not_found"
     USER_EMAIL_REQUIRED = "error.user.email_required"
     USER_EMAIL_INVALID = "error.user.email_invalid"
+    USER_IDS_INVALID = "error.user.ids_invalid"
+    USER_IDS_TOO_MANY = "error.user.ids_too_many"
     
     # Game errors
     GAME_NOT_FOUND = "error.game.not_found"
@@ -0,0 +1,408 @@
+"""
+Métriques applicatives de Bridge Quest (format d'exposition Prometheus).
+
+Enregistrement sans verrou : chaque thread écrit dans son propre fragment
+(threading.local) ; le chemin chaud (requêtes, consumers) ne fait aucune
+entrée-sortie. Un thread démon du worker, démarré au premier
+enregistrement, fusionne toutes les METRICS_FLUSH_INTERVAL_SECONDS les
+fragments du processus et publie le total cumulé du worker dans le cache
+partagé (une clé par worker, avec TTL). L'endpoint de scrape additionne les
+fragments de tous les workers encore actifs : le résultat est cohérent quel
+que soit le nombre de processus.
+
+Les workers actifs sont suivis dans un sorted set Redis (ZADD du worker avec
+l'heure de publication, purge des entrées expirées) : aucune
+lecture-modification-écriture, deux publications simultanées ne s'effacent
+pas. Sans Redis (cache local, un seul processus), seul le worker courant est
+visible.
+
+Les métriques sont déclarées avec register_counter / register_gauge /
+register_histogram puis alimentées par increment / observe, avec des labels
+à cardinalité bornée (nom de vue résolu, méthode, statut...). Une jauge est
+alimentée par des incréments positifs et négatifs : la somme des fragments
+donne la valeur courante. Une jauge à labels non bornés (ex. par partie)
+passe par adjust_gauge : ses séries sont supprimées en revenant à zéro.
+"""
+import bisect
+import logging
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
+
+from utils.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "metrics"
+_WORKERS_KEY = f"{_KEY_PREFIX}:workers"
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+
+# Déclarations : nom -> (type, aide, bornes des buckets ou None)
+_definitions = {}
+
+_local = threading.local()
+_shards = []
+_shards_lock = threading.Lock()
+_flush_lock = threading.Lock()
+# Thread de publication (démarré au premier enregistrement, par processus)
+_publisher = None
+_publisher_pid = None
+_publisher_lock = threading.Lock()
+# Publications additionnelles faites par le thread de publication
+_publish_hooks = []
+# Jauges du processus dont les séries à zéro sont supprimées (adjust_gauge)
+_gauges = {}
+_gauges_lock = threading.Lock()
+
+_WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def register_counter(name, help_text):
+    """
+    Déclare un compteur.
+
+    Args:
+        name: Nom Prometheus (ex. 'http_requests_total')
+        help_text: Description exposée dans # HELP
+    """
+    _definitions[name] = (COUNTER, help_text, None)
+
+
+def register_gauge(name, help_text):
+    """
+    Déclare une jauge (valeur courante, alimentée par increment).
+
+    Les séries à zéro ne sont pas exposées (ex. partie sans connexion).
+
+    Args:
+        name: Nom Prometheus (ex. 'ws_connections')
+        help_text: Description exposée dans # HELP
+    """
+    _definitions[name] = (GAUGE, help_text, None)
+
+
+def register_histogram(name, help_text, buckets):
+    """
+    Déclare un histogramme.
+
+    Args:
+        name: Nom Prometheus (ex. 'http_request_duration_seconds')
+        help_text: Description exposée dans # HELP
+        buckets: Bornes supérieures croissantes des buckets (+Inf ajouté)
+    """
+    _definitions[name] = (HISTOGRAM, help_text, tuple(buckets))
+
+
+def _shard():
+    """Retourne le fragment du thread courant (créé au premier appel)."""
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = {}
+        _local.shard = shard
+        with _shards_lock:
+            _shards.append(shard)
+        _ensure_publisher()
+    return shard
+
+
+def _ensure_publisher():
+    """Démarre le thread de publication du processus s'il ne tourne pas (fork compris)."""
+    global _publisher, _publisher_pid
+    pid = os.getpid()
+    if _publisher_pid == pid:
+        return
+    with _publisher_lock:
+        if _publisher_pid != pid:
+            _publisher = threading.Thread(
+                target=_publish_forever, name="metrics-publisher", daemon=True
+            )
+            _publisher.start()
+            _publisher_pid = pid
+
+
+def _publish_forever():
+    """Boucle du thread de publication (toutes les METRICS_FLUSH_INTERVAL_SECONDS)."""
+    while True:
+        time.sleep(settings.METRICS_FLUSH_INTERVAL_SECONDS)
+        try:
+            flush()
+        except Exception:
+            logger.exception("Publication des métriques impossible")
+
+
+def add_publish_hook(hook):
+    """
+    Ajoute une publication faite par le thread de publication après les métriques.
+
+    Args:
+        hook: Fonction sans argument (ex. publication des réservoirs de latence)
+    """
+    _publish_hooks.append(hook)
+
+
+def _labels_key(labels):
+    """Clé hashable et ordonnée d'un jeu de labels."""
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+def increment(name, labels=None, value=1):
+    """
+    Incrémente un compteur ou une jauge (sans verrou).
+
+    Args:
+        name: Nom du compteur ou de la jauge déclaré
+        labels: Dictionnaire de labels
+        value: Incrément (négatif pour décrémenter une jauge)
+    """
+    shard = _shard()
+    key = (name, _labels_key(labels))
+    shard[key] = shard.get(key, 0) + value
+
+
+def adjust_gauge(name, labels, value):
+    """
+    Ajuste une jauge à labels non bornés ; la série disparaît en revenant à zéro.
+
+    Contrairement à increment, la valeur est tenue au niveau du processus
+    (sous verrou) : une ouverture et une fermeture faites par deux threads
+    différents s'annulent et ne laissent aucune série.
+
+    Args:
+        name: Nom de la jauge déclarée
+        labels: Dictionnaire de labels (ex. {'channel': 'game', 'game': 12})
+        value: Incrément (négatif pour décrémenter)
+    """
+    _ensure_publisher()
+    key = (name, _labels_key(labels))
+    with _gauges_lock:
+        current = _gauges.get(key, 0) + value
+        if current:
+            _gauges[key] = current
+        else:
+            _gauges.pop(key, None)
+
+
+def observe(name, value, labels=None):
+    """
+    Enregistre une observation dans un histogramme (sans verrou).
+
+    Args:
+        name: Nom de l'histogramme déclaré
+        value: Valeur observée
+        labels: Dictionnaire de labels
+    """
+    buckets = _definitions[name][2]
+    shard = _shard()
+    key = (name, _labels_key(labels))
+    series = shard.get(key)
+    if series is None:
+        # [compteurs par bucket (+Inf compris), somme, nombre]
+        series = [[0] * (len(buckets) + 1), 0.0, 0]
+        shard[key] = series
+    series[0][bisect.bisect_left(buckets, value)] += 1
+    series[1] += value
+    series[2] += 1
+
+
+def _merge_into(total, series_by_key):
+    """Additionne des séries (compteurs ou histogrammes) dans `total`."""
+    for key, value in series_by_key.items():
+        if isinstance(value, list):
+            current = total.get(key)
+            if current is None:
+                total[key] = [list(value[0]), value[1], value[2]]
+            else:
+                current[0] = [a + b for a, b in zip(current[0], value[0])]
+                current[1] += value[1]
+                current[2] += value[2]
+        else:
+            total[key] = total.get(key, 0) + value
+
+
+def snapshot():
+    """
+    Fusionne les fragments des threads du processus.
+
+    Returns:
+        dict: {(nom, labels): valeur cumulée} pour ce worker
+    """
+    with _shards_lock:
+        shards = list(_shards)
+    total = {}
+    for shard in shards:
+        # La copie d'un dict (clés str/tuple) est atomique sous le GIL
+        _merge_into(total, {
+            key: [list(value[0]), value[1], value[2]] if isinstance(value, list) else value
+            for key, value in shard.copy().items()
+        })
+    with _gauges_lock:
+        _merge_into(total, _gauges)
+    return total
+
+
+def reset():
+    """Remet à zéro les métriques du processus (tests)."""
+    with _shards_lock:
+        for shard in _shards:
+            shard.clear()
+    with _gauges_lock:
+        _gauges.clear()
+
+
+def flush():
+    """
+    Publie le total du worker dans le cache partagé, puis les publications additionnelles.
+
+    Appelé par le thread de publication et avant chaque scrape (collect) ;
+    un seul thread publie à la fois, les autres n'attendent pas.
+    """
+    if not _flush_lock.acquire(blocking=False):
+        return
+    try:
+        ttl = settings.METRICS_WORKER_TTL_SECONDS
+        cache.set(f"{_KEY_PREFIX}:shard:{_WORKER_ID}", snapshot(), timeout=ttl)
+        _register_worker(ttl)
+        for hook in _publish_hooks:
+            hook()
+    finally:
+        _flush_lock.release()
+
+
+def _register_worker(ttl):
+    """Marque le worker actif (ZADD) et purge les workers expirés, en une transaction Redis."""
+    client = get_redis_client()
+    if client is None:
+        return
+    key = cache.make_and_validate_key(_WORKERS_KEY)
+    now = time.time()
+    pipeline = client.pipeline()
+    pipeline.zadd(key, {_WORKER_ID: now})
+    pipeline.zremrangebyscore(key, "-inf", now - ttl)
+    pipeline.execute()
+
+
+def get_worker_id():
+    """Identifiant du worker courant (hôte:pid)."""
+    return _WORKER_ID
+
+
+def get_active_workers():
+    """
+    Liste les workers ayant publié leurs métriques récemment (voir flush).
+
+    Returns:
+        list: Identifiants des workers actifs (le seul worker courant sans Redis)
+    """
+    client = get_redis_client()
+    if client is None:
+        return [_WORKER_ID]
+    key = cache.make_and_validate_key(_WORKERS_KEY)
+    since = time.time() - settings.METRICS_WORKER_TTL_SECONDS
+    return [worker.decode() for worker in client.zrangebyscore(key, since, "+inf")]
+
+
+def collect():
+    """
+    Additionne les totaux publiés par tous les workers actifs.
+
+    Returns:
+        dict: {(nom, labels): valeur} pour l'ensemble des workers
+    """
+    flush()
+    shards = cache.get_many([f"{_KEY_PREFIX}:shard:{worker}" for worker in get_active_workers()])
+    total = {}
+    for shard in shards.values():
+        _merge_into(total, shard)
+    return total
+
+
+def _format_labels(labels, extra=()):
+    """Formate des labels Prometheus ({a="1",b="2"})."""
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def render_prometheus(series):
+    """
+    Rend des séries au format texte Prometheus (version 0.0.4).
+
+    Args:
+        series: {(nom, labels): valeur} (voir collect)
+
+    Returns:
+        str: Exposition texte
+    """
+    by_name = {}
+    for (name, labels), value in series.items():
+        by_name.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name in sorted(by_name):
+        if name not in _definitions:
+            continue
+        kind, help_text, buckets = _definitions[name]
+        values = sorted(by_name[name])
+        if kind == GAUGE:
+            values = [(labels, value) for labels, value in values if value]
+            if not values:
+                continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in values:
+            if kind != HISTOGRAM:
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+                continue
+            counts, total, count = value
+            cumulative = 0
+            for bound, bucket_count in zip(list(buckets) + ["+Inf"], counts):
+                cumulative += bucket_count
+                lines.append(
+                    f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}"
+                )
+            lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def check_internal_request(request):
+    """
+    Réserve un endpoint interne aux adresses de METRICS_ALLOWED_IPS.
+
+    Seule l'adresse de connexion (REMOTE_ADDR) est prise en compte :
+    X-Forwarded-For est falsifiable par le client.
+
+    Raises:
+        Http404: Adresse non autorisée (l'endpoint n'est pas révélé)
+    """
+    if request.META.get("REMOTE_ADDR") not in settings.METRICS_ALLOWED_IPS:
+        raise Http404
+
+
+def metrics_view(request):
+    """
+    Expose les métriques de tous les workers au format Prometheus.
+
+    Réservé aux adresses de METRICS_ALLOWED_IPS (voir check_internal_request).
+
+    Returns:
+        HttpResponse: Exposition texte Prometheus
+    """
+    check_internal_request(request)
+    return HttpResponse(
+        render_prometheus(collect()),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
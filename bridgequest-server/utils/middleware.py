@@ -1,14 +1,62 @@
 """
 Middleware pour Bridge Quest.
 
-Responsabilité : AccessLogMiddleware — enregistre les requêtes HTTP
-avec le format unifié du projet pour une cohérence visuelle en console.
+Responsabilités :
+- AccessLogMiddleware — enregistre les requêtes HTTP avec le format unifié
+  du projet pour une cohérence visuelle en console. Les champs structurés
+  (durée, utilisateur...) sont passés en `extra` pour le JSONFormatter, et
+  les chemins à fort trafic peuvent être échantillonnés
+  (ACCESS_LOG_SAMPLE_RATES ; les erreurs sont toujours enregistrées).
+- MetricsMiddleware — latence, statut, taille de réponse et requêtes SQL
+  par vue résolue (utils.metrics, exposées par /internal/metrics/).
+- ProfilingMiddleware — profilage à la demande (échantillon ou en-tête
+  signé), profils écrits sur disque (utils.profiling). Retiré de la chaîne
+  si PROFILING_ENABLED est faux.
+- AsyncWhiteNoiseMiddleware — WhiteNoise compatible async.
+
+Les middlewares fonctionnent en mode sync et async : un seul
+middleware sync-only force Django à exécuter toute la chaîne (vues async
+comprises) dans le thread unique des vues synchrones sous ASGI.
 """
+import contextvars
 import logging
+import os
+import random
+import time
 from urllib.parse import parse_qs, urlencode, urlparse
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.functional import empty
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from utils import metrics, profiling, sql_recorder
+
 logger = logging.getLogger('bridgequest.access')
 
+# Vue des requêtes non résolues (404) : borne la cardinalité des labels
+_UNRESOLVED_VIEW = 'unresolved'
+
+metrics.register_counter('http_requests_total', 'Requêtes HTTP par vue, méthode et statut.')
+metrics.register_histogram(
+    'http_request_duration_seconds',
+    'Durée des requêtes HTTP par vue.',
+    (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+metrics.register_histogram(
+    'http_response_size_bytes',
+    'Taille des réponses HTTP par vue.',
+    (100, 1000, 10000, 100000, 1000000),
+)
+metrics.register_counter('db_queries_total', 'Requêtes SQL exécutées par vue.')
+metrics.register_counter('db_query_duration_seconds_total', 'Temps passé en requêtes SQL par vue.')
+
+# Statistiques SQL de la requête HTTP en cours ([nombre, durée]). Le contexte
+# est propagé aux threads de sync_to_async : les requêtes SQL des vues async
+# sont aussi attribuées.
+_request_db_stats = contextvars.ContextVar('request_db_stats', default=None)
+
 # Format NCSA-like pour alignement avec le formatter 'verbose' Django
 _LOG_FORMAT = '{client} - - "{method} {path}" {status} {size}'
 
@@ -73,6 +121,48 @@ def _get_safe_log_path(request):
     return f"{parsed.path}?{safe_query}" if safe_query else parsed.path
 
 
+def _get_user_id(request):
+    """
+    Retourne l'ID de l'utilisateur authentifié, sans provoquer de requête.
+
+    Un utilisateur de session encore non évalué (SimpleLazyObject) est
+    ignoré : l'évaluer coûterait une requête SQL pour le seul log.
+    """
+    user = request.__dict__.get('user')
+    if user is None or getattr(user, '_wrapped', None) is empty:
+        return None
+    if not getattr(user, 'is_authenticated', False):
+        return None
+    return user.pk
+
+
+def _get_sample_rate(method, path):
+    """
+    Retourne le taux d'échantillonnage d'une requête réussie.
+
+    ACCESS_LOG_SAMPLE_RATES associe un préfixe de chemin, éventuellement
+    précédé de la méthode (« POST /api/locations/ »), à un taux entre 0 et 1.
+    Le préfixe le plus long l'emporte ; 1 par défaut.
+    """
+    best_rate = 1.0
+    best_length = -1
+    for rule, rate in settings.ACCESS_LOG_SAMPLE_RATES.items():
+        rule_method, _, rule_path = rule.rpartition(' ')
+        if rule_method and rule_method.upper() != method:
+            continue
+        if path.startswith(rule_path) and len(rule_path) > best_length:
+            best_rate = rate
+            best_length = len(rule_path)
+    return best_rate
+
+
+def _is_sampled_out(request, status):
+    """Indique si une requête réussie est écartée par l'échantillonnage."""
+    if status >= 400 or not settings.ACCESS_LOG_SAMPLE_RATES:
+        return False
+    return random.random() >= _get_sample_rate(request.method, request.path)
+
+
 def _format_access_log_message(client, method, path, status, size):
     """Construit le message de log au format NCSA pour cohérence avec le formatter verbose."""
     return _LOG_FORMAT.format(
@@ -92,21 +182,205 @@ class AccessLogMiddleware:
     les autres logs ({levelname} {asctime} [{module}] {message}).
     """
 
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
         response = self.get_response(request)
-        self._log_request(request, response)
+        self._log_request(request, response, time.perf_counter() - started)
         return response
 
-    def _log_request(self, request, response):
-        """Enregistre la requête avec le format unifié."""
+    async def __acall__(self, request):
+        """Variante async : aucun thread réservé pendant le traitement de la requête."""
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self._log_request(request, response, time.perf_counter() - started)
+        return response
+
+    def _log_request(self, request, response, duration):
+        """Enregistre la requête avec le format unifié et les champs structurés."""
+        status = response.status_code
+        if not logger.isEnabledFor(logging.INFO) or _is_sampled_out(request, status):
+            return
+
         client = _get_client_ip(request)
         method = request.method
         path = _get_safe_log_path(request)
-        status = response.status_code
         size = _get_response_size(response)
 
         message = _format_access_log_message(client, method, path, status, size)
-        logger.info(message)
+        logger.info(message, extra={
+            'client': client,
+            'method': method,
+            'path': path,
+            'status': status,
+            'size': size,
+            'duration_ms': round(duration * 1000, 2),
+            'user_id': _get_user_id(request),
+        })
+
+
+def _record_db_query(sql, duration):
+    """Écouteur SQL (utils.sql_recorder) : compte les requêtes de la requête HTTP en cours."""
+    stats = _request_db_stats.get()
+    if stats is not None:
+        stats[0] += 1
+        stats[1] += duration
+
+
+def _get_view_name(request):
+    """Nom de la vue résolue (ex. 'games:positions'), 'unresolved' sinon."""
+    resolver_match = getattr(request, 'resolver_match', None)
+    if resolver_match is None:
+        return _UNRESOLVED_VIEW
+    return resolver_match.view_name
+
+
+class MetricsMiddleware:
+    """
+    Middleware qui mesure chaque requête par vue résolue.
+
+    Enregistre la latence, le statut, la taille de la réponse et le nombre
+    et la durée des requêtes SQL (compteurs en mémoire, publiés par le
+    thread de utils.metrics).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        sql_recorder.add_listener(_record_db_query)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _request_db_stats.set([0, 0.0])
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+            self._record(request, response, time.perf_counter() - started)
+        finally:
+            _request_db_stats.reset(token)
+        return response
+
+    async def __acall__(self, request):
+        """Variante async (mêmes mesures)."""
+        token = _request_db_stats.set([0, 0.0])
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+            self._record(request, response, time.perf_counter() - started)
+        finally:
+            _request_db_stats.reset(token)
+        return response
+
+    def _record(self, request, response, duration):
+        """Enregistre les métriques de la requête."""
+        view = _get_view_name(request)
+        queries, query_time = _request_db_stats.get()
+        metrics.increment('http_requests_total', {
+            'view': view, 'method': request.method, 'status': response.status_code,
+        })
+        metrics.observe('http_request_duration_seconds', duration, {'view': view})
+        metrics.observe('http_response_size_bytes', _get_response_size(response), {'view': view})
+        if queries:
+            metrics.increment('db_queries_total', {'view': view}, queries)
+            metrics.increment('db_query_duration_seconds_total', {'view': view}, query_time)
+
+
+class ProfilingMiddleware:
+    """
+    Middleware qui profile une fraction des requêtes (voir utils.profiling).
+
+    cProfile en chaîne synchrone, échantillonneur statistique en chaîne
+    async (Daphne). Le nom du fichier de profil est renvoyé dans l'en-tête
+    X-BridgeQuest-Profile-File lorsque la requête portait l'en-tête de
+    profilage.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        profiling.install_query_capture()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not profiling.should_profile(request.META.get(profiling.PROFILE_HEADER)):
+            return self.get_response(request)
+        profile = profiling.Profile(sampling=False)
+        profile.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            profile.stop()
+        self._expose(request, response, profile.save(_get_view_name(request)))
+        return response
+
+    async def __acall__(self, request):
+        """Variante async (échantillonneur statistique)."""
+        if not profiling.should_profile(request.META.get(profiling.PROFILE_HEADER)):
+            return await self.get_response(request)
+        profile = profiling.Profile(sampling=True)
+        profile.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            profile.stop()
+        self._expose(request, response, await profile.asave(_get_view_name(request)))
+        return response
+
+    def _expose(self, request, response, path):
+        """Indique le fichier de profil au client qui l'a demandé (en-tête de profilage)."""
+        if request.META.get(profiling.PROFILE_HEADER):
+            response['X-BridgeQuest-Profile-File'] = os.path.basename(path)
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise compatible sync et async.
+
+    WhiteNoiseMiddleware est sync-only. Sous ASGI, les requêtes non
+    statiques passent ici sans changer de thread ; seul le service d'un
+    fichier statique (I/O disque) est délégué à un thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        """Sert le fichier statique demandé, sinon transmet la requête (async)."""
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
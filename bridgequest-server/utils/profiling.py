@@ -0,0 +1,325 @@
+"""
+Profilage à la demande des requêtes HTTP et des handlers WebSocket.
+
+Désactivé par défaut (PROFILING_ENABLED) : ProfilingMiddleware lève alors
+MiddlewareNotUsed et profile_consumer retourne le consumer inchangé, sans
+aucun coût sur le chemin des requêtes.
+
+Déclenchement :
+- une fraction PROFILING_SAMPLE_RATE des requêtes et des messages WebSocket,
+- l'en-tête X-BridgeQuest-Profile signé (make_profile_token, valable
+  PROFILING_TOKEN_MAX_AGE_SECONDS). Pour un WebSocket, l'en-tête de la
+  poignée de main profile tous les messages de la connexion.
+
+Profileurs :
+- chaîne synchrone (WSGI, runserver) : cProfile (déterministe), fichier
+  .prof (pstats, snakeviz),
+- chaîne async (Daphne : vues HTTP et consumers) : échantillonneur
+  statistique (sys._current_frames). Le code synchrone y tourne dans les
+  threads de sync_to_async, hors de portée de cProfile (un profileur par
+  thread). Fichier .folded (piles repliées : speedscope, flamegraph.pl) ;
+  les requêtes concurrentes du même processus y figurent aussi.
+
+Sorties dans PROFILING_DIR :
+- <horodatage>-<endpoint>-<id>.prof|.folded et .sql.json (requêtes SQL),
+- index.json : par endpoint, les PROFILING_TOP_N profils les plus lents,
+- rotation : au-delà de PROFILING_MAX_FILES profils, les plus anciens
+  absents de l'index sont supprimés.
+"""
+import cProfile
+import contextvars
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+
+from utils import sql_recorder
+
+PROFILE_HEADER = "HTTP_X_BRIDGEQUEST_PROFILE"
+WEBSOCKET_PROFILE_HEADER = b"x-bridgequest-profile"
+
+_TOKEN_SALT = "bridgequest.profiling"
+_TOKEN_VALUE = "profile"
+_INDEX_FILE = "index.json"
+_PROFILE_SUFFIXES = (".prof", ".folded")
+_QUERIES_SUFFIX = ".sql.json"
+
+# Fichiers des threads en attente (exclus des échantillons : threads inactifs)
+_IDLE_MODULES = ("threading.py", "queue.py", "selectors.py")
+
+# Requêtes SQL du profil en cours ([(sql, durée)]), propagées aux threads de
+# sync_to_async comme les statistiques de MetricsMiddleware
+_profiled_queries = contextvars.ContextVar("profiled_queries", default=None)
+
+_write_lock = threading.Lock()
+
+
+def make_profile_token():
+    """
+    Génère une valeur signée pour l'en-tête X-BridgeQuest-Profile.
+
+    Returns:
+        str: Jeton horodaté (valable PROFILING_TOKEN_MAX_AGE_SECONDS)
+    """
+    return signing.TimestampSigner(salt=_TOKEN_SALT).sign(_TOKEN_VALUE)
+
+
+def _is_valid_token(token):
+    """Vérifie la signature et l'âge d'un jeton de profilage."""
+    if not token:
+        return False
+    try:
+        value = signing.TimestampSigner(salt=_TOKEN_SALT).unsign(
+            token, max_age=settings.PROFILING_TOKEN_MAX_AGE_SECONDS
+        )
+    except signing.BadSignature:
+        return False
+    return value == _TOKEN_VALUE
+
+
+def should_profile(token=None):
+    """
+    Indique si une requête doit être profilée.
+
+    Args:
+        token: Valeur de l'en-tête de profilage (optionnelle)
+
+    Returns:
+        bool: True si le jeton est valide ou si la requête est échantillonnée
+    """
+    return _is_valid_token(token) or random.random() < settings.PROFILING_SAMPLE_RATE
+
+
+def get_websocket_token(scope):
+    """Retourne l'en-tête de profilage de la poignée de main WebSocket."""
+    for name, value in scope.get("headers", ()):
+        if name == WEBSOCKET_PROFILE_HEADER:
+            return value.decode("latin-1")
+    return None
+
+
+def _capture_query(sql, duration):
+    """Écouteur SQL (utils.sql_recorder) : enregistre les requêtes du profil en cours."""
+    queries = _profiled_queries.get()
+    if queries is not None:
+        queries.append((sql, duration))
+
+
+def install_query_capture():
+    """Inscrit la capture SQL auprès de l'enregistreur partagé (profilage actif)."""
+    sql_recorder.add_listener(_capture_query)
+
+
+class _Sampler:
+    """Échantillonneur statistique des piles de tous les threads du processus."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiling-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or frame.f_code.co_filename.endswith(_IDLE_MODULES):
+                    continue
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                self.stacks[self._fold(names.get(thread_id, thread_id), frame)] += 1
+
+    @staticmethod
+    def _fold(thread_name, frame):
+        """Pile repliée : thread;module:fonction;... (de la racine à la feuille)."""
+        parts = []
+        while frame is not None:
+            code = frame.f_code
+            parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+            frame = frame.f_back
+        parts.append(str(thread_name))
+        return ";".join(reversed(parts))
+
+    def dump(self, path):
+        with open(path, "w") as handle:
+            for stack, count in self.stacks.most_common():
+                handle.write(f"{stack} {count}\n")
+
+
+class Profile:
+    """
+    Profil d'une requête ou d'un message WebSocket.
+
+    Args:
+        sampling: Échantillonneur statistique (chaîne async) au lieu de cProfile
+    """
+
+    def __init__(self, sampling):
+        self.sampling = sampling
+        self._profiler = (
+            _Sampler(settings.PROFILING_SAMPLE_INTERVAL_SECONDS) if sampling else cProfile.Profile()
+        )
+        self._queries = []
+        self._token = None
+        self._started = None
+        self.duration = None
+
+    def start(self):
+        """Démarre le profileur et la capture SQL."""
+        self._token = _profiled_queries.set(self._queries)
+        self._started = time.perf_counter()
+        if self.sampling:
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self):
+        """Arrête le profileur et la capture SQL."""
+        if self.sampling:
+            self._profiler.stop()
+        else:
+            self._profiler.disable()
+        self.duration = time.perf_counter() - self._started
+        _profiled_queries.reset(self._token)
+
+    def save(self, endpoint):
+        """
+        Écrit le profil et les requêtes SQL, met à jour l'index et applique la rotation.
+
+        Args:
+            endpoint: Nom de l'endpoint (vue résolue ou handler WebSocket)
+
+        Returns:
+            str: Chemin du fichier de profil
+        """
+        directory = settings.PROFILING_DIR
+        os.makedirs(directory, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", endpoint)[:80]
+        base = f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}-{uuid.uuid4().hex[:8]}"
+        profile_name = base + (".folded" if self.sampling else ".prof")
+
+        if self.sampling:
+            self._profiler.dump(os.path.join(directory, profile_name))
+        else:
+            self._profiler.dump_stats(os.path.join(directory, profile_name))
+        _write_json(os.path.join(directory, base + _QUERIES_SUFFIX), {
+            "endpoint": endpoint,
+            "duration_ms": round(self.duration * 1000, 3),
+            "query_count": len(self._queries),
+            "queries": [
+                {"sql": sql, "duration_ms": round(duration * 1000, 3)}
+                for sql, duration in self._queries
+            ],
+        })
+        with _write_lock:
+            index = _update_index(directory, endpoint, profile_name, self.duration)
+            _rotate(directory, index)
+        return os.path.join(directory, profile_name)
+
+    async def asave(self, endpoint):
+        """Variante async de save (écriture disque hors de la boucle d'événements)."""
+        return await sync_to_async(self.save, thread_sensitive=False)(endpoint)
+
+
+def _write_json(path, payload):
+    """Écrit un fichier JSON de façon atomique (fichier temporaire puis remplacement)."""
+    temporary = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    with open(temporary, "w") as handle:
+        json.dump(payload, handle, indent=2)
+    os.replace(temporary, path)
+
+
+def _read_index(directory):
+    """Lit l'index des profils les plus lents ({} si absent ou illisible)."""
+    try:
+        with open(os.path.join(directory, _INDEX_FILE)) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+
+def _update_index(directory, endpoint, profile_name, duration):
+    """Ajoute un profil à l'index et ne garde que les PROFILING_TOP_N plus lents par endpoint."""
+    index = _read_index(directory)
+    entries = index.get(endpoint, [])
+    entries.append({"duration_ms": round(duration * 1000, 3), "profile": profile_name})
+    entries.sort(key=lambda entry: entry["duration_ms"], reverse=True)
+    index[endpoint] = entries[:settings.PROFILING_TOP_N]
+    _write_json(os.path.join(directory, _INDEX_FILE), index)
+    return index
+
+
+def _rotate(directory, index):
+    """Supprime les profils les plus anciens au-delà de PROFILING_MAX_FILES (hors index)."""
+    kept = {entry["profile"] for entries in index.values() for entry in entries}
+    profiles = sorted(
+        (name for name in os.listdir(directory) if name.endswith(_PROFILE_SUFFIXES)),
+        key=lambda name: os.path.getmtime(os.path.join(directory, name)),
+    )
+    excess = len(profiles) - settings.PROFILING_MAX_FILES
+    for name in profiles:
+        if excess <= 0:
+            break
+        if name in kept:
+            continue
+        base = os.path.splitext(name)[0]
+        for path in (name, base + _QUERIES_SUFFIX):
+            try:
+                os.remove(os.path.join(directory, path))
+            except FileNotFoundError:
+                pass
+        excess -= 1
+
+
+def profile_consumer(consumer_class):
+    """
+    Ajoute le profilage des handlers à un consumer async (si activé).
+
+    Chaque message (websocket.connect, websocket.receive, événements de
+    groupe...) est profilé s'il est échantillonné ou si la poignée de main
+    portait un en-tête de profilage valide.
+
+    Args:
+        consumer_class: Classe de consumer (AsyncConsumer)
+
+    Returns:
+        type: Sous-classe profilée, ou consumer_class inchangée si désactivé
+    """
+    if not settings.PROFILING_ENABLED:
+        return consumer_class
+    install_query_capture()
+
+    class ProfiledConsumer(consumer_class):
+        async def dispatch(self, message):
+            if message["type"] == "websocket.connect":
+                self._profile_connection = _is_valid_token(get_websocket_token(self.scope))
+            if not (getattr(self, "_profile_connection", False) or should_profile()):
+                return await super().dispatch(message)
+            profile = Profile(sampling=True)
+            profile.start()
+            try:
+                return await super().dispatch(message)
+            finally:
+                profile.stop()
+                await profile.asave(f"ws:{consumer_class.__name__}.{message['type']}")
+
+    ProfiledConsumer.__name__ = consumer_class.__name__
+    ProfiledConsumer.__qualname__ = consumer_class.__qualname__
+    return ProfiledConsumer
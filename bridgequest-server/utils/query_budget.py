@@ -0,0 +1,154 @@
+"""
+Budgets de requêtes SQL par vue, service et handler de consumer.
+
+query_budget(name, max_queries=..., max_duration_ms=...) s'utilise comme
+décorateur (fonction sync ou async) ou context manager. Chaque requête SQL
+exécutée dans le bloc est attribuée à tous les budgets actifs (un service
+appelé par une vue compte pour les deux), y compris depuis les threads de
+sync_to_async / database_sync_to_async (contextvar propagée).
+
+En sortie de bloc, un dépassement :
+- lève QueryBudgetExceeded (QUERY_BUDGET_MODE='raise', settings de test :
+  une régression N+1 fait échouer la suite),
+- ou journalise un avertissement sur bridgequest.query_budget ('warn',
+  production, sur une fraction QUERY_BUDGET_SAMPLE_RATE des traitements).
+
+Les traitements mesurés alimentent aussi query_budget_queries_total et
+query_budget_query_seconds_total{scope} (utils.metrics).
+
+QUERY_BUDGET_MODE='off' désactive toute mesure.
+"""
+import contextvars
+import functools
+import logging
+import random
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+
+from utils import metrics, sql_recorder
+
+logger = logging.getLogger('bridgequest.query_budget')
+
+MODE_OFF = 'off'
+MODE_WARN = 'warn'
+MODE_RAISE = 'raise'
+
+# Marqueur d'un traitement non échantillonné : les budgets imbriqués sont ignorés
+_UNSAMPLED = ()
+
+# Budgets actifs du traitement en cours (tuple, du plus externe au plus interne)
+_active_budgets = contextvars.ContextVar('query_budgets', default=None)
+
+metrics.register_counter('query_budget_queries_total', 'Requêtes SQL par vue, service ou handler.')
+metrics.register_counter(
+    'query_budget_query_seconds_total', 'Temps passé en requêtes SQL par vue, service ou handler.'
+)
+metrics.register_counter('query_budget_exceeded_total', 'Dépassements de budget de requêtes SQL.')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Budget de requêtes SQL dépassé (mode 'raise')."""
+
+
+def _record_query(sql, duration):
+    """Écouteur SQL (utils.sql_recorder) : attribue la requête aux budgets actifs."""
+    budgets = _active_budgets.get()
+    if budgets:
+        for budget in budgets:
+            budget.queries.append((sql, duration))
+
+
+class _Budget:
+    """Mesure et limites d'un bloc (voir query_budget)."""
+
+    __slots__ = ('name', 'max_queries', 'max_duration_ms', 'queries')
+
+    def __init__(self, name, max_queries, max_duration_ms):
+        self.name = name
+        self.max_queries = max_queries
+        self.max_duration_ms = max_duration_ms
+        self.queries = []
+
+    def violations(self, duration_ms):
+        """Liste les limites dépassées."""
+        found = []
+        if self.max_queries is not None and len(self.queries) > self.max_queries:
+            found.append(f'{len(self.queries)} requêtes > {self.max_queries}')
+        if self.max_duration_ms is not None and duration_ms > self.max_duration_ms:
+            found.append(f'{duration_ms:.1f} ms > {self.max_duration_ms} ms')
+        return found
+
+
+class query_budget:
+    """
+    Budget de requêtes SQL d'une vue, d'un service ou d'un handler.
+
+    Args:
+        name: Nom du périmètre (label 'scope' des métriques)
+        max_queries: Nombre maximal de requêtes SQL (None : non limité)
+        max_duration_ms: Temps SQL cumulé maximal en ms (None : non limité)
+    """
+
+    def __init__(self, name, max_queries=None, max_duration_ms=None):
+        self.name = name
+        self.max_queries = max_queries
+        self.max_duration_ms = max_duration_ms
+        self._entered = contextvars.ContextVar(f'query_budget_{name}', default=None)
+
+    def __call__(self, func):
+        if iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with self:
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self:
+                return func(*args, **kwargs)
+        return wrapper
+
+    def __enter__(self):
+        budgets = _active_budgets.get()
+        if settings.QUERY_BUDGET_MODE == MODE_OFF or budgets == _UNSAMPLED:
+            budget = None
+            token = None
+        elif budgets is None and random.random() >= settings.QUERY_BUDGET_SAMPLE_RATE:
+            budget = None
+            token = _active_budgets.set(_UNSAMPLED)
+        else:
+            sql_recorder.add_listener(_record_query)
+            budget = _Budget(self.name, self.max_queries, self.max_duration_ms)
+            token = _active_budgets.set((budgets or ()) + (budget,))
+        # Pile par contexte : un même budget peut être actif dans plusieurs
+        # tâches ou threads, voire imbriqué (récursion)
+        self._entered.set((budget, token, self._entered.get()))
+        return budget
+
+    def __exit__(self, exc_type, exc, traceback):
+        budget, token, outer = self._entered.get()
+        self._entered.set(outer)
+        if token is not None:
+            _active_budgets.reset(token)
+        if budget is not None:
+            _check(budget, failed=exc_type is not None)
+        return False
+
+
+def _check(budget, failed):
+    """Enregistre les métriques du bloc et signale un dépassement."""
+    duration = sum(query_duration for _, query_duration in budget.queries)
+    labels = {'scope': budget.name}
+    metrics.increment('query_budget_queries_total', labels, len(budget.queries))
+    metrics.increment('query_budget_query_seconds_total', labels, duration)
+    violations = budget.violations(duration * 1000)
+    if not violations:
+        return
+    metrics.increment('query_budget_exceeded_total', labels)
+    message = f'Budget SQL dépassé pour {budget.name} : {", ".join(violations)}'
+    if settings.QUERY_BUDGET_MODE == MODE_RAISE and not failed:
+        statements = '\n'.join(f'  {sql}' for sql, _ in budget.queries)
+        raise QueryBudgetExceeded(f'{message}\n{statements}')
+    logger.warning(message, extra={'scope': budget.name, 'query_count': len(budget.queries)})
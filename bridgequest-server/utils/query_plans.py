@@ -0,0 +1,147 @@
+"""
+Plans d'exécution (EXPLAIN) des requêtes chaudes de Bridge Quest.
+
+capture_plans(func, ...) exécute un chemin de code réel (service, vue) en
+interceptant ses SELECT, puis rejoue EXPLAIN sur chacun avec les mêmes
+paramètres. Les plans ne dépendent donc pas d'une copie du queryset : une
+modification du service (filtre, tri, ordering implicite du modèle) est
+vue telle qu'elle part en base.
+
+plan_regressions(plan) signale les nœuds qui ne passent pas à l'échelle :
+- SQLite (EXPLAIN QUERY PLAN) : parcours complet d'une table ou d'un
+  index ('SCAN <table>', 'SCAN <table> USING [COVERING] INDEX ...', par
+  opposition à 'SEARCH' borné par une clé) et tri en B-tree temporaire
+  ('USE TEMP B-TREE FOR ORDER BY', '... FOR GROUP BY', ...),
+- PostgreSQL (EXPLAIN) : 'Seq Scan' et nœuds 'Sort' / 'Incremental Sort'.
+
+Les plans ne sont représentatifs que sur des tables volumineuses dont les
+statistiques sont à jour (voir analyze) : sur quelques lignes, les deux
+moteurs préfèrent légitimement un parcours complet.
+"""
+import re
+
+from django.db import connections
+
+VENDOR_SQLITE = 'sqlite'
+VENDOR_POSTGRESQL = 'postgresql'
+
+_SQLITE_FULL_SCAN = re.compile(r'^SCAN (?!CONSTANT ROW)')
+_SQLITE_TEMP_SORT = 'USE TEMP B-TREE'
+_POSTGRESQL_FULL_SCAN = re.compile(r'\bSeq Scan on\b')
+_POSTGRESQL_SORT = re.compile(r'^(?:->\s*)?(?:Incremental )?Sort\s+\(')
+
+
+class QueryPlan:
+    """
+    Plan d'exécution d'une requête capturée.
+
+    Args:
+        sql: Requête SQL (paramètres non substitués)
+        params: Paramètres de la requête
+        vendor: Moteur ('sqlite' ou 'postgresql')
+        lines: Lignes du plan, dans l'ordre de sortie d'EXPLAIN
+    """
+
+    __slots__ = ('sql', 'params', 'vendor', 'lines')
+
+    def __init__(self, sql, params, vendor, lines):
+        self.sql = sql
+        self.params = params
+        self.vendor = vendor
+        self.lines = lines
+
+    def __str__(self):
+        return '\n'.join([self.sql, *(f'  {line}' for line in self.lines)])
+
+
+def analyze(using='default'):
+    """
+    Met à jour les statistiques du planificateur (ANALYZE).
+
+    Args:
+        using: Alias de la base
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def explain(sql, params, using='default'):
+    """
+    Retourne le plan d'exécution d'une requête.
+
+    Args:
+        sql: Requête SQL
+        params: Paramètres de la requête
+        using: Alias de la base
+
+    Returns:
+        QueryPlan: Le plan (une ligne par nœud)
+
+    Raises:
+        NotImplementedError: Si le moteur n'est ni SQLite ni PostgreSQL
+    """
+    connection = connections[using]
+    vendor = connection.vendor
+    with connection.cursor() as cursor:
+        if vendor == VENDOR_SQLITE:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            # Colonnes (id, parent, notused, detail)
+            lines = [row[-1] for row in cursor.fetchall()]
+        elif vendor == VENDOR_POSTGRESQL:
+            cursor.execute(f'EXPLAIN {sql}', params)
+            lines = [row[0] for row in cursor.fetchall()]
+        else:
+            raise NotImplementedError(f'EXPLAIN non pris en charge pour {vendor}')
+    return QueryPlan(sql, params, vendor, lines)
+
+
+def capture_plans(func, *args, using='default', **kwargs):
+    """
+    Exécute func et retourne le plan de chacun de ses SELECT.
+
+    Les autres requêtes (INSERT, UPDATE, ...) s'exécutent normalement mais
+    ne sont pas expliquées.
+
+    Args:
+        func: Chemin de code à exécuter (service, vue)
+        *args: Arguments positionnels de func
+        using: Alias de la base
+        **kwargs: Arguments nommés de func
+
+    Returns:
+        list[QueryPlan]: Les plans, dans l'ordre d'exécution des requêtes
+    """
+    statements = []
+
+    def capture(execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith('SELECT'):
+            statements.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connections[using].execute_wrapper(capture):
+        func(*args, **kwargs)
+    return [explain(sql, params, using) for sql, params in statements]
+
+
+def plan_regressions(plan, allow_sort=False):
+    """
+    Lignes d'un plan indiquant un parcours complet ou un tri temporaire.
+
+    Args:
+        plan: QueryPlan
+        allow_sort: Tolère les tris (requête dont l'ensemble trié est borné
+            par un parcours d'index, ex. les collisions d'un nom d'utilisateur)
+
+    Returns:
+        list[str]: Les lignes fautives (vide si le plan est sain)
+    """
+    if plan.vendor == VENDOR_SQLITE:
+        full_scan, sort = _SQLITE_FULL_SCAN.match, lambda line: _SQLITE_TEMP_SORT in line
+    else:
+        full_scan, sort = _POSTGRESQL_FULL_SCAN.search, _POSTGRESQL_SORT.match
+    regressions = []
+    for line in plan.lines:
+        line = line.strip()
+        if full_scan(line) or (not allow_sort and sort(line)):
+            regressions.append(line)
+    return regressions
@@ -0,0 +1,30 @@
+"""
+Accès à la connexion Redis du cache partagé.
+
+Les opérations hors API de cache Django (sorted sets, scripts Lua
+atomiques) passent par la connexion exposée par django-redis, backend de
+cache de production. En développement et en tests (LocMemCache), aucune
+connexion n'est disponible : les appelants se replient sur le cache Django
+ou la base.
+"""
+from django.core.cache import DEFAULT_CACHE_ALIAS
+
+
+def get_redis_client(alias=DEFAULT_CACHE_ALIAS):
+    """
+    Retourne le client Redis d'un cache, ou None si le cache n'est pas Redis.
+
+    Args:
+        alias: Alias du cache dans settings.CACHES.
+
+    Returns:
+        redis.Redis | None: Client Redis (django-redis), ou None.
+    """
+    try:
+        from django_redis import get_redis_connection
+    except ImportError:
+        return None
+    try:
+        return get_redis_connection(alias)
+    except NotImplementedError:
+        return None  # Cache non Redis (LocMemCache en développement et tests)
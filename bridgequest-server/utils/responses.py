@@ -3,6 +3,7 @@ Utilitaires pour les réponses API.
 
 Fonctions partagées pour construire des réponses HTTP standardisées.
 """
+from django.http import JsonResponse
 from rest_framework import status
 from rest_framework.response import Response
 
@@ -19,3 +20,17 @@ def error_response(message, status_code=status.HTTP_400_BAD_REQUEST):
         Response: Réponse DRF avec {"error": "..."}.
     """
     return Response({"error": str(message)}, status=status_code)
+
+
+def json_error_response(message, status_code=status.HTTP_400_BAD_REQUEST):
+    """
+    Construit une réponse d'erreur standardisée pour les vues Django natives (async).
+
+    Args:
+        message: Message d'erreur (str ou exception avec __str__).
+        status_code: Code HTTP (400 par défaut).
+
+    Returns:
+        JsonResponse: Réponse JSON avec {"error": "..."}.
+    """
+    return JsonResponse({"error": str(message)}, status=status_code)
@@ -0,0 +1,60 @@
+"""
+Enregistreur SQL partagé (métriques HTTP, budgets de requêtes, profilage).
+
+Un seul wrapper d'exécution par connexion mesure chaque requête et la
+transmet aux écouteurs inscrits (add_listener). Chaque écouteur décide
+lui-même, via sa contextvar, si la requête le concerne.
+
+Le wrapper est inséré en tête de connection.execute_wrappers (le plus
+interne) : connection.execute_wrapper() retire le dernier wrapper de la
+liste en sortie de bloc, une installation pendant un tel bloc ne doit pas
+s'intercaler à sa place (le bloc retirerait l'enregistreur et laisserait son
+propre wrapper en place).
+"""
+import time
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+# Écouteurs : fonction (sql, durée en secondes)
+_listeners = []
+
+
+def _record_query(execute, sql, params, many, context):
+    """Wrapper d'exécution SQL : mesure la requête et la transmet aux écouteurs."""
+    if not _listeners:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        for listener in _listeners:
+            listener(sql, duration)
+
+
+def _install(connection, **kwargs):
+    """Ajoute l'enregistreur à une connexion (une seule fois, en wrapper le plus interne)."""
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _record_query)
+
+
+def install():
+    """Installe l'enregistreur sur les connexions déjà ouvertes du thread courant."""
+    for connection in connections.all(initialized_only=True):
+        _install(connection)
+
+
+def add_listener(listener):
+    """
+    Inscrit un écouteur des requêtes SQL (une seule fois) et installe l'enregistreur.
+
+    Args:
+        listener: Fonction (sql, durée en secondes), appelée après chaque requête
+    """
+    if listener not in _listeners:
+        _listeners.append(listener)
+    install()
+
+
+connection_created.connect(_install)
@@ -8,7 +8,7 @@ from rest_framework import status
 from utils.exceptions import BridgeQuestException
 from utils.messages import ErrorMessages
 
-# Timeout (secondes) pour les appels HTTP vers les APIs SSO (Google tokeninfo, Apple keys)
+# Timeout (secondes) pour les appels HTTP vers les APIs SSO (clés publiques Google et Apple)
 REQUEST_TIMEOUT_SECONDS = 10
 
 
@@ -0,0 +1,7 @@
+"""
+Tests du module Utils.
+
+Les tests unitaires et d'intégration seront organisés ici.
+"""
+# Ne pas importer les classes de test ici pour éviter les conflits avec Django test discovery
+# Les tests sont automatiquement découverts par Django
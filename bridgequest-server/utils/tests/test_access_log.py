@@ -0,0 +1,188 @@
+"""
+Tests pour le pipeline d'access logs (AccessLogMiddleware, utils.log_handlers).
+"""
+import json
+import logging
+import threading
+import time
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils.functional import SimpleLazyObject
+
+from utils import metrics, middleware
+from utils.log_handlers import JSONFormatter, QueueListenerHandler
+from utils.middleware import AccessLogMiddleware
+
+User = get_user_model()
+
+
+class _ListHandler(logging.Handler):
+    """Handler de test conservant les enregistrements (délai d'écriture optionnel)."""
+
+    def __init__(self, delay=0.0):
+        super().__init__()
+        self.delay = delay
+        self.records = []
+
+    def emit(self, record):
+        time.sleep(self.delay)
+        self.records.append(record)
+
+
+class QueueListenerHandlerTestCase(SimpleTestCase):
+    """Tests pour QueueListenerHandler et JSONFormatter."""
+
+    def _handler(self, target, **kwargs):
+        """Construit un handler de file (fermé en fin de test)."""
+        handler = QueueListenerHandler([target], **kwargs)
+        self.addCleanup(handler.close)
+        return handler
+
+    def _record(self, message="message", **extra):
+        """Construit un enregistrement avec des champs extra."""
+        record = logging.LogRecord(
+            "bridgequest.access", logging.INFO, __file__, 1, message, (), None
+        )
+        record.__dict__.update(extra)
+        return record
+
+    def test_records_are_written_by_background_thread(self):
+        """Test que les enregistrements sont écrits hors du thread appelant."""
+        target = _ListHandler()
+        handler = self._handler(target)
+        caller = threading.get_ident()
+        writers = []
+        target.emit = lambda record: writers.append(threading.get_ident())
+
+        handler.handle(self._record())
+        handler.flush()
+
+        self.assertEqual(len(writers), 1)
+        self.assertNotEqual(writers[0], caller)
+
+    def test_slow_target_does_not_block_caller(self):
+        """Test qu'une cible lente ne ralentit pas l'émission."""
+        target = _ListHandler(delay=0.05)
+        handler = self._handler(target)
+
+        started = time.perf_counter()
+        for _ in range(5):
+            handler.handle(self._record())
+        elapsed = time.perf_counter() - started
+        handler.flush()
+
+        self.assertLess(elapsed, 0.05)
+        self.assertEqual(len(target.records), 5)
+
+    def test_full_queue_drops_records(self):
+        """Test qu'une file pleine abandonne l'enregistrement au lieu de bloquer."""
+        release = threading.Event()
+        target = _ListHandler()
+        target.emit = lambda record: release.wait(timeout=5)
+        handler = self._handler(target, queue_size=1)
+
+        for _ in range(5):
+            handler.handle(self._record())
+        release.set()
+
+        self.assertGreaterEqual(handler.dropped, 3)
+
+    def test_dropped_records_are_counted_in_metrics(self):
+        """Test que les abandons sont exportés par handler (log_records_dropped_total)."""
+        metrics.reset()
+        release = threading.Event()
+        target = _ListHandler()
+        target.emit = lambda record: release.wait(timeout=5)
+        handler = self._handler(target, queue_size=1)
+        handler.set_name("access_queue")
+
+        for _ in range(5):
+            handler.handle(self._record())
+        release.set()
+
+        labels = (("handler", "access_queue"),)
+        self.assertEqual(
+            metrics.snapshot()[("log_records_dropped_total", labels)], handler.dropped
+        )
+
+    def test_unconfigured_targets_are_rejected(self):
+        """Test qu'une cible non encore configurée (dictConfig) est refusée."""
+        with self.assertRaises(TypeError):
+            QueueListenerHandler([{"class": "logging.StreamHandler"}])
+
+    def test_json_formatter_includes_extra_fields(self):
+        """Test que le JSONFormatter produit une ligne JSON avec les champs extra."""
+        line = JSONFormatter().format(self._record("GET /", duration_ms=1.5, user_id=7))
+
+        payload = json.loads(line)
+        self.assertEqual(payload["message"], "GET /")
+        self.assertEqual(payload["level"], "INFO")
+        self.assertEqual((payload["duration_ms"], payload["user_id"]), (1.5, 7))
+
+
+class AccessLogMiddlewareTestCase(TestCase):
+    """Tests pour AccessLogMiddleware (champs structurés, échantillonnage)."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        self.factory = RequestFactory()
+        self.status = 200
+
+    def _log(self, method="get", path="/api/games/", user=None):
+        """Exécute le middleware et retourne les enregistrements émis."""
+        request = getattr(self.factory, method)(path)
+        if user is not None:
+            request.user = user
+        access_middleware = AccessLogMiddleware(
+            lambda request: HttpResponse(b"ok", status=self.status)
+        )
+        with self.assertLogs("bridgequest.access", level="INFO") as logs:
+            middleware.logger.info("marker")
+            access_middleware(request)
+        return logs.records[1:]
+
+    def test_log_contains_structured_fields(self):
+        """Test que l'enregistrement porte durée, statut, taille et utilisateur."""
+        user = User.objects.create_user(username="logged", email="logged@example.com")
+
+        record, = self._log(user=user)
+
+        self.assertEqual(
+            (record.method, record.path, record.status, record.size),
+            ("GET", "/api/games/", 200, 2),
+        )
+        self.assertEqual(record.user_id, user.id)
+        self.assertGreaterEqual(record.duration_ms, 0)
+
+    def test_unevaluated_session_user_is_not_loaded(self):
+        """Test qu'un utilisateur de session non évalué n'est pas chargé pour le log."""
+        loader = patch.object(User.objects, "get").start()
+        self.addCleanup(patch.stopall)
+
+        record, = self._log(user=SimpleLazyObject(lambda: AnonymousUser()))
+
+        self.assertIsNone(record.user_id)
+        loader.assert_not_called()
+
+    @override_settings(ACCESS_LOG_SAMPLE_RATES={"POST /api/locations/": 0.0})
+    def test_sampled_path_skips_successful_requests(self):
+        """Test qu'un chemin échantillonné à 0 n'enregistre pas les succès."""
+        self.assertEqual(self._log(method="post", path="/api/locations/"), [])
+        self.assertEqual(len(self._log(method="get", path="/api/locations/")), 1)
+
+    @override_settings(ACCESS_LOG_SAMPLE_RATES={"POST /api/locations/": 0.0})
+    def test_errors_are_always_logged(self):
+        """Test que les erreurs sont enregistrées même sur un chemin échantillonné."""
+        self.status = 500
+
+        self.assertEqual(len(self._log(method="post", path="/api/locations/")), 1)
+
+    @override_settings(ACCESS_LOG_SAMPLE_RATES={"/api/": 0.0, "/api/games/": 1.0})
+    def test_longest_prefix_wins(self):
+        """Test que la règle au préfixe le plus long s'applique."""
+        self.assertEqual(len(self._log(path="/api/games/")), 1)
+        self.assertEqual(self._log(path="/api/auth/me/"), [])
@@ -0,0 +1,187 @@
+"""
+Tests pour le client HTTP sortant partagé (utils.http_client).
+
+Les appels visent un faux fournisseur HTTP local dont les réponses sont scriptées.
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import requests
+from django.test import SimpleTestCase
+
+from utils import http_client, metrics
+from utils.http_client import OutboundHTTPClient, UpstreamUnavailableError
+
+
+class OutboundHTTPClientTestCase(SimpleTestCase):
+    """Tests pour OutboundHTTPClient (pool, retries, disjoncteur, concurrence)."""
+
+    def setUp(self):
+        """Démarre un faux fournisseur renvoyant les statuts de self.statuses."""
+        self.statuses = []
+        self.requests_received = 0
+        self.connections = set()
+        self.release = threading.Event()
+        self.release.set()
+        test = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                test.requests_received += 1
+                test.connections.add(self.client_address)
+                test.release.wait(timeout=5)
+                status = test.statuses.pop(0) if test.statuses else 200
+                body = b"{}"
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.host = f"127.0.0.1:{server.server_port}"
+        self.url = f"http://{self.host}/keys"
+
+        patcher = patch.object(http_client, "_RETRY_BACKOFF_BASE_SECONDS", 0)  # Backoff immédiat
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        metrics.reset()
+
+    def _metric(self, name, host=None, **labels):
+        """Valeur d'une métrique outbound_http_* de l'hôte testé (0 si absente)."""
+        key = (name, tuple(sorted({"host": host or self.host, **labels}.items())))
+        return metrics.snapshot().get(key, 0)
+
+    def _client(self, **kwargs):
+        """Construit un client de test (paramètres surchargeables)."""
+        options = {
+            "pool_size": 2,
+            "max_concurrency_per_host": 4,
+            "max_retries": 2,
+            "circuit_failure_threshold": 2,
+            "circuit_reset_seconds": 60,
+            **kwargs,
+        }
+        return OutboundHTTPClient(**options)
+
+    def test_connections_are_reused(self):
+        """Test que les appels successifs réutilisent la connexion keep-alive."""
+        client = self._client()
+
+        for _ in range(3):
+            self.assertEqual(client.get(self.url, timeout=2).status_code, 200)
+
+        self.assertEqual(self.requests_received, 3)
+        self.assertEqual(len(self.connections), 1)
+
+    def test_retries_transient_errors(self):
+        """Test qu'une erreur 503 transitoire est retentée puis réussit."""
+        self.statuses = [503, 200]
+        client = self._client()
+
+        response = client.get(self.url, timeout=2)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._metric("outbound_http_requests_total"), 2)
+        self.assertEqual(self._metric("outbound_http_retries_total"), 1)
+        self.assertEqual(self._metric("outbound_http_circuit_open"), 0)
+
+    def test_circuit_opens_and_fails_fast(self):
+        """Test que le disjoncteur s'ouvre après des échecs et refuse les appels suivants."""
+        self.statuses = [503] * 6
+        client = self._client(max_retries=2)
+
+        client.get(self.url, timeout=2)
+        client.get(self.url, timeout=2)
+        with self.assertRaises(UpstreamUnavailableError):
+            client.get(self.url, timeout=2)
+
+        self.assertEqual(self.requests_received, 6)
+        self.assertEqual(self._metric("outbound_http_circuit_open"), 1)
+        self.assertEqual(self._metric("outbound_http_rejected_total", reason="circuit"), 1)
+
+    def test_half_open_probe_closes_circuit(self):
+        """Test qu'un appel d'essai réussi après le délai referme le disjoncteur."""
+        self.statuses = [503, 503]
+        client = self._client(max_retries=0, circuit_reset_seconds=0)
+
+        client.get(self.url, timeout=2)
+        client.get(self.url, timeout=2)
+        self.assertEqual(self._metric("outbound_http_circuit_open"), 1)
+
+        self.assertEqual(client.get(self.url, timeout=2).status_code, 200)
+        self.assertEqual(self._metric("outbound_http_circuit_open"), 0)
+
+    def test_network_error_is_raised_after_retries(self):
+        """Test qu'une erreur réseau persistante est levée après les tentatives."""
+        client = self._client(max_retries=1)
+
+        with self.assertRaises(requests.RequestException):
+            client.get("http://127.0.0.1:1/keys", timeout=1)
+
+        self.assertEqual(self._metric("outbound_http_requests_total", "127.0.0.1:1"), 2)
+        self.assertEqual(self._metric("outbound_http_failures_total", "127.0.0.1:1"), 2)
+
+    def test_concurrency_is_bounded_per_host(self):
+        """Test qu'au-delà de la concurrence autorisée, l'appel échoue immédiatement."""
+        client = self._client(max_concurrency_per_host=1)
+        self.release.clear()
+        pending = threading.Thread(target=client.get, args=(self.url,), kwargs={"timeout": 5})
+        pending.start()
+        while self.requests_received == 0:
+            time.sleep(0.01)
+
+        try:
+            with self.assertRaises(UpstreamUnavailableError):
+                client.get(self.url, timeout=2)
+        finally:
+            self.release.set()
+            pending.join()
+
+        self.assertEqual(self._metric("outbound_http_rejected_total", reason="concurrency"), 1)
+
+    def test_unexpected_probe_error_reopens_circuit(self):
+        """Test qu'un essai interrompu par une exception quelconque rouvre le disjoncteur."""
+        self.statuses = [503]
+        client = self._client(max_retries=0, circuit_failure_threshold=1, circuit_reset_seconds=0)
+        client.get(self.url, timeout=2)
+
+        with patch.object(client.session, "get", side_effect=ValueError("réponse illisible")):
+            with self.assertRaises(ValueError):
+                client.get(self.url, timeout=2)
+
+        self.assertEqual(client._host_state(self.host).circuit.state, "open")
+        self.assertEqual(client.get(self.url, timeout=2).status_code, 200)
+
+    def test_saturated_host_does_not_consume_probe(self):
+        """Test qu'un appel refusé faute de créneau ne consomme pas l'appel d'essai."""
+        self.statuses = [503]
+        client = self._client(
+            max_concurrency_per_host=1, max_retries=0, circuit_failure_threshold=1,
+            circuit_reset_seconds=0,
+        )
+        client.get(self.url, timeout=2)
+        state = client._host_state(self.host)
+
+        state.semaphore.acquire()
+        try:
+            with self.assertRaises(UpstreamUnavailableError):
+                client.get(self.url, timeout=2)
+        finally:
+            state.semaphore.release()
+
+        self.assertEqual(state.circuit.state, "open")
+        self.assertEqual(client.get(self.url, timeout=2).status_code, 200)
+
+    def test_get_http_client_is_shared(self):
+        """Test que le client du processus est unique."""
+        self.assertIs(http_client.get_http_client(), http_client.get_http_client())
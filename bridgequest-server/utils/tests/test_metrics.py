@@ -0,0 +1,202 @@
+"""
+Tests pour les métriques (utils.metrics, MetricsMiddleware, /internal/metrics/).
+"""
+import threading
+from unittest.mock import ANY, MagicMock, patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from utils import metrics
+from utils.middleware import MetricsMiddleware
+from utils.sql_recorder import _record_query
+
+User = get_user_model()
+
+metrics.register_counter("test_events_total", "Compteur de test.")
+metrics.register_histogram("test_latency_seconds", "Histogramme de test.", (0.1, 1))
+metrics.register_gauge("test_connections", "Jauge de test.")
+
+
+class MetricsRegistryTestCase(TestCase):
+    """Tests pour l'enregistrement, l'agrégation et le rendu des métriques."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        cache.clear()
+        metrics.reset()
+
+    def test_counters_from_all_threads_are_merged(self):
+        """Test que les fragments de chaque thread sont additionnés."""
+        def record():
+            for _ in range(100):
+                metrics.increment("test_events_total", {"kind": "a"})
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(metrics.snapshot()[("test_events_total", (("kind", "a"),))], 400)
+
+    def test_histogram_rendering_is_cumulative(self):
+        """Test que les buckets d'histogramme sont rendus cumulés avec somme et nombre."""
+        for value in (0.05, 0.5, 5):
+            metrics.observe("test_latency_seconds", value, {"view": "v"})
+
+        text = metrics.render_prometheus(metrics.snapshot())
+
+        self.assertIn("# TYPE test_latency_seconds histogram", text)
+        self.assertIn('test_latency_seconds_bucket{view="v",le="0.1"} 1', text)
+        self.assertIn('test_latency_seconds_bucket{view="v",le="1"} 2', text)
+        self.assertIn('test_latency_seconds_bucket{view="v",le="+Inf"} 3', text)
+        self.assertIn('test_latency_seconds_count{view="v"} 3', text)
+
+    def test_label_values_are_escaped(self):
+        """Test que les valeurs de labels sont échappées."""
+        metrics.increment("test_events_total", {"kind": 'a"b'})
+
+        text = metrics.render_prometheus(metrics.snapshot())
+
+        self.assertIn('test_events_total{kind="a\\"b"} 1', text)
+
+    def test_gauge_hides_series_back_to_zero(self):
+        """Test qu'une jauge revenue à zéro n'est plus exposée."""
+        metrics.increment("test_connections", {"game": 1})
+        metrics.increment("test_connections", {"game": 2})
+        metrics.increment("test_connections", {"game": 2}, -1)
+
+        text = metrics.render_prometheus(metrics.snapshot())
+
+        self.assertIn("# TYPE test_connections gauge", text)
+        self.assertIn('test_connections{game="1"} 1', text)
+        self.assertNotIn('game="2"', text)
+
+    def test_adjusted_gauge_drops_series_back_to_zero(self):
+        """Test qu'adjust_gauge supprime la série revenue à zéro, même entre threads."""
+        metrics.adjust_gauge("test_connections", {"game": 1}, 1)
+        closer = threading.Thread(
+            target=metrics.adjust_gauge, args=("test_connections", {"game": 1}, -1)
+        )
+        closer.start()
+        closer.join()
+        metrics.adjust_gauge("test_connections", {"game": 2}, 1)
+
+        series = metrics.snapshot()
+
+        self.assertNotIn(("test_connections", (("game", 1),)), series)
+        self.assertEqual(series[("test_connections", (("game", 2),))], 1)
+
+    def test_collect_sums_all_workers(self):
+        """Test que le scrape additionne les totaux publiés par les autres workers."""
+        metrics.increment("test_events_total", {"kind": "a"}, 2)
+        cache.set("metrics:shard:other:1", {("test_events_total", (("kind", "a"),)): 5})
+        workers = [metrics.get_worker_id(), "other:1"]
+
+        with patch("utils.metrics.get_active_workers", return_value=workers):
+            series = metrics.collect()
+
+        self.assertEqual(series[("test_events_total", (("kind", "a"),))], 7)
+
+    def test_workers_are_tracked_in_redis_sorted_set(self):
+        """Test que la publication enregistre le worker par ZADD (sans relecture du registre)."""
+        client = MagicMock()
+        client.zrangebyscore.return_value = [b"other:1"]
+
+        with patch("utils.metrics.get_redis_client", return_value=client):
+            metrics.flush()
+            workers = metrics.get_active_workers()
+
+        pipeline = client.pipeline.return_value
+        key = cache.make_and_validate_key("metrics:workers")
+        pipeline.zadd.assert_called_once_with(key, {metrics.get_worker_id(): ANY})
+        pipeline.zremrangebyscore.assert_called_once_with(key, "-inf", ANY)
+        pipeline.execute.assert_called_once_with()
+        client.get.assert_not_called()
+        self.assertEqual(workers, ["other:1"])
+
+    def test_first_record_starts_publisher_thread(self):
+        """Test que le premier enregistrement démarre le thread démon de publication."""
+        metrics.increment("test_events_total", {"kind": "a"})
+
+        self.assertTrue(metrics._publisher.daemon)
+        self.assertTrue(metrics._publisher.is_alive())
+
+
+class MetricsMiddlewareTestCase(TestCase):
+    """Tests pour MetricsMiddleware et l'endpoint d'exposition."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        cache.clear()
+        metrics.reset()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="metrics", email="metrics@example.com")
+
+    def test_request_is_recorded_by_resolved_view(self):
+        """Test que statut, latence, taille et SQL sont enregistrés par vue résolue."""
+        self.client.force_authenticate(user=self.user)
+        self.client.get(f"/api/auth/profile/{self.user.id}/")
+
+        series = metrics.snapshot()
+        labels = (("method", "GET"), ("status", 200), ("view", "accounts:user-profile"))
+        self.assertEqual(series[("http_requests_total", labels)], 1)
+        self.assertEqual(
+            series[("http_request_duration_seconds", (("view", "accounts:user-profile"),))][2], 1
+        )
+        view_labels = (("view", "accounts:user-profile"),)
+        self.assertGreaterEqual(series[("db_queries_total", view_labels)], 1)
+
+    def test_recorder_installation_keeps_active_execute_wrappers(self):
+        """Test qu'une installation pendant un execute_wrapper ne déplace pas ce wrapper."""
+        def passthrough(execute, sql, params, many, context):
+            return execute(sql, params, many, context)
+
+        installed = connection.execute_wrappers
+        connection.execute_wrappers = []
+        try:
+            with connection.execute_wrapper(passthrough):
+                MetricsMiddleware(lambda request: None)
+
+            self.assertEqual(connection.execute_wrappers, [_record_query])
+        finally:
+            connection.execute_wrappers = installed
+
+    def test_request_path_does_not_publish(self):
+        """Test qu'une requête ne met à jour que les compteurs en mémoire (pas de cache)."""
+        with patch("utils.metrics.cache") as mock_cache:
+            self.client.get("/no/such/path/")
+
+        mock_cache.set.assert_not_called()
+
+    def test_unresolved_requests_share_one_label(self):
+        """Test que les URLs inconnues sont regroupées (cardinalité bornée)."""
+        self.client.get("/no/such/path/")
+        self.client.get("/other/missing/")
+
+        labels = (("method", "GET"), ("status", 404), ("view", "unresolved"))
+        self.assertEqual(metrics.snapshot()[("http_requests_total", labels)], 2)
+
+    def test_metrics_endpoint_exposes_prometheus_text(self):
+        """Test que l'endpoint expose les métriques au format Prometheus."""
+        self.client.get("/no/such/path/")
+
+        response = self.client.get("/internal/metrics/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn(
+            b'http_requests_total{method="GET",status="404",view="unresolved"} 1', response.content
+        )
+
+    def test_metrics_endpoint_rejects_other_addresses(self):
+        """Test que l'endpoint est invisible hors des adresses autorisées (XFF ignoré)."""
+        response = self.client.get(
+            "/internal/metrics/", REMOTE_ADDR="203.0.113.5", HTTP_X_FORWARDED_FOR="127.0.0.1"
+        )
+
+        self.assertEqual(response.status_code, 404)
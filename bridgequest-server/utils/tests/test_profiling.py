@@ -0,0 +1,153 @@
+"""
+Tests pour le profilage à la demande (utils.profiling, ProfilingMiddleware).
+"""
+import json
+import os
+import tempfile
+
+from asgiref.sync import async_to_sync
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from games.consumers import GameConsumer
+from utils import profiling
+from utils.middleware import ProfilingMiddleware
+from utils.sql_recorder import _record_query
+
+User = get_user_model()
+
+
+class ProfilingTestCase(TestCase):
+    """Tests pour ProfilingMiddleware, la rotation et profile_consumer."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        settings_override = override_settings(
+            PROFILING_ENABLED=True,
+            PROFILING_SAMPLE_RATE=0.0,
+            PROFILING_DIR=self.directory,
+            PROFILING_SAMPLE_INTERVAL_SECONDS=0.001,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.factory = RequestFactory()
+
+    def _view(self, request):
+        """Vue de test exécutant une requête SQL."""
+        User.objects.count()
+        return HttpResponse(b"ok")
+
+    def _files(self, suffix):
+        """Fichiers du répertoire de profils ayant ce suffixe."""
+        return sorted(name for name in os.listdir(self.directory) if name.endswith(suffix))
+
+    def _index(self):
+        """Contenu de l'index des profils les plus lents."""
+        with open(os.path.join(self.directory, "index.json")) as handle:
+            return json.load(handle)
+
+    def test_disabled_middleware_is_removed_from_chain(self):
+        """Test que le middleware désactivé lève MiddlewareNotUsed."""
+        with override_settings(PROFILING_ENABLED=False):
+            with self.assertRaises(MiddlewareNotUsed):
+                ProfilingMiddleware(self._view)
+
+    def test_disabled_consumer_is_unchanged(self):
+        """Test que profile_consumer ne modifie pas le consumer si désactivé."""
+        with override_settings(PROFILING_ENABLED=False):
+            self.assertIs(profiling.profile_consumer(GameConsumer), GameConsumer)
+
+    def test_signed_header_writes_profile_and_queries(self):
+        """Test qu'un en-tête signé produit un profil cProfile et la liste SQL."""
+        request = self.factory.get("/", HTTP_X_BRIDGEQUEST_PROFILE=profiling.make_profile_token())
+
+        response = ProfilingMiddleware(self._view)(request)
+
+        profile, = self._files(".prof")
+        self.assertEqual(response["X-BridgeQuest-Profile-File"], profile)
+        queries_file, = self._files(".sql.json")
+        with open(os.path.join(self.directory, queries_file)) as handle:
+            queries = json.load(handle)
+        self.assertEqual(queries["query_count"], 1)
+        self.assertIn("COUNT", queries["queries"][0]["sql"])
+        self.assertEqual(self._index()["unresolved"][0]["profile"], profile)
+
+    def test_capture_installation_keeps_active_execute_wrappers(self):
+        """Test qu'une installation pendant un execute_wrapper ne déplace pas ce wrapper."""
+        def passthrough(execute, sql, params, many, context):
+            return execute(sql, params, many, context)
+
+        request = self.factory.get("/", HTTP_X_BRIDGEQUEST_PROFILE=profiling.make_profile_token())
+        installed = connection.execute_wrappers
+        connection.execute_wrappers = []
+        try:
+            with connection.execute_wrapper(passthrough):
+                ProfilingMiddleware(self._view)(request)
+
+            self.assertEqual(connection.execute_wrappers, [_record_query])
+        finally:
+            connection.execute_wrappers = installed
+        queries_file, = self._files(".sql.json")
+        with open(os.path.join(self.directory, queries_file)) as handle:
+            self.assertEqual(json.load(handle)["query_count"], 1)
+
+    def test_unsigned_or_forged_header_is_not_profiled(self):
+        """Test qu'un en-tête falsifié ne déclenche pas le profilage."""
+        request = self.factory.get("/", HTTP_X_BRIDGEQUEST_PROFILE="profile:forged")
+
+        response = ProfilingMiddleware(self._view)(request)
+
+        self.assertEqual(os.listdir(self.directory), [])
+        self.assertNotIn("X-BridgeQuest-Profile-File", response)
+
+    def test_async_chain_uses_sampling_profiler(self):
+        """Test que la chaîne async produit des piles repliées."""
+        async def view(request):
+            return HttpResponse(b"ok")
+
+        middleware = ProfilingMiddleware(view)
+        request = self.factory.get("/", HTTP_X_BRIDGEQUEST_PROFILE=profiling.make_profile_token())
+
+        async_to_sync(middleware)(request)
+
+        self.assertEqual(len(self._files(".folded")), 1)
+
+    @override_settings(PROFILING_MAX_FILES=2, PROFILING_TOP_N=1)
+    def test_rotation_keeps_slowest_profile_per_endpoint(self):
+        """Test que la rotation supprime les profils anciens mais garde le plus lent."""
+        durations = [0.5, 0.1, 0.2, 0.3]
+        for duration in durations:
+            profile = profiling.Profile(sampling=False)
+            profile.start()
+            profile.stop()
+            profile.duration = duration
+            profile.save("games:list")
+
+        slowest = self._index()["games:list"]
+        self.assertEqual([entry["duration_ms"] for entry in slowest], [500.0])
+        self.assertEqual(len(self._files(".prof")), 2)
+        self.assertIn(slowest[0]["profile"], self._files(".prof"))
+        self.assertEqual(len(self._files(".sql.json")), 2)
+
+    def test_consumer_handshake_header_profiles_connection(self):
+        """Test que l'en-tête de la poignée de main profile les messages WebSocket."""
+        consumer = profiling.profile_consumer(GameConsumer)
+        communicator = WebsocketCommunicator(
+            consumer.as_asgi(),
+            "/ws/game/1/",
+            headers=[(b"x-bridgequest-profile", profiling.make_profile_token().encode())],
+        )
+        communicator.scope["user"] = None
+        communicator.scope["url_route"] = {"kwargs": {"game_id": 1}}
+
+        connected, _ = async_to_sync(communicator.connect)()
+
+        self.assertFalse(connected)
+        self.assertIn("ws:GameConsumer.websocket.connect", self._index())
@@ -0,0 +1,150 @@
+"""
+Tests pour les budgets de requêtes SQL (utils.query_budget).
+"""
+from unittest.mock import patch
+
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from games.consumers import LobbyConsumer
+from games.models import Game, GameState, Player
+from locations.services import position_service
+from utils import metrics
+from utils.query_budget import QueryBudgetExceeded, query_budget
+from utils.sql_recorder import _record_query
+
+User = get_user_model()
+
+
+class QueryBudgetTestCase(TestCase):
+    """Tests pour query_budget (context manager, décorateur, modes)."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        metrics.reset()
+        self.user = User.objects.create_user(username="alice", email="alice@test.com")
+
+    def _queries(self, count):
+        """Exécute `count` requêtes SQL."""
+        for _ in range(count):
+            User.objects.filter(pk=self.user.pk).exists()
+
+    def test_budget_within_limit_records_metrics(self):
+        """Test qu'un bloc dans son budget passe et alimente les métriques par périmètre."""
+        with query_budget("scope", max_queries=2) as budget:
+            self._queries(2)
+
+        self.assertEqual(len(budget.queries), 2)
+        key = ("query_budget_queries_total", (("scope", "scope"),))
+        self.assertEqual(metrics.snapshot()[key], 2)
+
+    def test_exceeded_budget_raises_with_statements(self):
+        """Test qu'un dépassement lève QueryBudgetExceeded avec les requêtes exécutées."""
+        with self.assertRaisesMessage(QueryBudgetExceeded, "3 requêtes > 2"):
+            with query_budget("scope", max_queries=2):
+                self._queries(3)
+
+    def test_nested_budgets_share_queries(self):
+        """Test qu'une requête est attribuée à tous les budgets actifs."""
+        with query_budget("view") as outer:
+            self._queries(1)
+            with query_budget("service") as inner:
+                self._queries(2)
+
+        self.assertEqual((len(outer.queries), len(inner.queries)), (3, 2))
+
+    @override_settings(QUERY_BUDGET_MODE="warn")
+    def test_warn_mode_logs_instead_of_raising(self):
+        """Test qu'en mode warn un dépassement est journalisé."""
+        with self.assertLogs("bridgequest.query_budget", level="WARNING") as logs:
+            with query_budget("scope", max_queries=0):
+                self._queries(1)
+
+        self.assertIn("scope", logs.output[0])
+
+    @override_settings(QUERY_BUDGET_SAMPLE_RATE=0.0)
+    def test_unsampled_request_is_not_measured(self):
+        """Test qu'un traitement non échantillonné n'est pas mesuré (budgets imbriqués compris)."""
+        with query_budget("view", max_queries=0) as outer:
+            with query_budget("service", max_queries=0) as inner:
+                self._queries(1)
+
+        self.assertIsNone(outer)
+        self.assertIsNone(inner)
+
+    @override_settings(QUERY_BUDGET_MODE="off")
+    def test_off_mode_does_not_measure(self):
+        """Test que le mode off désactive la mesure."""
+        with query_budget("scope", max_queries=0) as budget:
+            self._queries(1)
+
+        self.assertIsNone(budget)
+
+    def test_recorder_installation_keeps_active_execute_wrappers(self):
+        """Test qu'une installation pendant un execute_wrapper ne déplace pas ce wrapper."""
+        def passthrough(execute, sql, params, many, context):
+            return execute(sql, params, many, context)
+
+        installed = connection.execute_wrappers
+        connection.execute_wrappers = []
+        try:
+            with connection.execute_wrapper(passthrough):
+                with query_budget("scope") as budget:
+                    self._queries(1)
+
+            self.assertEqual(connection.execute_wrappers, [_record_query])
+            self.assertEqual(len(budget.queries), 1)
+        finally:
+            connection.execute_wrappers = installed
+
+    async def test_async_decorator_counts_thread_queries(self):
+        """Test que les requêtes de database_sync_to_async sont attribuées au handler."""
+        @query_budget("handler", max_queries=1)
+        async def handler():
+            await database_sync_to_async(self._queries)(2)
+
+        with self.assertRaises(QueryBudgetExceeded):
+            await handler()
+
+
+class QueryBudgetRegressionTestCase(TestCase):
+    """Tests que les budgets des chemins chauds détectent les régressions N+1."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        self.user = User.objects.create_user(username="alice", email="alice@test.com")
+        self.game = Game.objects.create(code="ABC123", state=GameState.WAITING)
+        self.player = Player.objects.create(user=self.user, game=self.game)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_n_plus_one_in_positions_view_fails(self):
+        """Test qu'une requête par joueur dans game_positions_view dépasse le budget."""
+        original = position_service.get_latest_positions_for_game.__wrapped__
+
+        def n_plus_one(game):
+            positions = original(game)
+            for player in game.players.all():
+                Player.objects.get(pk=player.pk)
+            return positions
+
+        with patch("games.views.game_views.get_latest_positions_for_game", n_plus_one):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(f"/api/games/{self.game.id}/positions/")
+
+    async def test_lobby_connect_is_within_budget(self):
+        """Test que la connexion au lobby respecte son budget de requêtes."""
+        communicator = WebsocketCommunicator(LobbyConsumer.as_asgi(), f"/ws/lobby/{self.game.id}/")
+        communicator.scope["user"] = self.user
+        communicator.scope["url_route"] = {"kwargs": {"game_id": self.game.id}}
+
+        connected, _ = await communicator.connect()
+        await communicator.receive_json_from()
+        await communicator.send_json_to({"type": "leave"})
+        await communicator.disconnect()
+
+        self.assertTrue(connected)
@@ -0,0 +1,177 @@
+"""
+Tests des plans d'exécution des requêtes chaudes (utils.query_plans).
+
+Un jeu de données synthétique réaliste est construit une fois
+(games.services.synthetic_data, plus des noms d'utilisateur en collision),
+les statistiques du planificateur sont mises à jour, puis chaque requête
+chaude de HOT_QUERIES est exécutée par son chemin de code réel et son plan
+EXPLAIN vérifié : aucun parcours complet de table ou d'index, aucun tri
+temporaire.
+
+Portée : la suite s'exécute sur SQLite (bridgequest.settings.testing), seul
+moteur configuré dans le dépôt ; les requêtes chaudes n'y sont vérifiées que
+sous SQLite. Sous PostgreSQL, la détection des régressions est testée sur des
+plans d'exemple (PlanRegressionsTestCase) ; les plans réels ne sont vérifiés
+que si les DATABASES de test pointent vers PostgreSQL (les tests de
+HotQueryPlanTestCase, dont test_postgresql_lookups_use_index_conditions,
+s'exécutent alors sur ce moteur).
+"""
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from accounts.services import auth_service, profile_cache
+from games.models import Game, GameState
+from games.services import game_loop, game_reaper, lobby_service, score_service
+from games.services.synthetic_data import generate_synthetic_data
+from games.views.game_views import _game_players_response
+from locations.services.position_service import get_latest_positions_for_game
+from utils import query_plans
+
+User = get_user_model()
+
+USER_COUNT = 2000
+COLLIDING_USERNAMES = 25
+GAME_COUNT = 200
+PLAYERS_PER_GAME = 6
+POSITIONS_PER_PLAYER = 20
+
+# Requêtes chaudes : nom -> chemin de code réel, appelé avec le test case
+HOT_QUERIES = {
+    "get_latest_positions_for_game": lambda case: get_latest_positions_for_game(case.game),
+    "_handle_admin_exclusion": lambda case: lobby_service._handle_admin_exclusion(case.game),
+    "_generate_unique_username": lambda case: auth_service._generate_unique_username("alice"),
+    "create_or_get_user_from_sso_data": lambda case: (
+        auth_service.create_or_get_user_from_sso_data({"email": "user7@example.com"}, "google")
+    ),
+    "get_public_profile": lambda case: profile_cache.get_public_profile(case.player.user_id),
+    "get_public_profiles": lambda case: profile_cache.get_public_profiles([1, 2, 3]),
+    "game_players_view": lambda case: _game_players_response(case.game),
+    "get_leaderboard": lambda case: score_service.get_leaderboard(case.game.id),
+    "player.positions (Position.ordering)": lambda case: list(case.player.positions.all()[:50]),
+    "_find_stale_game_ids": lambda case: game_reaper._find_stale_game_ids(
+        [GameState.WAITING], timezone.now() - timedelta(hours=1), 100
+    ),
+    "_ids_with_recent_positions": lambda case: game_reaper._ids_with_recent_positions(
+        [case.game.id], timezone.now() - timedelta(minutes=5)
+    ),
+    "_active_game_ids": lambda case: game_loop._active_game_ids(),
+}
+
+# Tris tolérés : l'ensemble trié est borné par un parcours d'index
+# (les seules collisions du nom, triées par longueur de suffixe)
+BOUNDED_SORTS = {"_generate_unique_username"}
+
+
+def _build_dataset():
+    """
+    Construit le jeu de données synthétique et met à jour les statistiques.
+
+    Returns:
+        Game: Une partie en cours, cible des requêtes par partie
+    """
+    generate_synthetic_data(
+        USER_COUNT, GAME_COUNT, PLAYERS_PER_GAME, POSITIONS_PER_PLAYER, seed=42, prefix="user"
+    )
+    User.objects.bulk_create(
+        User(username=f"alice{index or ''}", email=f"alice{index}@example.com")
+        for index in range(COLLIDING_USERNAMES)
+    )
+    query_plans.analyze()
+    return Game.objects.filter(state=GameState.IN_PROGRESS).order_by("pk").first()
+
+
+class PlanRegressionsTestCase(SimpleTestCase):
+    """Tests pour plan_regressions (SQLite et PostgreSQL)."""
+
+    def _plan(self, vendor, *lines):
+        """Construit un plan factice."""
+        return query_plans.QueryPlan("SELECT 1", (), vendor, list(lines))
+
+    def test_sqlite_full_scans_and_temp_sorts_are_flagged(self):
+        """Test que SCAN (table ou index) et USE TEMP B-TREE sont signalés sous SQLite."""
+        plan = self._plan(
+            query_plans.VENDOR_SQLITE,
+            "SCAN accounts_user",
+            "SCAN accounts_user USING COVERING INDEX sqlite_autoindex_accounts_user_1",
+            "SEARCH games_player USING INDEX games_player_game_id (game_id=?)",
+            "USE TEMP B-TREE FOR ORDER BY",
+        )
+
+        self.assertEqual(len(query_plans.plan_regressions(plan)), 3)
+        self.assertEqual(len(query_plans.plan_regressions(plan, allow_sort=True)), 2)
+
+    def test_postgresql_seq_scans_and_sorts_are_flagged(self):
+        """Test que Seq Scan et Sort sont signalés sous PostgreSQL, pas Sort Key."""
+        plan = self._plan(
+            query_plans.VENDOR_POSTGRESQL,
+            "Limit  (cost=8.30..8.31 rows=1 width=8)",
+            "  ->  Sort  (cost=8.30..8.31 rows=1 width=8)",
+            "        Sort Key: date_joined DESC",
+            "        ->  Seq Scan on accounts_user  (cost=0.00..8.29 rows=1 width=8)",
+            "  ->  Index Scan using games_player_pkey on games_player  (cost=0.28..8.29 rows=1)",
+        )
+
+        self.assertEqual(
+            query_plans.plan_regressions(plan),
+            [
+                "->  Sort  (cost=8.30..8.31 rows=1 width=8)",
+                "->  Seq Scan on accounts_user  (cost=0.00..8.29 rows=1 width=8)",
+            ],
+        )
+
+
+class HotQueryPlanTestCase(TestCase):
+    """Tests que les requêtes chaudes restent indexées sur un jeu de données réaliste."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Construit le jeu de données synthétique une fois pour la classe."""
+        cls.game = _build_dataset()
+        cls.player = cls.game.players.order_by("pk").first()
+
+    def test_hot_queries_avoid_full_scans_and_temp_sorts(self):
+        """Test qu'aucune requête chaude ne parcourt une table entière ni ne trie en mémoire."""
+        for name, run in HOT_QUERIES.items():
+            with self.subTest(query=name):
+                plans = query_plans.capture_plans(run, self)
+
+                self.assertTrue(plans)
+                for plan in plans:
+                    regressions = query_plans.plan_regressions(
+                        plan, allow_sort=name in BOUNDED_SORTS
+                    )
+                    self.assertEqual(regressions, [], f"Plan dégradé pour {name} :\n{plan}")
+
+    def test_username_collisions_use_index_range(self):
+        """Test que l'allocation de nom borne le parcours de l'index unique de username."""
+        plan, = query_plans.capture_plans(auth_service._generate_unique_username, "alice")
+
+        self.assertEqual(
+            auth_service._generate_unique_username("alice"), f"alice{COLLIDING_USERNAMES}"
+        )
+        if plan.vendor == query_plans.VENDOR_SQLITE:
+            self.assertRegex(
+                plan.lines[0], r"^SEARCH accounts_user .*\(username>\? AND username<\?\)"
+            )
+
+    @skipUnless(
+        connection.vendor == query_plans.VENDOR_POSTGRESQL,
+        "DATABASES de test sur PostgreSQL requis (la suite du dépôt utilise SQLite)",
+    )
+    def test_postgresql_lookups_use_index_conditions(self):
+        """Test que, sous PostgreSQL, les recherches par nom et par email passent par un index."""
+        for name, column in (
+            ("_generate_unique_username", "username"),
+            ("create_or_get_user_from_sso_data", "email"),
+        ):
+            with self.subTest(query=name):
+                plans = query_plans.capture_plans(HOT_QUERIES[name], self)
+                text = "\n".join(line for plan in plans for line in plan.lines)
+
+                self.assertRegex(text, r"Index (Only )?Scan using \S+ on accounts_user")
+                self.assertRegex(text, rf"Index Cond: .*\b{column}\b")
@@ -0,0 +1,124 @@
+"""
+Tests pour le traçage par requête (utils.tracing).
+"""
+from asgiref.sync import sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from games.consumers import GameConsumer
+from games.models import Game, GameState, Player
+from utils import tracing
+
+User = get_user_model()
+
+
+@override_settings(TRACING_ENABLED=True, TRACING_EXPORTER=tracing.EXPORTER_MEMORY)
+class SpanTestCase(SimpleTestCase):
+    """Tests pour span, traced et la propagation traceparent."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        tracing.clear_finished_spans()
+
+    def test_nested_spans_share_trace(self):
+        """Test qu'un span ouvert dans un autre en est l'enfant."""
+        with tracing.span("parent"):
+            with tracing.span("child", {"key": "value"}):
+                pass
+
+        child, parent = tracing.get_finished_spans()
+        self.assertEqual(child["traceId"], parent["traceId"])
+        self.assertEqual(child["parentSpanId"], parent["spanId"])
+        self.assertEqual(parent["parentSpanId"], "")
+        self.assertEqual(child["attributes"], {"key": "value"})
+        self.assertGreaterEqual(child["endTimeUnixNano"], child["startTimeUnixNano"])
+
+    def test_traced_records_errors(self):
+        """Test que traced marque le span en erreur et propage l'exception."""
+        @tracing.traced("failing")
+        def failing():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            failing()
+
+        span, = tracing.get_finished_spans()
+        self.assertEqual(span["status"], {"code": "ERROR", "message": "ValueError"})
+
+    def test_traceparent_round_trip(self):
+        """Test que extract(inject()) rattache un span distant à la trace."""
+        with tracing.span("sender") as sender:
+            traceparent = tracing.inject()
+
+        with tracing.span("receiver", parent=tracing.extract(traceparent)):
+            pass
+
+        receiver = tracing.get_finished_spans()[-1]
+        self.assertEqual(receiver["traceId"], sender.trace_id)
+        self.assertEqual(receiver["parentSpanId"], sender.span_id)
+        self.assertIsNone(tracing.extract("garbage"))
+
+    @override_settings(TRACING_SAMPLE_RATE=0.0)
+    def test_unsampled_trace_records_nothing(self):
+        """Test qu'une trace non échantillonnée ne produit aucun span."""
+        with tracing.span("root"):
+            with tracing.span("child"):
+                self.assertIsNone(tracing.inject())
+
+        self.assertEqual(tracing.get_finished_spans(), [])
+
+    @override_settings(TRACING_ENABLED=False)
+    def test_disabled_tracing_is_noop(self):
+        """Test que le traçage désactivé ne produit aucun span."""
+        with tracing.span("root") as span:
+            self.assertIsNone(span)
+
+        self.assertEqual(tracing.get_finished_spans(), [])
+
+
+@override_settings(TRACING_ENABLED=True, TRACING_EXPORTER=tracing.EXPORTER_MEMORY)
+class PositionTraceTestCase(TestCase):
+    """Test de bout en bout : POST position → diffusion → livraison WebSocket."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        tracing.clear_finished_spans()
+        self.user = User.objects.create_user(username="alice", email="alice@test.com")
+        self.game = Game.objects.create(code="ABC123", state=GameState.IN_PROGRESS)
+        Player.objects.create(user=self.user, game=self.game)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    async def test_position_fix_is_traced_to_client_send(self):
+        """Test que toutes les étapes d'un fix appartiennent à la même trace."""
+        communicator = WebsocketCommunicator(GameConsumer.as_asgi(), f"/ws/game/{self.game.id}/")
+        communicator.scope["user"] = self.user
+        communicator.scope["url_route"] = {"kwargs": {"game_id": self.game.id}}
+        await communicator.connect()
+        await communicator.receive_json_from()
+
+        await sync_to_async(self.client.post)(
+            "/api/locations/",
+            {"game_id": self.game.id, "latitude": 48.85, "longitude": 2.35},
+            format="json",
+        )
+        frame = await communicator.receive_json_from()
+        await communicator.disconnect()
+
+        spans = {span["name"]: span for span in tracing.get_finished_spans()}
+        chain = [
+            "update_position_view",
+            "update_position",
+            "broadcast_position_updated",
+            "channel_layer.group_send",
+            "GameConsumer.position_updated",
+        ]
+        self.assertEqual({spans[name]["traceId"] for name in chain}, {spans[chain[0]]["traceId"]})
+        self.assertEqual(spans["update_position"]["parentSpanId"], spans["update_position_view"]["spanId"])
+        self.assertEqual(
+            spans["GameConsumer.position_updated"]["parentSpanId"],
+            spans["channel_layer.group_send"]["spanId"],
+        )
+        self.assertNotIn("traceparent", frame)
@@ -0,0 +1,224 @@
+"""
+Traçage léger par requête (spans) de Bridge Quest.
+
+Une trace suit un traitement de bout en bout, y compris au travers du
+channel layer : un fix GPS traverse update_position_view → update_position
+→ broadcast_position_updated → group_send → GameConsumer.position_updated
+(envoi au client), éventuellement sur deux workers différents.
+
+- span(name) : context manager (sync et async) qui ouvre un span enfant du
+  span courant (contextvar), ou une nouvelle trace. La décision
+  d'échantillonnage (TRACING_SAMPLE_RATE) est prise à la racine et héritée.
+- traced(name) : décorateur équivalent pour une fonction (sync ou async).
+- inject() / extract() : propagation dans les messages du channel layer au
+  format W3C traceparent (clé 'traceparent' de l'événement).
+
+Les spans terminés sont exportés (TRACING_EXPORTER) :
+- 'log' : une ligne JSON par span sur le logger bridgequest.tracing
+  (fichier via QueueListenerHandler en production, hors du chemin critique),
+- 'memory' : collecteur borné en mémoire (tests, benchmarks ; voir
+  get_finished_spans).
+
+Format des spans : champs d'un span OTLP/JSON (traceId, spanId,
+parentSpanId, name, startTimeUnixNano, endTimeUnixNano, attributes, status).
+
+Désactivé par défaut (TRACING_ENABLED) : span() ne fait alors qu'un test.
+"""
+import contextvars
+import functools
+import json
+import logging
+import os
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger('bridgequest.tracing')
+
+EXPORTER_LOG = 'log'
+EXPORTER_MEMORY = 'memory'
+
+_TRACEPARENT_VERSION = '00'
+_FLAG_SAMPLED = '01'
+
+# Marqueur d'une trace non échantillonnée : ses descendants ne créent pas de span
+_UNSAMPLED = object()
+
+_current_span = contextvars.ContextVar('trace_span', default=None)
+
+_finished_spans = deque(maxlen=10000)
+
+
+class SpanContext:
+    """Identifiants d'un span distant (extrait d'un traceparent)."""
+
+    __slots__ = ('trace_id', 'span_id')
+
+    def __init__(self, trace_id, span_id):
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+
+class Span:
+    """
+    Span en cours.
+
+    Args:
+        name: Nom de l'étape (ex. 'update_position')
+        trace_id: Identifiant de la trace (32 caractères hexadécimaux)
+        parent_id: Identifiant du span parent, ou None pour la racine
+        attributes: Attributs initiaux
+    """
+
+    __slots__ = (
+        'name', 'trace_id', 'span_id', 'parent_id', 'attributes', 'start_ns', 'end_ns', 'error',
+    )
+
+    def __init__(self, name, trace_id, parent_id=None, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    def set_attribute(self, key, value):
+        """Ajoute un attribut au span."""
+        self.attributes[key] = value
+
+    def to_dict(self):
+        """Représentation JSON du span (champs OTLP)."""
+        return {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_id or '',
+            'name': self.name,
+            'startTimeUnixNano': self.start_ns,
+            'endTimeUnixNano': self.end_ns,
+            'attributes': self.attributes,
+            'status': {'code': 'ERROR', 'message': self.error} if self.error else {'code': 'OK'},
+        }
+
+
+def _export(span):
+    """Exporte un span terminé vers l'exporteur configuré."""
+    if settings.TRACING_EXPORTER == EXPORTER_MEMORY:
+        _finished_spans.append(span.to_dict())
+    else:
+        logger.info(json.dumps(span.to_dict(), default=str))
+
+
+@contextmanager
+def span(name, attributes=None, parent=None):
+    """
+    Ouvre un span enfant du span courant (ou de `parent`), ou une nouvelle trace.
+
+    Args:
+        name: Nom de l'étape
+        attributes: Attributs du span (dict)
+        parent: SpanContext distant (voir extract), prioritaire sur le span courant
+
+    Yields:
+        Span | None: Le span ouvert, None si le traçage est inactif pour cette trace
+    """
+    if not settings.TRACING_ENABLED:
+        yield None
+        return
+
+    current = parent or _current_span.get()
+    if current is _UNSAMPLED or (
+        current is None and random.random() >= settings.TRACING_SAMPLE_RATE
+    ):
+        token = _current_span.set(_UNSAMPLED)
+        try:
+            yield None
+        finally:
+            _current_span.reset(token)
+        return
+
+    if current is None:
+        opened = Span(name, os.urandom(16).hex(), attributes=attributes)
+    else:
+        opened = Span(name, current.trace_id, current.span_id, attributes)
+    token = _current_span.set(opened)
+    try:
+        yield opened
+    except BaseException as exc:
+        opened.error = type(exc).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        opened.end_ns = time.time_ns()
+        _export(opened)
+
+
+def traced(name=None):
+    """
+    Décorateur : exécute la fonction dans un span (nom par défaut : module.fonction).
+
+    Args:
+        name: Nom du span
+    """
+    def decorator(func):
+        span_name = name or f'{func.__module__}.{func.__qualname__}'
+
+        if iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def inject():
+    """
+    Retourne le traceparent du span courant, à ajouter à un message channels.
+
+    Returns:
+        str | None: '00-<trace_id>-<span_id>-01', ou None hors trace échantillonnée
+    """
+    current = _current_span.get()
+    if not isinstance(current, Span):
+        return None
+    return f'{_TRACEPARENT_VERSION}-{current.trace_id}-{current.span_id}-{_FLAG_SAMPLED}'
+
+
+def extract(traceparent):
+    """
+    Lit le contexte distant d'un traceparent.
+
+    Args:
+        traceparent: Valeur reçue (ex. event.get('traceparent'))
+
+    Returns:
+        SpanContext | None: None si absent ou invalide
+    """
+    if not traceparent:
+        return None
+    parts = traceparent.split('-')
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return SpanContext(parts[1], parts[2])
+
+
+def get_finished_spans():
+    """Spans terminés du collecteur en mémoire (exporteur 'memory')."""
+    return list(_finished_spans)
+
+
+def clear_finished_spans():
+    """Vide le collecteur en mémoire (tests)."""
+    _finished_spans.clear()